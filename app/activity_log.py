@@ -0,0 +1,249 @@
+"""
+Append-only activity log for the audit endpoints
+
+Create/update activity on entities, investments, cash flows and valuations is
+captured from the session flush (using the records' own created_by/updated_by
+audit fields), so every write path - CRUD, bulk uploads, imports - lands in one
+narrow table. Audit queries then become single indexed range scans over
+(user, occurred_at), (tenant, occurred_at) or (investment, occurred_at) with
+keyset pagination instead of scanning each source table.
+"""
+
+import json
+from datetime import datetime
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, desc, event, func, literal, insert, select, inspect
+from sqlalchemy.orm import Session
+
+from app import models
+
+ActivityLog = models.ActivityLog
+
+# Snapshot fields stored with each event, per tracked model
+TRACKED_MODELS = {
+    models.Entity: ('name', 'entity_type'),
+    models.Investment: ('name', 'asset_class'),
+    models.CashFlow: ('type', 'amount', 'date'),
+    models.Valuation: ('nav_value', 'date'),
+}
+
+# System-maintained columns; changes limited to these are not user activity
+DERIVED_FIELDS = {
+    'called_amount', 'fees', 'last_forecast_date', 'updated_date',
+}
+
+
+def _json_value(value):
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    if hasattr(value, 'value'):  # Enums
+        return value.value
+    return value
+
+
+def _investment_id(obj) -> Optional[int]:
+    if isinstance(obj, models.Investment):
+        return obj.id
+    return getattr(obj, 'investment_id', None)
+
+
+def _changed_fields(obj) -> List[str]:
+    state = inspect(obj)
+    return [attr.key for attr in state.mapper.column_attrs
+            if state.attrs[attr.key].history.has_changes()]
+
+
+def _event_row(obj, action: str, occurred_at: datetime, changed: Optional[List[str]] = None) -> dict:
+    snapshot = {field: _json_value(getattr(obj, field, None)) for field in TRACKED_MODELS[type(obj)]}
+    if changed:
+        snapshot['changed_fields'] = changed
+
+    if action == 'create':
+        user_id = getattr(obj, 'created_by_user_id', None)
+        username = getattr(obj, 'created_by', None)
+    else:
+        user_id = getattr(obj, 'updated_by_user_id', None)
+        username = getattr(obj, 'updated_by', None)
+
+    return {
+        'occurred_at': occurred_at,
+        'tenant_id': getattr(obj, 'tenant_id', None),
+        'user_id': user_id,
+        'username': str(username) if username is not None else None,
+        'action': action,
+        'record_type': type(obj).__name__,
+        'record_id': obj.id,
+        'investment_id': _investment_id(obj),
+        'details': json.dumps(snapshot),
+    }
+
+
+def record_activity(session: Session, flush_context) -> None:
+    """after_flush hook: append one activity row per created/updated tracked record"""
+    occurred_at = datetime.utcnow()
+    rows = []
+
+    for obj in session.new:
+        if type(obj) in TRACKED_MODELS:
+            rows.append(_event_row(obj, 'create', occurred_at))
+
+    for obj in session.dirty:
+        if type(obj) not in TRACKED_MODELS or obj in session.new:
+            continue
+        changed = _changed_fields(obj)
+        if set(changed) - DERIVED_FIELDS:
+            rows.append(_event_row(obj, 'update', occurred_at, changed))
+
+    if rows:
+        # Executed on the flushing connection so the log commits (or rolls back) with the change
+        session.connection().execute(insert(ActivityLog.__table__), rows)
+
+
+def install_activity_log(session_factory) -> None:
+    """Attach the activity recorder to a sessionmaker (idempotent)"""
+    if not event.contains(session_factory, 'after_flush', record_activity):
+        event.listen(session_factory, 'after_flush', record_activity)
+
+
+# =============================================================================
+# Queries
+# =============================================================================
+
+def encode_cursor(occurred_at: datetime, activity_id: int) -> str:
+    return f"{occurred_at.isoformat()}|{activity_id}"
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        timestamp, activity_id = cursor.rsplit('|', 1)
+        return datetime.fromisoformat(timestamp), int(activity_id)
+    except (ValueError, AttributeError):
+        raise ValueError(f"Invalid activity cursor: {cursor}")
+
+
+def _scope_filters(since: Optional[datetime] = None, until: Optional[datetime] = None,
+                   tenant_id: Optional[int] = None, user_id: Optional[int] = None,
+                   username: Optional[str] = None, investment_id: Optional[int] = None,
+                   record_type: Optional[str] = None) -> list:
+    filters = []
+    if tenant_id is not None:
+        filters.append(ActivityLog.tenant_id == tenant_id)
+    if user_id is not None:
+        filters.append(ActivityLog.user_id == user_id)
+    if username is not None:
+        filters.append(ActivityLog.username == username)
+    if investment_id is not None:
+        filters.append(ActivityLog.investment_id == investment_id)
+    if record_type is not None:
+        filters.append(ActivityLog.record_type == record_type)
+    if since is not None:
+        filters.append(ActivityLog.occurred_at >= since)
+    if until is not None:
+        filters.append(ActivityLog.occurred_at < until)
+    return filters
+
+
+def serialize_activity(row: models.ActivityLog) -> dict:
+    return {
+        'id': row.id,
+        'occurred_at': row.occurred_at.isoformat() if row.occurred_at else None,
+        'tenant_id': row.tenant_id,
+        'user_id': row.user_id,
+        'username': row.username,
+        'action': row.action,
+        'record_type': row.record_type,
+        'record_id': row.record_id,
+        'investment_id': row.investment_id,
+        'details': json.loads(row.details) if row.details else {},
+    }
+
+
+def get_activity_page(db: Session, limit: int = 50, cursor: Optional[str] = None,
+                      **scope) -> Tuple[List[dict], Optional[str]]:
+    """
+    Newest-first page of activity for a scope (tenant/user/investment/time range).
+    Returns the rows and the cursor for the next page (None when exhausted).
+    """
+    query = db.query(ActivityLog).filter(*_scope_filters(**scope))
+
+    if cursor:
+        cursor_time, cursor_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            ActivityLog.occurred_at < cursor_time,
+            and_(ActivityLog.occurred_at == cursor_time, ActivityLog.id < cursor_id)
+        ))
+
+    rows = query.order_by(desc(ActivityLog.occurred_at), desc(ActivityLog.id)).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].occurred_at, rows[-1].id)
+
+    return [serialize_activity(row) for row in rows], next_cursor
+
+
+def count_activity(db: Session, **scope) -> Dict[Tuple[str, str], int]:
+    """Event counts keyed by (record_type, action) over a scope, in one grouped query"""
+    rows = db.query(
+        ActivityLog.record_type, ActivityLog.action, func.count(ActivityLog.id)
+    ).filter(*_scope_filters(**scope)).group_by(ActivityLog.record_type, ActivityLog.action).all()
+    return {(record_type, action): count for record_type, action, count in rows}
+
+
+def get_active_users(db: Session, **scope) -> List[str]:
+    """Distinct users with activity in a scope"""
+    rows = db.query(ActivityLog.username, ActivityLog.user_id).filter(
+        *_scope_filters(**scope)
+    ).distinct().all()
+    users = {username if username is not None else str(user_id)
+             for username, user_id in rows if username is not None or user_id is not None}
+    return sorted(users)
+
+
+# =============================================================================
+# Backfill
+# =============================================================================
+
+def backfill_activity_log(db: Session) -> int:
+    """
+    Seed the log from existing created_by/updated_by audit fields.
+    Runs only against an empty log so it is safe to call more than once.
+    """
+    if db.query(ActivityLog.id).first() is not None:
+        return 0
+
+    columns = ['occurred_at', 'tenant_id', 'user_id', 'username', 'action',
+               'record_type', 'record_id', 'investment_id']
+    inserted = 0
+    for model in TRACKED_MODELS:
+        investment_column = model.id if model is models.Investment else getattr(model, 'investment_id', literal(None))
+
+        # Creates: set-based insert straight from the source table
+        creates = select(
+            model.created_date, model.tenant_id, model.created_by_user_id, model.created_by,
+            literal('create'), literal(model.__name__), model.id, investment_column
+        ).where(model.created_date.isnot(None))
+        result = db.execute(insert(ActivityLog.__table__).from_select(columns, creates))
+        inserted += result.rowcount or 0
+
+        # Last update: created/updated defaults differ by microseconds on insert, so
+        # only a gap of more than a second counts as a real update
+        updates = db.execute(select(
+            model.updated_date, model.created_date, model.tenant_id, model.updated_by_user_id,
+            model.updated_by, model.id, investment_column
+        ).where(model.updated_date.isnot(None), model.created_date.isnot(None))).all()
+        rows = [
+            {'occurred_at': updated, 'tenant_id': tenant_id, 'user_id': user_id,
+             'username': str(username) if username is not None else None, 'action': 'update',
+             'record_type': model.__name__, 'record_id': record_id, 'investment_id': investment_id}
+            for updated, created, tenant_id, user_id, username, record_id, investment_id in updates
+            if (updated - created).total_seconds() > 1
+        ]
+        if rows:
+            db.execute(insert(ActivityLog.__table__), rows)
+            inserted += len(rows)
+
+    db.commit()
+    return inserted
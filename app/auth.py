@@ -6,13 +6,15 @@ with tenant isolation and role-based access control.
 """
 
 import os
+import threading
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from jose import JWTError, jwt
 from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, make_transient_to_detached
 
 from .database import get_db
 from .models import User, Tenant, UserRole
@@ -23,6 +25,16 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", "30"))
 REFRESH_TOKEN_EXPIRE_DAYS = int(os.getenv("REFRESH_TOKEN_EXPIRE_DAYS", "7"))
 
+# Resolved principals are cached per process for this long (0 disables the cache)
+PRINCIPAL_CACHE_TTL_SECONDS = float(os.getenv("PRINCIPAL_CACHE_TTL_SECONDS", "60"))
+PRINCIPAL_CACHE_MAX_ENTRIES = 10000
+
+# Tenants whose admins may change platform-wide reference data (e.g. FX rates);
+# comma-separated ids, empty means none (use the command-line importers instead)
+PLATFORM_ADMIN_TENANT_IDS = {
+    int(tenant_id) for tenant_id in os.getenv("PLATFORM_ADMIN_TENANT_IDS", "").split(",") if tenant_id.strip()
+}
+
 # Password hashing
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
@@ -107,6 +119,7 @@ def authenticate_user(db: Session, username: str, password: str) -> Optional[Use
     # Update last login
     user.last_login = datetime.utcnow()
     db.commit()
+    invalidate_principal(user.id, user.tenant_id)
 
     return user
 
@@ -187,6 +200,67 @@ def verify_token(token: str, token_type: str = "access") -> TokenData:
     except JWTError:
         raise AuthenticationError("Invalid token")
 
+# =============================================================================
+# Principal cache
+# =============================================================================
+#
+# get_current_user runs on every authenticated request. Active users are kept
+# as detached snapshots keyed by (user_id, tenant_id) and re-attached to the
+# request's session with merge(load=False), which issues no SQL, so a cache hit
+# costs only the JWT verify. Writes that change what a principal may do
+# (role, is_active, password, profile) call invalidate_principal; other
+# processes pick the change up when the TTL expires.
+
+_principal_cache: Dict[Tuple[int, int], Tuple[float, User]] = {}
+_principal_cache_lock = threading.Lock()
+
+
+def _snapshot_user(user: User) -> User:
+    """Detached copy of a user's column values, safe to share between requests"""
+    snapshot = User(**{column.key: getattr(user, column.key) for column in User.__table__.columns})
+    make_transient_to_detached(snapshot)
+    return snapshot
+
+
+def get_cached_principal(user_id: int, tenant_id: int) -> Optional[User]:
+    """Cached user snapshot, or None if absent or expired"""
+    with _principal_cache_lock:
+        entry = _principal_cache.get((user_id, tenant_id))
+        if entry is None:
+            return None
+        expires_at, snapshot = entry
+        if expires_at <= time.monotonic():
+            del _principal_cache[(user_id, tenant_id)]
+            return None
+        return snapshot
+
+
+def cache_principal(user: User):
+    """Remember an active user for PRINCIPAL_CACHE_TTL_SECONDS"""
+    if PRINCIPAL_CACHE_TTL_SECONDS <= 0:
+        return
+    now = time.monotonic()
+    snapshot = _snapshot_user(user)
+    with _principal_cache_lock:
+        if len(_principal_cache) >= PRINCIPAL_CACHE_MAX_ENTRIES:
+            for key in [k for k, (expires_at, _) in _principal_cache.items() if expires_at <= now]:
+                del _principal_cache[key]
+            if len(_principal_cache) >= PRINCIPAL_CACHE_MAX_ENTRIES:
+                _principal_cache.clear()
+        _principal_cache[(user.id, user.tenant_id)] = (now + PRINCIPAL_CACHE_TTL_SECONDS, snapshot)
+
+
+def invalidate_principal(user_id: Optional[int] = None, tenant_id: Optional[int] = None):
+    """Drop cached principals: one user, one tenant's users, or everything"""
+    with _principal_cache_lock:
+        if user_id is None and tenant_id is None:
+            _principal_cache.clear()
+            return
+        for key in list(_principal_cache):
+            if (user_id is None or key[0] == user_id) and (tenant_id is None or key[1] == tenant_id):
+                del _principal_cache[key]
+
+
 def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(security),
     db: Session = Depends(get_db)
@@ -213,6 +287,11 @@ def get_current_user(
     try:
         token_data = verify_token(credentials.credentials)
 
+        # Recently resolved principals skip the database round-trip
+        snapshot = get_cached_principal(token_data.user_id, token_data.tenant_id)
+        if snapshot is not None:
+            return db.merge(snapshot, load=False)
+
         # Get user from database to ensure they still exist and are active
         user = db.query(User).filter(
             User.id == token_data.user_id,
@@ -222,6 +301,7 @@ def get_current_user(
         if user is None or not user.is_active:
             raise credentials_exception
 
+        cache_principal(user)
         return user
 
     except AuthenticationError:
@@ -350,4 +430,16 @@ def refresh_access_token(refresh_token: str, db: Session) -> dict:
 require_admin = require_role(UserRole.ADMIN)
 require_manager = require_role(UserRole.MANAGER)
 require_contributor = require_role(UserRole.CONTRIBUTOR)
-require_viewer = require_role(UserRole.VIEWER)
\ No newline at end of file
+require_viewer = require_role(UserRole.VIEWER)
+
+def require_platform_admin(current_user: User = Depends(require_admin)) -> User:
+    """
+    Dependency for changes to data shared by every tenant: an admin of one of
+    the PLATFORM_ADMIN_TENANT_IDS tenants
+    """
+    if current_user.tenant_id not in PLATFORM_ADMIN_TENANT_IDS:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Shared reference data can only be changed by a platform administrator"
+        )
+    return current_user
\ No newline at end of file
@@ -0,0 +1,335 @@
+"""
+Portfolio-wide quartile ranking against PitchBook vintage benchmarks
+
+Ranks every investment of a tenant in one call. The IRR quantiles
+(PitchBookPerformanceByVintage) and TVPI/DPI quantiles
+(PitchBookMultiplesQuantiles) are loaded once into a BenchmarkQuantileIndex:
+an (asset class, vintage) -> row map over a rows x metrics x quantiles array
+holding the bottom decile, bottom quartile, median, top quartile and top decile.
+Investment IRR, TVPI and DPI come from the cached report dataset (a handful of
+bulk queries per tenant and date), so the whole book is ranked with array
+operations:
+
+- quartile: 1 (top) to 4 (bottom) against the quartile breakpoints, the same
+  rule as BenchmarkComparisonService.calculate_quartile_rank
+- percentile: linear interpolation between the available breakpoints,
+  extrapolated along the outermost segment and clipped to 0-100
+
+Results are also summarised per metric as asset class x vintage heatmaps.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy.orm import Session
+
+from app import models
+from app.models import AssetClass
+from app.performance import CashFlowEvent, calculate_irr
+from app.report_data import get_report_dataset
+
+RANK_METRICS = ('irr', 'tvpi', 'dpi')
+# Percentile of each stored breakpoint, low to high
+QUANTILE_PERCENTILES = np.array([10.0, 25.0, 50.0, 75.0, 90.0])
+
+IRR_QUANTILE_COLUMNS = ('bottom_decile', 'bottom_quartile', 'median_irr', 'top_quartile', 'top_decile')
+TVPI_QUANTILE_COLUMNS = ('tvpi_bottom_decile', 'tvpi_bottom_quartile', 'tvpi_median',
+                         'tvpi_top_quartile', 'tvpi_top_decile')
+DPI_QUANTILE_COLUMNS = ('dpi_bottom_decile', 'dpi_bottom_quartile', 'dpi_median',
+                        'dpi_top_quartile', 'dpi_top_decile')
+
+# PitchBook asset class codes per portfolio asset class, in lookup order
+# (the PDF parser stores real assets tables as infrastructure)
+BENCHMARK_ASSET_CLASSES = {
+    AssetClass.PRIVATE_EQUITY: ('private_equity',),
+    AssetClass.VENTURE_CAPITAL: ('venture_capital',),
+    AssetClass.PRIVATE_CREDIT: ('private_debt',),
+    AssetClass.REAL_ESTATE: ('real_estate',),
+    AssetClass.REAL_ASSETS: ('real_assets', 'infrastructure'),
+}
+
+
+def _as_float(value) -> float:
+    return np.nan if value is None else float(value)
+
+
+def _optional(value) -> Optional[float]:
+    return None if value is None or np.isnan(value) else float(value)
+
+
+def rank_against_quantiles(values: np.ndarray, quantiles: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Quartile ranks and percentiles of ``values`` (n) against per-row breakpoints
+    ``quantiles`` (n x 5, ordered as QUANTILE_PERCENTILES, NaN where missing).
+    Both results are NaN where the value or the needed breakpoints are missing.
+    """
+    values = np.asarray(values, dtype=float)
+    quantiles = np.asarray(quantiles, dtype=float).reshape(len(values), len(QUANTILE_PERCENTILES))
+    n, k = quantiles.shape
+    rows = np.arange(n)
+    positions = np.arange(k)
+    v = values[:, None]
+
+    # Quartile needs both quartiles and the median
+    quartile_breaks = quantiles[:, 1:4]
+    has_quartiles = ~np.isnan(quartile_breaks).any(axis=1) & ~np.isnan(values)
+    with np.errstate(invalid='ignore'):
+        quartile = 4.0 - (v >= quartile_breaks).sum(axis=1)
+    quartile = np.where(has_quartiles, quartile, np.nan)
+
+    # Nearest breakpoints below (lo) and above (hi) each value
+    valid = ~np.isnan(quantiles) & ~np.isnan(v)
+    with np.errstate(invalid='ignore'):
+        below = valid & (quantiles <= v)
+        above = valid & (quantiles > v)
+    lo = np.where(below, positions, -1).max(axis=1)
+    hi = np.where(above, positions, k).min(axis=1)
+    # Outside the breakpoints, extrapolate along the outermost segment
+    lo_prev = np.where(valid & (positions < lo[:, None]), positions, -1).max(axis=1)
+    hi_next = np.where(valid & (positions > hi[:, None]), positions, k).min(axis=1)
+
+    inside = (lo >= 0) & (hi < k)
+    top = (lo >= 0) & (hi == k) & (lo_prev >= 0)
+    bottom = (lo < 0) & (hi < k) & (hi_next < k)
+    start = np.select([inside, top, bottom], [lo, lo_prev, hi], default=-1)
+    end = np.select([inside, top, bottom], [hi, lo, hi_next], default=-1)
+    segment = start >= 0
+
+    # Fewer than two breakpoints leave no segment to interpolate on (NaN)
+    s, e = np.maximum(start, 0), np.maximum(end, 0)
+    q_start, q_end = quantiles[rows, s], quantiles[rows, e]
+    p_start, p_end = QUANTILE_PERCENTILES[s], QUANTILE_PERCENTILES[e]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        interpolated = p_start + (values - q_start) / (q_end - q_start) * (p_end - p_start)
+    flat = segment & ~(q_end > q_start)
+    interpolated = np.where(flat, p_start, interpolated)
+    percentile = np.where(segment, interpolated, np.nan)
+
+    return quartile, np.clip(percentile, 0.0, 100.0)
+
+
+@dataclass
+class BenchmarkQuantileIndex:
+    """Benchmark breakpoints per (PitchBook asset class, vintage year)"""
+    keys: Dict[Tuple[str, int], int]
+    quantiles: np.ndarray  # rows x len(RANK_METRICS) x len(QUANTILE_PERCENTILES)
+    quarter_end_dates: List[Optional[date]]
+
+    def lookup(self, asset_classes: Sequence, vintage_years: Sequence[Optional[int]]) -> np.ndarray:
+        """Row per investment (-1 where no benchmark covers its asset class and vintage)"""
+        rows = np.full(len(vintage_years), -1, dtype=np.int64)
+        for i, (asset_class, vintage_year) in enumerate(zip(asset_classes, vintage_years)):
+            for code in BENCHMARK_ASSET_CLASSES.get(asset_class, ()):
+                row = self.keys.get((code, vintage_year))
+                if row is not None:
+                    rows[i] = row
+                    break
+        return rows
+
+    def gather(self, rows: np.ndarray) -> np.ndarray:
+        """Breakpoints for each row index, NaN for -1"""
+        if not len(self.keys):
+            return np.full((len(rows), len(RANK_METRICS), len(QUANTILE_PERCENTILES)), np.nan)
+        gathered = self.quantiles[np.maximum(rows, 0)]
+        gathered[rows < 0] = np.nan
+        return gathered
+
+
+def load_benchmark_index(db: Session, quarter_end_date: Optional[date] = None) -> BenchmarkQuantileIndex:
+    """
+    Load the vintage benchmark quantiles with one query per table. For each
+    asset class and vintage the latest quarter on or before quarter_end_date
+    (any quarter when None) is used.
+    """
+    sources = (
+        (models.PitchBookPerformanceByVintage, {0: IRR_QUANTILE_COLUMNS}),
+        (models.PitchBookMultiplesQuantiles, {1: TVPI_QUANTILE_COLUMNS, 2: DPI_QUANTILE_COLUMNS}),
+    )
+    latest: Dict[Tuple[str, int], Dict[int, Tuple]] = {}
+    quarter_dates: Dict[Tuple[str, int], Optional[date]] = {}
+
+    for model, metric_columns in sources:
+        columns = [getattr(model, c) for cols in metric_columns.values() for c in cols]
+        query = db.query(model.asset_class, model.vintage_year, model.quarter_end_date, *columns)
+        if quarter_end_date is not None:
+            query = query.filter(model.quarter_end_date <= quarter_end_date)
+        # Oldest first (undated rows before dated ones) so the latest quarter wins
+        for row in sorted(query.all(), key=lambda r: (r[2] is not None, r[2] or date.min)):
+            key = (row[0], row[1])
+            values = row[3:]
+            for offset, (metric, cols) in enumerate(metric_columns.items()):
+                latest.setdefault(key, {})[metric] = values[offset * 5:(offset + 1) * 5]
+            if row[2] is not None:
+                quarter_dates[key] = max(row[2], quarter_dates.get(key) or row[2])
+            else:
+                quarter_dates.setdefault(key, None)
+
+    keys = {key: i for i, key in enumerate(sorted(latest))}
+    quantiles = np.full((len(keys), len(RANK_METRICS), len(QUANTILE_PERCENTILES)), np.nan)
+    for key, i in keys.items():
+        for metric, values in latest[key].items():
+            quantiles[i, metric] = [_as_float(v) for v in values]
+
+    return BenchmarkQuantileIndex(
+        keys=keys,
+        quantiles=quantiles,
+        quarter_end_dates=[quarter_dates.get(key) for key in keys]
+    )
+
+
+@dataclass
+class InvestmentRanking:
+    """One investment's metrics and ranks against its vintage benchmark"""
+    investment_id: int
+    name: str
+    asset_class: Optional[str]
+    vintage_year: Optional[int]
+    commitment_amount: float
+    benchmark_asset_class: Optional[str] = None
+    benchmark_quarter_end_date: Optional[date] = None
+    irr: Optional[float] = None
+    tvpi: Optional[float] = None
+    dpi: Optional[float] = None
+    irr_quartile: Optional[int] = None
+    tvpi_quartile: Optional[int] = None
+    dpi_quartile: Optional[int] = None
+    irr_percentile: Optional[float] = None
+    tvpi_percentile: Optional[float] = None
+    dpi_percentile: Optional[float] = None
+
+
+@dataclass
+class PortfolioBenchmarkRanking:
+    """Benchmark ranks for every investment of a tenant, with heatmaps per metric"""
+    tenant_id: int
+    as_of_date: date
+    quarter_end_date: Optional[date]
+    investments: List[InvestmentRanking]
+    heatmaps: Dict[str, List[dict]] = field(default_factory=dict)
+
+
+class BenchmarkRankingService:
+    """Ranks a whole portfolio against the PitchBook vintage benchmarks"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def investment_metrics(self, tenant_id: int, as_of_date: date):
+        """Positions and their IRR, TVPI and DPI arrays from the report dataset"""
+        dataset = get_report_dataset(self.db, tenant_id, as_of_date)
+        positions = [dataset.positions[i] for i in sorted(dataset.positions)]
+        index = {p.investment_id: i for i, p in enumerate(positions)}
+
+        metrics = np.full((len(positions), len(RANK_METRICS)), np.nan)
+        for i, p in enumerate(positions):
+            if p.called > 0:
+                metrics[i, 1] = p.tvpi
+                metrics[i, 2] = p.dpi
+
+        # IRR per investment from daily-netted flows plus the NAV on the as-of date
+        flows = dataset.flows
+        if not flows.empty:
+            daily = flows.assign(amount=flows['amount'].astype(float)).groupby(
+                ['investment_id', 'date'], sort=True
+            )['amount'].sum()
+            for investment_id, series in daily.groupby(level=0):
+                i = index.get(investment_id)
+                if i is None or positions[i].called <= 0:
+                    continue
+                events = [CashFlowEvent(date=d, amount=a) for (_, d), a in series.items()]
+                if positions[i].current_nav > 0:
+                    events.append(CashFlowEvent(date=as_of_date, amount=positions[i].current_nav))
+                if len(events) >= 2:
+                    irr = calculate_irr(events)
+                    if irr is not None:
+                        metrics[i, 0] = irr
+        return positions, metrics
+
+    def rank_portfolio(self, tenant_id: int, as_of_date: Optional[date] = None,
+                       quarter_end_date: Optional[date] = None) -> PortfolioBenchmarkRanking:
+        """Quartile and percentile ranks for every investment, plus asset class x vintage heatmaps"""
+        as_of_date = as_of_date or date.today()
+        benchmarks = load_benchmark_index(self.db, quarter_end_date)
+        positions, metrics = self.investment_metrics(tenant_id, as_of_date)
+
+        rows = benchmarks.lookup([p.asset_class for p in positions], [p.vintage_year for p in positions])
+        breakpoints = benchmarks.gather(rows)
+        quartiles = np.full(metrics.shape, np.nan)
+        percentiles = np.full(metrics.shape, np.nan)
+        for m in range(len(RANK_METRICS)):
+            quartiles[:, m], percentiles[:, m] = rank_against_quantiles(metrics[:, m], breakpoints[:, m])
+
+        benchmark_keys = list(benchmarks.keys)
+        rankings = []
+        for i, p in enumerate(positions):
+            ranking = InvestmentRanking(
+                investment_id=p.investment_id,
+                name=p.name,
+                asset_class=p.asset_class.value if isinstance(p.asset_class, AssetClass) else p.asset_class,
+                vintage_year=p.vintage_year,
+                commitment_amount=p.commitment_amount,
+                benchmark_asset_class=benchmark_keys[rows[i]][0] if rows[i] >= 0 else None,
+                benchmark_quarter_end_date=benchmarks.quarter_end_dates[rows[i]] if rows[i] >= 0 else None
+            )
+            for m, metric in enumerate(RANK_METRICS):
+                setattr(ranking, metric, _optional(metrics[i, m]))
+                quartile = _optional(quartiles[i, m])
+                setattr(ranking, f"{metric}_quartile", int(quartile) if quartile is not None else None)
+                percentile = _optional(percentiles[i, m])
+                setattr(ranking, f"{metric}_percentile", round(percentile, 1) if percentile is not None else None)
+            rankings.append(ranking)
+
+        return PortfolioBenchmarkRanking(
+            tenant_id=tenant_id,
+            as_of_date=as_of_date,
+            quarter_end_date=quarter_end_date,
+            investments=rankings,
+            heatmaps=build_heatmaps(rankings)
+        )
+
+
+def build_heatmaps(rankings: List[InvestmentRanking]) -> Dict[str, List[dict]]:
+    """
+    Per metric, one cell per (asset class, vintage) with the count of investments
+    in each quartile and the commitment-weighted average quartile and percentile
+    of the ranked investments.
+    """
+    frame = pd.DataFrame([vars(r) for r in rankings])
+    heatmaps = {metric: [] for metric in RANK_METRICS}
+    if frame.empty:
+        return heatmaps
+    frame = frame[frame['vintage_year'].notna()]
+
+    for metric in RANK_METRICS:
+        quartile, percentile = f"{metric}_quartile", f"{metric}_percentile"
+        for (asset_class, vintage_year), group in frame.groupby(['asset_class', 'vintage_year'], sort=True):
+            ranked = group[group[quartile].notna() | group[percentile].notna()]
+            cell = {
+                'asset_class': asset_class,
+                'vintage_year': int(vintage_year),
+                'investments': len(group),
+                'ranked': len(ranked),
+                'commitment': float(group['commitment_amount'].sum()),
+                'quartile_counts': {q: int((ranked[quartile] == q).sum()) for q in (1, 2, 3, 4)},
+                'average_quartile': None,
+                'average_percentile': None,
+            }
+            for column, key in ((quartile, 'average_quartile'), (percentile, 'average_percentile')):
+                values = ranked[ranked[column].notna()]
+                if not values.empty:
+                    weights = values['commitment_amount'].astype(float)
+                    if weights.sum() > 0:
+                        average = float(np.average(values[column].astype(float), weights=weights))
+                    else:
+                        average = float(values[column].astype(float).mean())
+                    cell[key] = round(average, 2)
+            heatmaps[metric].append(cell)
+    return heatmaps
+
+
+def create_benchmark_ranking_service(db: Session) -> BenchmarkRankingService:
+    """Factory function to create benchmark ranking service"""
+    return BenchmarkRankingService(db)
@@ -0,0 +1,127 @@
+"""
+Boot profiler
+
+Shows where a worker's cold start goes:
+
+    python -m app.boot_profile                      # profiles app.main_tenant
+    python -m app.boot_profile app.main --top 30
+
+Imports the application module in a fresh interpreter with ``-X importtime``,
+then reports the exclusive import time per top-level package (pandas,
+reportlab, app, ...) and the slowest application modules. Unless
+``--imports-only`` is given it then imports the app in this process and times
+each startup handler, which is what every uvicorn worker pays before serving.
+"""
+
+import argparse
+import asyncio
+import importlib
+import inspect
+import os
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@dataclass
+class ImportTiming:
+    module: str
+    self_us: int
+    cumulative_us: int
+    depth: int
+
+
+def parse_importtime(output: str) -> List[ImportTiming]:
+    """Parse ``python -X importtime`` stderr lines into timings"""
+    timings = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        parts = line[len('import time:'):].split('|')
+        if len(parts) != 3:
+            continue
+        try:
+            self_us, cumulative_us = int(parts[0]), int(parts[1])
+        except ValueError:
+            continue  # the header line
+        name = parts[2].rstrip()
+        stripped = name.lstrip()
+        # importtime indents nested imports by two spaces after the separator's space
+        timings.append(ImportTiming(stripped, self_us, cumulative_us, (len(name) - len(stripped) - 1) // 2))
+    return timings
+
+
+def package_totals(timings: List[ImportTiming]) -> List[Tuple[str, float]]:
+    """Exclusive import time per top-level package in ms, slowest first"""
+    totals: Dict[str, int] = defaultdict(int)
+    for timing in timings:
+        totals[timing.module.split('.')[0]] += timing.self_us
+    return sorted(((package, us / 1000) for package, us in totals.items()), key=lambda t: t[1], reverse=True)
+
+
+def profile_imports(module: str) -> List[ImportTiming]:
+    """Import a module in a fresh interpreter and collect its import timings"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=PROJECT_ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.splitlines()[-1] if result.stderr else ''}")
+    return parse_importtime(result.stderr)
+
+
+def profile_startup(module: str, attribute: str = 'app') -> Tuple[float, List[Tuple[str, float]]]:
+    """Import time of the app module in this process and the duration of each startup handler"""
+    started = time.perf_counter()
+    app = getattr(importlib.import_module(module), attribute)
+    import_seconds = time.perf_counter() - started
+
+    handlers = []
+    for handler in app.router.on_startup:
+        started = time.perf_counter()
+        if inspect.iscoroutinefunction(handler):
+            asyncio.run(handler())
+        else:
+            handler()
+        handlers.append((f"{handler.__module__}.{handler.__name__}", time.perf_counter() - started))
+    return import_seconds, handlers
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Report import and startup time of the API application")
+    parser.add_argument('module', nargs='?', default='app.main_tenant', help="Application module (default app.main_tenant)")
+    parser.add_argument('--top', type=int, default=20, help="Rows per table")
+    parser.add_argument('--imports-only', action='store_true', help="Skip running the startup handlers")
+    args = parser.parse_args(argv)
+
+    timings = profile_imports(args.module)
+    total_ms = sum(t.self_us for t in timings) / 1000
+    print(f"Import of {args.module}: {total_ms:.0f} ms across {len(timings)} modules\n")
+
+    print("Exclusive import time by package")
+    for package, ms in package_totals(timings)[:args.top]:
+        print(f"  {ms:9.1f} ms  {ms / total_ms:6.1%}  {package}")
+
+    app_modules = sorted((t for t in timings if t.module.split('.')[0] == 'app'),
+                         key=lambda t: t.cumulative_us, reverse=True)
+    print("\nSlowest application modules (cumulative, including their imports)")
+    for timing in app_modules[:args.top]:
+        print(f"  {timing.cumulative_us / 1000:9.1f} ms  {timing.module}")
+
+    if not args.imports_only:
+        sys.path.insert(0, PROJECT_ROOT)
+        import_seconds, handlers = profile_startup(args.module)
+        print(f"\nIn-process import: {import_seconds * 1000:.0f} ms")
+        for name, seconds in handlers:
+            print(f"  startup {name}: {seconds * 1000:.0f} ms")
+        if not handlers:
+            print("  no startup handlers")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,183 @@
+"""
+Cash flow and valuation listing
+
+Lists cash flows and valuations as projected column tuples instead of full ORM
+rows, ordered on (date, id) and paged with keyset cursors: pass the returned
+cursor back to continue after the last row of the previous page. Rows are
+turned into JSON-ready dicts column by column, so list endpoints can return
+them directly without per-row Pydantic validation. ``iter_rows`` walks a whole
+tenant history in keyset batches for streaming exports.
+"""
+
+import base64
+import enum
+import json
+import uuid
+from datetime import date, datetime
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_, asc, desc
+from sqlalchemy.orm import Session
+
+from app import models
+
+CashFlow, Valuation = models.CashFlow, models.Valuation
+
+CASHFLOW_FIELDS = ('id', 'uuid', 'investment_id', 'date', 'type', 'amount',
+                   'distribution_type', 'tax_year', 'k1_reportable', 'notes')
+VALUATION_FIELDS = ('id', 'uuid', 'investment_id', 'date', 'nav_value')
+
+# Fields returned when no selection is given (the CashFlow / Valuation schemas)
+DEFAULT_FIELDS = {
+    CashFlow: ('id', 'uuid', 'investment_id', 'date', 'type', 'amount'),
+    Valuation: VALUATION_FIELDS,
+}
+ALLOWED_FIELDS = {CashFlow: CASHFLOW_FIELDS, Valuation: VALUATION_FIELDS}
+
+EXPORT_BATCH_ROWS = 5000
+
+
+def parse_fields(model, fields: Optional[str]) -> Tuple[str, ...]:
+    """Validate a comma-separated field selection; raises ValueError for unknown fields"""
+    if not fields:
+        return DEFAULT_FIELDS[model]
+    selected = tuple(dict.fromkeys(f.strip() for f in fields.split(',') if f.strip()))
+    unknown = [f for f in selected if f not in ALLOWED_FIELDS[model]]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}; choose from {', '.join(ALLOWED_FIELDS[model])}")
+    return selected
+
+
+def encode_cursor(row_date: date, row_id: int) -> str:
+    payload = json.dumps([row_date.isoformat(), row_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[date, int]:
+    try:
+        row_date, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return date.fromisoformat(row_date), int(row_id)
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def _json_value(value):
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def serialize_rows(rows: Sequence[tuple]) -> List[tuple]:
+    """Row tuples with enums, dates and UUIDs made JSON-ready, converting each column once by its value type"""
+    if not rows:
+        return []
+    columns = list(zip(*rows))
+    for i, column in enumerate(columns):
+        sample = next((v for v in column if v is not None), None)
+        if isinstance(sample, (enum.Enum, date, datetime, uuid.UUID)):
+            columns[i] = [None if v is None else _json_value(v) for v in column]
+    return list(zip(*columns))
+
+
+def rows_to_dicts(fields: Sequence[str], rows: Sequence[tuple]) -> List[Dict]:
+    """Row tuples to JSON-ready dicts keyed by field"""
+    return [dict(zip(fields, values)) for values in serialize_rows(rows)]
+
+
+def _filtered_query(db: Session, model, fields: Sequence[str], tenant_id: int,
+                    investment_id: Optional[int] = None, start_date: Optional[date] = None,
+                    end_date: Optional[date] = None):
+    # date and id are always selected for the cursor, after the requested fields
+    query = db.query(*(getattr(model, f) for f in fields), model.date, model.id).filter(model.tenant_id == tenant_id)
+    if investment_id is not None:
+        query = query.filter(model.investment_id == investment_id)
+    if start_date:
+        query = query.filter(model.date >= start_date)
+    if end_date:
+        query = query.filter(model.date <= end_date)
+    return query
+
+
+def _after_cursor(query, model, cursor: Tuple[date, int], descending: bool):
+    last_date, last_id = cursor
+    if descending:
+        return query.filter(or_(model.date < last_date, and_(model.date == last_date, model.id < last_id)))
+    return query.filter(or_(model.date > last_date, and_(model.date == last_date, model.id > last_id)))
+
+
+def list_rows(
+    db: Session,
+    model,
+    tenant_id: int,
+    fields: Optional[Sequence[str]] = None,
+    investment_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    limit: Optional[int] = None,
+    cursor: Optional[str] = None,
+    sort_order: str = 'desc'
+) -> Tuple[List[Dict], Optional[str]]:
+    """
+    One page of CashFlow or Valuation rows as dicts of the selected fields,
+    ordered by (date, id), and the cursor for the next page (None when
+    exhausted or when no limit is given). Raises ValueError for a bad cursor.
+    """
+    fields = tuple(fields or DEFAULT_FIELDS[model])
+    descending = sort_order.lower() == 'desc'
+    query = _filtered_query(db, model, fields, tenant_id, investment_id, start_date, end_date)
+    if cursor:
+        query = _after_cursor(query, model, decode_cursor(cursor), descending)
+
+    direction = desc if descending else asc
+    query = query.order_by(direction(model.date), direction(model.id))
+    if limit is None:
+        return rows_to_dicts(fields, [row[:-2] for row in query.all()]), None
+
+    rows = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1][-2], rows[-1][-1])
+    return rows_to_dicts(fields, [row[:-2] for row in rows]), next_cursor
+
+
+def iter_rows(
+    db: Session,
+    model,
+    tenant_id: int,
+    fields: Optional[Sequence[str]] = None,
+    investment_id: Optional[int] = None,
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    batch_rows: int = EXPORT_BATCH_ROWS
+) -> Iterator[List[Dict]]:
+    """Every matching row in ascending (date, id) order, yielded in keyset batches of dicts"""
+    fields = tuple(fields or DEFAULT_FIELDS[model])
+    base = _filtered_query(db, model, fields, tenant_id, investment_id, start_date, end_date)
+    position = None
+    while True:
+        query = _after_cursor(base, model, position, False) if position else base
+        rows = query.order_by(asc(model.date), asc(model.id)).limit(batch_rows).all()
+        if not rows:
+            return
+        yield rows_to_dicts(fields, [row[:-2] for row in rows])
+        if len(rows) < batch_rows:
+            return
+        position = (rows[-1][-2], rows[-1][-1])
+
+
+def iter_json_array(batches: Iterator[List[Dict]]) -> Iterator[str]:
+    """Encode row batches as one JSON array, a batch at a time"""
+    yield '['
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        chunk = ','.join(json.dumps(row, separators=(',', ':')) for row in batch)
+        yield chunk if first else ',' + chunk
+        first = False
+    yield ']'
@@ -1,7 +1,7 @@
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date
-from app import models, schemas
+from app import models, schemas, activity_log
 from app.performance import (
     calculate_investment_performance, 
     aggregate_portfolio_performance, 
@@ -13,7 +13,7 @@ from app.performance import (
 )
 from app.models import CashFlowType, MarketBenchmark, BenchmarkReturn
 from sqlalchemy.orm import joinedload
-from sqlalchemy import desc, and_, or_
+from sqlalchemy import or_
 from datetime import datetime, timedelta
 
 # Entity CRUD operations
@@ -900,144 +900,66 @@ def get_documents_by_entity(db: Session, entity_id: int, include_archived: bool
 
 
 # ===== ENHANCED BASIC AUDITING SYSTEM =====
-# Basic audit reporting queries for tracking changes
-
-def get_recent_changes_by_user(db: Session, user: str, days: int = 30, limit: int = 50) -> dict:
+# Audit reporting queries served from the append-only activity_log table
+
+def _activity_details(activity: List[dict], record_type: str, action: str) -> List[dict]:
+    """Flatten activity rows of one kind into the legacy detail format"""
+    details = []
+    for item in activity:
+        if item['record_type'] != record_type or item['action'] != action:
+            continue
+        user_key, timestamp_key = ('created_by', 'created_date') if action == 'create' else ('updated_by', 'updated_date')
+        details.append({
+            'id': item['record_id'],
+            **({'investment_id': item['investment_id']} if record_type in ('CashFlow', 'Valuation') else {}),
+            **{('type' if k == 'entity_type' else k): v
+               for k, v in item['details'].items() if k != 'changed_fields'},
+            user_key: item['username'],
+            timestamp_key: item['occurred_at']
+        })
+    return details
+
+def get_recent_changes_by_user(db: Session, user: str, days: int = 30, limit: int = 50, cursor: Optional[str] = None) -> dict:
     """
     Get recent changes made by a specific user across all entities
-    Returns a summary of creates and updates by this user
+    Returns a summary of creates and updates by this user, with a keyset-paginated activity feed
     """
     since_date = datetime.utcnow() - timedelta(days=days)
     
-    # Query entities created by user
-    created_entities = db.query(models.Entity).filter(
-        and_(
-            models.Entity.created_by == user,
-            models.Entity.created_date >= since_date
-        )
-    ).order_by(desc(models.Entity.created_date)).limit(limit).all()
-    
-    # Query entities updated by user
-    updated_entities = db.query(models.Entity).filter(
-        and_(
-            models.Entity.updated_by == user,
-            models.Entity.updated_date >= since_date,
-            models.Entity.created_by != user  # Don't double-count newly created ones
-        )
-    ).order_by(desc(models.Entity.updated_date)).limit(limit).all()
-    
-    # Query investments created by user
-    created_investments = db.query(models.Investment).filter(
-        and_(
-            models.Investment.created_by == user,
-            models.Investment.created_date >= since_date
-        )
-    ).order_by(desc(models.Investment.created_date)).limit(limit).all()
-    
-    # Query investments updated by user
-    updated_investments = db.query(models.Investment).filter(
-        and_(
-            models.Investment.updated_by == user,
-            models.Investment.updated_date >= since_date,
-            models.Investment.created_by != user
-        )
-    ).order_by(desc(models.Investment.updated_date)).limit(limit).all()
-    
-    # Query cashflows created by user
-    created_cashflows = db.query(models.CashFlow).filter(
-        and_(
-            models.CashFlow.created_by == user,
-            models.CashFlow.created_date >= since_date
-        )
-    ).order_by(desc(models.CashFlow.created_date)).limit(limit).all()
+    counts = activity_log.count_activity(db, username=user, since=since_date)
+    activity, next_cursor = activity_log.get_activity_page(
+        db, limit=limit, cursor=cursor, username=user, since=since_date
+    )
     
-    # Query valuations created by user
-    created_valuations = db.query(models.Valuation).filter(
-        and_(
-            models.Valuation.created_by == user,
-            models.Valuation.created_date >= since_date
-        )
-    ).order_by(desc(models.Valuation.created_date)).limit(limit).all()
+    summary = {
+        'entities_created': counts.get(('Entity', 'create'), 0),
+        'entities_updated': counts.get(('Entity', 'update'), 0),
+        'investments_created': counts.get(('Investment', 'create'), 0),
+        'investments_updated': counts.get(('Investment', 'update'), 0),
+        'cashflows_created': counts.get(('CashFlow', 'create'), 0),
+        'valuations_created': counts.get(('Valuation', 'create'), 0),
+    }
+    summary['total_actions'] = sum(counts.values())
     
     return {
         'user': user,
         'period_days': days,
-        'summary': {
-            'entities_created': len(created_entities),
-            'entities_updated': len(updated_entities),
-            'investments_created': len(created_investments),
-            'investments_updated': len(updated_investments),
-            'cashflows_created': len(created_cashflows),
-            'valuations_created': len(created_valuations),
-            'total_actions': (
-                len(created_entities) + len(updated_entities) + 
-                len(created_investments) + len(updated_investments) + 
-                len(created_cashflows) + len(created_valuations)
-            )
-        },
+        'summary': summary,
         'details': {
-            'entities_created': [
-                {
-                    'id': e.id, 
-                    'name': e.name, 
-                    'type': e.entity_type, 
-                    'created_date': e.created_date.isoformat() if e.created_date else None
-                } 
-                for e in created_entities
-            ],
-            'entities_updated': [
-                {
-                    'id': e.id, 
-                    'name': e.name, 
-                    'type': e.entity_type, 
-                    'updated_date': e.updated_date.isoformat() if e.updated_date else None
-                } 
-                for e in updated_entities
-            ],
-            'investments_created': [
-                {
-                    'id': i.id, 
-                    'name': i.name, 
-                    'asset_class': i.asset_class, 
-                    'created_date': i.created_date.isoformat() if i.created_date else None
-                } 
-                for i in created_investments
-            ],
-            'investments_updated': [
-                {
-                    'id': i.id, 
-                    'name': i.name, 
-                    'asset_class': i.asset_class, 
-                    'updated_date': i.updated_date.isoformat() if i.updated_date else None
-                } 
-                for i in updated_investments
-            ],
-            'cashflows_created': [
-                {
-                    'id': cf.id, 
-                    'investment_id': cf.investment_id, 
-                    'type': cf.type, 
-                    'amount': cf.amount, 
-                    'date': cf.date.isoformat() if cf.date else None,
-                    'created_date': cf.created_date.isoformat() if cf.created_date else None
-                } 
-                for cf in created_cashflows
-            ],
-            'valuations_created': [
-                {
-                    'id': v.id, 
-                    'investment_id': v.investment_id, 
-                    'nav_value': v.nav_value, 
-                    'date': v.date.isoformat() if v.date else None,
-                    'created_date': v.created_date.isoformat() if v.created_date else None
-                } 
-                for v in created_valuations
-            ]
-        }
+            'entities_created': _activity_details(activity, 'Entity', 'create'),
+            'entities_updated': _activity_details(activity, 'Entity', 'update'),
+            'investments_created': _activity_details(activity, 'Investment', 'create'),
+            'investments_updated': _activity_details(activity, 'Investment', 'update'),
+            'cashflows_created': _activity_details(activity, 'CashFlow', 'create'),
+            'valuations_created': _activity_details(activity, 'Valuation', 'create')
+        },
+        'activity': activity,
+        'next_cursor': next_cursor
     }
 
 
-def get_investment_change_history(db: Session, investment_id: int, days: int = 90) -> dict:
+def get_investment_change_history(db: Session, investment_id: int, days: int = 90,
+                                  limit: int = 200, cursor: Optional[str] = None) -> dict:
     """
     Get the change history for a specific investment
     Shows who created it, who has updated it, and related changes
@@ -1049,21 +971,13 @@ def get_investment_change_history(db: Session, investment_id: int, days: int = 9
     if not investment:
         return {'error': 'Investment not found'}
     
-    # Get related cashflow changes
-    cashflow_changes = db.query(models.CashFlow).filter(
-        and_(
-            models.CashFlow.investment_id == investment_id,
-            models.CashFlow.created_date >= since_date
-        )
-    ).order_by(desc(models.CashFlow.created_date)).all()
+    counts = activity_log.count_activity(db, investment_id=investment_id, since=since_date)
+    activity, next_cursor = activity_log.get_activity_page(
+        db, limit=limit, cursor=cursor, investment_id=investment_id, since=since_date
+    )
     
-    # Get related valuation changes
-    valuation_changes = db.query(models.Valuation).filter(
-        and_(
-            models.Valuation.investment_id == investment_id,
-            models.Valuation.created_date >= since_date
-        )
-    ).order_by(desc(models.Valuation.created_date)).all()
+    cashflow_changes = counts.get(('CashFlow', 'create'), 0)
+    valuation_changes = counts.get(('Valuation', 'create'), 0)
     
     return {
         'investment_id': investment_id,
@@ -1076,122 +990,35 @@ def get_investment_change_history(db: Session, investment_id: int, days: int = 9
             'last_updated_date': investment.updated_date.isoformat() if investment.updated_date else None
         },
         'recent_changes': {
-            'cashflows_added': [
-                {
-                    'id': cf.id,
-                    'type': cf.type,
-                    'amount': cf.amount,
-                    'date': cf.date.isoformat() if cf.date else None,
-                    'created_by': cf.created_by,
-                    'created_date': cf.created_date.isoformat() if cf.created_date else None
-                }
-                for cf in cashflow_changes
-            ],
-            'valuations_added': [
-                {
-                    'id': v.id,
-                    'nav_value': v.nav_value,
-                    'date': v.date.isoformat() if v.date else None,
-                    'created_by': v.created_by,
-                    'created_date': v.created_date.isoformat() if v.created_date else None
-                }
-                for v in valuation_changes
-            ]
+            'cashflows_added': _activity_details(activity, 'CashFlow', 'create'),
+            'valuations_added': _activity_details(activity, 'Valuation', 'create')
         },
         'summary': {
-            'total_cashflow_changes': len(cashflow_changes),
-            'total_valuation_changes': len(valuation_changes),
-            'total_recent_activity': len(cashflow_changes) + len(valuation_changes)
-        }
+            'total_cashflow_changes': cashflow_changes,
+            'total_valuation_changes': valuation_changes,
+            'total_recent_activity': sum(counts.values())
+        },
+        'activity': activity,
+        'next_cursor': next_cursor
     }
 
 
-def get_system_activity_summary(db: Session, days: int = 7) -> dict:
+def get_system_activity_summary(db: Session, days: int = 7, tenant_id: Optional[int] = None) -> dict:
     """
     Get a summary of system-wide activity for the specified period
     Useful for family office oversight and compliance
     """
     since_date = datetime.utcnow() - timedelta(days=days)
     
-    # Count new entities
-    new_entities = db.query(models.Entity).filter(
-        models.Entity.created_date >= since_date
-    ).count()
-    
-    # Count new investments
-    new_investments = db.query(models.Investment).filter(
-        models.Investment.created_date >= since_date
-    ).count()
-    
-    # Count new cashflows
-    new_cashflows = db.query(models.CashFlow).filter(
-        models.CashFlow.created_date >= since_date
-    ).count()
-    
-    # Count new valuations
-    new_valuations = db.query(models.Valuation).filter(
-        models.Valuation.created_date >= since_date
-    ).count()
-    
-    # Count entity updates
-    entity_updates = db.query(models.Entity).filter(
-        and_(
-            models.Entity.updated_date >= since_date,
-            models.Entity.created_date < since_date  # Don't count newly created ones
-        )
-    ).count()
-    
-    # Count investment updates
-    investment_updates = db.query(models.Investment).filter(
-        and_(
-            models.Investment.updated_date >= since_date,
-            models.Investment.created_date < since_date
-        )
-    ).count()
-    
-    # Get active users (those who have created or updated something)
-    active_users_created = db.query(models.Entity.created_by).filter(
-        and_(
-            models.Entity.created_date >= since_date,
-            models.Entity.created_by.isnot(None)
-        )
-    ).union(
-        db.query(models.Investment.created_by).filter(
-            and_(
-                models.Investment.created_date >= since_date,
-                models.Investment.created_by.isnot(None)
-            )
-        )
-    ).union(
-        db.query(models.CashFlow.created_by).filter(
-            and_(
-                models.CashFlow.created_date >= since_date,
-                models.CashFlow.created_by.isnot(None)
-            )
-        )
-    ).distinct().all()
-    
-    active_users_updated = db.query(models.Entity.updated_by).filter(
-        and_(
-            models.Entity.updated_date >= since_date,
-            models.Entity.updated_by.isnot(None)
-        )
-    ).union(
-        db.query(models.Investment.updated_by).filter(
-            and_(
-                models.Investment.updated_date >= since_date,
-                models.Investment.updated_by.isnot(None)
-            )
-        )
-    ).distinct().all()
+    counts = activity_log.count_activity(db, tenant_id=tenant_id, since=since_date)
+    active_users = activity_log.get_active_users(db, tenant_id=tenant_id, since=since_date)
     
-    all_active_users = set()
-    for user_tuple in active_users_created:
-        if user_tuple[0]:
-            all_active_users.add(user_tuple[0])
-    for user_tuple in active_users_updated:
-        if user_tuple[0]:
-            all_active_users.add(user_tuple[0])
+    new_entities = counts.get(('Entity', 'create'), 0)
+    new_investments = counts.get(('Investment', 'create'), 0)
+    new_cashflows = counts.get(('CashFlow', 'create'), 0)
+    new_valuations = counts.get(('Valuation', 'create'), 0)
+    entity_updates = counts.get(('Entity', 'update'), 0)
+    investment_updates = counts.get(('Investment', 'update'), 0)
     
     return {
         'period_days': days,
@@ -1212,8 +1039,8 @@ def get_system_activity_summary(db: Session, days: int = 7) -> dict:
             )
         },
         'user_activity': {
-            'active_users': sorted(list(all_active_users)),
-            'active_user_count': len(all_active_users)
+            'active_users': active_users,
+            'active_user_count': len(active_users)
         }
     }
 
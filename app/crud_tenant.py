@@ -8,22 +8,26 @@ and include proper user audit trails.
 from sqlalchemy.orm import Session, joinedload
 from sqlalchemy import and_, or_, desc, func
 from typing import List, Optional, Tuple, Union
-from datetime import datetime
+from datetime import date, datetime
 from uuid import UUID
+import numpy as np
 
 from . import models
 from . import schemas  # Import the main schemas module
 from .schemas_auth.auth import TenantCreate, UserCreate, UserUpdate  # Import auth-specific schemas
-from .auth import get_password_hash
+from .auth import get_password_hash, invalidate_principal
 from .performance import (
     calculate_investment_performance,
-    calculate_true_portfolio_performance,
-    CashFlowEvent
+    calculate_true_portfolio_performance
 )
 from .models import (
     User, Tenant, Entity, Investment, CashFlow, Valuation,
     Document, FamilyMember, UserRole, TenantStatus, CashFlowType
 )
+from .fx_service import (
+    get_fx_table, get_reporting_currency, normalize_portfolio_flows,
+    DEFAULT_REPORTING_CURRENCY, FLOW_CONTRIBUTION, FLOW_DISTRIBUTION
+)
 
 # =============================================================================
 # Helper Functions for UUID/ID Lookups
@@ -197,6 +201,9 @@ def update_user(
 
     db.commit()
     db.refresh(db_user)
+
+    # Role, activation and profile changes must not be served from the principal cache
+    invalidate_principal(user_id, tenant_id)
     return db_user
 
 # =============================================================================
@@ -625,16 +632,22 @@ def get_tenant_stats(db: Session, tenant_id: int) -> dict:
     }
 
 
-def get_portfolio_performance(db: Session, tenant_id: int) -> schemas.PortfolioPerformance:
-    """Calculate and return aggregate portfolio performance metrics for a specific tenant"""
+def get_portfolio_performance(db: Session, tenant_id: int, currency: Optional[str] = None) -> schemas.PortfolioPerformance:
+    """
+    Calculate and return aggregate portfolio performance metrics for a specific tenant.
+    Amounts are expressed in ``currency`` (default: the tenant's reporting currency).
+    """
     # Get investments for the tenant
     investments = get_investments(db, tenant_id)
+    reporting_currency = (currency or get_reporting_currency(db, tenant_id)).upper()
+    today = date.today()
 
     investment_metrics = []
     investments_with_nav = 0
-    all_cash_flows = []  # Collect all cash flows for true portfolio IRR
+    # All actual cash flows (through today) as parallel arrays for one vectorized FX conversion
+    flow_investment, flow_dates, flow_amounts, flow_kinds = [], [], [], []
 
-    for investment in investments:
+    for index, investment in enumerate(investments):
         # Include ALL relevant cash flow types for contributions and distributions
         contributions = [cf for cf in investment.cashflows if cf.type in [CashFlowType.CAPITAL_CALL, CashFlowType.CONTRIBUTION]]
         distributions = [cf for cf in investment.cashflows if cf.type in [CashFlowType.DISTRIBUTION, CashFlowType.YIELD, CashFlowType.RETURN_OF_PRINCIPAL]]
@@ -648,20 +661,23 @@ def get_portfolio_performance(db: Session, tenant_id: int) -> schemas.PortfolioP
 
         # Collect all cash flows for portfolio-level IRR calculation
         # ONLY include actual cash flows through today (exclude future projected flows)
-        from datetime import date
-        today = date.today()
-
-        for cf in contributions:
-            if cf.date <= today:
-                all_cash_flows.append(CashFlowEvent(cf.date, -abs(cf.amount)))  # Contributions are negative
-        for cf in distributions:
-            if cf.date <= today:
-                all_cash_flows.append(CashFlowEvent(cf.date, abs(cf.amount)))   # Distributions are positive
-
-        # Add current NAV as final cash flow if exists
-        if perf_metrics.current_nav and perf_metrics.current_nav > 0:
-            # Use today's date for NAV valuation
-            all_cash_flows.append(CashFlowEvent(today, perf_metrics.current_nav))
+        for kind, flows, sign in ((FLOW_CONTRIBUTION, contributions, -1), (FLOW_DISTRIBUTION, distributions, 1)):
+            for cf in flows:
+                if cf.date <= today:
+                    flow_investment.append(index)
+                    flow_dates.append(cf.date)
+                    flow_amounts.append(sign * abs(cf.amount))  # Contributions negative, distributions positive
+                    flow_kinds.append(kind)
+
+    # Express every flow, NAV and total in the reporting currency; the current NAV of
+    # each investment becomes a terminal flow at today's date
+    currencies = [inv.currency or DEFAULT_REPORTING_CURRENCY for inv in investments]
+    needs_fx = any(c.upper() != reporting_currency for c in currencies)
+    fx = get_fx_table(db) if needs_fx else None
+    investment_metrics, all_cash_flows, unconverted = normalize_portfolio_flows(
+        fx, reporting_currency, currencies, investment_metrics,
+        flow_investment, flow_dates, flow_amounts, flow_kinds, today
+    )
 
     # Calculate true portfolio-level metrics using all cash flows
     portfolio_metrics = calculate_true_portfolio_performance(all_cash_flows, investment_metrics)
@@ -687,9 +703,14 @@ def get_portfolio_performance(db: Session, tenant_id: int) -> schemas.PortfolioP
     entities = db.query(Entity).filter(Entity.tenant_id == tenant_id, Entity.is_active == True).all()
     entity_count = len(entities)
 
-    # Calculate commitment and called amounts
-    total_commitment = sum(inv.commitment_amount for inv in investments)
-    total_called = sum(inv.called_amount for inv in investments)
+    # Calculate commitment and called amounts (at today's rates)
+    if fx is not None:
+        spot = fx.convert(np.ones(len(investments)), currencies, [today] * len(investments),
+                          reporting_currency, strict=False)
+    else:
+        spot = np.ones(len(investments))
+    total_commitment = float(sum(inv.commitment_amount * rate for inv, rate in zip(investments, spot)))
+    total_called = float(sum((inv.called_amount or 0) * rate for inv, rate in zip(investments, spot)))
 
     # Get unique asset classes and vintage years
     asset_classes = set()
@@ -720,7 +741,9 @@ def get_portfolio_performance(db: Session, tenant_id: int) -> schemas.PortfolioP
         dormant_investment_count=dormant_investments,
         realized_investment_count=realized_investments,
         total_commitment=total_commitment,
-        total_called=total_called
+        total_called=total_called,
+        reporting_currency=reporting_currency,
+        unconverted_currencies=unconverted
     )
 
 # =============================================================================
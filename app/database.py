@@ -1,8 +1,19 @@
+import contextvars
+import math
 import os
+import threading
+import time
+from typing import Optional
 from dotenv import load_dotenv
-from sqlalchemy import create_engine
+from fastapi import Request
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import QueuePool
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from starlette.datastructures import MutableHeaders
 from app.models import Base
+from app.activity_log import install_activity_log
 
 # Load environment variables
 load_dotenv()
@@ -10,19 +21,319 @@ load_dotenv()
 # Get database URL from environment or fall back to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./portfolio_tracker.db")
 
-# Configure engine based on database type
-if DATABASE_URL.startswith("sqlite"):
-    # SQLite specific configuration
-    engine = create_engine(DATABASE_URL, connect_args={"check_same_thread": False})
-else:
+# Connection pool settings (server databases and file-backed SQLite)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))
+DB_POOL_PRE_PING = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+
+# SQLite tuning: WAL lets dashboard reads run alongside a writer, and the busy
+# timeout makes a blocked writer wait instead of failing with "database is locked"
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_CACHE_SIZE_KB = int(os.getenv("SQLITE_CACHE_SIZE_KB", "65536"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+SQLITE_SYNCHRONOUS = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+
+# Optional read replica for analytics reads (a PostgreSQL standby, or a SQLite
+# snapshot file refreshed with snapshot_sqlite_replica for local testing)
+READ_REPLICA_URL = os.getenv("READ_REPLICA_URL")
+# Reads go to the primary while the client's last write is younger than this,
+# or while the replica reports more lag than this
+READ_REPLICA_MAX_LAG_SECONDS = float(os.getenv("READ_REPLICA_MAX_LAG_SECONDS", "5"))
+READ_REPLICA_LAG_CHECK_SECONDS = float(os.getenv("READ_REPLICA_LAG_CHECK_SECONDS", "10"))
+
+# Schema creation and seeding run from the one-shot ``python -m app.db_init``;
+# set this to also run them in every worker's startup (old behaviour)
+DB_INIT_ON_STARTUP = os.getenv("DB_INIT_ON_STARTUP", "false").lower() == "true"
+
+
+class PoolMetrics:
+    """Thread-safe counters for pool checkouts and the time spent waiting on them"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.total_wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+
+    def record(self, wait_seconds: float, timed_out: bool = False):
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.total_wait_seconds += wait_seconds
+            self.max_wait_seconds = max(self.max_wait_seconds, wait_seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            attempts = self.checkouts + self.timeouts
+            return {
+                "checkouts": self.checkouts,
+                "timeouts": self.timeouts,
+                "avg_wait_ms": round(self.total_wait_seconds / attempts * 1000, 3) if attempts else 0.0,
+                "max_wait_ms": round(self.max_wait_seconds * 1000, 3),
+            }
+
+
+class MeteredQueuePool(QueuePool):
+    """QueuePool that times every checkout, including waits for a free connection and new connects"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.metrics = PoolMetrics()
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            self.metrics.record(time.perf_counter() - started, timed_out=True)
+            raise
+        self.metrics.record(time.perf_counter() - started)
+        return connection
+
+    def recreate(self):
+        # Keep counting across engine.dispose()
+        pool = super().recreate()
+        pool.metrics = self.metrics
+        return pool
+
+
+def _is_memory_sqlite(database_url: str) -> bool:
+    return database_url in ("sqlite://", "sqlite:///:memory:") or "mode=memory" in database_url
+
+
+def _install_sqlite_pragmas(engine: Engine, wal: bool):
+    @event.listens_for(engine, "connect")
+    def _set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        if wal:
+            cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute(f"PRAGMA synchronous={SQLITE_SYNCHRONOUS}")
+        cursor.execute(f"PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute(f"PRAGMA cache_size={-SQLITE_CACHE_SIZE_KB}")
+        cursor.execute(f"PRAGMA mmap_size={SQLITE_MMAP_SIZE}")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.close()
+
+
+def create_db_engine(database_url: str = DATABASE_URL, pool_size: int = None, max_overflow: int = None,
+                     pool_timeout: float = None, pool_recycle: int = None) -> Engine:
+    """
+    Engine with pool sizing and recycling from the DB_POOL_* settings. SQLite
+    connections get WAL (file databases only), a busy timeout and the cache /
+    mmap pragmas. In-memory SQLite keeps SQLAlchemy's single-connection pool.
+    """
+    pool_args = {
+        "poolclass": MeteredQueuePool,
+        "pool_size": DB_POOL_SIZE if pool_size is None else pool_size,
+        "max_overflow": DB_MAX_OVERFLOW if max_overflow is None else max_overflow,
+        "pool_timeout": DB_POOL_TIMEOUT if pool_timeout is None else pool_timeout,
+        "pool_recycle": DB_POOL_RECYCLE if pool_recycle is None else pool_recycle,
+    }
+
+    if database_url.startswith("sqlite"):
+        # SQLite specific configuration
+        connect_args = {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_MS / 1000}
+        if _is_memory_sqlite(database_url):
+            engine = create_engine(database_url, connect_args=connect_args)
+        else:
+            engine = create_engine(database_url, connect_args=connect_args, **pool_args)
+        _install_sqlite_pragmas(engine, wal=not _is_memory_sqlite(database_url))
+        return engine
+
     # PostgreSQL or other databases
-    engine = create_engine(DATABASE_URL)
+    return create_engine(database_url, pool_pre_ping=DB_POOL_PRE_PING, **pool_args)
+
+
+def get_pool_metrics(bind: Engine = None) -> dict:
+    """Pool occupancy and checkout wait statistics for an engine (default: the application engine)"""
+    pool = (bind or engine).pool
+    stats = {"pool_class": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        stats.update({
+            "pool_size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "idle": pool.checkedin(),
+            "overflow": max(pool.overflow(), 0),
+            "max_overflow": pool._max_overflow,
+        })
+    metrics = getattr(pool, "metrics", None)
+    if metrics is not None:
+        stats.update(metrics.snapshot())
+    return stats
+
+
+# Read-after-write is tracked per client, not per process: a response to a
+# request that committed a write carries the write's wall-clock time in this
+# cookie and header, and get_read_db keeps that client on the primary until
+# the lag window has passed. API clients that do not keep cookies can echo
+# the header back instead.
+READ_AFTER_WRITE_COOKIE = "last_write_at"
+READ_AFTER_WRITE_HEADER = "X-Last-Write-At"
+
+# Write times committed during the current request, set by ReadAfterWriteMiddleware
+_request_writes: contextvars.ContextVar[Optional[dict]] = contextvars.ContextVar("request_writes", default=None)
+
+
+class ReadSessionRouter:
+    """
+    Chooses the session factory for read-only analytics. Reads use the replica
+    unless none is configured, the client committed a write within the lag
+    window (read-after-write), or the replica's measured lag is over the limit.
+    """
+
+    def __init__(self, primary_factory, replica_factory=None, max_lag_seconds: float = READ_REPLICA_MAX_LAG_SECONDS,
+                 lag_check_seconds: float = READ_REPLICA_LAG_CHECK_SECONDS):
+        self.primary_factory = primary_factory
+        self.replica_factory = replica_factory
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_check_seconds = lag_check_seconds
+        self._replica_lag = None
+        self._lag_checked_at = 0.0
+        self._lock = threading.Lock()
+
+    def replica_lag_seconds(self):
+        """Replication delay reported by a PostgreSQL standby (None when unknown), cached between checks"""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._lag_checked_at < self.lag_check_seconds:
+                return self._replica_lag
+            self._lag_checked_at = now
+        replica_engine = self.replica_factory.kw["bind"]
+        lag = None
+        if replica_engine.dialect.name == "postgresql":
+            try:
+                with replica_engine.connect() as conn:
+                    lag = conn.exec_driver_sql(
+                        "SELECT CASE WHEN pg_is_in_recovery() "
+                        "THEN EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) ELSE 0 END"
+                    ).scalar()
+            except Exception:
+                lag = float("inf")  # unreachable replica: stay on the primary until the next check
+        self._replica_lag = lag
+        return lag
+
+    def use_replica(self, last_write_at: Optional[float] = None) -> bool:
+        """``last_write_at`` is the wall-clock time of the client's last write, if known"""
+        if self.replica_factory is None:
+            return False
+        if last_write_at is not None and time.time() - last_write_at < self.max_lag_seconds:
+            return False
+        lag = self.replica_lag_seconds()
+        return lag is None or lag <= self.max_lag_seconds
+
+    def session(self, last_write_at: Optional[float] = None):
+        factory = self.replica_factory if self.use_replica(last_write_at) else self.primary_factory
+        return factory()
+
+
+def _record_request_write():
+    writes = _request_writes.get()
+    if writes is not None:
+        writes["last_write_at"] = time.time()
+
+
+def _install_write_tracking(session_factory):
+    @event.listens_for(session_factory, "after_flush")
+    def _mark_write(session, flush_context):
+        session.info["has_writes"] = True
+
+    @event.listens_for(session_factory, "do_orm_execute")
+    def _mark_bulk_write(orm_execute_state):
+        # Bulk INSERT/UPDATE/DELETE statements bypass the flush
+        if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+            orm_execute_state.session.info["has_writes"] = True
+
+    @event.listens_for(session_factory, "after_commit")
+    def _record_write(session):
+        if session.info.pop("has_writes", False):
+            _record_request_write()
+
+    @event.listens_for(session_factory, "after_rollback")
+    def _clear_write(session):
+        session.info.pop("has_writes", None)
+
+
+def client_last_write_at(request: Request) -> Optional[float]:
+    """Wall-clock time of the client's last write from the header or cookie (None when absent or malformed)"""
+    value = request.headers.get(READ_AFTER_WRITE_HEADER) or request.cookies.get(READ_AFTER_WRITE_COOKIE)
+    try:
+        last_write_at = float(value) if value else None
+    except ValueError:
+        return None
+    return last_write_at if last_write_at is not None and math.isfinite(last_write_at) else None
+
+
+class ReadAfterWriteMiddleware:
+    """
+    ASGI middleware that marks responses to requests which committed a write
+    with the read-after-write cookie and header, so the same client's reads
+    stay on the primary for ``max_age_seconds``
+    """
+
+    def __init__(self, app, max_age_seconds: float = READ_REPLICA_MAX_LAG_SECONDS):
+        self.app = app
+        self.max_age_seconds = max_age_seconds
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        # Shared by reference with the threadpool workers running sync handlers
+        writes = {}
+        token = _request_writes.set(writes)
+
+        async def send_marked(message):
+            if message["type"] == "http.response.start" and "last_write_at" in writes:
+                value = f"{writes['last_write_at']:.3f}"
+                headers = MutableHeaders(scope=message)
+                headers.append(READ_AFTER_WRITE_HEADER, value)
+                headers.append("set-cookie", f"{READ_AFTER_WRITE_COOKIE}={value}; "
+                                             f"Max-Age={math.ceil(self.max_age_seconds)}; Path=/; HttpOnly; SameSite=Lax")
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_marked)
+        finally:
+            _request_writes.reset(token)
+
+
+def snapshot_sqlite_replica(primary_url: str = DATABASE_URL, replica_url: str = READ_REPLICA_URL):
+    """Copy a SQLite primary into the replica file with the online backup API"""
+    import sqlite3
+    from sqlalchemy.engine import make_url
+
+    source = sqlite3.connect(make_url(primary_url).database)
+    target = sqlite3.connect(make_url(replica_url).database)
+    try:
+        source.backup(target)
+    finally:
+        target.close()
+        source.close()
+
+
+engine = create_db_engine(DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
-def create_database():
+# Record create/update activity for the audit endpoints
+install_activity_log(SessionLocal)
+
+read_engine = create_db_engine(READ_REPLICA_URL) if READ_REPLICA_URL else None
+ReadSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=read_engine) if read_engine else None
+read_router = ReadSessionRouter(SessionLocal, ReadSessionLocal)
+_install_write_tracking(SessionLocal)
+
+def create_schema():
+    """Create any missing tables"""
     Base.metadata.create_all(bind=engine)
-    
-    # Seed benchmark data on first run
+
+def seed_reference_data():
+    """Seed the benchmark reference data when the table is empty"""
     from app.benchmark_seeder import seed_benchmark_data
     from app.models import PerformanceBenchmark
     
@@ -38,9 +349,22 @@ def create_database():
     finally:
         db.close()
 
+def create_database():
+    """Create tables and seed reference data; run once per deploy via ``python -m app.db_init``"""
+    create_schema()
+    seed_reference_data()
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+def get_read_db(request: Request):
+    """Session for read-only analytics: the read replica when configured and fresh, else the primary"""
+    db = read_router.session(client_last_write_at(request))
+    try:
+        yield db
+    finally:
+        db.close()
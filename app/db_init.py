@@ -0,0 +1,87 @@
+"""
+One-shot database initialisation
+
+Creates missing tables, seeds the benchmark reference data and optionally runs
+migration scripts, once per deploy instead of in every worker's startup:
+
+    python -m app.db_init                                   # tables + seed data
+    python -m app.db_init --migration migration_fx_rates    # also run a migration
+    python -m app.db_init --list-migrations
+
+Migrations are the scripts in migrations/ that define ``run_migration()``; they
+run in the order given, and a script returning False stops the run.
+"""
+
+import argparse
+import importlib.util
+import os
+import sys
+from typing import List
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MIGRATIONS_DIR = os.path.join(PROJECT_ROOT, 'migrations')
+
+
+def available_migrations() -> List[str]:
+    """Names of the migration scripts that define run_migration()"""
+    names = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        if not filename.endswith('.py'):
+            continue
+        with open(os.path.join(MIGRATIONS_DIR, filename), encoding='utf-8') as script:
+            if 'def run_migration(' in script.read():
+                names.append(filename[:-3])
+    return names
+
+
+def run_migration_script(name: str) -> bool:
+    """Import migrations/<name>.py and call its run_migration()"""
+    path = os.path.join(MIGRATIONS_DIR, f"{name}.py")
+    if not os.path.exists(path):
+        print(f"❌ Migration {name} not found in {MIGRATIONS_DIR}")
+        return False
+
+    spec = importlib.util.spec_from_file_location(f"migrations.{name}", path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    if not hasattr(module, 'run_migration'):
+        print(f"❌ Migration {name} has no run_migration()")
+        return False
+
+    print(f"🔄 Running migration {name}...")
+    # Scripts signal failure by returning False; older ones return None on success
+    return module.run_migration() is not False
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Create tables, seed reference data and run migrations")
+    parser.add_argument('--no-seed', action='store_true', help="Only create missing tables")
+    parser.add_argument('--migration', action='append', default=[], metavar='NAME',
+                        help="Run migrations/NAME.py after creating tables (repeatable)")
+    parser.add_argument('--list-migrations', action='store_true', help="List available migrations and exit")
+    args = parser.parse_args(argv)
+
+    if args.list_migrations:
+        for name in available_migrations():
+            print(name)
+        return 0
+
+    from app.database import create_schema, seed_reference_data
+
+    print("🔄 Creating missing tables...")
+    create_schema()
+    print("✅ Schema ready")
+
+    if not args.no_seed:
+        seed_reference_data()
+
+    for name in args.migration:
+        if not run_migration_script(name):
+            print(f"❌ Migration {name} failed")
+            return 1
+        print(f"✅ Migration {name} complete")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,169 @@
+"""
+Entity listing with investment stats
+
+Lists entities together with their investment count, total commitment, called
+capital and latest NAV. The stats come from one GROUP BY entity_id subquery
+outer-joined to the entity page, so a page costs one query (plus one for family
+members) instead of one investment query per entity. Pages can be sorted on the
+entity columns or on any aggregate and walked with keyset cursors: pass the
+returned cursor back to continue after the last row of the previous page.
+"""
+
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import and_, or_, func, asc, desc
+from sqlalchemy.orm import Session, selectinload
+
+from app import models
+
+Entity, Investment, Valuation = models.Entity, models.Investment, models.Valuation
+
+SORT_FIELDS = (
+    'name', 'entity_type', 'created_date',
+    'investment_count', 'total_commitment', 'total_called', 'current_nav',
+)
+STAT_FIELDS = ('investment_count', 'total_commitment', 'total_called', 'current_nav')
+
+
+def encode_cursor(sort_by: str, value, entity_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    elif hasattr(value, 'value'):  # enum
+        value = value.value
+    payload = json.dumps([sort_by, value, entity_id], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor: str, sort_by: str) -> Tuple[object, int]:
+    try:
+        cursor_sort, value, entity_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError):
+        raise ValueError(f"Invalid entity cursor: {cursor}")
+    if cursor_sort != sort_by:
+        raise ValueError(f"Cursor was issued for sort_by={cursor_sort}, not {sort_by}")
+    if sort_by == 'created_date' and value is not None:
+        value = datetime.fromisoformat(value)
+    elif sort_by == 'entity_type' and value is not None:
+        value = models.EntityType(value)
+    return value, int(entity_id)
+
+
+def entity_stats_subquery(db: Session, tenant_id: Optional[int] = None, include_archived: bool = False,
+                          entity_ids: Optional[Iterable[int]] = None):
+    """Investment count, commitment, called and latest NAV per entity as one grouped subquery"""
+    latest_dates = db.query(
+        Valuation.investment_id, func.max(Valuation.date).label('latest_date')
+    )
+    if tenant_id is not None:
+        latest_dates = latest_dates.filter(Valuation.tenant_id == tenant_id)
+    latest_dates = latest_dates.group_by(Valuation.investment_id).subquery()
+
+    latest_navs = db.query(
+        Valuation.investment_id, func.max(Valuation.nav_value).label('nav_value')
+    ).join(
+        latest_dates,
+        and_(Valuation.investment_id == latest_dates.c.investment_id,
+             Valuation.date == latest_dates.c.latest_date)
+    ).group_by(Valuation.investment_id).subquery()
+
+    query = db.query(
+        Investment.entity_id.label('entity_id'),
+        func.count(Investment.id).label('investment_count'),
+        func.sum(Investment.commitment_amount).label('total_commitment'),
+        func.sum(func.coalesce(Investment.called_amount, 0.0)).label('total_called'),
+        func.sum(func.coalesce(latest_navs.c.nav_value, 0.0)).label('current_nav')
+    ).outerjoin(latest_navs, latest_navs.c.investment_id == Investment.id)
+
+    if tenant_id is not None:
+        query = query.filter(Investment.tenant_id == tenant_id)
+    if not include_archived:
+        query = query.filter(Investment.is_archived == False)
+    if entity_ids is not None:
+        query = query.filter(Investment.entity_id.in_(list(entity_ids)))
+
+    return query.group_by(Investment.entity_id).subquery()
+
+
+def get_entity_stats(db: Session, entity_id: int, tenant_id: Optional[int] = None,
+                     include_archived: bool = False) -> Dict[str, float]:
+    """Stats for a single entity"""
+    stats = entity_stats_subquery(db, tenant_id, include_archived, entity_ids=[entity_id])
+    row = db.query(*(stats.c[field] for field in STAT_FIELDS)).first()
+    if row is None:
+        return {'investment_count': 0, 'total_commitment': 0.0, 'total_called': 0.0, 'current_nav': 0.0}
+    return dict(zip(STAT_FIELDS, row))
+
+
+def get_entities_with_stats(
+    db: Session,
+    tenant_id: Optional[int] = None,
+    skip: int = 0,
+    limit: int = 100,
+    entity_type: Optional[str] = None,
+    search: Optional[str] = None,
+    include_inactive: bool = False,
+    include_archived: bool = False,
+    sort_by: str = 'name',
+    sort_order: str = 'asc',
+    cursor: Optional[str] = None
+) -> Tuple[List[dict], Optional[str]]:
+    """
+    One page of entities with their investment stats.
+    Returns entity dicts (entity columns, family_members and stats) and the
+    cursor for the next page (None when exhausted). Raises ValueError for an
+    unknown sort field or a cursor issued for a different sort.
+    """
+    if sort_by not in SORT_FIELDS:
+        raise ValueError(f"Cannot sort entities by {sort_by}; choose one of {', '.join(SORT_FIELDS)}")
+    descending = sort_order.lower() == 'desc'
+
+    stats = entity_stats_subquery(db, tenant_id, include_archived)
+    stat_columns = {
+        'investment_count': func.coalesce(stats.c.investment_count, 0),
+        'total_commitment': func.coalesce(stats.c.total_commitment, 0.0),
+        'total_called': func.coalesce(stats.c.total_called, 0.0),
+        'current_nav': func.coalesce(stats.c.current_nav, 0.0),
+    }
+    sort_column = stat_columns[sort_by] if sort_by in stat_columns else getattr(Entity, sort_by)
+
+    query = db.query(
+        Entity, *(stat_columns[field].label(field) for field in STAT_FIELDS)
+    ).outerjoin(stats, stats.c.entity_id == Entity.id).options(selectinload(Entity.family_members))
+
+    if tenant_id is not None:
+        query = query.filter(Entity.tenant_id == tenant_id)
+    if not include_inactive:
+        query = query.filter(Entity.is_active == True)
+    if entity_type:
+        query = query.filter(Entity.entity_type == entity_type)
+    if search:
+        query = query.filter(Entity.name.ilike(f"%{search}%"))
+
+    if cursor:
+        value, last_id = decode_cursor(cursor, sort_by)
+        if descending:
+            query = query.filter(or_(sort_column < value, and_(sort_column == value, Entity.id < last_id)))
+        else:
+            query = query.filter(or_(sort_column > value, and_(sort_column == value, Entity.id > last_id)))
+    elif skip:
+        query = query.offset(skip)
+
+    direction = desc if descending else asc
+    rows = query.order_by(direction(sort_column), direction(Entity.id)).limit(limit + 1).all()
+
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        last_value = last._mapping[sort_by] if sort_by in stat_columns else getattr(last[0], sort_by)
+        next_cursor = encode_cursor(sort_by, last_value, last[0].id)
+
+    entities = []
+    for entity, *values in rows:
+        entity_dict = {**entity.__dict__, 'family_members': entity.family_members}
+        entity_dict.update(zip(STAT_FIELDS, values))
+        entities.append(entity_dict)
+    return entities, next_cursor
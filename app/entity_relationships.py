@@ -5,13 +5,13 @@ Handles complex relationships, multi-entity ownership, and hierarchy visualizati
 
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_, func
-from typing import List, Optional
+from sqlalchemy import and_, or_, func, literal
+from typing import Dict, List, Optional
 from datetime import date, datetime
 
 from app.models import (
     Entity, EntityRelationship, InvestmentOwnership, EntityHierarchy,
-    Investment, AdvancedRelationshipType, OwnershipType, EntityType
+    Investment, Valuation, AdvancedRelationshipType, OwnershipType, EntityType
 )
 from app.schemas import (
     EntityRelationshipCreate, EntityRelationshipUpdate, EntityRelationship as EntityRelationshipSchema,
@@ -19,7 +19,7 @@ from app.schemas import (
     InvestmentOwnership as InvestmentOwnershipSchema, InvestmentOwnershipWithDetails,
     EntityHierarchyCreate, EntityHierarchyUpdate, EntityHierarchy as EntityHierarchySchema,
     EntityHierarchyNode, EntityWithRelationships, InvestmentWithOwnership,
-    FamilyTreeResponse, OwnershipVisualizationData
+    FamilyTreeResponse, OwnershipVisualizationData, EntitySubtreeNode, EntitySubtreeResponse
 )
 
 class EntityRelationshipService:
@@ -412,9 +412,246 @@ class EntityHierarchyService:
                 hierarchy.hierarchy_path = str(hierarchy.entity_id)
         else:
             hierarchy.hierarchy_path = str(hierarchy.entity_id)
-        
+
         db.commit()
-    
+
+    @staticmethod
+    def _subtree_clause(db: Session, path: str, include_root: bool = True):
+        """
+        Filter for a node and everything below it by hierarchy_path prefix.
+        SQLite compares paths with BINARY collation, so the descendants of "1.3"
+        are the index range ["1.3.", "1.3/") ('/' sorts right after '.'); other
+        backends use a prefix LIKE served by the varchar_pattern_ops index.
+        """
+        prefix = f"{path}."
+        if db.get_bind().dialect.name == 'sqlite':
+            descendants = and_(
+                EntityHierarchy.hierarchy_path >= prefix,
+                EntityHierarchy.hierarchy_path < f"{path}/"
+            )
+        else:
+            descendants = EntityHierarchy.hierarchy_path.startswith(prefix, autoescape=True)
+
+        if include_root:
+            return or_(EntityHierarchy.hierarchy_path == path, descendants)
+        return descendants
+
+    @staticmethod
+    def _is_in_subtree(path: str, root_path: str) -> bool:
+        """Whether ``path`` is ``root_path`` or lies below it"""
+        return path == root_path or path.startswith(f"{root_path}.")
+
+    @staticmethod
+    def move_subtree(db: Session, hierarchy: EntityHierarchy, new_parent_entity_id: Optional[int]) -> int:
+        """
+        Re-parent a hierarchy entry, rewriting the paths and levels of all its
+        descendants with one UPDATE over the old path prefix. Returns the number
+        of descendants rewritten; the caller commits.
+        """
+        old_path = hierarchy.hierarchy_path or str(hierarchy.entity_id)
+        new_path = str(hierarchy.entity_id)
+        new_level = 1
+
+        if new_parent_entity_id is not None:
+            if new_parent_entity_id == hierarchy.entity_id:
+                raise HTTPException(status_code=400, detail="An entity cannot be its own parent")
+
+            parent = db.query(Entity.id).filter(Entity.id == new_parent_entity_id).first()
+            if not parent:
+                raise HTTPException(status_code=404, detail="Parent entity not found")
+
+            parent_entry = db.query(EntityHierarchy).filter(
+                EntityHierarchy.entity_id == new_parent_entity_id
+            ).first()
+            if parent_entry:
+                parent_path = parent_entry.hierarchy_path or str(parent_entry.entity_id)
+                if EntityHierarchyService._is_in_subtree(parent_path, old_path):
+                    raise HTTPException(
+                        status_code=400,
+                        detail="Cannot move an entity below one of its own descendants"
+                    )
+                new_path = f"{parent_path}.{hierarchy.entity_id}"
+                new_level = (parent_entry.hierarchy_level or 1) + 1
+            else:
+                # Parent without a hierarchy entry: same treatment as _update_hierarchy_path
+                new_level = hierarchy.hierarchy_level or 1
+
+        level_delta = new_level - (hierarchy.hierarchy_level or 1)
+        moved = 0
+        if new_path != old_path or level_delta:
+            moved = db.query(EntityHierarchy).filter(
+                EntityHierarchyService._subtree_clause(db, old_path, include_root=False)
+            ).update({
+                EntityHierarchy.hierarchy_path: literal(new_path) + func.substr(
+                    EntityHierarchy.hierarchy_path, len(old_path) + 1
+                ),
+                EntityHierarchy.hierarchy_level: EntityHierarchy.hierarchy_level + level_delta
+            }, synchronize_session=False)
+
+        hierarchy.parent_entity_id = new_parent_entity_id
+        hierarchy.hierarchy_path = new_path
+        hierarchy.hierarchy_level = new_level
+        return moved
+
+    @staticmethod
+    def rebuild_hierarchy_paths(db: Session) -> int:
+        """Recompute every path and level from the parent links; returns the number of rows changed"""
+        entries = {entry.entity_id: entry for entry in db.query(EntityHierarchy).all()}
+        resolved = {}
+
+        def resolve(entity_id, trail):
+            if entity_id in resolved:
+                return resolved[entity_id]
+            entry = entries[entity_id]
+            parent_id = entry.parent_entity_id
+            if parent_id in entries and parent_id not in trail and parent_id != entity_id:
+                parent_path, parent_level = resolve(parent_id, trail | {entity_id})
+                resolved[entity_id] = (f"{parent_path}.{entity_id}", parent_level + 1)
+            else:
+                # Roots, parents without an entry and broken cycles start a new path
+                level = 1 if parent_id is None else (entry.hierarchy_level or 1)
+                resolved[entity_id] = (str(entity_id), level)
+            return resolved[entity_id]
+
+        changed = 0
+        for entity_id, entry in entries.items():
+            path, level = resolve(entity_id, frozenset())
+            if entry.hierarchy_path != path or entry.hierarchy_level != level:
+                entry.hierarchy_path = path
+                entry.hierarchy_level = level
+                changed += 1
+
+        db.commit()
+        return changed
+
+    @staticmethod
+    def _roll_up_subtree(nodes: Dict[int, EntitySubtreeNode], root_entity_id: int) -> EntitySubtreeNode:
+        """Link nodes to their parents and add each node's totals into its ancestors, deepest first"""
+        for node in nodes.values():
+            node.subtree_investment_count = node.investment_count
+            node.subtree_commitment = node.total_commitment
+            node.subtree_called = node.called_amount
+            node.subtree_nav = node.current_nav
+
+        for node in sorted(nodes.values(), key=lambda n: n.hierarchy_path.count('.'), reverse=True):
+            parent = nodes.get(node.parent_entity_id)
+            if node.entity_id == root_entity_id or parent is None:
+                continue
+            parent.children.append(node)
+            parent.subtree_investment_count += node.subtree_investment_count
+            parent.subtree_commitment += node.subtree_commitment
+            parent.subtree_called += node.subtree_called
+            parent.subtree_nav += node.subtree_nav
+
+        for node in nodes.values():
+            node.children.sort(key=lambda child: (child.sort_order, child.entity_name))
+        return nodes[root_entity_id]
+
+    @staticmethod
+    def get_subtree(db: Session, entity_id: int, as_of_date: Optional[date] = None,
+                    tenant_id: Optional[int] = None) -> EntitySubtreeResponse:
+        """
+        Get an entity and all its descendants with commitment, called and NAV
+        rolled up per node. Descendants come from one path-prefix query and the
+        investment totals from one grouped query over the same prefix, so the
+        cost follows the size of the subtree rather than the whole family tree.
+        Totals follow Investment.entity_id; ownership-weighted exposure is
+        served by the look-through endpoints.
+        """
+        as_of_date = as_of_date or date.today()
+
+        root_query = db.query(EntityHierarchy).join(
+            Entity, EntityHierarchy.entity_id == Entity.id
+        ).filter(EntityHierarchy.entity_id == entity_id)
+        if tenant_id is not None:
+            root_query = root_query.filter(Entity.tenant_id == tenant_id)
+        root = root_query.first()
+        if not root:
+            raise HTTPException(status_code=404, detail="Hierarchy entry not found")
+        if not root.hierarchy_path:
+            # Read path: never repair here; paths come from rebuild_hierarchy_paths
+            raise HTTPException(
+                status_code=409,
+                detail="Hierarchy paths are missing; run migrations/migration_hierarchy_path_index.py "
+                       "(EntityHierarchyService.rebuild_hierarchy_paths) to rebuild them"
+            )
+
+        subtree = EntityHierarchyService._subtree_clause(db, root.hierarchy_path)
+
+        # All descendants in one range scan
+        node_query = db.query(
+            EntityHierarchy.entity_id,
+            EntityHierarchy.parent_entity_id,
+            EntityHierarchy.hierarchy_level,
+            EntityHierarchy.hierarchy_path,
+            EntityHierarchy.sort_order,
+            Entity.name,
+            Entity.entity_type
+        ).join(Entity, EntityHierarchy.entity_id == Entity.id).filter(subtree)
+        if tenant_id is not None:
+            node_query = node_query.filter(Entity.tenant_id == tenant_id)
+
+        # Latest NAV per investment on or before the as-of date, for investments in the subtree only
+        latest_dates_query = db.query(
+            Valuation.investment_id, func.max(Valuation.date).label('latest_date')
+        ).join(
+            Investment, Investment.id == Valuation.investment_id
+        ).join(
+            EntityHierarchy, EntityHierarchy.entity_id == Investment.entity_id
+        ).filter(Valuation.date <= as_of_date, subtree)
+        if tenant_id is not None:
+            latest_dates_query = latest_dates_query.filter(Investment.tenant_id == tenant_id)
+        latest_dates = latest_dates_query.group_by(Valuation.investment_id).subquery()
+        latest_navs = db.query(
+            Valuation.investment_id, func.max(Valuation.nav_value).label('nav_value')
+        ).join(
+            latest_dates,
+            and_(Valuation.investment_id == latest_dates.c.investment_id,
+                 Valuation.date == latest_dates.c.latest_date)
+        ).group_by(Valuation.investment_id).subquery()
+
+        # Direct investment totals per entity, over the same prefix
+        totals_query = db.query(
+            Investment.entity_id,
+            func.count(Investment.id),
+            func.sum(Investment.commitment_amount),
+            func.sum(func.coalesce(Investment.called_amount, 0.0)),
+            func.sum(func.coalesce(latest_navs.c.nav_value, 0.0))
+        ).join(
+            EntityHierarchy, EntityHierarchy.entity_id == Investment.entity_id
+        ).outerjoin(
+            latest_navs, latest_navs.c.investment_id == Investment.id
+        ).filter(subtree)
+        if tenant_id is not None:
+            totals_query = totals_query.filter(Investment.tenant_id == tenant_id)
+        totals = {row[0]: row[1:] for row in totals_query.group_by(Investment.entity_id)}
+
+        nodes = {}
+        for node_entity_id, parent_id, level, path, sort_order, name, entity_type in node_query:
+            count, commitment, called, nav = totals.get(node_entity_id, (0, 0.0, 0.0, 0.0))
+            nodes[node_entity_id] = EntitySubtreeNode(
+                entity_id=node_entity_id,
+                entity_name=name,
+                entity_type=entity_type,
+                parent_entity_id=parent_id,
+                hierarchy_level=level or 1,
+                hierarchy_path=path,
+                sort_order=sort_order or 0,
+                investment_count=count or 0,
+                total_commitment=commitment or 0.0,
+                called_amount=called or 0.0,
+                current_nav=nav or 0.0
+            )
+
+        root_node = EntityHierarchyService._roll_up_subtree(nodes, root.entity_id)
+
+        return EntitySubtreeResponse(
+            as_of_date=as_of_date,
+            root=root_node,
+            total_entities=len(nodes),
+            max_hierarchy_depth=max(node.hierarchy_level for node in nodes.values())
+        )
+
     @staticmethod
     def get_family_tree(db: Session) -> FamilyTreeResponse:
         """Get complete family tree structure"""
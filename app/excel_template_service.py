@@ -2,21 +2,28 @@
 Excel Template Generation and Processing Service
 Professional-grade templates for institutional users
 """
+from collections import OrderedDict
+from dataclasses import dataclass
 from typing import List, Dict, Any, Tuple, Optional
 from io import BytesIO
+import hashlib
+import json
+import os
+import threading
 import pandas as pd
-from openpyxl import Workbook
-from openpyxl.styles import Font, Fill, PatternFill, Border, Side, Alignment
-from openpyxl.worksheet.datavalidation import DataValidation
-from openpyxl.utils.dataframe import dataframe_to_rows
-from openpyxl.formatting.rule import CellIsRule
-from openpyxl.worksheet.table import Table, TableStyleInfo
+import xlsxwriter
+from xlsxwriter.utility import xl_col_to_name
+from fastapi import Request, Response
 from sqlalchemy.orm import Session
-from datetime import datetime, date
+from sqlalchemy import func, case, and_
+from sqlalchemy.exc import SQLAlchemyError
+from datetime import date
 import logging
 
-from app import models, schemas, crud
+from app import models
 from app.models import CashFlowType, EntityType
+from app.upload_streaming import UploadSource, iter_excel_chunks
+from app.services.benchmark_cache import etag_matches
 
 logger = logging.getLogger(__name__)
 
@@ -54,517 +61,402 @@ class BulkUploadResult:
         if len(self.warnings) > 20:
             self.has_more_warnings = True
 
+TEMPLATE_CACHE_SIZE = int(os.getenv("EXCEL_TEMPLATE_CACHE_SIZE", "256"))
+XLSX_MEDIA_TYPE = "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
+
+TEMPLATE_FILENAMES = {
+    "nav": "NAV_Upload_Template.xlsx",
+    "cashflow": "CashFlow_Upload_Template.xlsx",
+    "investment": "Investment_Upload_Template.xlsx",
+    "entity": "Entity_Upload_Template.xlsx",
+}
+
+# Dropdown values matching the frontend enums exactly
+CASHFLOW_TYPES = ["CAPITAL_CALL", "FEES", "YIELD", "RETURN_OF_PRINCIPAL", "DISTRIBUTION"]
+ENTITY_TYPES = ["INDIVIDUAL", "TRUST", "LLC", "PARTNERSHIP", "CORPORATION", "FOUNDATION", "OTHER"]
+INVESTMENT_DROPDOWNS = [
+    # (db field, Validation Data header, named range, options)
+    ("entity_id", "Entities", "Entities", None),  # the tenant's entities, filled in per template
+    ("asset_class", "Asset Classes", "AssetClasses",
+     ["PUBLIC_EQUITY", "PUBLIC_FIXED_INCOME", "PRIVATE_EQUITY", "VENTURE_CAPITAL", "PRIVATE_CREDIT",
+      "REAL_ESTATE", "REAL_ASSETS", "CASH_AND_EQUIVALENTS"]),
+    ("investment_structure", "Investment Structures", "InvestmentStructures",
+     ["LIMITED_PARTNERSHIP", "DIRECT_INVESTMENT", "CO_INVESTMENT", "FUND_OF_FUNDS", "SEPARATE_ACCOUNT",
+      "HEDGE_FUND", "PUBLIC_MARKETS", "BANK_ACCOUNT", "LOAN"]),
+    ("liquidity_profile", "Liquidity Profiles", "LiquidityProfiles", ["ILLIQUID", "SEMI_LIQUID", "LIQUID"]),
+    ("reporting_frequency", "Reporting Frequencies", "ReportingFrequencies",
+     ["MONTHLY", "QUARTERLY", "SEMI_ANNUALLY", "ANNUALLY"]),
+    ("risk_rating", "Risk Ratings", "RiskRatings", ["LOW", "MEDIUM", "HIGH"]),
+    ("tax_classification", "Tax Classifications", "TaxClassifications",
+     ["1099", "K-1", "Schedule C", "W-2", "1041", "1120S"]),
+    ("activity_classification", "Activity Classifications", "ActivityClassifications",
+     ["ACTIVE", "PASSIVE", "PORTFOLIO"]),
+    ("currency", "Currencies", "Currencies", ["USD", "EUR", "GBP", "JPY"]),
+]
+
+
+@dataclass
+class RenderedTemplate:
+    """A generated template workbook and its ETag"""
+    kind: str
+    body: bytes
+    etag: str
+
+    @property
+    def filename(self) -> str:
+        return TEMPLATE_FILENAMES[self.kind]
+
+
 class ExcelTemplateService:
-    """Service for generating professional Excel templates and processing uploads"""
-    
-    def __init__(self):
+    """
+    Service for generating professional Excel templates
+
+    A template only depends on the tenant's investment names (NAV and cash flow
+    templates) or entity names (investment template), so rendered workbooks are
+    cached per tenant and template, keyed by a fingerprint of those names. Each
+    download re-reads the names - one narrow query - and rebuilds only when
+    they changed, which also picks up changes made through other workers.
+
+    Workbooks are written with xlsxwriter; dropdowns reference named ranges on
+    the 'Validation Data' sheet, so lists are not limited by Excel's 255
+    character inline formula.
+    """
+
+    def __init__(self, cache_size: int = TEMPLATE_CACHE_SIZE):
         # Professional color scheme
         self.colors = {
-            'header': 'FF2E86C1',  # Professional blue
-            'secondary': 'FFE8F4F8',  # Light blue
-            'success': 'FF27AE60',  # Green
-            'warning': 'FFF39C12',  # Orange
-            'error': 'FFE74C3C',   # Red
-            'border': 'FF5D6D7E'   # Gray
+            'header': '#2E86C1',  # Professional blue
+            'secondary': '#E8F4F8',  # Light blue
+            'required': '#D32F2F',  # Red
+            'field_name': '#FFFFCC',  # Light yellow
+            'sample': '#FFF8DC',  # Cornsilk
+            'border': '#5D6D7E'   # Gray
         }
-        
+
         # Standard fonts
         self.fonts = {
-            'header': Font(name='Calibri', size=12, bold=True, color='FFFFFF'),
-            'subheader': Font(name='Calibri', size=11, bold=True, color='FF2C3E50'),
-            'body': Font(name='Calibri', size=10),
-            'instruction': Font(name='Calibri', size=9, italic=True, color='FF7F8C8D')
+            'header': {'font_name': 'Calibri', 'font_size': 12, 'bold': True, 'font_color': '#FFFFFF'},
+            'required': {'font_name': 'Calibri', 'font_size': 11, 'bold': True, 'font_color': '#FFFFFF'},
+            'subheader': {'font_name': 'Calibri', 'font_size': 11, 'bold': True, 'font_color': '#2C3E50'},
+            'body': {'font_name': 'Calibri', 'font_size': 10},
+            'instruction': {'font_name': 'Calibri', 'font_size': 9, 'italic': True, 'font_color': '#7F8C8D'}
         }
 
-    def _create_professional_style(self, workbook: Workbook) -> Dict:
-        """Create professional styling elements"""
-        return {
-            'header_fill': PatternFill(start_color=self.colors['header'], end_color=self.colors['header'], fill_type="solid"),
-            'secondary_fill': PatternFill(start_color=self.colors['secondary'], end_color=self.colors['secondary'], fill_type="solid"),
-            'thin_border': Border(
-                left=Side(border_style="thin", color=self.colors['border']),
-                right=Side(border_style="thin", color=self.colors['border']),
-                top=Side(border_style="thin", color=self.colors['border']),
-                bottom=Side(border_style="thin", color=self.colors['border'])
-            ),
-            'center_alignment': Alignment(horizontal="center", vertical="center")
-        }
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Tuple[Optional[int], str], Tuple[str, RenderedTemplate]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    # =========================================================================
+    # Cached templates
+    # =========================================================================
+
+    def get_template(self, db: Session, kind: str, tenant_id: Optional[int] = None) -> RenderedTemplate:
+        """Template for the tenant (all data if None), rebuilt only when its names changed"""
+        if kind not in TEMPLATE_FILENAMES:
+            raise ValueError(f"Unknown template: {kind}")
+
+        names = self._template_names(db, kind, tenant_id)
+        fingerprint = hashlib.sha256(json.dumps([kind, names]).encode()).hexdigest()
+        key = (tenant_id, kind)
 
-    def generate_nav_template(self, db: Session) -> BytesIO:
+        with self._lock:
+            cached = self._cache.get(key)
+            if cached is not None and cached[0] == fingerprint:
+                self._cache.move_to_end(key)
+                return cached[1]
+
+        body = self.render_template(kind, names)
+        template = RenderedTemplate(kind=kind, body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        with self._lock:
+            self._cache[key] = (fingerprint, template)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return template
+
+    def clear_cache(self, tenant_id: Optional[int] = None):
+        """Drop cached templates (all, or one tenant's)"""
+        with self._lock:
+            for key in [k for k in self._cache if tenant_id is None or k[0] == tenant_id]:
+                del self._cache[key]
+
+    def _template_names(self, db: Session, kind: str, tenant_id: Optional[int]) -> List[str]:
+        """The names a template's dropdown is built from"""
+        if kind in ("nav", "cashflow"):
+            query = db.query(models.Investment.name).filter(models.Investment.name.isnot(None))
+            if tenant_id is not None:
+                query = query.filter(models.Investment.tenant_id == tenant_id)
+            return [name for name, in query.order_by(models.Investment.id) if name]
+        if kind == "investment":
+            # Display names as the investment importer matches them: "Name (TYPE)"
+            query = db.query(models.Entity.name, models.Entity.entity_type).filter(models.Entity.is_active == True)
+            if tenant_id is not None:
+                query = query.filter(models.Entity.tenant_id == tenant_id)
+            return [f"{name} ({entity_type.value if entity_type else 'Unknown'})"
+                    for name, entity_type in query.order_by(models.Entity.id)]
+        return []
+
+    def generate_nav_template(self, db: Session, tenant_id: Optional[int] = None) -> BytesIO:
         """Generate professional NAV upload template"""
-        workbook = Workbook()
-        styles = self._create_professional_style(workbook)
-        
-        # Remove default sheet and create NAV Data sheet
-        workbook.remove(workbook.active)
-        data_sheet = workbook.create_sheet("NAV Data")
-        instructions_sheet = workbook.create_sheet("Instructions")
-        validation_sheet = workbook.create_sheet("Validation Data")
-        
-        # Get investment names for dropdown validation
-        investments = crud.get_investments(db, skip=0, limit=1000)
-        investment_names = [inv.name for inv in investments if inv.name]
-        print(f"NAV Template: Found {len(investment_names)} investments: {investment_names}")
-        
-        self._create_nav_data_sheet(data_sheet, investment_names, styles)
-        self._create_nav_instructions_sheet(instructions_sheet, styles)
-        self._create_validation_data_sheet(validation_sheet, investment_names, styles)
-        
-        # Set active sheet to data entry
-        workbook.active = data_sheet
-        
-        # Save to BytesIO
-        excel_buffer = BytesIO()
-        workbook.save(excel_buffer)
-        excel_buffer.seek(0)
-        return excel_buffer
+        return BytesIO(self.get_template(db, "nav", tenant_id).body)
 
-    def generate_investment_template(self, db: Session) -> BytesIO:
+    def generate_cashflow_template(self, db: Session, tenant_id: Optional[int] = None) -> BytesIO:
+        """Generate professional Cash Flow upload template"""
+        return BytesIO(self.get_template(db, "cashflow", tenant_id).body)
+
+    def generate_investment_template(self, db: Session, tenant_id: Optional[int] = None) -> BytesIO:
         """Generate professional Investment bulk upload template"""
-        workbook = Workbook()
-        styles = self._create_professional_style(workbook)
-        
-        # Remove default sheet and create sheets
-        workbook.remove(workbook.active)
-        data_sheet = workbook.create_sheet("Investment Data")
-        instructions_sheet = workbook.create_sheet("Instructions")
-        validation_sheet = workbook.create_sheet("Validation Data")
-        
-        # Get entities for dropdown validation
-        entities = crud.get_entities(db, skip=0, limit=1000)
-        entity_names = [f"{entity.name} ({entity.entity_type.value if entity.entity_type else 'Unknown'})" for entity in entities]
-        entity_ids = [entity.id for entity in entities]
-        print(f"Investment Template: Found {len(entity_names)} entities: {entity_names}")
-        
-        # All dropdown values matching frontend enums exactly
-        asset_classes = ["PUBLIC_EQUITY", "PUBLIC_FIXED_INCOME", "PRIVATE_EQUITY", "VENTURE_CAPITAL", "PRIVATE_CREDIT", "REAL_ESTATE", "REAL_ASSETS", "CASH_AND_EQUIVALENTS"]
-        investment_structures = ["LIMITED_PARTNERSHIP", "DIRECT_INVESTMENT", "CO_INVESTMENT", "FUND_OF_FUNDS", "SEPARATE_ACCOUNT", "HEDGE_FUND", "PUBLIC_MARKETS", "BANK_ACCOUNT", "LOAN"]
-        liquidity_profiles = ["ILLIQUID", "SEMI_LIQUID", "LIQUID"]
-        reporting_frequencies = ["MONTHLY", "QUARTERLY", "SEMI_ANNUALLY", "ANNUALLY"]
-        risk_ratings = ["LOW", "MEDIUM", "HIGH"]
-        tax_classifications = ["1099", "K-1", "Schedule C", "W-2", "1041", "1120S"]
-        activity_classifications = ["ACTIVE", "PASSIVE", "PORTFOLIO"]
-        currencies = ["USD", "EUR", "GBP", "JPY"]
-        
-        self._create_investment_data_sheet(data_sheet, entity_names, entity_ids, asset_classes, investment_structures, liquidity_profiles, reporting_frequencies, risk_ratings, tax_classifications, activity_classifications, currencies, styles)
-        self._create_investment_instructions_sheet(instructions_sheet, styles)
-        self._create_investment_validation_data_sheet(validation_sheet, entity_names, entity_ids, asset_classes, investment_structures, liquidity_profiles, reporting_frequencies, risk_ratings, tax_classifications, activity_classifications, currencies, styles)
-        
-        # Set active sheet to data entry
-        workbook.active = data_sheet
-        
-        # Save to BytesIO
-        excel_buffer = BytesIO()
-        workbook.save(excel_buffer)
-        excel_buffer.seek(0)
-        return excel_buffer
+        return BytesIO(self.get_template(db, "investment", tenant_id).body)
 
-    def generate_entity_template(self, db: Session) -> BytesIO:
+    def generate_entity_template(self, db: Session, tenant_id: Optional[int] = None) -> BytesIO:
         """Generate professional Entity bulk upload template"""
-        workbook = Workbook()
-        styles = self._create_professional_style(workbook)
-        
-        # Remove default sheet and create sheets
-        workbook.remove(workbook.active)
-        data_sheet = workbook.create_sheet("Entity Data")
-        instructions_sheet = workbook.create_sheet("Instructions")
-        validation_sheet = workbook.create_sheet("Validation Data")
-        
-        # Entity type dropdown options
-        entity_types = ["INDIVIDUAL", "TRUST", "LLC", "PARTNERSHIP", "CORPORATION", "FOUNDATION", "OTHER"]
-        
-        self._create_entity_data_sheet(data_sheet, entity_types, styles)
-        self._create_entity_instructions_sheet(instructions_sheet, styles)
-        self._create_entity_validation_data_sheet(validation_sheet, entity_types, styles)
-        
-        # Set active sheet to data entry
-        workbook.active = data_sheet
-        
-        # Save to BytesIO
-        excel_buffer = BytesIO()
-        workbook.save(excel_buffer)
-        excel_buffer.seek(0)
-        return excel_buffer
-
-    def _create_nav_data_sheet(self, sheet, investment_names: List[str], styles: Dict):
-        """Create the NAV data entry sheet with validation"""
-        # Headers
-        headers = [
-            "Investment Name", "NAV Date", "NAV Value", "Notes"
-        ]
-        
-        # Header descriptions
-        descriptions = [
-            "Select from dropdown", "Format: YYYY-MM-DD", "Numeric value > 0", "Optional comments"
-        ]
-        
-        # Apply header styling
-        for col, (header, desc) in enumerate(zip(headers, descriptions), 1):
-            cell = sheet.cell(row=1, column=col)
-            cell.value = header
-            cell.font = self.fonts['header']
-            cell.fill = styles['header_fill']
-            cell.border = styles['thin_border']
-            cell.alignment = styles['center_alignment']
-            
-            # Add description in row 2
-            desc_cell = sheet.cell(row=2, column=col)
-            desc_cell.value = desc
-            desc_cell.font = self.fonts['instruction']
-            desc_cell.fill = styles['secondary_fill']
-            desc_cell.border = styles['thin_border']
-            desc_cell.alignment = styles['center_alignment']
-        
+        return BytesIO(self.get_template(db, "entity", tenant_id).body)
+
+    # =========================================================================
+    # Rendering
+    # =========================================================================
+
+    def render_template(self, kind: str, names: List[str]) -> bytes:
+        """Render one template workbook to .xlsx bytes (no database access)"""
+        builders = {
+            "nav": self._build_nav_template,
+            "cashflow": self._build_cashflow_template,
+            "investment": self._build_investment_template,
+            "entity": self._build_entity_template,
+        }
+        buffer = BytesIO()
+        workbook = xlsxwriter.Workbook(buffer, {'in_memory': True})
+        builders[kind](workbook, self._create_formats(workbook), names)
+        workbook.close()
+        return buffer.getvalue()
+
+    def _create_formats(self, workbook: xlsxwriter.Workbook) -> Dict:
+        """Create professional styling elements, once per workbook"""
+        border = {'border': 1, 'border_color': self.colors['border']}
+        center = {'align': 'center', 'valign': 'vcenter'}
+        wrapped = {'align': 'left', 'valign': 'top', 'text_wrap': True}
+        return {
+            'header': workbook.add_format({**self.fonts['header'], 'bg_color': self.colors['header'], **border, **center}),
+            'required': workbook.add_format({**self.fonts['required'], 'bg_color': self.colors['required'], **border, **center}),
+            'description': workbook.add_format({**self.fonts['instruction'], 'bg_color': self.colors['secondary'], **border, **center}),
+            'field_name': workbook.add_format({**self.fonts['instruction'], 'bg_color': self.colors['field_name'], **border, **center}),
+            'body': workbook.add_format({**self.fonts['body'], **border}),
+            'sample': workbook.add_format({**self.fonts['body'], 'bg_color': self.colors['sample'], **border}),
+            'subheader': workbook.add_format(self.fonts['subheader']),
+            'text': {
+                style: workbook.add_format({**self.fonts[style], **wrapped}) if style else workbook.add_format(wrapped)
+                for style in ('header', 'subheader', 'body', None)
+            },
+        }
+
+    def _write_instructions(self, sheet, instructions: List[Tuple[str, Optional[str]]], formats: Dict, width: int):
+        """Write an instructions sheet: one line of text per row in column A"""
+        for row, (text, style) in enumerate(instructions):
+            sheet.write_string(row, 0, text, formats['text'][style])
+        sheet.set_column(0, 0, width)
+
+    def _write_validation_lists(self, workbook, sheet, lists: List[Tuple[str, str, List[str]]], formats: Dict):
+        """Write dropdown lists into columns of the validation sheet, each under a named range"""
+        for col, (header, range_name, options) in enumerate(lists):
+            sheet.write_string(0, col, header, formats['subheader'])
+            for row, option in enumerate(options, 1):
+                sheet.write_string(row, col, option)
+            if options:
+                column = xl_col_to_name(col)
+                workbook.define_name(range_name, f"='{sheet.name}'!${column}$2:${column}${len(options) + 1}")
+
+    def _build_nav_template(self, workbook, formats: Dict, investment_names: List[str]):
+        """NAV Data, Instructions and Validation Data sheets"""
+        data_sheet = workbook.add_worksheet("NAV Data")
+        instructions_sheet = workbook.add_worksheet("Instructions")
+        validation_sheet = workbook.add_worksheet("Validation Data")
+
+        # Header row and descriptions in row 2
+        data_sheet.write_row(0, 0, ["Investment Name", "NAV Date", "NAV Value", "Notes"], formats['header'])
+        data_sheet.write_row(1, 0, ["Select from dropdown", "Format: YYYY-MM-DD", "Numeric value > 0", "Optional comments"],
+                             formats['description'])
+
         # Set column widths
-        sheet.column_dimensions['A'].width = 25  # Investment Name
-        sheet.column_dimensions['B'].width = 15  # NAV Date
-        sheet.column_dimensions['C'].width = 15  # NAV Value
-        sheet.column_dimensions['D'].width = 30  # Notes
-        
-        # Add data validation for Investment Name (dropdown)
+        data_sheet.set_column('A:A', 25)  # Investment Name
+        data_sheet.set_column('B:B', 15)  # NAV Date
+        data_sheet.set_column('C:C', 15)  # NAV Value
+        data_sheet.set_column('D:D', 30)  # Notes
+
         if investment_names:
-            print(f"Creating dropdown validation for {len(investment_names)} investments")
-            investment_validation = DataValidation(
-                type="list",
-                formula1=f"'Validation Data'!$A$2:$A${len(investment_names)+1}",
-                showDropDown=True
-            )
-            investment_validation.error = "Please select a valid investment name"
-            investment_validation.errorTitle = "Invalid Investment"
-            sheet.add_data_validation(investment_validation)
-            investment_validation.add(f"A3:A1000")
-        else:
-            print("WARNING: No investments found - dropdown will be empty")
-        
-        # Add date validation
-        date_validation = DataValidation(
-            type="date",
-            operator="greaterThan",
-            formula1="1900-01-01",
-            showDropDown=False
-        )
-        date_validation.error = "Please enter a valid date (YYYY-MM-DD)"
-        date_validation.errorTitle = "Invalid Date"
-        sheet.add_data_validation(date_validation)
-        date_validation.add("B3:B1000")
-        
-        # Add numeric validation for NAV Value
-        value_validation = DataValidation(
-            type="decimal",
-            operator="greaterThan",
-            formula1=0,
-            showDropDown=False
-        )
-        value_validation.error = "NAV Value must be greater than 0"
-        value_validation.errorTitle = "Invalid NAV Value"
-        sheet.add_data_validation(value_validation)
-        value_validation.add("C3:C1000")
-        
-        # Add sample data
-        sample_data = [
-            ["Example Fund LP", "2024-12-31", 1000000, "Q4 2024 valuation"],
-            ["", "", "", ""],  # Empty row for user input
-        ]
-        
-        for row_idx, row_data in enumerate(sample_data, 3):
-            for col_idx, value in enumerate(row_data, 1):
-                cell = sheet.cell(row=row_idx, column=col_idx)
-                cell.value = value
-                cell.font = self.fonts['body']
-                cell.border = styles['thin_border']
-                if row_idx == 3:  # Sample row - make it stand out
-                    cell.fill = PatternFill(start_color='FFF8DC', end_color='FFF8DC', fill_type="solid")
-
-    def _create_nav_instructions_sheet(self, sheet, styles: Dict):
-        """Create comprehensive instructions for NAV upload"""
+            data_sheet.data_validation('A3:A1000', {
+                'validate': 'list', 'source': '=InvestmentNames',
+                'error_title': 'Invalid Investment', 'error_message': 'Please select a valid investment name'
+            })
+        data_sheet.data_validation('B3:B1000', {
+            'validate': 'date', 'criteria': '>', 'value': date(1900, 1, 1),
+            'error_title': 'Invalid Date', 'error_message': 'Please enter a valid date (YYYY-MM-DD)'
+        })
+        data_sheet.data_validation('C3:C1000', {
+            'validate': 'decimal', 'criteria': '>', 'value': 0,
+            'error_title': 'Invalid NAV Value', 'error_message': 'NAV Value must be greater than 0'
+        })
+
+        # Sample row, then an empty row for user input
+        data_sheet.write_row(2, 0, ["Example Fund LP", "2024-12-31", 1000000, "Q4 2024 valuation"], formats['sample'])
+        data_sheet.write_row(3, 0, [""] * 4, formats['body'])
+        data_sheet.activate()
+
         instructions = [
-            ("NAV Upload Template Instructions", self.fonts['header']),
+            ("NAV Upload Template Instructions", 'header'),
             ("", None),
-            ("Overview:", self.fonts['subheader']),
-            ("This template allows you to upload Net Asset Values (NAVs) for your investments.", self.fonts['body']),
-            ("Please follow the format exactly to ensure successful import.", self.fonts['body']),
+            ("Overview:", 'subheader'),
+            ("This template allows you to upload Net Asset Values (NAVs) for your investments.", 'body'),
+            ("Please follow the format exactly to ensure successful import.", 'body'),
             ("", None),
-            ("Column Descriptions:", self.fonts['subheader']),
-            ("• Investment Name: Select from the dropdown list of existing investments", self.fonts['body']),
-            ("• NAV Date: Enter date in YYYY-MM-DD format (e.g., 2024-12-31)", self.fonts['body']),
-            ("• NAV Value: Enter numeric value greater than 0 (e.g., 1000000)", self.fonts['body']),
-            ("• Notes: Optional field for additional information", self.fonts['body']),
+            ("Column Descriptions:", 'subheader'),
+            ("• Investment Name: Select from the dropdown list of existing investments", 'body'),
+            ("• NAV Date: Enter date in YYYY-MM-DD format (e.g., 2024-12-31)", 'body'),
+            ("• NAV Value: Enter numeric value greater than 0 (e.g., 1000000)", 'body'),
+            ("• Notes: Optional field for additional information", 'body'),
             ("", None),
-            ("Important Notes:", self.fonts['subheader']),
-            ("• The investment must already exist in the system", self.fonts['body']),
-            ("• NAV Date must be a valid date", self.fonts['body']),
-            ("• NAV Value must be positive", self.fonts['body']),
-            ("• Duplicate NAV dates for the same investment will be rejected", self.fonts['body']),
-            ("• Maximum 1000 records per upload", self.fonts['body']),
+            ("Important Notes:", 'subheader'),
+            ("• The investment must already exist in the system", 'body'),
+            ("• NAV Date must be a valid date", 'body'),
+            ("• NAV Value must be positive", 'body'),
+            ("• Duplicate NAV dates for the same investment will be rejected", 'body'),
+            ("• Maximum 1000 records per upload", 'body'),
             ("", None),
-            ("Steps to Use:", self.fonts['subheader']),
-            ("1. Switch to the 'NAV Data' tab", self.fonts['body']),
-            ("2. Fill in your data starting from row 3", self.fonts['body']),
-            ("3. Use the dropdown for Investment Name", self.fonts['body']),
-            ("4. Save the file and upload through the web interface", self.fonts['body']),
+            ("Steps to Use:", 'subheader'),
+            ("1. Switch to the 'NAV Data' tab", 'body'),
+            ("2. Fill in your data starting from row 3", 'body'),
+            ("3. Use the dropdown for Investment Name", 'body'),
+            ("4. Save the file and upload through the web interface", 'body'),
             ("", None),
-            ("Support:", self.fonts['subheader']),
-            ("Contact your administrator for assistance or questions", self.fonts['body']),
+            ("Support:", 'subheader'),
+            ("Contact your administrator for assistance or questions", 'body'),
         ]
-        
-        for row, (text, font) in enumerate(instructions, 1):
-            cell = sheet.cell(row=row, column=1)
-            cell.value = text
-            if font:
-                cell.font = font
-            cell.alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
-        
-        sheet.column_dimensions['A'].width = 80
+        self._write_instructions(instructions_sheet, instructions, formats, 80)
 
-    def generate_cashflow_template(self, db: Session) -> BytesIO:
-        """Generate professional Cash Flow upload template"""
-        workbook = Workbook()
-        styles = self._create_professional_style(workbook)
-        
-        # Remove default sheet and create sheets
-        workbook.remove(workbook.active)
-        data_sheet = workbook.create_sheet("Cash Flow Data")
-        instructions_sheet = workbook.create_sheet("Instructions")
-        validation_sheet = workbook.create_sheet("Validation Data")
-        
-        # Get investment names for dropdown validation
-        investments = crud.get_investments(db, skip=0, limit=1000)
-        investment_names = [inv.name for inv in investments if inv.name]
-        print(f"Cash Flow Template: Found {len(investment_names)} investments: {investment_names}")
-        
-        # Cash flow types - using the enhanced categories
-        cashflow_types = [
-            "CAPITAL_CALL",
-            "FEES", 
-            "YIELD",
-            "RETURN_OF_PRINCIPAL",
-            "DISTRIBUTION"
-        ]
-        
-        self._create_cashflow_data_sheet(data_sheet, investment_names, cashflow_types, styles)
-        self._create_cashflow_instructions_sheet(instructions_sheet, styles)
-        self._create_cashflow_validation_data_sheet(validation_sheet, investment_names, cashflow_types, styles)
-        
-        workbook.active = data_sheet
-        
-        excel_buffer = BytesIO()
-        workbook.save(excel_buffer)
-        excel_buffer.seek(0)
-        return excel_buffer
-
-    def _create_cashflow_data_sheet(self, sheet, investment_names: List[str], cashflow_types: List[str], styles: Dict):
-        """Create the Cash Flow data entry sheet"""
-        headers = [
-            "Investment Name", "Date", "Cash Flow Type", "Amount", "Description", "Notes"
-        ]
-        
-        descriptions = [
-            "Select from dropdown", 
-            "Format: YYYY-MM-DD", 
+        self._write_validation_lists(workbook, validation_sheet, [
+            ("Investment Names", "InvestmentNames", investment_names)
+        ], formats)
+        if not investment_names:
+            validation_sheet.write_string(1, 0, "No investments found - Create investments first")
+        validation_sheet.set_column('A:A', 30)
+
+    def _build_cashflow_template(self, workbook, formats: Dict, investment_names: List[str]):
+        """Cash Flow Data, Instructions and Validation Data sheets"""
+        data_sheet = workbook.add_worksheet("Cash Flow Data")
+        instructions_sheet = workbook.add_worksheet("Instructions")
+        validation_sheet = workbook.add_worksheet("Validation Data")
+
+        data_sheet.write_row(0, 0, ["Investment Name", "Date", "Cash Flow Type", "Amount", "Description", "Notes"],
+                             formats['header'])
+        data_sheet.write_row(1, 0, [
+            "Select from dropdown",
+            "Format: YYYY-MM-DD",
             "Select type from dropdown",
-            "Positive=inflow, Negative=outflow", 
+            "Positive=inflow, Negative=outflow",
             "Brief description",
             "Optional comments"
-        ]
-        
-        # Apply header styling
-        for col, (header, desc) in enumerate(zip(headers, descriptions), 1):
-            cell = sheet.cell(row=1, column=col)
-            cell.value = header
-            cell.font = self.fonts['header']
-            cell.fill = styles['header_fill']
-            cell.border = styles['thin_border']
-            cell.alignment = styles['center_alignment']
-            
-            desc_cell = sheet.cell(row=2, column=col)
-            desc_cell.value = desc
-            desc_cell.font = self.fonts['instruction']
-            desc_cell.fill = styles['secondary_fill']
-            desc_cell.border = styles['thin_border']
-            desc_cell.alignment = styles['center_alignment']
-        
+        ], formats['description'])
+
         # Set column widths
-        sheet.column_dimensions['A'].width = 25  # Investment Name
-        sheet.column_dimensions['B'].width = 15  # Date
-        sheet.column_dimensions['C'].width = 20  # Cash Flow Type
-        sheet.column_dimensions['D'].width = 15  # Amount
-        sheet.column_dimensions['E'].width = 25  # Description
-        sheet.column_dimensions['F'].width = 30  # Notes
-        
-        # Investment name validation
+        data_sheet.set_column('A:A', 25)  # Investment Name
+        data_sheet.set_column('B:B', 15)  # Date
+        data_sheet.set_column('C:C', 20)  # Cash Flow Type
+        data_sheet.set_column('D:D', 15)  # Amount
+        data_sheet.set_column('E:E', 25)  # Description
+        data_sheet.set_column('F:F', 30)  # Notes
+
         if investment_names:
-            print(f"Cash Flow: Creating investment dropdown with {len(investment_names)} options")
-            investment_validation = DataValidation(
-                type="list",
-                formula1=f"'Validation Data'!$A$2:$A${len(investment_names)+1}",
-                showDropDown=True
-            )
-            sheet.add_data_validation(investment_validation)
-            investment_validation.add("A3:A1000")
-        else:
-            print("WARNING: Cash Flow - No investments found for dropdown")
-        
-        # Date validation
-        date_validation = DataValidation(
-            type="date",
-            operator="greaterThan",
-            formula1="1900-01-01",
-            showDropDown=False
-        )
-        sheet.add_data_validation(date_validation)
-        date_validation.add("B3:B1000")
-        
-        # Cash flow type validation
-        print(f"Cash Flow: Creating cash flow type dropdown with {len(cashflow_types)} options: {cashflow_types}")
-        cashflow_validation = DataValidation(
-            type="list",
-            formula1=f"'Validation Data'!$B$2:$B${len(cashflow_types)+1}",
-            showDropDown=True
-        )
-        sheet.add_data_validation(cashflow_validation)
-        cashflow_validation.add("C3:C1000")
-        
-        # Amount validation (numeric)
-        amount_validation = DataValidation(
-            type="decimal",
-            operator="notEqual",
-            formula1=0,
-            showDropDown=False
-        )
-        amount_validation.error = "Amount cannot be zero"
-        amount_validation.errorTitle = "Invalid Amount"
-        sheet.add_data_validation(amount_validation)
-        amount_validation.add("D3:D1000")
-        
-        # Add sample data
-        sample_data = [
-            ["Example Fund LP", "2024-12-31", "CAPITAL_CALL", -500000, "Q4 2024 capital call", ""],
-            ["Example Fund LP", "2024-12-31", "DISTRIBUTION", 750000, "Q4 2024 distribution", "Income + capital"],
-            ["", "", "", "", "", ""],  # Empty row
-        ]
-        
-        for row_idx, row_data in enumerate(sample_data, 3):
-            for col_idx, value in enumerate(row_data, 1):
-                cell = sheet.cell(row=row_idx, column=col_idx)
-                cell.value = value
-                cell.font = self.fonts['body']
-                cell.border = styles['thin_border']
-                if row_idx <= 4:  # Sample rows
-                    cell.fill = PatternFill(start_color='FFF8DC', end_color='FFF8DC', fill_type="solid")
-
-    def _create_cashflow_instructions_sheet(self, sheet, styles: Dict):
-        """Create comprehensive instructions for Cash Flow upload"""
+            data_sheet.data_validation('A3:A1000', {'validate': 'list', 'source': '=InvestmentNames'})
+        data_sheet.data_validation('B3:B1000', {'validate': 'date', 'criteria': '>', 'value': date(1900, 1, 1)})
+        data_sheet.data_validation('C3:C1000', {'validate': 'list', 'source': '=CashFlowTypes'})
+        data_sheet.data_validation('D3:D1000', {
+            'validate': 'decimal', 'criteria': '!=', 'value': 0,
+            'error_title': 'Invalid Amount', 'error_message': 'Amount cannot be zero'
+        })
+
+        # Sample rows, then an empty row
+        data_sheet.write_row(2, 0, ["Example Fund LP", "2024-12-31", "CAPITAL_CALL", -500000, "Q4 2024 capital call", ""],
+                             formats['sample'])
+        data_sheet.write_row(3, 0, ["Example Fund LP", "2024-12-31", "DISTRIBUTION", 750000, "Q4 2024 distribution", "Income + capital"],
+                             formats['sample'])
+        data_sheet.write_row(4, 0, [""] * 6, formats['body'])
+        data_sheet.activate()
+
         instructions = [
-            ("Cash Flow Upload Template Instructions", self.fonts['header']),
+            ("Cash Flow Upload Template Instructions", 'header'),
             ("", None),
-            ("Overview:", self.fonts['subheader']),
-            ("This template allows you to upload cash flow transactions for your investments.", self.fonts['body']),
-            ("Each row represents a single cash flow transaction.", self.fonts['body']),
+            ("Overview:", 'subheader'),
+            ("This template allows you to upload cash flow transactions for your investments.", 'body'),
+            ("Each row represents a single cash flow transaction.", 'body'),
             ("", None),
-            ("Column Descriptions:", self.fonts['subheader']),
-            ("• Investment Name: Select from dropdown of existing investments", self.fonts['body']),
-            ("• Date: Transaction date in YYYY-MM-DD format", self.fonts['body']),
-            ("• Cash Flow Type: Select from dropdown:", self.fonts['body']),
-            ("  - CAPITAL_CALL: Money called from investors", self.fonts['body']),
-            ("  - FEES: Management fees and expenses", self.fonts['body']),
-            ("  - YIELD: Income distributions (dividends, interest)", self.fonts['body']),
-            ("  - RETURN_OF_PRINCIPAL: Return of original capital", self.fonts['body']),
-            ("  - DISTRIBUTION: General distributions (mixed types)", self.fonts['body']),
-            ("• Amount: Positive for money received, negative for money paid", self.fonts['body']),
-            ("• Description: Brief description of the transaction", self.fonts['body']),
-            ("• Notes: Additional comments or details", self.fonts['body']),
+            ("Column Descriptions:", 'subheader'),
+            ("• Investment Name: Select from dropdown of existing investments", 'body'),
+            ("• Date: Transaction date in YYYY-MM-DD format", 'body'),
+            ("• Cash Flow Type: Select from dropdown:", 'body'),
+            ("  - CAPITAL_CALL: Money called from investors", 'body'),
+            ("  - FEES: Management fees and expenses", 'body'),
+            ("  - YIELD: Income distributions (dividends, interest)", 'body'),
+            ("  - RETURN_OF_PRINCIPAL: Return of original capital", 'body'),
+            ("  - DISTRIBUTION: General distributions (mixed types)", 'body'),
+            ("• Amount: Positive for money received, negative for money paid", 'body'),
+            ("• Description: Brief description of the transaction", 'body'),
+            ("• Notes: Additional comments or details", 'body'),
             ("", None),
-            ("Amount Convention:", self.fonts['subheader']),
-            ("• Positive amounts: Money flowing TO you (distributions, returns)", self.fonts['body']),
-            ("• Negative amounts: Money flowing FROM you (capital calls, fees)", self.fonts['body']),
+            ("Amount Convention:", 'subheader'),
+            ("• Positive amounts: Money flowing TO you (distributions, returns)", 'body'),
+            ("• Negative amounts: Money flowing FROM you (capital calls, fees)", 'body'),
             ("", None),
-            ("Examples:", self.fonts['subheader']),
-            ("• Capital Call: Amount = -500,000 (you pay money)", self.fonts['body']),
-            ("• Distribution: Amount = 750,000 (you receive money)", self.fonts['body']),
-            ("• Management Fee: Amount = -25,000 (you pay fee)", self.fonts['body']),
+            ("Examples:", 'subheader'),
+            ("• Capital Call: Amount = -500,000 (you pay money)", 'body'),
+            ("• Distribution: Amount = 750,000 (you receive money)", 'body'),
+            ("• Management Fee: Amount = -25,000 (you pay fee)", 'body'),
             ("", None),
-            ("Data Requirements:", self.fonts['subheader']),
-            ("• Investment must exist in the system", self.fonts['body']),
-            ("• Date must be valid", self.fonts['body']),
-            ("• Cash Flow Type must be selected from dropdown", self.fonts['body']),
-            ("• Amount cannot be zero", self.fonts['body']),
-            ("• Description is recommended for clarity", self.fonts['body']),
-            ("• Maximum 1000 records per upload", self.fonts['body']),
+            ("Data Requirements:", 'subheader'),
+            ("• Investment must exist in the system", 'body'),
+            ("• Date must be valid", 'body'),
+            ("• Cash Flow Type must be selected from dropdown", 'body'),
+            ("• Amount cannot be zero", 'body'),
+            ("• Description is recommended for clarity", 'body'),
+            ("• Maximum 1000 records per upload", 'body'),
             ("", None),
-            ("Processing Notes:", self.fonts['subheader']),
-            ("• Investment summaries will be automatically updated", self.fonts['body']),
-            ("• All transactions are processed as a batch", self.fonts['body']),
-            ("• If any error occurs, entire batch is rejected", self.fonts['body']),
-            ("• Detailed error reporting will identify issues", self.fonts['body']),
+            ("Processing Notes:", 'subheader'),
+            ("• Investment summaries will be automatically updated", 'body'),
+            ("• All transactions are processed as a batch", 'body'),
+            ("• If any error occurs, entire batch is rejected", 'body'),
+            ("• Detailed error reporting will identify issues", 'body'),
             ("", None),
-            ("Steps to Use:", self.fonts['subheader']),
-            ("1. Switch to 'Cash Flow Data' tab", self.fonts['body']),
-            ("2. Fill in your data starting from row 3", self.fonts['body']),
-            ("3. Use dropdowns for Investment Name and Cash Flow Type", self.fonts['body']),
-            ("4. Follow amount conventions (positive/negative)", self.fonts['body']),
-            ("5. Save file and upload through web interface", self.fonts['body']),
+            ("Steps to Use:", 'subheader'),
+            ("1. Switch to 'Cash Flow Data' tab", 'body'),
+            ("2. Fill in your data starting from row 3", 'body'),
+            ("3. Use dropdowns for Investment Name and Cash Flow Type", 'body'),
+            ("4. Follow amount conventions (positive/negative)", 'body'),
+            ("5. Save file and upload through web interface", 'body'),
         ]
-        
-        for row, (text, font) in enumerate(instructions, 1):
-            cell = sheet.cell(row=row, column=1)
-            cell.value = text
-            if font:
-                cell.font = font
-            cell.alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
-        
-        sheet.column_dimensions['A'].width = 80
+        self._write_instructions(instructions_sheet, instructions, formats, 80)
 
-    def _create_validation_data_sheet(self, sheet, investment_names: List[str], styles: Dict):
-        """Create validation data sheet for dropdowns"""
-        # Investment names in column A
-        sheet.cell(row=1, column=1, value="Investment Names")
-        sheet.cell(row=1, column=1).font = self.fonts['subheader']
-        
-        if investment_names:
-            for idx, name in enumerate(investment_names, 2):
-                sheet.cell(row=idx, column=1, value=name)
-        else:
-            # Add placeholder if no investments exist
-            sheet.cell(row=2, column=1, value="No investments found - Create investments first")
-        
-        sheet.column_dimensions['A'].width = 30
+        self._write_validation_lists(workbook, validation_sheet, [
+            ("Investment Names", "InvestmentNames", investment_names),
+            ("Cash Flow Types", "CashFlowTypes", CASHFLOW_TYPES),
+        ], formats)
+        validation_sheet.set_column('A:A', 30)
+        validation_sheet.set_column('B:B', 20)
 
-    def _create_cashflow_validation_data_sheet(self, sheet, investment_names: List[str], cashflow_types: List[str], styles: Dict):
-        """Create validation data for Cash Flow template"""
-        print(f"Creating validation sheet with {len(investment_names)} investments and {len(cashflow_types)} types")
-        
-        # Investment names in column A
-        sheet.cell(row=1, column=1, value="Investment Names")
-        sheet.cell(row=1, column=1).font = self.fonts['subheader']
-        
-        for idx, name in enumerate(investment_names, 2):
-            sheet.cell(row=idx, column=1, value=name)
-            print(f"Added investment to validation: {name}")
-        
-        # Cash flow types in column B
-        sheet.cell(row=1, column=2, value="Cash Flow Types")
-        sheet.cell(row=1, column=2).font = self.fonts['subheader']
-        
-        for idx, cf_type in enumerate(cashflow_types, 2):
-            sheet.cell(row=idx, column=2, value=cf_type)
-            print(f"Added cash flow type to validation: {cf_type}")
-        
-        sheet.column_dimensions['A'].width = 30
-        sheet.column_dimensions['B'].width = 20
+    def _build_investment_template(self, workbook, formats: Dict, entity_names: List[str]):
+        """Investment Data (triple header), Instructions and Validation Data sheets"""
+        data_sheet = workbook.add_worksheet("Investment Data")
+        instructions_sheet = workbook.add_worksheet("Instructions")
+        validation_sheet = workbook.add_worksheet("Validation Data")
 
-    def _create_investment_data_sheet(self, sheet, entity_names: List[str], entity_ids: List[int], asset_classes: List[str], investment_structures: List[str], liquidity_profiles: List[str], reporting_frequencies: List[str], risk_ratings: List[str], tax_classifications: List[str], activity_classifications: List[str], currencies: List[str], styles: Dict):
-        """Create bulletproof Investment data entry sheet with dual headers"""
         # User-friendly headers (Row 1) - EXACTLY matching frontend modal inputs plus Entity Owner
         user_headers = [
-            "Entity Owner*", "Investment Name*", "Asset Class*", "Investment Structure*", "Manager", "Strategy*", 
-            "Vintage Year*", "Target Raise", "Geography Focus", "Commitment Amount*", "Commitment Date*", 
+            "Entity Owner*", "Investment Name*", "Asset Class*", "Investment Structure*", "Manager", "Strategy*",
+            "Vintage Year*", "Target Raise", "Geography Focus", "Commitment Amount*", "Commitment Date*",
             "Management Fee (%)", "Performance Fee (%)", "Hurdle Rate (%)", "Distribution Target", "Currency",
             "Liquidity Profile*", "Expected Maturity Date", "Reporting Frequency", "Contact Person", "Email",
             "Portal Link", "Fund Administrator", "Fund Domicile", "Tax Classification", "Activity Classification",
             "Due Diligence Date", "IC Approval Date", "Risk Rating", "Benchmark Index"
         ]
-        
-        # Database field names (Row 2) - EXACT field names including entity_id
+
+        # Database field names (Row 2) - the investment importer reads this row as the header
         db_field_names = [
             "entity_id", "name", "asset_class", "investment_structure", "manager", "strategy",
             "vintage_year", "target_raise", "geography_focus", "commitment_amount", "commitment_date",
@@ -573,7 +465,7 @@ class ExcelTemplateService:
             "portal_link", "fund_administrator", "fund_domicile", "tax_classification", "activity_classification",
             "due_diligence_date", "ic_approval_date", "risk_rating", "benchmark_index"
         ]
-        
+
         # Field requirements and examples (Row 3) - including entity selection guidance
         field_examples = [
             "Select entity from dropdown", "e.g., Acme Fund III", "Select from dropdown", "Select from dropdown", "e.g., ABC Capital", "e.g., Growth Buyout",
@@ -583,720 +475,328 @@ class ExcelTemplateService:
             "https://portal.fund.com", "e.g., SS&C GlobeOp", "e.g., Delaware", "Select from dropdown", "Select from dropdown",
             "YYYY-MM-DD", "YYYY-MM-DD", "Select from dropdown", "e.g., S&P 500"
         ]
-        
-        # Apply triple-header styling
-        for col, (user_header, db_field, example) in enumerate(zip(user_headers, db_field_names, field_examples), 1):
-            # Row 1: User-friendly headers (bold required fields)
-            user_cell = sheet.cell(row=1, column=col)
-            user_cell.value = user_header
-            
-            # Bold required fields (marked with *)
-            if '*' in user_header:
-                required_font = Font(name='Calibri', size=11, bold=True, color='FFFFFF')
-                user_cell.font = required_font
-                user_cell.fill = PatternFill(start_color="D32F2F", end_color="D32F2F", fill_type="solid")  # Red for required
-            else:
-                user_cell.font = self.fonts['header']
-                user_cell.fill = styles['header_fill']
-                
-            user_cell.border = styles['thin_border']
-            user_cell.alignment = styles['center_alignment']
-            
-            # Row 2: Database field names (clean field names without brackets for import compatibility)
-            db_cell = sheet.cell(row=2, column=col)
-            db_cell.value = db_field
-            db_cell.font = self.fonts['instruction']
-            db_cell.fill = PatternFill(start_color="FFFFCC", end_color="FFFFCC", fill_type="solid")  # Light yellow
-            db_cell.border = styles['thin_border']
-            db_cell.alignment = styles['center_alignment']
-            
-            # Row 3: Examples and requirements
-            example_cell = sheet.cell(row=3, column=col)
-            example_cell.value = example
-            example_cell.font = self.fonts['instruction']
-            example_cell.fill = styles['secondary_fill']
-            example_cell.border = styles['thin_border']
-            example_cell.alignment = styles['center_alignment']
-        
-        # Set column widths
-        for col in range(1, len(user_headers) + 1):
-            col_letter = self._get_excel_column_letter(col)
-            sheet.column_dimensions[col_letter].width = 18
-        
-        # Wider columns for text fields
-        sheet.column_dimensions['A'].width = 25  # Investment Name
-        sheet.column_dimensions['D'].width = 25  # Entity
-        sheet.column_dimensions['E'].width = 20  # Strategy
-        
-        # Add sample data - matching corrected field order exactly (removed called_amount, entity_id, fees)
+
+        # Required fields (marked with *) get red headers
+        for col, user_header in enumerate(user_headers):
+            data_sheet.write_string(0, col, user_header, formats['required' if '*' in user_header else 'header'])
+        data_sheet.write_row(1, 0, db_field_names, formats['field_name'])
+        data_sheet.write_row(2, 0, field_examples, formats['description'])
+
+        # Set column widths, wider for text fields
+        data_sheet.set_column(0, len(user_headers) - 1, 18)
+        data_sheet.set_column('A:A', 25)
+        data_sheet.set_column('D:D', 25)
+        data_sheet.set_column('E:E', 20)
+
         sample_data = [
             "Example Fund LP", "PRIVATE_EQUITY", "LIMITED_PARTNERSHIP", "ABC Capital Partners", "Growth Buyout",
             "2024", "500000000", "North America", "5000000", "2024-01-15",
             "2.5", "20.0", "8.0", "Quarterly distributions", "USD",
             "ILLIQUID", "2034-01-15", "QUARTERLY", "John Smith", "john@fund.com",
-            "https://portal.fund.com", "SS&C GlobeOp", "Delaware", "K-1", "PASSIVE", 
+            "https://portal.fund.com", "SS&C GlobeOp", "Delaware", "K-1", "PASSIVE",
             "2023-12-01", "2024-01-15", "MEDIUM", "S&P 500"
         ]
-        
-        # Create 100 blank data rows (rows 4-103) for bulk entry
-        for row_num in range(4, 104):  # 100 rows of data
-            for col_num in range(1, len(user_headers) + 1):
-                cell = sheet.cell(row=row_num, column=col_num)
-                cell.border = styles['thin_border']
-                if row_num == 4:  # First row gets sample data
-                    if col_num <= len(sample_data):
-                        cell.value = sample_data[col_num - 1]
-                        cell.fill = PatternFill(start_color='FFF8DC', end_color='FFF8DC', fill_type="solid")
-                cell.font = self.fonts['body']
-        
-        # Add Excel data validation dropdowns for enum fields
-        self._add_investment_dropdowns(sheet, entity_names, asset_classes, investment_structures, 
-                                     liquidity_profiles, reporting_frequencies, risk_ratings, tax_classifications, activity_classifications, currencies)
 
-    def _add_investment_dropdowns(self, sheet, entity_names, asset_classes, investment_structures,
-                                liquidity_profiles, reporting_frequencies, risk_ratings, tax_classifications, activity_classifications, currencies):
-        """Add dropdown validation to all enum columns with proper error handling"""
-        
-        try:
-            # Column mappings (1-indexed) - UPDATED after removing entity_id, called_amount, fees columns
-            dropdowns = {
-                2: asset_classes,                    # Asset Class (column 2)
-                3: investment_structures,            # Investment Structure (column 3)
-                15: currencies,                      # Currency (column 15)
-                16: liquidity_profiles,              # Liquidity Profile (column 16)
-                18: reporting_frequencies,           # Reporting Frequency (column 18)
-                24: tax_classifications,             # Tax Classification (column 24)
-                25: activity_classifications,        # Activity Classification (column 25)
-                28: risk_ratings                     # Risk Rating (column 28)
-            }
-            
-            # Add validation for each dropdown column
-            for col_idx, options in dropdowns.items():
-                if options and len(options) > 0:  # Only add dropdown if options exist
-                    try:
-                        # Limit formula length to prevent Excel errors
-                        formula_options = options[:10] if len(options) > 10 else options
-                        formula_str = ",".join(formula_options)
-                        
-                        # Ensure formula doesn't exceed Excel limits (255 chars)
-                        if len(formula_str) > 200:
-                            formula_options = options[:5]  # Further reduce if still too long
-                            formula_str = ",".join(formula_options)
-                        
-                        # Create validation with proper error handling
-                        dv = DataValidation(type="list", formula1=f'"{formula_str}"')
-                        dv.error = 'Please select from the dropdown list'
-                        dv.errorTitle = 'Invalid Entry'
-                        dv.prompt = f'Select from: {", ".join(formula_options[:3])}{"..." if len(formula_options) > 3 else ""}'
-                        dv.promptTitle = 'Select Value'
-                        
-                        # Apply to all data rows (4-103) with proper column letter calculation
-                        col_letter = self._get_excel_column_letter(col_idx)
-                        dv.add(f'{col_letter}4:{col_letter}103')
-                        sheet.add_data_validation(dv)
-                        
-                    except Exception as e:
-                        print(f"Warning: Failed to add dropdown for column {col_idx}: {str(e)}")
-                        continue
-            
-            # Special handling for Entity Names (if available) with length limits
-            if entity_names and len(entity_names) > 0:
-                try:
-                    # Limit entity names to prevent formula overflow
-                    limited_entities = entity_names[:15] if len(entity_names) > 15 else entity_names
-                    
-                    # Clean entity names to remove problematic characters
-                    clean_entities = [name.replace('"', "'").replace(',', ';') for name in limited_entities]
-                    
-                    entity_formula = ",".join(clean_entities)
-                    if len(entity_formula) <= 200:  # Only add if formula is reasonable length
-                        entity_dv = DataValidation(type="list", formula1=f'"{entity_formula}"')
-                        entity_dv.error = 'Please select an existing entity or create one first'
-                        entity_dv.errorTitle = 'Entity Not Found'
-                        entity_dv.prompt = f'Available entities: {", ".join(clean_entities[:3])}{"..." if len(clean_entities) > 3 else ""}'
-                        entity_dv.promptTitle = 'Select Entity'
-                        entity_dv.add('E4:E103')  # Owner column (column 5)
-                        sheet.add_data_validation(entity_dv)
-                        
-                except Exception as e:
-                    print(f"Warning: Failed to add entity dropdown: {str(e)}")
-                    
-        except Exception as e:
-            print(f"Warning: Error in dropdown creation: {str(e)}")
-            # Continue without dropdowns rather than failing completely
-
-    def _get_excel_column_letter(self, col_num):
-        """Convert column number to Excel column letter (1=A, 26=Z, 27=AA, etc.)"""
-        result = ""
-        while col_num > 0:
-            col_num -= 1
-            result = chr(col_num % 26 + ord('A')) + result
-            col_num //= 26
-        return result
+        # Sample row, then blank bordered rows through row 103 for bulk entry
+        data_sheet.write_row(3, 0, sample_data, formats['sample'])
+        data_sheet.write_row(3, len(sample_data), [""] * (len(user_headers) - len(sample_data)), formats['body'])
+        for row in range(4, 103):
+            data_sheet.write_row(row, 0, [""] * len(user_headers), formats['body'])
+
+        # Dropdowns on the enum columns, each backed by a named range on the Validation Data sheet
+        dropdown_lists = []
+        for field, header, range_name, options in INVESTMENT_DROPDOWNS:
+            options = entity_names if options is None else options
+            dropdown_lists.append((header, range_name, options))
+            if not options:
+                continue
+            column = xl_col_to_name(db_field_names.index(field))
+            if field == "entity_id":
+                prompt_title, prompt = 'Select Entity', 'Available entities: '
+                error_title, error = 'Entity Not Found', 'Please select an existing entity or create one first'
+            else:
+                prompt_title, prompt = 'Select Value', 'Select from: '
+                error_title, error = 'Invalid Entry', 'Please select from the dropdown list'
+            prompt += ", ".join(options[:3]) + ("..." if len(options) > 3 else "")
+            data_sheet.data_validation(f'{column}4:{column}103', {
+                'validate': 'list', 'source': f'={range_name}',
+                'input_title': prompt_title, 'input_message': prompt[:255],
+                'error_title': error_title, 'error_message': error
+            })
+        data_sheet.activate()
 
-    def _create_investment_instructions_sheet(self, sheet, styles: Dict):
-        """Create comprehensive instructions for Investment upload"""
         instructions = [
-            ("Investment Bulk Upload Template Instructions", self.fonts['header']),
+            ("Investment Bulk Upload Template Instructions", 'header'),
             ("", None),
-            ("🚀 NEW FEATURES:", self.fonts['subheader']),
-            ("• Excel dropdowns for all enum fields - eliminates data entry errors!", self.fonts['body']),
-            ("• 100 blank rows ready for bulk data entry", self.fonts['body']),
-            ("• Triple header system: User names, database fields, examples", self.fonts['body']),
-            ("• Force upload mode available - creates investments with defaults for missing data", self.fonts['body']),
+            ("🚀 NEW FEATURES:", 'subheader'),
+            ("• Excel dropdowns for all enum fields - eliminates data entry errors!", 'body'),
+            ("• 100 blank rows ready for bulk data entry", 'body'),
+            ("• Triple header system: User names, database fields, examples", 'body'),
+            ("• Force upload mode available - creates investments with defaults for missing data", 'body'),
             ("", None),
-            ("Overview:", self.fonts['subheader']),
-            ("This template allows you to upload multiple investments at once.", self.fonts['body']),
-            ("Required fields are marked with * and highlighted in RED.", self.fonts['body']),
-            ("Optional fields use standard blue headers.", self.fonts['body']),
+            ("Overview:", 'subheader'),
+            ("This template allows you to upload multiple investments at once.", 'body'),
+            ("Required fields are marked with * and highlighted in RED.", 'body'),
+            ("Optional fields use standard blue headers.", 'body'),
             ("", None),
-            ("Required Fields (*) - Must be completed:", self.fonts['subheader']),
-            ("• Investment Name: Unique name for the investment", self.fonts['body']),
-            ("• Asset Class: SELECT FROM DROPDOWN (prevents errors)", self.fonts['body']),
-            ("• Investment Structure: Select from dropdown", self.fonts['body']),
-            ("• Entity: Select from existing entities", self.fonts['body']),
-            ("• Strategy: Investment strategy description", self.fonts['body']),
-            ("• Vintage Year: Year of investment (YYYY)", self.fonts['body']),
-            ("• Commitment Amount: Total committed capital", self.fonts['body']),
-            ("• Commitment Date: Date in YYYY-MM-DD format", self.fonts['body']),
+            ("Required Fields (*) - Must be completed:", 'subheader'),
+            ("• Investment Name: Unique name for the investment", 'body'),
+            ("• Asset Class: SELECT FROM DROPDOWN (prevents errors)", 'body'),
+            ("• Investment Structure: Select from dropdown", 'body'),
+            ("• Entity: Select from existing entities", 'body'),
+            ("• Strategy: Investment strategy description", 'body'),
+            ("• Vintage Year: Year of investment (YYYY)", 'body'),
+            ("• Commitment Amount: Total committed capital", 'body'),
+            ("• Commitment Date: Date in YYYY-MM-DD format", 'body'),
             ("", None),
-            ("Optional Fields - Can be updated later:", self.fonts['subheader']),
-            ("• Financial: Management fees, performance fees, hurdle rates", self.fonts['body']),
-            ("• Contact: Person, email, phone, address information", self.fonts['body']),
-            ("• Operational: Fund size, target return, investment periods", self.fonts['body']),
-            ("• Legal: Geography, sector focus, risk rating, ESG focus", self.fonts['body']),
-            ("• Administrative: Other fees, key terms, due diligence notes", self.fonts['body']),
+            ("Optional Fields - Can be updated later:", 'subheader'),
+            ("• Financial: Management fees, performance fees, hurdle rates", 'body'),
+            ("• Contact: Person, email, phone, address information", 'body'),
+            ("• Operational: Fund size, target return, investment periods", 'body'),
+            ("• Legal: Geography, sector focus, risk rating, ESG focus", 'body'),
+            ("• Administrative: Other fees, key terms, due diligence notes", 'body'),
             ("", None),
-            ("Data Format Guidelines:", self.fonts['subheader']),
-            ("• Dates: Use YYYY-MM-DD format (e.g., 2024-12-31)", self.fonts['body']),
-            ("• Percentages: Enter as numbers (e.g., 2.5 for 2.5%)", self.fonts['body']),
-            ("• Amounts: Enter numeric values without commas", self.fonts['body']),
-            ("• Years: Enter as whole numbers", self.fonts['body']),
-            ("• Text Fields: Keep descriptions concise", self.fonts['body']),
+            ("Data Format Guidelines:", 'subheader'),
+            ("• Dates: Use YYYY-MM-DD format (e.g., 2024-12-31)", 'body'),
+            ("• Percentages: Enter as numbers (e.g., 2.5 for 2.5%)", 'body'),
+            ("• Amounts: Enter numeric values without commas", 'body'),
+            ("• Years: Enter as whole numbers", 'body'),
+            ("• Text Fields: Keep descriptions concise", 'body'),
             ("", None),
-            ("Steps to Use:", self.fonts['subheader']),
-            ("1. Switch to the 'Investment Data' tab", self.fonts['body']),
-            ("2. Fill in required fields (marked with *) for each investment", self.fonts['body']),
-            ("3. Use dropdowns for standardized fields", self.fonts['body']),
-            ("4. Optional fields can be left blank and updated later", self.fonts['body']),
-            ("5. Save the file and upload through the web interface", self.fonts['body']),
+            ("Steps to Use:", 'subheader'),
+            ("1. Switch to the 'Investment Data' tab", 'body'),
+            ("2. Fill in required fields (marked with *) for each investment", 'body'),
+            ("3. Use dropdowns for standardized fields", 'body'),
+            ("4. Optional fields can be left blank and updated later", 'body'),
+            ("5. Save the file and upload through the web interface", 'body'),
             ("", None),
-            ("Important Notes:", self.fonts['subheader']),
-            ("• Entity must exist before creating investments", self.fonts['body']),
-            ("• Investment names must be unique", self.fonts['body']),
-            ("• Called Amount cannot exceed Commitment Amount", self.fonts['body']),
-            ("• Maximum 1000 investments per upload", self.fonts['body']),
+            ("Important Notes:", 'subheader'),
+            ("• Entity must exist before creating investments", 'body'),
+            ("• Investment names must be unique", 'body'),
+            ("• Called Amount cannot exceed Commitment Amount", 'body'),
+            ("• Maximum 1000 investments per upload", 'body'),
         ]
-        
-        for row, (text, font) in enumerate(instructions, 1):
-            cell = sheet.cell(row=row, column=1)
-            cell.value = text
-            if font:
-                cell.font = font
-            cell.alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
-        
-        sheet.column_dimensions['A'].width = 80
+        self._write_instructions(instructions_sheet, instructions, formats, 80)
 
-    def _create_investment_validation_data_sheet(self, sheet, entity_names: List[str], entity_ids: List[int], asset_classes: List[str], investment_structures: List[str], liquidity_profiles: List[str], reporting_frequencies: List[str], risk_ratings: List[str], tax_classifications: List[str], activity_classifications: List[str], currencies: List[str], styles: Dict):
-        """Create validation data for Investment template dropdowns"""
-        
-        # Column headers - include all dropdown fields
-        headers = ["Entities", "Asset Classes", "Investment Structures", "Liquidity Profiles", "Reporting Frequencies", "Risk Ratings", "Tax Classifications", "Activity Classifications", "Currencies"]
-        data_lists = [entity_names, asset_classes, investment_structures, liquidity_profiles, reporting_frequencies, risk_ratings, tax_classifications, activity_classifications, currencies]
-        
-        # Add headers
-        for col, header in enumerate(headers, 1):
-            cell = sheet.cell(row=1, column=col)
-            cell.value = header
-            cell.font = self.fonts['subheader']
-        
-        # Add data for each column
-        for col, data_list in enumerate(data_lists, 1):
-            for idx, item in enumerate(data_list, 2):
-                sheet.cell(row=idx, column=col, value=item)
-        
-        # Set column widths
-        for col in range(1, len(headers) + 1):
-            col_letter = self._get_excel_column_letter(col)
-            sheet.column_dimensions[col_letter].width = 25
-
-    def _create_nav_data_sheet(self, sheet, investment_names: List[str], styles: Dict):
-        """Create the NAV data entry sheet with validation"""
-        # Headers
-        headers = [
-            "Investment Name", "NAV Date", "NAV Value", "Notes"
-        ]
-        
-        # Header descriptions
-        descriptions = [
-            "Select from dropdown", "Format: YYYY-MM-DD", "Numeric value > 0", "Optional comments"
-        ]
-        
-        # Apply header styling
-        for col, (header, desc) in enumerate(zip(headers, descriptions), 1):
-            cell = sheet.cell(row=1, column=col)
-            cell.value = header
-            cell.font = self.fonts['header']
-            cell.fill = styles['header_fill']
-            cell.border = styles['thin_border']
-            cell.alignment = styles['center_alignment']
-            
-            # Add description in row 2
-            desc_cell = sheet.cell(row=2, column=col)
-            desc_cell.value = desc
-            desc_cell.font = self.fonts['instruction']
-            desc_cell.fill = styles['secondary_fill']
-            desc_cell.border = styles['thin_border']
-            desc_cell.alignment = styles['center_alignment']
-        
-        # Set column widths
-        sheet.column_dimensions['A'].width = 25  # Investment Name
-        sheet.column_dimensions['B'].width = 15  # NAV Date
-        sheet.column_dimensions['C'].width = 15  # NAV Value
-        sheet.column_dimensions['D'].width = 30  # Notes
-        
-        # Add data validation for Investment Name (dropdown)
-        if investment_names:
-            print(f"Creating dropdown validation for {len(investment_names)} investments")
-            investment_validation = DataValidation(
-                type="list",
-                formula1=f"'Validation Data'!$A$2:$A${len(investment_names)+1}",
-                showDropDown=True
-            )
-            investment_validation.error = "Please select a valid investment name"
-            investment_validation.errorTitle = "Invalid Investment"
-            sheet.add_data_validation(investment_validation)
-            investment_validation.add(f"A3:A1000")
-        else:
-            print("WARNING: No investments found - dropdown will be empty")
-        
-        # Add date validation
-        date_validation = DataValidation(
-            type="date",
-            operator="greaterThan",
-            formula1="1900-01-01",
-            showDropDown=False
-        )
-        date_validation.error = "Please enter a valid date (YYYY-MM-DD)"
-        date_validation.errorTitle = "Invalid Date"
-        sheet.add_data_validation(date_validation)
-        date_validation.add("B3:B1000")
-        
-        # Add numeric validation for NAV Value
-        value_validation = DataValidation(
-            type="decimal",
-            operator="greaterThan",
-            formula1=0,
-            showDropDown=False
-        )
-        value_validation.error = "NAV Value must be greater than 0"
-        value_validation.errorTitle = "Invalid NAV Value"
-        sheet.add_data_validation(value_validation)
-        value_validation.add("C3:C1000")
-        
-        # Add sample data
-        sample_data = [
-            ["Example Fund LP", "2024-12-31", 1000000, "Q4 2024 valuation"],
-            ["", "", "", ""],  # Empty row for user input
-        ]
-        
-        for row_idx, row_data in enumerate(sample_data, 3):
-            for col_idx, value in enumerate(row_data, 1):
-                cell = sheet.cell(row=row_idx, column=col_idx)
-                cell.value = value
-                cell.font = self.fonts['body']
-                cell.border = styles['thin_border']
-                if row_idx == 3:  # Sample row - make it stand out
-                    cell.fill = PatternFill(start_color='FFF8DC', end_color='FFF8DC', fill_type="solid")
-
-    def _create_entity_data_sheet(self, sheet, entity_types: List[str], styles: Dict):
-        """Create the Entity data entry sheet with conditional field requirements"""
-        # User-friendly headers (Row 1)
-        user_headers = [
-            "Entity Name*", "Entity Type*", "Tax ID*", "Legal Address", 
-            "Formation Date", "Notes"
-        ]
-        
-        # Database field names (Row 2) 
-        db_field_names = [
-            "name", "entity_type", "tax_id", "legal_address",
-            "formation_date", "notes"
-        ]
-        
-        # Field requirements and examples (Row 3)
+        self._write_validation_lists(workbook, validation_sheet, dropdown_lists, formats)
+        validation_sheet.set_column(0, len(dropdown_lists) - 1, 25)
+
+    def _build_entity_template(self, workbook, formats: Dict, names: List[str]):
+        """Entity Data (triple header), Instructions and Validation Data sheets"""
+        data_sheet = workbook.add_worksheet("Entity Data")
+        instructions_sheet = workbook.add_worksheet("Instructions")
+        validation_sheet = workbook.add_worksheet("Validation Data")
+
+        user_headers = ["Entity Name*", "Entity Type*", "Tax ID*", "Legal Address", "Formation Date", "Notes"]
+        db_field_names = ["name", "entity_type", "tax_id", "legal_address", "formation_date", "notes"]
         field_examples = [
             "e.g., Smith Family Trust", "Select from dropdown", "SSN/EIN/TIN", "Full legal address",
             "For legal entities: YYYY-MM-DD", "Optional comments"
         ]
-        
-        # Apply triple-header styling (reusing investment pattern)
-        for col, (user_header, db_field, example) in enumerate(zip(user_headers, db_field_names, field_examples), 1):
-            # Row 1: User-friendly headers (bold required fields)
-            user_cell = sheet.cell(row=1, column=col)
-            user_cell.value = user_header
-            
-            # Bold required fields (marked with *)
-            if '*' in user_header:
-                required_font = Font(name='Calibri', size=11, bold=True, color='FFFFFF')
-                user_cell.font = required_font
-                user_cell.fill = PatternFill(start_color="D32F2F", end_color="D32F2F", fill_type="solid")  # Red for required
-            else:
-                user_cell.font = self.fonts['header']
-                user_cell.fill = styles['header_fill']
-                
-            user_cell.border = styles['thin_border']
-            user_cell.alignment = styles['center_alignment']
-            
-            # Row 2: Database field names
-            db_cell = sheet.cell(row=2, column=col)
-            db_cell.value = db_field
-            db_cell.font = self.fonts['instruction']
-            db_cell.fill = PatternFill(start_color="FFFFCC", end_color="FFFFCC", fill_type="solid")  # Light yellow
-            db_cell.border = styles['thin_border']
-            db_cell.alignment = styles['center_alignment']
-            
-            # Row 3: Examples and requirements
-            example_cell = sheet.cell(row=3, column=col)
-            example_cell.value = example
-            example_cell.font = self.fonts['instruction']
-            example_cell.fill = styles['secondary_fill']
-            example_cell.border = styles['thin_border']
-            example_cell.alignment = styles['center_alignment']
-        
+
+        for col, user_header in enumerate(user_headers):
+            data_sheet.write_string(0, col, user_header, formats['required' if '*' in user_header else 'header'])
+        data_sheet.write_row(1, 0, db_field_names, formats['field_name'])
+        data_sheet.write_row(2, 0, field_examples, formats['description'])
+
         # Set column widths
-        sheet.column_dimensions['A'].width = 30  # Entity Name
-        sheet.column_dimensions['B'].width = 20  # Entity Type
-        sheet.column_dimensions['C'].width = 20  # Tax ID
-        sheet.column_dimensions['D'].width = 35  # Legal Address
-        sheet.column_dimensions['E'].width = 18  # Formation Date
-        sheet.column_dimensions['F'].width = 30  # Notes
-        
-        # Add sample data with different entity types
+        data_sheet.set_column('A:A', 30)  # Entity Name
+        data_sheet.set_column('B:B', 20)  # Entity Type
+        data_sheet.set_column('C:C', 20)  # Tax ID
+        data_sheet.set_column('D:D', 35)  # Legal Address
+        data_sheet.set_column('E:E', 18)  # Formation Date
+        data_sheet.set_column('F:F', 30)  # Notes
+
+        # Sample rows with different entity types, then blank rows through row 53
         sample_data_rows = [
             ["Smith Family Trust", "TRUST", "12-3456789", "123 Main St, New York, NY 10001", "2020-01-15", "Primary family trust"],
             ["John Smith", "INDIVIDUAL", "123-45-6789", "456 Oak Ave, Los Angeles, CA 90210", "", "Individual investor"],
             ["Acme Holdings LLC", "LLC", "98-7654321", "789 Business Blvd, Chicago, IL 60601", "2019-05-10", "Investment holding company"],
         ]
-        
-        # Create sample rows and 50 blank data rows for bulk entry
-        for row_num in range(4, 54):  # 50 rows of data
-            for col_num in range(1, len(user_headers) + 1):
-                cell = sheet.cell(row=row_num, column=col_num)
-                cell.border = styles['thin_border']
-                
-                # Add sample data to first 3 rows
-                if row_num <= 6:  # Rows 4, 5, 6 get sample data
-                    sample_index = row_num - 4
-                    if sample_index < len(sample_data_rows) and col_num <= len(sample_data_rows[sample_index]):
-                        cell.value = sample_data_rows[sample_index][col_num - 1]
-                        cell.fill = PatternFill(start_color='FFF8DC', end_color='FFF8DC', fill_type="solid")
-                        
-                cell.font = self.fonts['body']
-        
-        # Add Excel data validation for Entity Type dropdown
-        self._add_entity_dropdowns(sheet, entity_types)
+        for row, sample in enumerate(sample_data_rows, 3):
+            data_sheet.write_row(row, 0, sample, formats['sample'])
+        for row in range(3 + len(sample_data_rows), 53):
+            data_sheet.write_row(row, 0, [""] * len(user_headers), formats['body'])
 
-    def _add_entity_dropdowns(self, sheet, entity_types: List[str]):
-        """Add dropdown validation for entity type column"""
-        try:
-            # Entity Type validation (column 2)
-            if entity_types and len(entity_types) > 0:
-                formula_str = ",".join(entity_types)
-                
-                if len(formula_str) <= 255:  # Excel formula length limit
-                    dv = DataValidation(type="list", formula1=f'"{formula_str}"')
-                    dv.error = 'Please select from the dropdown list'
-                    dv.errorTitle = 'Invalid Entity Type'
-                    dv.prompt = f'Select entity type: {", ".join(entity_types[:3])}{"..." if len(entity_types) > 3 else ""}'
-                    dv.promptTitle = 'Select Entity Type'
-                    
-                    # Apply to all data rows (4-53)
-                    dv.add('B4:B53')
-                    sheet.add_data_validation(dv)
-                    
-        except Exception as e:
-            print(f"Warning: Failed to add entity type dropdown: {str(e)}")
+        data_sheet.data_validation('B4:B53', {
+            'validate': 'list', 'source': '=EntityTypes',
+            'input_title': 'Select Entity Type',
+            'input_message': f'Select entity type: {", ".join(ENTITY_TYPES[:3])}{"..." if len(ENTITY_TYPES) > 3 else ""}',
+            'error_title': 'Invalid Entity Type', 'error_message': 'Please select from the dropdown list'
+        })
+        data_sheet.activate()
 
-    def _create_entity_instructions_sheet(self, sheet, styles: Dict):
-        """Create comprehensive instructions for Entity upload with conditional requirements"""
         instructions = [
-            ("Entity Bulk Upload Template Instructions", self.fonts['header']),
+            ("Entity Bulk Upload Template Instructions", 'header'),
             ("", None),
-            ("🏢 ENTITY MANAGEMENT SYSTEM:", self.fonts['subheader']),
-            ("• Create multiple entities (Individuals, Trusts, LLCs, etc.) in bulk", self.fonts['body']),
-            ("• Smart conditional field requirements based on entity type", self.fonts['body']),
-            ("• Professional Excel dropdowns eliminate data entry errors", self.fonts['body']),
-            ("• 50 blank rows ready for efficient bulk data entry", self.fonts['body']),
+            ("🏢 ENTITY MANAGEMENT SYSTEM:", 'subheader'),
+            ("• Create multiple entities (Individuals, Trusts, LLCs, etc.) in bulk", 'body'),
+            ("• Smart conditional field requirements based on entity type", 'body'),
+            ("• Professional Excel dropdowns eliminate data entry errors", 'body'),
+            ("• 50 blank rows ready for efficient bulk data entry", 'body'),
             ("", None),
-            ("Overview:", self.fonts['subheader']),
-            ("This template allows you to create multiple entities at once.", self.fonts['body']),
-            ("Required fields are marked with * and highlighted in RED.", self.fonts['body']),
-            ("Field requirements change based on entity type for optimal data quality.", self.fonts['body']),
+            ("Overview:", 'subheader'),
+            ("This template allows you to create multiple entities at once.", 'body'),
+            ("Required fields are marked with * and highlighted in RED.", 'body'),
+            ("Field requirements change based on entity type for optimal data quality.", 'body'),
             ("", None),
-            ("Required Fields (*) - Must be completed for ALL entities:", self.fonts['subheader']),
-            ("• Entity Name: Unique name for the entity", self.fonts['body']),
-            ("• Entity Type: SELECT FROM DROPDOWN (prevents errors)", self.fonts['body']),
-            ("• Tax ID: SSN for individuals, EIN/TIN for legal entities", self.fonts['body']),
+            ("Required Fields (*) - Must be completed for ALL entities:", 'subheader'),
+            ("• Entity Name: Unique name for the entity", 'body'),
+            ("• Entity Type: SELECT FROM DROPDOWN (prevents errors)", 'body'),
+            ("• Tax ID: SSN for individuals, EIN/TIN for legal entities", 'body'),
             ("", None),
-            ("📋 CONDITIONAL FIELD REQUIREMENTS:", self.fonts['subheader']),
+            ("📋 CONDITIONAL FIELD REQUIREMENTS:", 'subheader'),
             ("", None),
-            ("For INDIVIDUAL entities:", self.fonts['subheader']),
-            ("• Formation Date: OPTIONAL (leave blank)", self.fonts['body']),
-            ("• Tax ID: Social Security Number (XXX-XX-XXXX)", self.fonts['body']),
-            ("• Legal Address: Personal residence address", self.fonts['body']),
+            ("For INDIVIDUAL entities:", 'subheader'),
+            ("• Formation Date: OPTIONAL (leave blank)", 'body'),
+            ("• Tax ID: Social Security Number (XXX-XX-XXXX)", 'body'),
+            ("• Legal Address: Personal residence address", 'body'),
             ("", None),
-            ("For LEGAL entities (Trust, LLC, Corporation, etc.):", self.fonts['subheader']),
-            ("• Formation Date: RECOMMENDED (YYYY-MM-DD format)", self.fonts['body']),
-            ("• Tax ID: Employer Identification Number (XX-XXXXXXX)", self.fonts['body']),
-            ("• Legal Address: Official business/trust address", self.fonts['body']),
+            ("For LEGAL entities (Trust, LLC, Corporation, etc.):", 'subheader'),
+            ("• Formation Date: RECOMMENDED (YYYY-MM-DD format)", 'body'),
+            ("• Tax ID: Employer Identification Number (XX-XXXXXXX)", 'body'),
+            ("• Legal Address: Official business/trust address", 'body'),
             ("", None),
-            ("Optional Fields - Can be updated later:", self.fonts['subheader']),
-            ("• Legal Address: Physical or mailing address", self.fonts['body']),
-            ("• Notes: Additional comments, special instructions, or relationships", self.fonts['body']),
+            ("Optional Fields - Can be updated later:", 'subheader'),
+            ("• Legal Address: Physical or mailing address", 'body'),
+            ("• Notes: Additional comments, special instructions, or relationships", 'body'),
             ("", None),
-            ("Entity Type Descriptions:", self.fonts['subheader']),
-            ("• INDIVIDUAL: Natural person (family member, investor)", self.fonts['body']),
-            ("• TRUST: Revocable/irrevocable trusts, family trusts", self.fonts['body']),
-            ("• LLC: Limited Liability Companies", self.fonts['body']),
-            ("• PARTNERSHIP: General or Limited Partnerships", self.fonts['body']),
-            ("• CORPORATION: C-Corp, S-Corp entities", self.fonts['body']),
-            ("• FOUNDATION: Charitable foundations, family foundations", self.fonts['body']),
-            ("• OTHER: Other legal entity types", self.fonts['body']),
+            ("Entity Type Descriptions:", 'subheader'),
+            ("• INDIVIDUAL: Natural person (family member, investor)", 'body'),
+            ("• TRUST: Revocable/irrevocable trusts, family trusts", 'body'),
+            ("• LLC: Limited Liability Companies", 'body'),
+            ("• PARTNERSHIP: General or Limited Partnerships", 'body'),
+            ("• CORPORATION: C-Corp, S-Corp entities", 'body'),
+            ("• FOUNDATION: Charitable foundations, family foundations", 'body'),
+            ("• OTHER: Other legal entity types", 'body'),
             ("", None),
-            ("Data Format Guidelines:", self.fonts['subheader']),
-            ("• Entity Names: Keep unique and descriptive", self.fonts['body']),
-            ("• Tax IDs: Use proper formatting (XXX-XX-XXXX or XX-XXXXXXX)", self.fonts['body']),
-            ("• Formation Dates: Use YYYY-MM-DD format (e.g., 2024-12-31)", self.fonts['body']),
-            ("• Addresses: Include full address for better record keeping", self.fonts['body']),
+            ("Data Format Guidelines:", 'subheader'),
+            ("• Entity Names: Keep unique and descriptive", 'body'),
+            ("• Tax IDs: Use proper formatting (XXX-XX-XXXX or XX-XXXXXXX)", 'body'),
+            ("• Formation Dates: Use YYYY-MM-DD format (e.g., 2024-12-31)", 'body'),
+            ("• Addresses: Include full address for better record keeping", 'body'),
             ("", None),
-            ("Steps to Use:", self.fonts['subheader']),
-            ("1. Switch to the 'Entity Data' tab", self.fonts['body']),
-            ("2. Fill in required fields (marked with *) for each entity", self.fonts['body']),
-            ("3. Use dropdown for Entity Type (prevents errors)", self.fonts['body']),
-            ("4. Follow conditional requirements based on entity type", self.fonts['body']),
-            ("5. Optional fields can be left blank and updated later", self.fonts['body']),
-            ("6. Save the file and upload through the web interface", self.fonts['body']),
+            ("Steps to Use:", 'subheader'),
+            ("1. Switch to the 'Entity Data' tab", 'body'),
+            ("2. Fill in required fields (marked with *) for each entity", 'body'),
+            ("3. Use dropdown for Entity Type (prevents errors)", 'body'),
+            ("4. Follow conditional requirements based on entity type", 'body'),
+            ("5. Optional fields can be left blank and updated later", 'body'),
+            ("6. Save the file and upload through the web interface", 'body'),
             ("", None),
-            ("Important Notes:", self.fonts['subheader']),
-            ("• Entity names must be unique across the entire system", self.fonts['body']),
-            ("• Tax IDs should be unique (system will warn of duplicates)", self.fonts['body']),
-            ("• Formation dates are validated for reasonableness", self.fonts['body']),
-            ("• Maximum 50 entities per upload for optimal performance", self.fonts['body']),
+            ("Important Notes:", 'subheader'),
+            ("• Entity names must be unique across the entire system", 'body'),
+            ("• Tax IDs should be unique (system will warn of duplicates)", 'body'),
+            ("• Formation dates are validated for reasonableness", 'body'),
+            ("• Maximum 50 entities per upload for optimal performance", 'body'),
             ("", None),
-            ("After Upload:", self.fonts['subheader']),
-            ("• Entities will be immediately available for investment assignment", self.fonts['body']),
-            ("• You can add family members and relationships later", self.fonts['body']),
-            ("• Investment ownership can be assigned to any created entity", self.fonts['body']),
-            ("• Entity details can be updated individually after bulk creation", self.fonts['body']),
+            ("After Upload:", 'subheader'),
+            ("• Entities will be immediately available for investment assignment", 'body'),
+            ("• You can add family members and relationships later", 'body'),
+            ("• Investment ownership can be assigned to any created entity", 'body'),
+            ("• Entity details can be updated individually after bulk creation", 'body'),
         ]
-        
-        for row, (text, font) in enumerate(instructions, 1):
-            cell = sheet.cell(row=row, column=1)
-            cell.value = text
-            if font:
-                cell.font = font
-            cell.alignment = Alignment(horizontal="left", vertical="top", wrap_text=True)
-        
-        sheet.column_dimensions['A'].width = 85
+        self._write_instructions(instructions_sheet, instructions, formats, 85)
 
-    def _create_entity_validation_data_sheet(self, sheet, entity_types: List[str], styles: Dict):
-        """Create validation data for Entity template dropdowns"""
-        
-        # Entity types in column A
-        sheet.cell(row=1, column=1, value="Entity Types")
-        sheet.cell(row=1, column=1).font = self.fonts['subheader']
-        
-        for idx, entity_type in enumerate(entity_types, 2):
-            sheet.cell(row=idx, column=1, value=entity_type)
-        
-        # Set column widths
-        sheet.column_dimensions['A'].width = 25
+        self._write_validation_lists(workbook, validation_sheet, [("Entity Types", "EntityTypes", ENTITY_TYPES)], formats)
+        validation_sheet.set_column('A:A', 25)
+
+
+def template_response(request: Request, template: RenderedTemplate) -> Response:
+    """Download response for a template, or 304 Not Modified when the client's copy is current"""
+    headers = {"ETag": template.etag, "Cache-Control": "no-cache"}
+    if etag_matches(request.headers.get("if-none-match"), template.etag):
+        return Response(status_code=304, headers=headers)
+    headers["Content-Disposition"] = f"attachment; filename={template.filename}"
+    return Response(content=template.body, media_type=XLSX_MEDIA_TYPE, headers=headers)
 
 class BulkUploadProcessor:
-    """Process bulk uploads from Excel templates"""
+    """Process bulk uploads from Excel templates
+    
+    Uploads are validated column-wise: dates, amounts and types are parsed for the
+    whole sheet at once, investment names are resolved against a full name index,
+    and every failing row is reported. Valid rows are then written in a single
+    flush/commit.
+    """
+    
+    TEMPLATE_ROW_PATTERN = 'Select from dropdown|Format:'
+    
+    CASHFLOW_TYPE_MAP = {
+        'CAPITAL_CALL': CashFlowType.CAPITAL_CALL,
+        'FEES': CashFlowType.FEES,
+        'YIELD': CashFlowType.YIELD,
+        'RETURN_OF_PRINCIPAL': CashFlowType.RETURN_OF_PRINCIPAL,
+        'DISTRIBUTION': CashFlowType.DISTRIBUTION
+    }
+    
+    ENTITY_TYPE_MAP = {
+        'INDIVIDUAL': EntityType.INDIVIDUAL,
+        'TRUST': EntityType.TRUST,
+        'LLC': EntityType.LLC,
+        'PARTNERSHIP': EntityType.PARTNERSHIP,
+        'CORPORATION': EntityType.CORPORATION,
+        'FOUNDATION': EntityType.FOUNDATION,
+        'OTHER': EntityType.OTHER,
+    }
     
     @staticmethod
-    def process_nav_upload(file_content: bytes, filename: str, db: Session) -> BulkUploadResult:
-        """Process NAV bulk upload"""
-        result = BulkUploadResult()
+    def process_nav_upload(file_content: UploadSource, filename: str, db: Session,
+                           tenant_id: Optional[int] = None, current_user: str = "bulk_upload") -> BulkUploadResult:
+        """Process NAV bulk upload (valid rows are upserted in one transaction)
+        
+        ``file_content`` is the raw workbook bytes or the path of a spooled upload;
+        the sheet is read in row chunks.
+        """
+        result = BulkUploadResult(filename)
         
         try:
-            # Read Excel file
-            df = pd.read_excel(BytesIO(file_content), sheet_name='NAV Data')
-            
-            logger.info(f"Processing {len(df)} NAV records from {filename}")
+            investment_index = BulkUploadProcessor._load_investment_index(db, tenant_id)
             
-            # Remove empty rows and template format row
-            df = df.dropna(how='all')
-            
-            # Filter out template instruction rows
-            df = df[~df['Investment Name'].astype(str).str.contains('Select from dropdown|Format:', case=False, na=False)]
-            
-            # Get investment name mapping
-            investments = crud.get_investments(db, skip=0, limit=1000)
-            investment_map = {inv.name: inv.id for inv in investments}
-            
-            for index, row in df.iterrows():
-                row_num = index + 3  # Account for header rows
-                
-                # Skip empty rows
-                if pd.isna(row.get('Investment Name')):
-                    continue
-                
-                try:
-                    # Validate investment exists
-                    investment_name = str(row['Investment Name']).strip()
-                    if investment_name not in investment_map:
-                        result.add_error(row_num, f"Investment '{investment_name}' not found")
-                        continue
-                    
-                    investment_id = investment_map[investment_name]
-                    
-                    # Validate NAV date
-                    nav_date = row['NAV Date']
-                    if pd.isna(nav_date):
-                        result.add_error(row_num, "NAV Date is required")
-                        continue
-                    
-                    if isinstance(nav_date, str):
-                        try:
-                            nav_date = datetime.strptime(nav_date, '%Y-%m-%d').date()
-                        except ValueError:
-                            result.add_error(row_num, "Invalid NAV Date format. Use YYYY-MM-DD")
-                            continue
-                    elif isinstance(nav_date, datetime):
-                        nav_date = nav_date.date()
-                    
-                    # Validate NAV value
-                    nav_value = row['NAV Value']
-                    if pd.isna(nav_value) or nav_value <= 0:
-                        result.add_error(row_num, "NAV Value must be greater than 0")
-                        continue
-                    
-                    # Check for duplicate
-                    existing_valuation = db.query(models.Valuation).filter(
-                        models.Valuation.investment_id == investment_id,
-                        models.Valuation.date == nav_date
-                    ).first()
-                    
-                    if existing_valuation:
-                        result.add_warning(row_num, f"NAV for {nav_date} already exists, updating value")
-                        existing_valuation.nav_value = float(nav_value)
-                        db.commit()
-                    else:
-                        # Create new valuation
-                        valuation = models.Valuation(
-                            investment_id=investment_id,
-                            date=nav_date,
-                            nav_value=float(nav_value),
-                            created_by="bulk_upload"
-                        )
-                        db.add(valuation)
-                        db.commit()
-                    
-                    result.add_success()
-                    
-                except Exception as e:
-                    result.add_error(row_num, f"Processing error: {str(e)}")
+            rows_read = 0
+            for chunk in iter_excel_chunks(file_content, 'NAV Data', filename=filename):
+                rows_read += len(chunk)
+                chunk = BulkUploadProcessor._prepare_template_frame(chunk)
+                valuations = BulkUploadProcessor._validate_nav_frame(chunk, investment_index, result)
+                BulkUploadProcessor._upsert_valuations(db, valuations, result, tenant_id, current_user)
+            db.commit()
             
+            logger.info(f"Processed {rows_read} NAV rows from {filename}")
             result.message = f"Processed {result.success_count} NAV records successfully"
             if result.error_count > 0:
                 result.message += f" with {result.error_count} errors"
                 
         except Exception as e:
+            db.rollback()
+            result.success_count = 0
             result.add_error(0, f"File processing error: {str(e)}")
             
         return result
 
     @staticmethod
-    def process_cashflow_upload(file_content: bytes, filename: str, db: Session) -> BulkUploadResult:
-        """Process Cash Flow bulk upload"""
-        result = BulkUploadResult()
+    def process_cashflow_upload(file_content: UploadSource, filename: str, db: Session,
+                                tenant_id: Optional[int] = None, current_user: str = "bulk_upload") -> BulkUploadResult:
+        """Process Cash Flow bulk upload (all-or-nothing: any error saves no records)
+        
+        ``file_content`` is the raw workbook bytes or the path of a spooled upload.
+        Valid chunks are flushed as they are read; the transaction is rolled back
+        if any row in the file fails validation.
+        """
+        result = BulkUploadResult(filename)
         
         try:
-            # Read Excel file
-            df = pd.read_excel(BytesIO(file_content), sheet_name='Cash Flow Data')
+            investment_index = BulkUploadProcessor._load_investment_index(db, tenant_id)
+            affected_investments = set()
             
-            logger.info(f"Processing {len(df)} cash flow records from {filename}")
+            rows_read = 0
+            for chunk in iter_excel_chunks(file_content, 'Cash Flow Data', filename=filename):
+                rows_read += len(chunk)
+                chunk = BulkUploadProcessor._prepare_template_frame(chunk)
+                cashflows = BulkUploadProcessor._validate_cashflow_frame(chunk, investment_index, result)
+                if result.error_count == 0:
+                    BulkUploadProcessor._insert_cashflows(db, cashflows, result, tenant_id, current_user)
+                    affected_investments.update(cashflows['investment_id'].tolist())
             
-            # Remove empty rows and template format row
-            df = df.dropna(how='all')
-            
-            # Filter out template instruction rows
-            df = df[~df['Investment Name'].astype(str).str.contains('Select from dropdown|Format:', case=False, na=False)]
-            
-            # Get investment name mapping
-            investments = crud.get_investments(db, skip=0, limit=1000)
-            investment_map = {inv.name: inv.id for inv in investments}
-            
-            # Cash flow type mapping
-            cf_type_map = {
-                'CAPITAL_CALL': CashFlowType.CAPITAL_CALL,
-                'FEES': CashFlowType.FEES,
-                'YIELD': CashFlowType.YIELD,
-                'RETURN_OF_PRINCIPAL': CashFlowType.RETURN_OF_PRINCIPAL,
-                'DISTRIBUTION': CashFlowType.DISTRIBUTION
-            }
-            
-            for index, row in df.iterrows():
-                row_num = index + 3
-                
-                # Skip empty rows
-                if pd.isna(row.get('Investment Name')):
-                    continue
-                
-                try:
-                    # Validate investment exists
-                    investment_name = str(row['Investment Name']).strip()
-                    if investment_name not in investment_map:
-                        result.add_error(row_num, f"Investment '{investment_name}' not found")
-                        continue
-                    
-                    investment_id = investment_map[investment_name]
-                    
-                    # Validate date
-                    cf_date = row['Date']
-                    if pd.isna(cf_date):
-                        result.add_error(row_num, "Date is required")
-                        continue
-                    
-                    if isinstance(cf_date, str):
-                        try:
-                            cf_date = datetime.strptime(cf_date, '%Y-%m-%d').date()
-                        except ValueError:
-                            result.add_error(row_num, "Invalid Date format. Use YYYY-MM-DD")
-                            continue
-                    elif isinstance(cf_date, datetime):
-                        cf_date = cf_date.date()
-                    
-                    # Validate cash flow type
-                    cf_type_str = str(row['Cash Flow Type']).strip().upper()
-                    if cf_type_str not in cf_type_map:
-                        result.add_error(row_num, f"Invalid Cash Flow Type: {cf_type_str}")
-                        continue
-                    
-                    cf_type = cf_type_map[cf_type_str]
-                    
-                    # Validate amount
-                    amount = row['Amount']
-                    if pd.isna(amount) or amount == 0:
-                        result.add_error(row_num, "Amount cannot be zero or empty")
-                        continue
-                    
-                    # Create cash flow
-                    cashflow = models.CashFlow(
-                        investment_id=investment_id,
-                        date=cf_date,
-                        amount=float(amount),
-                        type=cf_type,
-                        notes=str(row.get('Notes', '')) if not pd.isna(row.get('Notes')) else ""
-                    )
-                    
-                    db.add(cashflow)
-                    result.add_success()
-                    
-                except Exception as e:
-                    result.add_error(row_num, f"Processing error: {str(e)}")
+            logger.info(f"Processed {rows_read} cash flow rows from {filename}")
             
             # Commit all changes if no errors
             if result.error_count == 0:
@@ -1305,71 +805,45 @@ class BulkUploadProcessor:
                 
                 # Update investment summaries
                 try:
-                    BulkUploadProcessor._update_investment_summaries(db, list(investment_map.values()))
+                    BulkUploadProcessor._update_investment_summaries(db, list(affected_investments))
                 except Exception as e:
+                    db.rollback()
                     result.add_warning(0, f"Investment summary update failed: {str(e)}")
             else:
                 db.rollback()
+                result.success_count = 0
                 result.message = f"Upload failed due to {result.error_count} errors. No records were saved."
                 
         except Exception as e:
+            db.rollback()
+            result.success_count = 0
             result.add_error(0, f"File processing error: {str(e)}")
             
         return result
 
     @staticmethod
-    def process_entity_upload(file_content: bytes, filename: str, db: Session) -> BulkUploadResult:
+    def process_entity_upload(file_content: UploadSource, filename: str, db: Session,
+                              tenant_id: Optional[int] = None, current_user: str = "admin") -> BulkUploadResult:
         """Process Entity bulk upload with conditional field validation"""
-        result = BulkUploadResult()
+        result = BulkUploadResult(filename)
         
         try:
-            # Read Excel file - skip headers like investment processing pattern
-            df = pd.read_excel(BytesIO(file_content), sheet_name='Entity Data', skiprows=[0, 2], header=0)
+            # Row 1 holds user headers, row 2 the field names and row 3 examples
+            chunks = iter_excel_chunks(file_content, 'Entity Data', header_row=2, skip_rows=[3], filename=filename)
             
-            # Clean column names - remove brackets from field names like '[name]' -> 'name'
-            df.columns = [col.strip('[]') if isinstance(col, str) else col for col in df.columns]
-            logger.info(f"Processing {len(df)} entity records from {filename}")
-            logger.info(f"Columns found: {list(df.columns)}")
-            
-            # Remove empty rows
-            df = df.dropna(how='all')
+            try:
+                for chunk in chunks:
+                    # Clean column names - remove brackets from field names like '[name]' -> 'name'
+                    chunk.columns = [col.strip('[]') if isinstance(col, str) else col for col in chunk.columns]
+                    entities = BulkUploadProcessor._validate_entity_frame(chunk, result)
+                    BulkUploadProcessor._insert_entities(db, entities, result, tenant_id, current_user)
+                db.commit()
+            except SQLAlchemyError as e:
+                db.rollback()
+                result.success_count = 0
+                result.add_error(0, f"Database error: {str(e)}")
             
-            for index, row in df.iterrows():
-                row_num = index + 4  # Account for 3-row header structure + 0-based index
-                
-                # Skip completely empty rows
-                if pd.isna(row.get('name')) or str(row.get('name')).strip() == '':
-                    continue
-                
-                try:
-                    # Extract and validate entity data using conditional logic
-                    entity_data, validation_errors = BulkUploadProcessor._validate_entity_row(row.to_dict(), row_num)
-                    
-                    if validation_errors:
-                        for error in validation_errors:
-                            result.add_error(row_num, error)
-                        continue
-                    
-                    if not entity_data:
-                        continue
-                    
-                    # Create entity using crud
-                    entity_create = schemas.EntityCreate(**entity_data)
-                    new_entity = crud.create_entity(db, entity_create)
-                    result.add_success()
-                    logger.info(f"Created entity: {new_entity.name} (ID: {new_entity.id})")
-                    
-                except Exception as e:
-                    error_msg = str(e)
-                    if "UNIQUE constraint failed" in error_msg:
-                        if "entities.name" in error_msg:
-                            result.add_error(row_num, f"Entity name '{row.get('name')}' already exists. Please use a unique name.")
-                        elif "entities.tax_id" in error_msg:
-                            result.add_error(row_num, f"Tax ID '{row.get('tax_id')}' already exists. Please use a unique Tax ID.")
-                        else:
-                            result.add_error(row_num, f"Duplicate data detected: {error_msg}")
-                    else:
-                        result.add_error(row_num, f"Database error: {error_msg}")
+            logger.info(f"Processed entity upload {filename}: {result.success_count} created")
             
             # Set result message
             if result.error_count == 0:
@@ -1378,134 +852,289 @@ class BulkUploadProcessor:
                 result.message = f"Created {result.success_count} entities with {result.error_count} errors"
                 
         except Exception as e:
+            db.rollback()
+            result.success_count = 0
             result.add_error(0, f"File processing error: {str(e)}")
             logger.error(f"Entity upload processing error: {str(e)}")
             
         return result
 
+    # -------------------------------------------------------------------------
+    # Column-wise parsing and validation
+    # -------------------------------------------------------------------------
+
     @staticmethod
-    def _validate_entity_row(row_data: Dict[str, Any], row_num: int) -> Tuple[Optional[Dict[str, Any]], List[str]]:
-        """Validate entity row with conditional field requirements"""
+    def _prepare_template_frame(df: pd.DataFrame, first_row: Optional[int] = None) -> pd.DataFrame:
+        """Drop empty and template instruction rows; ``first_row`` numbers frames read without ``_row_num``"""
+        if '_row_num' not in df:
+            df = df.dropna(how='all')
+            df = df.assign(_row_num=df.index + first_row)
         
-        def get_field_value(field_name: str):
-            """Helper to get field value safely"""
-            value = row_data.get(field_name)
-            if pd.isna(value) or (isinstance(value, str) and value.strip() == ''):
-                return None
-            return str(value).strip() if value is not None else None
+        names = df['Investment Name']
+        df = df[~names.astype(str).str.contains(BulkUploadProcessor.TEMPLATE_ROW_PATTERN, case=False, na=False)]
         
-        def parse_date(date_str: str, field_name: str):
-            """Helper to parse dates consistently"""
-            if not date_str:
-                return None
-            try:
-                if isinstance(date_str, str):
-                    return datetime.strptime(date_str.strip(), "%Y-%m-%d").date()
-                elif isinstance(date_str, datetime):
-                    return date_str.date()
-                elif isinstance(date_str, date):
-                    return date_str
-            except (ValueError, AttributeError):
-                logger.warning(f"Row {row_num}: Invalid {field_name} format: {date_str}")
-                return None
-            return None
-        
-        errors = []
+        # Rows without an investment name are skipped silently
+        return df[df['Investment Name'].notna()]
+
+    @staticmethod
+    def _load_investment_index(db: Session, tenant_id: Optional[int] = None) -> Dict[str, int]:
+        """Full investment name -> id index from a single two-column query"""
+        query = db.query(models.Investment.name, models.Investment.id)
+        if tenant_id is not None:
+            query = query.filter(models.Investment.tenant_id == tenant_id)
+        return {name: investment_id for name, investment_id in query.all()}
+
+    @staticmethod
+    def _parse_date_column(values: pd.Series) -> pd.Series:
+        """Parse a date column in one pass: Excel dates pass through, text must be YYYY-MM-DD"""
+        if pd.api.types.is_datetime64_any_dtype(values):
+            return values
+        # Date cells below the template's text "Format" row load as datetime objects in an object column
+        stripped = values.map(lambda v: v.strip() if isinstance(v, str) else v)
+        return pd.to_datetime(stripped, format='%Y-%m-%d', errors='coerce')
+
+    @staticmethod
+    def _text_column(values: pd.Series) -> pd.Series:
+        """Stripped text with blanks as None"""
+        text = values.astype(object).where(values.notna(), None)
+        text = text.map(lambda v: str(v).strip() if v is not None else None)
+        return text.where(text != '', None)
+
+    @staticmethod
+    def _report_failures(result: BulkUploadResult, df: pd.DataFrame,
+                         checks: List[Tuple[pd.Series, Any]], first_only: bool = True) -> pd.Series:
+        """
+        Apply ordered (mask, message) checks to every row at once. ``message`` is a
+        string or a per-row Series. Errors are reported in sheet order; with
+        ``first_only`` each row reports only its first failing check.
+        Returns the mask of rows that passed every check.
+        """
+        failed = pd.Series(False, index=df.index)
+        reports = []
+        for order, (mask, message) in enumerate(checks):
+            hits = mask.fillna(False).astype(bool)
+            if first_only:
+                hits &= ~failed
+            if not hits.any():
+                continue
+            failed |= hits
+            row_messages = message[hits] if isinstance(message, pd.Series) else [message] * int(hits.sum())
+            reports.extend(zip(df.loc[hits, '_row_num'], [order] * int(hits.sum()), row_messages))
+        
+        for row_num, _, message in sorted(reports, key=lambda r: (r[0], r[1])):
+            result.add_error(int(row_num), message)
+        return ~failed
+
+    @staticmethod
+    def _validate_nav_frame(df: pd.DataFrame, investment_index: Dict[str, int],
+                            result: BulkUploadResult) -> pd.DataFrame:
+        """Validate NAV rows column-wise; returns investment_id/date/nav_value/_row_num for valid rows"""
+        names = df['Investment Name'].astype(str).str.strip()
+        investment_ids = names.map(investment_index)
+        raw_dates = df['NAV Date']
+        dates = BulkUploadProcessor._parse_date_column(raw_dates)
+        nav_values = pd.to_numeric(df['NAV Value'], errors='coerce')
+        
+        valid = BulkUploadProcessor._report_failures(result, df, [
+            (investment_ids.isna(), "Investment '" + names + "' not found"),
+            (raw_dates.isna(), "NAV Date is required"),
+            (dates.isna(), "Invalid NAV Date format. Use YYYY-MM-DD"),
+            (nav_values.isna() | (nav_values <= 0), "NAV Value must be greater than 0"),
+        ])
+        
+        return pd.DataFrame({
+            'investment_id': investment_ids[valid].astype(int),
+            'date': dates[valid].dt.date,
+            'nav_value': nav_values[valid].astype(float),
+            '_row_num': df.loc[valid, '_row_num'],
+        })
+
+    @staticmethod
+    def _validate_cashflow_frame(df: pd.DataFrame, investment_index: Dict[str, int],
+                                 result: BulkUploadResult) -> pd.DataFrame:
+        """Validate cash flow rows column-wise; returns insertable columns for valid rows"""
+        names = df['Investment Name'].astype(str).str.strip()
+        investment_ids = names.map(investment_index)
+        raw_dates = df['Date']
+        dates = BulkUploadProcessor._parse_date_column(raw_dates)
+        type_names = df['Cash Flow Type'].astype(str).str.strip().str.upper()
+        types = type_names.map(BulkUploadProcessor.CASHFLOW_TYPE_MAP)
+        amounts = pd.to_numeric(df['Amount'], errors='coerce')
+        notes = BulkUploadProcessor._text_column(df['Notes']) if 'Notes' in df else pd.Series(None, index=df.index)
+        
+        valid = BulkUploadProcessor._report_failures(result, df, [
+            (investment_ids.isna(), "Investment '" + names + "' not found"),
+            (raw_dates.isna(), "Date is required"),
+            (dates.isna(), "Invalid Date format. Use YYYY-MM-DD"),
+            (types.isna(), "Invalid Cash Flow Type: " + type_names),
+            (amounts.isna() | (amounts == 0), "Amount cannot be zero or empty"),
+        ])
+        
+        return pd.DataFrame({
+            'investment_id': investment_ids[valid].astype(int),
+            'date': dates[valid].dt.date,
+            'type': types[valid],
+            'amount': amounts[valid].astype(float),
+            'notes': notes[valid].fillna(''),
+            '_row_num': df.loc[valid, '_row_num'],
+        })
+
+    @staticmethod
+    def _validate_entity_frame(df: pd.DataFrame, result: BulkUploadResult) -> pd.DataFrame:
+        """Validate entity rows column-wise, reporting every failing field per row"""
+        def column(name: str) -> pd.Series:
+            if name in df:
+                return BulkUploadProcessor._text_column(df[name])
+            return pd.Series(None, index=df.index, dtype=object)
+        
+        names = column('name')
+        # Skip completely empty rows
+        df = df[names.notna()]
+        names = names[df.index]
+        
+        entity_type_names = column('entity_type')[df.index]
+        entity_types = entity_type_names.str.upper().map(BulkUploadProcessor.ENTITY_TYPE_MAP)
+        tax_ids = column('tax_id')[df.index]
+        
+        formation_text = column('formation_date')[df.index]
+        formation_dates = BulkUploadProcessor._parse_date_column(
+            df['formation_date'] if 'formation_date' in df else pd.Series(pd.NaT, index=df.index)
+        )
+        for row_num, value in zip(df.loc[formation_text.notna() & formation_dates.isna(), '_row_num'],
+                                  formation_text[formation_text.notna() & formation_dates.isna()]):
+            logger.warning(f"Row {row_num}: Invalid formation_date format: {value}")
+        
+        valid = BulkUploadProcessor._report_failures(result, df, [
+            (entity_type_names.isna(), "Missing required field: entity_type"),
+            (entity_type_names.notna() & entity_types.isna(), "Invalid entity_type: " + entity_type_names.fillna('')),
+            (tax_ids.isna(), "Missing required field: tax_id"),
+        ], first_only=False)
+        
+        return pd.DataFrame({
+            'name': names[valid],
+            'entity_type': entity_types[valid],
+            'tax_id': tax_ids[valid],
+            'legal_address': column('legal_address')[df.index][valid],
+            'formation_date': formation_dates[valid].dt.date.where(formation_dates[valid].notna(), None),
+            'notes': column('notes')[df.index][valid],
+            '_row_num': df.loc[valid, '_row_num'],
+        })
+
+    # -------------------------------------------------------------------------
+    # Set-based persistence
+    # -------------------------------------------------------------------------
+
+    @staticmethod
+    def _upsert_valuations(db: Session, valuations: pd.DataFrame, result: BulkUploadResult,
+                           tenant_id: Optional[int], current_user: str):
+        """Insert new NAVs and update existing (investment, date) NAVs with one lookup query"""
+        if valuations.empty:
+            return
+        
+        # Later rows win when the same investment/date appears more than once in the file
+        repeated = valuations.duplicated(['investment_id', 'date'], keep='last')
+        for row_num, nav_date in zip(valuations.loc[repeated, '_row_num'], valuations.loc[repeated, 'date']):
+            result.add_warning(int(row_num), f"NAV for {nav_date} appears again later in the file, later value used")
+        latest = valuations[~repeated]
+        
+        existing = {
+            (v.investment_id, v.date): v for v in db.query(models.Valuation).filter(
+                models.Valuation.investment_id.in_(latest['investment_id'].unique().tolist()),
+                models.Valuation.date >= latest['date'].min(),
+                models.Valuation.date <= latest['date'].max()
+            )
+        }
         
-        try:
-            # Required: Entity Name
-            name = get_field_value('name')
-            if not name:
-                errors.append("Missing required field: name")
-            
-            # Required: Entity Type
-            entity_type_str = get_field_value('entity_type')
-            if not entity_type_str:
-                errors.append("Missing required field: entity_type")
-            
-            # Map entity type string to enum
-            entity_type_mapping = {
-                'INDIVIDUAL': EntityType.INDIVIDUAL,
-                'TRUST': EntityType.TRUST,
-                'LLC': EntityType.LLC,
-                'PARTNERSHIP': EntityType.PARTNERSHIP,
-                'CORPORATION': EntityType.CORPORATION,
-                'FOUNDATION': EntityType.FOUNDATION,
-                'OTHER': EntityType.OTHER,
-            }
-            
-            entity_type = None
-            if entity_type_str:
-                entity_type = entity_type_mapping.get(entity_type_str.upper())
-                if not entity_type:
-                    errors.append(f"Invalid entity_type: {entity_type_str}")
-            
-            # Required: Tax ID
-            tax_id = get_field_value('tax_id')
-            if not tax_id:
-                errors.append("Missing required field: tax_id")
-            
-            # Optional: Legal Address
-            legal_address = get_field_value('legal_address')
-            
-            # Conditional: Formation Date
-            formation_date_str = get_field_value('formation_date')
-            formation_date = parse_date(formation_date_str, 'formation_date') if formation_date_str else None
-            
-            # For legal entities (non-individuals), recommend formation date
-            if entity_type != EntityType.INDIVIDUAL and not formation_date and formation_date_str:
-                logger.warning(f"Row {row_num}: Formation date recommended for {entity_type_str} entities")
-            
-            # Optional: Notes
-            notes = get_field_value('notes')
-            
-            # Return early if there are validation errors
-            if errors:
-                return None, errors
-            
-            # Build entity data dictionary
-            entity_data = {
-                'name': name,
-                'entity_type': entity_type,
-                'tax_id': tax_id,
-                'is_active': True  # Default to active
-            }
-            
+        new_valuations = []
+        for investment_id, nav_date, nav_value, row_num in latest.itertuples(index=False, name=None):
+            current = existing.get((investment_id, nav_date))
+            if current is not None:
+                result.add_warning(int(row_num), f"NAV for {nav_date} already exists, updating value")
+                current.nav_value = nav_value
+                current.updated_by = current_user
+            else:
+                new_valuations.append(models.Valuation(
+                    investment_id=investment_id,
+                    tenant_id=tenant_id,
+                    date=nav_date,
+                    nav_value=nav_value,
+                    created_by=current_user,
+                    updated_by=current_user
+                ))
+        
+        db.add_all(new_valuations)
+        db.flush()
+        BulkUploadProcessor._release(db, new_valuations + list(existing.values()))
+        result.warnings.sort(key=lambda w: w['row'])
+        result.success_count += len(valuations)
+
+    @staticmethod
+    def _insert_cashflows(db: Session, cashflows: pd.DataFrame, result: BulkUploadResult,
+                          tenant_id: Optional[int], current_user: str):
+        """Flush a chunk of validated cash flows as one batch"""
+        new_cashflows = [
+            models.CashFlow(
+                investment_id=investment_id,
+                tenant_id=tenant_id,
+                date=cf_date,
+                type=cf_type,
+                amount=amount,
+                notes=notes,
+                created_by=current_user,
+                updated_by=current_user
+            )
+            for investment_id, cf_date, cf_type, amount, notes, _ in cashflows.itertuples(index=False, name=None)
+        ]
+        db.add_all(new_cashflows)
+        db.flush()
+        BulkUploadProcessor._release(db, new_cashflows)
+        result.success_count += len(cashflows)
+
+    @staticmethod
+    def _insert_entities(db: Session, entities: pd.DataFrame, result: BulkUploadResult,
+                         tenant_id: Optional[int], current_user: str):
+        """Flush a chunk of validated entities as one batch"""
+        new_entities = []
+        for record in entities.drop(columns='_row_num').to_dict('records'):
             # Add optional fields only if they have values
-            if legal_address:
-                entity_data['legal_address'] = legal_address
-            if formation_date:
-                entity_data['formation_date'] = formation_date
-            if notes:
-                entity_data['notes'] = notes
-            
-            return entity_data, []
-            
-        except Exception as e:
-            logger.error(f"Row {row_num}: Validation error: {str(e)}")
-            return None, [f"Validation error: {str(e)}"]
+            entity_data = {k: v for k, v in record.items() if v is not None and not pd.isna(v)}
+            new_entities.append(models.Entity(
+                **entity_data,
+                is_active=True,
+                tenant_id=tenant_id,
+                created_by=current_user,
+                updated_by=current_user
+            ))
+        db.add_all(new_entities)
+        db.flush()
+        BulkUploadProcessor._release(db, new_entities)
+        result.success_count += len(new_entities)
+
+    @staticmethod
+    def _release(db: Session, objects: List[Any]):
+        """Detach flushed upload rows so the session does not grow with the file"""
+        for obj in objects:
+            db.expunge(obj)
 
     @staticmethod
     def _update_investment_summaries(db: Session, investment_ids: List[int]):
-        """Update investment summaries after cash flow changes"""
-        for investment_id in set(investment_ids):  # Remove duplicates
-            investment = crud.get_investment(db, investment_id)
-            if investment:
-                # Recalculate called amount and fees
-                cashflows = crud.get_investment_cashflows(db, investment_id)
-                
-                called_amount = sum(
-                    abs(cf.amount) for cf in cashflows 
-                    if cf.type == CashFlowType.CAPITAL_CALL and cf.amount < 0
-                )
-                
-                fees = sum(
-                    abs(cf.amount) for cf in cashflows 
-                    if cf.type == CashFlowType.FEES and cf.amount < 0
-                )
-                
-                investment.called_amount = called_amount
-                investment.fees = fees
+        """Update investment called_amount/fees after cash flow changes with one grouped query"""
+        investment_ids = list(set(investment_ids))
+        if not investment_ids:
+            return
+        
+        cf = models.CashFlow
+        totals = {
+            investment_id: (called or 0.0, fees or 0.0)
+            for investment_id, called, fees in db.query(
+                cf.investment_id,
+                func.sum(case((and_(cf.type == CashFlowType.CAPITAL_CALL, cf.amount < 0), -cf.amount), else_=0.0)),
+                func.sum(case((and_(cf.type == CashFlowType.FEES, cf.amount < 0), -cf.amount), else_=0.0))
+            ).filter(cf.investment_id.in_(investment_ids)).group_by(cf.investment_id)
+        }
+        
+        for investment in db.query(models.Investment).filter(models.Investment.id.in_(investment_ids)):
+            investment.called_amount, investment.fees = totals.get(investment.id, (0.0, 0.0))
         
         db.commit()
 
@@ -0,0 +1,96 @@
+"""
+Execution pools for blocking work in async request handlers
+
+An ``async def`` handler runs on the event loop, so a synchronous SQLAlchemy
+query or a ReportLab render inside it stalls every other request on the
+worker. Handlers that never await are declared with plain ``def`` (FastAPI
+runs those in its thread pool); handlers that must await, such as uploads,
+hand their blocking part off:
+
+    result = await run_blocking(import_fx_rates_csv, db, upload_path)
+    pdf = await run_cpu_bound(render_report, HoldingsReport, tenant_name, dataset)
+
+run_blocking uses a dedicated pool of BLOCKING_POOL_SIZE threads for DB and
+file work, so long imports cannot starve the threads FastAPI uses for sync
+handlers and dependencies. run_cpu_bound uses a pool of CPU_POOL_SIZE worker
+processes (default: the core count), so concurrent reports render in
+parallel instead of queuing behind the GIL; its function must be defined at
+module level and its arguments must be picklable. CPU_POOL_SIZE=0 runs
+CPU-bound work in the thread pool instead.
+
+tests/test_async_handlers.py flags route handlers that block the loop.
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+BLOCKING_POOL_SIZE = int(os.getenv("BLOCKING_POOL_SIZE", "16"))
+CPU_POOL_SIZE = int(os.getenv("CPU_POOL_SIZE", str(os.cpu_count() or 1)))
+
+_lock = threading.Lock()
+_thread_pool: Optional[ThreadPoolExecutor] = None
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def _get_thread_pool() -> ThreadPoolExecutor:
+    global _thread_pool
+    with _lock:
+        if _thread_pool is None:
+            _thread_pool = ThreadPoolExecutor(max_workers=BLOCKING_POOL_SIZE, thread_name_prefix="blocking")
+        return _thread_pool
+
+
+def _get_process_pool() -> ProcessPoolExecutor:
+    global _process_pool
+    with _lock:
+        if _process_pool is None:
+            # Spawned, not forked: the server process holds DB connections and running threads
+            _process_pool = ProcessPoolExecutor(max_workers=CPU_POOL_SIZE,
+                                                mp_context=multiprocessing.get_context("spawn"))
+        return _process_pool
+
+
+async def run_blocking(func: Callable, *args, **kwargs) -> Any:
+    """Run a blocking call (DB queries, file I/O) in the blocking thread pool"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_get_thread_pool(), functools.partial(func, *args, **kwargs))
+
+
+async def run_cpu_bound(func: Callable, *args, **kwargs) -> Any:
+    """Run a CPU-bound call in a worker process; func and its arguments must be picklable"""
+    if CPU_POOL_SIZE <= 0:
+        return await run_blocking(func, *args, **kwargs)
+
+    global _process_pool
+    pool = _get_process_pool()
+    loop = asyncio.get_running_loop()
+    try:
+        return await loop.run_in_executor(pool, functools.partial(func, *args, **kwargs))
+    except BrokenProcessPool:
+        # A worker died (e.g. killed for memory); start a fresh pool for the next call
+        logger.error("CPU worker pool broke; it will be recreated")
+        with _lock:
+            if _process_pool is pool:
+                _process_pool = None
+        raise
+
+
+def shutdown_pools():
+    """Stop both pools; registered as an application shutdown handler"""
+    global _thread_pool, _process_pool
+    with _lock:
+        thread_pool, process_pool = _thread_pool, _process_pool
+        _thread_pool = _process_pool = None
+    if process_pool is not None:
+        process_pool.shutdown(wait=True, cancel_futures=True)
+    if thread_pool is not None:
+        thread_pool.shutdown(wait=True, cancel_futures=True)
@@ -0,0 +1,237 @@
+"""
+Forecast-vs-actual backtesting
+
+Compares every completed pacing-model forecast period with what actually
+happened and records the result in ForecastAccuracy:
+
+- forecasts: one query over CashFlowForecast for the scenario, periods ending
+  on or before the as-of date, joined to Investment for the pacing parameters
+- actual calls / distributions: one GROUP BY (investment, year) query over CashFlow
+- actual NAV: one query over Valuation, matched to period ends with an as-of merge
+
+Variances are computed column-wise and written with one DELETE and one
+executemany INSERT per run, so a nightly run over the whole book is a handful
+of statements. Calibration statistics group the stored variances by call
+schedule and distribution timing to guide PacingModelEngine tuning.
+"""
+
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, case, extract, insert
+from sqlalchemy.orm import Session
+
+from app import models
+from app.models import CashFlowType, ForecastScenario
+
+CALL_TYPES = [CashFlowType.CAPITAL_CALL, CashFlowType.CONTRIBUTION]
+DISTRIBUTION_TYPES = [CashFlowType.DISTRIBUTION, CashFlowType.YIELD, CashFlowType.RETURN_OF_PRINCIPAL]
+
+ACCURACY_COLUMNS = [
+    'investment_id', 'forecast_period',
+    'forecast_calls', 'actual_calls', 'forecast_distributions', 'actual_distributions',
+    'forecast_nav', 'actual_nav', 'calls_variance', 'distributions_variance', 'nav_variance',
+    'model_version',
+]
+
+
+@dataclass
+class BacktestResult:
+    """Summary of one backtest run"""
+    as_of_date: date
+    scenario: ForecastScenario
+    investments: int = 0
+    periods: int = 0
+    calibration: List[dict] = field(default_factory=list)
+
+
+def relative_variance(actual: np.ndarray, forecast: np.ndarray) -> np.ndarray:
+    """(actual - forecast) / forecast; 0 when both are zero, NaN when only the forecast is zero"""
+    actual = np.asarray(actual, dtype=float)
+    forecast = np.asarray(forecast, dtype=float)
+    variance = np.full(actual.shape, np.nan)
+    np.divide(actual - forecast, forecast, out=variance, where=forecast != 0)
+    variance[(forecast == 0) & (actual == 0)] = 0.0
+    return variance
+
+
+def calibration_statistics(frame: pd.DataFrame,
+                           group_by=('call_schedule', 'distribution_timing')) -> List[dict]:
+    """
+    Per-group accuracy of stored backtest rows. ``bias`` is total actual over
+    total forecast minus one (positive = the model under-forecasts); ``mape`` is
+    the mean absolute relative variance over periods with a non-zero forecast.
+    """
+    if frame.empty:
+        return []
+
+    stats = []
+    for key, group in frame.groupby(list(group_by), sort=True, dropna=False):
+        key = key if isinstance(key, tuple) else (key,)
+        entry = {name: getattr(value, 'value', value) for name, value in zip(group_by, key)}
+        entry['investments'] = int(group['investment_id'].nunique())
+        entry['periods'] = int(len(group))
+        for metric in ('calls', 'distributions', 'nav'):
+            forecast = group[f'forecast_{metric}'].sum()
+            actual = group[f'actual_{metric}'].sum()
+            variance = group[f'{metric}_variance'].dropna()
+            entry[metric] = {
+                'forecast_total': float(forecast),
+                'actual_total': float(actual),
+                'bias': float(actual / forecast - 1) if forecast else None,
+                'mape': float(variance.abs().mean()) if len(variance) else None,
+                'median_variance': float(variance.median()) if len(variance) else None,
+            }
+        stats.append(entry)
+    return stats
+
+
+class ForecastBacktestEngine:
+    """Backtests pacing-model forecasts against actual cash flows and NAVs"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def _investment_filter(self, query, tenant_id: Optional[int], investment_ids: Optional[List[int]]):
+        if tenant_id is not None:
+            query = query.filter(models.Investment.tenant_id == tenant_id)
+        if investment_ids is not None:
+            query = query.filter(models.Investment.id.in_(investment_ids))
+        return query
+
+    def build_backtest_frame(self, as_of_date: date, scenario: ForecastScenario = ForecastScenario.BASE,
+                             tenant_id: Optional[int] = None,
+                             investment_ids: Optional[List[int]] = None) -> pd.DataFrame:
+        """Completed forecast periods joined with actuals and variances, one row per (investment, period)"""
+        Forecast, Investment, CashFlow, Valuation = (
+            models.CashFlowForecast, models.Investment, models.CashFlow, models.Valuation
+        )
+
+        forecast_query = self.db.query(
+            Forecast.investment_id, Forecast.forecast_period_start, Forecast.forecast_period_end,
+            Forecast.projected_calls, Forecast.projected_distributions, Forecast.projected_nav,
+            Forecast.model_version, Investment.call_schedule, Investment.distribution_timing
+        ).join(Investment, Forecast.investment_id == Investment.id).filter(
+            Forecast.scenario == scenario,
+            Forecast.forecast_period_end <= as_of_date
+        )
+        forecasts = pd.DataFrame(
+            self._investment_filter(forecast_query, tenant_id, investment_ids).all(),
+            columns=['investment_id', 'period_start', 'forecast_period', 'forecast_calls',
+                     'forecast_distributions', 'forecast_nav', 'model_version',
+                     'call_schedule', 'distribution_timing']
+        )
+        if forecasts.empty:
+            return pd.DataFrame(columns=ACCURACY_COLUMNS + ['call_schedule', 'distribution_timing'])
+
+        # Actual calls and distributions per investment and calendar year
+        year = extract('year', CashFlow.date)
+        flow_query = self.db.query(
+            CashFlow.investment_id, year.label('year'),
+            func.sum(case((CashFlow.type.in_(CALL_TYPES), func.abs(CashFlow.amount)), else_=0.0)),
+            func.sum(case((CashFlow.type.in_(DISTRIBUTION_TYPES), func.abs(CashFlow.amount)), else_=0.0))
+        ).join(Investment, CashFlow.investment_id == Investment.id).filter(CashFlow.date <= as_of_date)
+        actual_flows = pd.DataFrame(
+            self._investment_filter(flow_query, tenant_id, investment_ids).group_by(CashFlow.investment_id, year).all(),
+            columns=['investment_id', 'year', 'actual_calls', 'actual_distributions']
+        )
+
+        # Forecast periods are calendar years of the fund's life
+        forecasts['year'] = pd.to_datetime(forecasts['forecast_period']).dt.year
+        actual_flows['year'] = actual_flows['year'].astype(int)
+        frame = forecasts.merge(actual_flows, on=['investment_id', 'year'], how='left')
+        frame[['actual_calls', 'actual_distributions']] = frame[['actual_calls', 'actual_distributions']].fillna(0.0)
+
+        # Actual NAV: latest valuation on or before each period end
+        nav_query = self.db.query(
+            Valuation.investment_id, Valuation.date, Valuation.nav_value
+        ).join(Investment, Valuation.investment_id == Investment.id).filter(Valuation.date <= as_of_date)
+        valuations = pd.DataFrame(
+            self._investment_filter(nav_query, tenant_id, investment_ids).all(),
+            columns=['investment_id', 'nav_date', 'actual_nav']
+        )
+        frame['_period_end'] = pd.to_datetime(frame['forecast_period'])
+        frame = frame.sort_values('_period_end')
+        if valuations.empty:
+            frame['actual_nav'] = 0.0
+        else:
+            valuations['_period_end'] = pd.to_datetime(valuations['nav_date'])
+            valuations = valuations.sort_values('_period_end')
+            frame = pd.merge_asof(frame, valuations[['investment_id', '_period_end', 'actual_nav']],
+                                  on='_period_end', by='investment_id', direction='backward')
+            frame['actual_nav'] = frame['actual_nav'].fillna(0.0)
+
+        for metric in ('calls', 'distributions', 'nav'):
+            frame[f'{metric}_variance'] = relative_variance(frame[f'actual_{metric}'], frame[f'forecast_{metric}'])
+
+        return frame.sort_values(['investment_id', 'forecast_period']).reset_index(drop=True)[
+            ACCURACY_COLUMNS + ['call_schedule', 'distribution_timing']
+        ]
+
+    def run_backtest(self, as_of_date: Optional[date] = None, scenario: ForecastScenario = ForecastScenario.BASE,
+                     tenant_id: Optional[int] = None, investment_ids: Optional[List[int]] = None) -> BacktestResult:
+        """Backtest and replace the stored ForecastAccuracy rows for the scope"""
+        as_of_date = as_of_date or date.today()
+        frame = self.build_backtest_frame(as_of_date, scenario, tenant_id, investment_ids)
+
+        scope = self._investment_filter(self.db.query(models.Investment.id), tenant_id, investment_ids)
+        try:
+            self.db.query(models.ForecastAccuracy).filter(
+                models.ForecastAccuracy.investment_id.in_(scope.scalar_subquery()),
+                models.ForecastAccuracy.forecast_period <= as_of_date
+            ).delete(synchronize_session=False)
+
+            if not frame.empty:
+                records = frame[ACCURACY_COLUMNS].astype(object).where(frame[ACCURACY_COLUMNS].notna(), None)
+                recorded_date = datetime.utcnow()
+                rows = [dict(row, recorded_date=recorded_date) for row in records.to_dict('records')]
+                self.db.execute(insert(models.ForecastAccuracy.__table__), rows)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+
+        return BacktestResult(
+            as_of_date=as_of_date,
+            scenario=scenario,
+            investments=int(frame['investment_id'].nunique()) if not frame.empty else 0,
+            periods=int(len(frame)),
+            calibration=calibration_statistics(frame)
+        )
+
+    def get_calibration(self, tenant_id: Optional[int] = None,
+                        group_by=('call_schedule', 'distribution_timing')) -> List[dict]:
+        """Calibration statistics from the stored ForecastAccuracy rows"""
+        Accuracy, Investment = models.ForecastAccuracy, models.Investment
+        query = self.db.query(
+            *(getattr(Accuracy, column) for column in ACCURACY_COLUMNS),
+            Investment.call_schedule, Investment.distribution_timing
+        ).join(Investment, Accuracy.investment_id == Investment.id)
+        frame = pd.DataFrame(
+            self._investment_filter(query, tenant_id, None).all(),
+            columns=ACCURACY_COLUMNS + ['call_schedule', 'distribution_timing']
+        )
+        return calibration_statistics(frame, group_by)
+
+
+def create_forecast_backtest_engine(db: Session) -> ForecastBacktestEngine:
+    """Factory function to create forecast backtest engine"""
+    return ForecastBacktestEngine(db)
+
+
+if __name__ == "__main__":
+    # Nightly job: backtest the whole book
+    import time
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        started = time.perf_counter()
+        result = create_forecast_backtest_engine(session).run_backtest()
+        print(f"✅ Backtested {result.periods} periods across {result.investments} investments "
+              f"in {time.perf_counter() - started:.1f}s")
+    finally:
+        session.close()
@@ -0,0 +1,334 @@
+"""
+FX normalization engine
+
+Investments carry their own currency, while portfolio aggregates must be
+expressed in one reporting currency. Rates live in the fx_rates table as the
+USD value of one unit of each currency per date and are held in memory as a
+dense (quote date x currency) array, forward-filled so any as-of lookup is a
+binary search on the date axis plus a column index. Conversion works on whole
+arrays of amounts / currencies / dates at once, so normalizing tens of
+thousands of cash flows costs a few numpy operations. The table is cached per
+process and rebuilt when the fx_rates fingerprint changes.
+"""
+
+import json
+import threading
+from dataclasses import dataclass, replace
+from datetime import date
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.performance import CashFlowEvent, PerformanceMetrics
+from app.upload_streaming import UploadSource, iter_csv_chunks
+
+DEFAULT_REPORTING_CURRENCY = "USD"
+
+
+class FxRateError(ValueError):
+    """Raised when an amount cannot be converted for lack of rates"""
+    pass
+
+
+@dataclass
+class FxRateTable:
+    """Dense USD-rate array: rows are quote dates, columns are currencies"""
+    dates: np.ndarray  # datetime64[D], ascending
+    currencies: List[str]
+    usd_rates: np.ndarray  # (len(dates), len(currencies)); NaN for currencies never quoted
+    version: Tuple = ()
+
+    def __post_init__(self):
+        self._column = {code: i for i, code in enumerate(self.currencies)}
+
+    @classmethod
+    def from_quotes(cls, quotes: pd.DataFrame, version: Tuple = ()) -> "FxRateTable":
+        """Build from rows of (rate_date, currency, usd_rate); USD is always 1.0"""
+        if quotes.empty:
+            return cls(np.array([np.datetime64(date.min, 'D')]), [DEFAULT_REPORTING_CURRENCY],
+                       np.ones((1, 1)), version)
+
+        quotes = quotes.assign(currency=quotes['currency'].str.upper(),
+                               rate_date=pd.to_datetime(quotes['rate_date']))
+        dense = quotes.pivot_table(index='rate_date', columns='currency', values='usd_rate', aggfunc='last')
+        # As-of semantics: carry each quote forward; dates before a currency's first quote use that quote
+        dense = dense.sort_index().ffill().bfill()
+        dense[DEFAULT_REPORTING_CURRENCY] = 1.0
+
+        return cls(
+            dates=dense.index.values.astype('datetime64[D]'),
+            currencies=list(dense.columns),
+            usd_rates=dense.to_numpy(dtype=float),
+            version=version
+        )
+
+    def _columns(self, codes: np.ndarray) -> np.ndarray:
+        """Column index per currency code (-1 when the currency has no rates)"""
+        unique, inverse = np.unique(codes, return_inverse=True)
+        lookup = np.array([self._column.get(str(code).upper(), -1) for code in unique], dtype=np.int64)
+        return lookup[inverse]
+
+    def _rows(self, dates) -> np.ndarray:
+        """Row of the latest quote date on or before each date"""
+        days = np.asarray(dates, dtype='datetime64[D]')
+        return np.clip(np.searchsorted(self.dates, days, side='right') - 1, 0, len(self.dates) - 1)
+
+    def usd_rates_for(self, currencies, dates) -> np.ndarray:
+        """USD value of one unit of each currency on each date (NaN when unknown)"""
+        codes = np.broadcast_to(np.asarray(currencies, dtype=object), np.shape(dates))
+        rows, columns = self._rows(dates), self._columns(codes)
+        rates = self.usd_rates[rows, np.maximum(columns, 0)]
+        return np.where(columns >= 0, rates, np.nan)
+
+    def convert(self, amounts, from_currencies, dates, to_currency: str, strict: bool = True) -> np.ndarray:
+        """
+        Convert amounts (each in its own currency, on its own date) into ``to_currency``.
+        With strict=False amounts whose rate is unknown are returned unconverted.
+        """
+        amounts = np.asarray(amounts, dtype=float)
+        if len(amounts) == 0:
+            return amounts
+        dates = np.asarray(dates, dtype='datetime64[D]')
+        source = self.usd_rates_for(from_currencies, dates)
+        target = self.usd_rates_for(to_currency, dates)
+        factors = source / target
+
+        unknown = np.isnan(factors)
+        if unknown.any():
+            if strict:
+                codes = np.broadcast_to(np.asarray(from_currencies, dtype=object), amounts.shape)
+                missing = sorted({str(code) for code in codes[unknown]})
+                raise FxRateError(f"No FX rates for {', '.join(missing)} -> {to_currency}")
+            factors = np.where(unknown, 1.0, factors)
+        return amounts * factors
+
+    def rate(self, from_currency: str, to_currency: str, as_of_date: date) -> Optional[float]:
+        """Single as-of rate, or None when either currency has no rates"""
+        value = float(self.usd_rates_for([from_currency], [as_of_date])[0] /
+                      self.usd_rates_for([to_currency], [as_of_date])[0])
+        return None if np.isnan(value) else value
+
+
+# =============================================================================
+# Loading and caching
+# =============================================================================
+
+_fx_table: Optional[FxRateTable] = None
+_fx_table_lock = threading.Lock()
+
+
+def get_fx_version(db: Session) -> Tuple:
+    count, last_updated = db.query(func.count(models.FxRate.id), func.max(models.FxRate.updated_date)).one()
+    return count, last_updated.isoformat() if last_updated else None
+
+
+def get_fx_table(db: Session) -> FxRateTable:
+    """Process-wide rate table, rebuilt when fx_rates changes"""
+    global _fx_table
+    version = get_fx_version(db)
+    with _fx_table_lock:
+        if _fx_table is not None and _fx_table.version == version:
+            return _fx_table
+
+    quotes = pd.DataFrame(
+        db.query(models.FxRate.rate_date, models.FxRate.currency, models.FxRate.usd_rate).all(),
+        columns=['rate_date', 'currency', 'usd_rate']
+    )
+    table = FxRateTable.from_quotes(quotes, version)
+    with _fx_table_lock:
+        _fx_table = table
+    return table
+
+
+def get_reporting_currency(db: Session, tenant_id: int) -> str:
+    """Tenant's reporting currency from its settings JSON ("reporting_currency"), default USD"""
+    tenant = db.query(models.Tenant.settings).filter(models.Tenant.id == tenant_id).first()
+    if tenant and tenant.settings:
+        try:
+            currency = json.loads(tenant.settings).get('reporting_currency')
+        except (ValueError, AttributeError):
+            currency = None
+        if currency:
+            return str(currency).upper()
+    return DEFAULT_REPORTING_CURRENCY
+
+
+def get_reporting_fx(db: Session, currencies: Iterable[str], reporting_currency: str) -> Optional[FxRateTable]:
+    """The rate table when any of ``currencies`` differs from the reporting currency, else None"""
+    needs_fx = any((code or DEFAULT_REPORTING_CURRENCY).upper() != reporting_currency for code in currencies)
+    return get_fx_table(db) if needs_fx else None
+
+
+def reporting_rates(fx: Optional[FxRateTable], currencies, dates, reporting_currency: str) -> np.ndarray:
+    """
+    Factor converting one unit of each currency on each date into the
+    reporting currency; 1.0 without a rate table or where rates are unknown
+    """
+    if len(dates) == 0 or fx is None:
+        return np.ones(len(dates))
+    codes = np.array([(code or DEFAULT_REPORTING_CURRENCY).upper() for code in np.broadcast_to(
+        np.asarray(currencies, dtype=object), (len(dates),))], dtype=object)
+    return fx.convert(np.ones(len(dates)), codes, dates, reporting_currency, strict=False)
+
+
+def unconverted_currencies(fx: Optional[FxRateTable], currencies: Iterable[str], reporting_currency: str,
+                           as_of_date: date) -> List[str]:
+    """Currencies among ``currencies`` with no rate into the reporting currency"""
+    if fx is None:
+        return []
+    codes = {(code or DEFAULT_REPORTING_CURRENCY).upper() for code in currencies}
+    return sorted(code for code in codes if fx.rate(code, reporting_currency, as_of_date) is None)
+
+
+def import_fx_rates_csv(db: Session, file_content: UploadSource, source: Optional[str] = None) -> Dict:
+    """
+    Upsert rates from a CSV with columns date, currency, usd_rate (USD per one
+    unit; "rate" is accepted as an alias). Returns inserted/updated counts and
+    per-row errors; nothing is written when any row is invalid.
+    """
+    result = {"inserted": 0, "updated": 0, "errors": []}
+    frames = []
+    for chunk in iter_csv_chunks(file_content):
+        chunk.columns = [str(c).strip().lower() if c != '_row_num' else c for c in chunk.columns]
+        if 'usd_rate' not in chunk.columns and 'rate' in chunk.columns:
+            chunk = chunk.rename(columns={'rate': 'usd_rate'})
+        missing = [c for c in ('date', 'currency', 'usd_rate') if c not in chunk.columns]
+        if missing:
+            result["errors"].append(f"Missing required columns: {', '.join(missing)}")
+            return result
+
+        parsed = pd.DataFrame({
+            'rate_date': pd.to_datetime(chunk['date'], errors='coerce').dt.date,
+            'currency': chunk['currency'].astype(str).str.strip().str.upper(),
+            'usd_rate': pd.to_numeric(chunk['usd_rate'], errors='coerce'),
+            '_row_num': chunk['_row_num'],
+        })
+        bad = parsed['rate_date'].isna() | parsed['usd_rate'].isna() | (parsed['usd_rate'] <= 0) | \
+            (parsed['currency'].str.len() != 3)
+        for row_num in parsed.loc[bad, '_row_num']:
+            result["errors"].append(f"Row {row_num}: date, 3-letter currency and positive usd_rate are required")
+        frames.append(parsed[~bad])
+
+    if result["errors"] or not frames:
+        return result
+
+    rates = pd.concat(frames).drop_duplicates(subset=['currency', 'rate_date'], keep='last')
+    existing = {
+        (row.currency, row.rate_date): row
+        for row in db.query(models.FxRate).filter(
+            models.FxRate.currency.in_(rates['currency'].unique().tolist()),
+            models.FxRate.rate_date >= rates['rate_date'].min(),
+            models.FxRate.rate_date <= rates['rate_date'].max()
+        )
+    }
+
+    new_rows = []
+    for currency, rate_date, usd_rate in rates[['currency', 'rate_date', 'usd_rate']].itertuples(index=False):
+        row = existing.get((currency, rate_date))
+        if row is not None:
+            if row.usd_rate != usd_rate:
+                row.usd_rate = float(usd_rate)
+                row.source = source or row.source
+                result["updated"] += 1
+        else:
+            new_rows.append(models.FxRate(rate_date=rate_date, currency=currency,
+                                          usd_rate=float(usd_rate), source=source))
+    db.add_all(new_rows)
+    db.commit()
+    result["inserted"] = len(new_rows)
+    return result
+
+
+# =============================================================================
+# Portfolio normalization
+# =============================================================================
+
+FLOW_CONTRIBUTION, FLOW_DISTRIBUTION = 0, 1
+
+
+def normalize_portfolio_flows(
+    fx: Optional[FxRateTable],
+    reporting_currency: str,
+    investment_currencies: Sequence[str],
+    investment_metrics: List[PerformanceMetrics],
+    flow_investment: Iterable[int],
+    flow_dates: Iterable[date],
+    flow_amounts: Iterable[float],
+    flow_kinds: Iterable[int],
+    as_of_date: date
+) -> Tuple[List[PerformanceMetrics], List[CashFlowEvent], List[str]]:
+    """
+    Express per-investment metrics and the portfolio cash flows in the reporting
+    currency. Flows convert at their own date, NAV and yield amounts at the
+    as-of date, all in one vectorized pass. Returns the converted metrics, the
+    portfolio IRR flows (each investment's NAV as a terminal flow on the as-of
+    date) and the currencies left unconverted for lack of rates.
+    """
+    n = len(investment_metrics)
+    index = np.fromiter(flow_investment, dtype=np.int64)
+    dates = np.asarray(list(flow_dates), dtype='datetime64[D]')
+    amounts = np.fromiter(flow_amounts, dtype=float)
+    kinds = np.fromiter(flow_kinds, dtype=np.int64)
+    codes = np.array([(c or DEFAULT_REPORTING_CURRENCY).upper() for c in investment_currencies], dtype=object)
+
+    nav = np.array([m.current_nav or 0.0 for m in investment_metrics], dtype=float)
+    as_of = np.full(n, np.datetime64(as_of_date, 'D'))
+
+    if fx is None or not (codes != reporting_currency).any():
+        converted, nav_converted, spot, missing = amounts, nav, np.ones(n), []
+    else:
+        converted = fx.convert(amounts, codes[index], dates, reporting_currency, strict=False)
+        spot = fx.convert(np.ones(n), codes, as_of, reporting_currency, strict=False)
+        nav_converted = nav * spot
+        if np.isnan(fx.usd_rates_for([reporting_currency], [as_of_date])[0]):
+            missing = [reporting_currency]
+        else:
+            missing = sorted(set(codes[np.isnan(fx.usd_rates_for(codes, as_of))].tolist()))
+
+    # Effective rate per investment for contributions and distributions
+    def ratio(kind):
+        mask = kinds == kind
+        local = np.bincount(index[mask], weights=np.abs(amounts[mask]), minlength=n)
+        reporting = np.bincount(index[mask], weights=np.abs(converted[mask]), minlength=n)
+        return np.divide(reporting, local, out=spot.copy(), where=local > 0)
+
+    contribution_rate, distribution_rate = ratio(FLOW_CONTRIBUTION), ratio(FLOW_DISTRIBUTION)
+
+    metrics = []
+    for i, m in enumerate(investment_metrics):
+        current_nav = None if m.current_nav is None else float(nav_converted[i])
+        total_distributions = m.total_distributions * distribution_rate[i]
+        metrics.append(replace(
+            m,
+            total_contributions=m.total_contributions * contribution_rate[i],
+            total_distributions=total_distributions,
+            current_nav=current_nav,
+            total_value=None if m.total_value is None else (current_nav or 0.0) + total_distributions,
+            trailing_yield_amount=None if m.trailing_yield_amount is None else m.trailing_yield_amount * spot[i],
+            latest_yield_amount=None if m.latest_yield_amount is None else m.latest_yield_amount * spot[i]
+        ))
+
+    events = [CashFlowEvent(d, float(a)) for d, a in zip(dates.astype(object), converted)]
+    events.extend(CashFlowEvent(as_of_date, float(v)) for v in nav_converted if v > 0)
+    return metrics, events, missing
+
+
+if __name__ == "__main__":
+    # Operator import of the shared rate table: python -m app.fx_service rates.csv
+    import sys
+    from app.database import SessionLocal
+
+    session = SessionLocal()
+    try:
+        result = import_fx_rates_csv(session, sys.argv[1], source=sys.argv[1])
+    finally:
+        session.close()
+    for error in result["errors"]:
+        print(f"❌ {error}")
+    if result["errors"]:
+        sys.exit(1)
+    print(f"✅ Imported FX rates: {result['inserted']} inserted, {result['updated']} updated")
@@ -3,9 +3,9 @@ Import/Export functionality for portfolio data
 """
 from typing import List, Dict, Any, Tuple
 import pandas as pd
-from io import BytesIO
 from sqlalchemy.orm import Session
-from app import models, schemas, crud
+from app import schemas, crud
+from app.upload_streaming import UploadSource, iter_csv_chunks, iter_excel_chunks
 from app.models import AssetClass, InvestmentStructure, LiquidityProfile, ReportingFrequency, RiskRating, TaxClassification, ActivityClassification
 import logging
 
@@ -363,111 +363,52 @@ def validate_and_convert_row(row: Dict[str, Any], row_num: int, db: Session, for
         logger.error(f"Unexpected error in validate_and_convert_row: {str(e)}")
         return None, [f"Unexpected error processing row: {str(e)}"]
 
-def import_investments_from_file(file_content: bytes, filename: str, db: Session, force_upload: bool = False) -> ImportResult:
-    """Import investments from CSV or Excel file"""
+def import_investments_from_file(file_content: UploadSource, filename: str, db: Session, force_upload: bool = False) -> ImportResult:
+    """Import investments from CSV or Excel file
+    
+    ``file_content`` is the raw file bytes or the path of a spooled upload; rows
+    are read and validated in chunks.
+    """
     result = ImportResult()
     
     try:
-        # Detect file type and read
+        # Detect file type and open a chunked reader; each chunk carries the sheet row number
         if filename.endswith('.csv'):
-            df = pd.read_csv(BytesIO(file_content))
+            chunks = iter_csv_chunks(file_content)
         elif filename.endswith(('.xlsx', '.xls')):
             # For Excel files, read from 'Investment Data' sheet 
             # Skip user headers (row 1) and examples (row 3), use db field names (row 2) as headers
-            df = pd.read_excel(BytesIO(file_content), sheet_name='Investment Data', skiprows=[0, 2], header=0)
-            
-            # Clean column names - remove brackets from field names like '[name]' -> 'name'
-            df.columns = [col.strip('[]') if isinstance(col, str) else col for col in df.columns]
-            logger.info(f"Cleaned column names: {list(df.columns)}")
+            chunks = iter_excel_chunks(file_content, 'Investment Data', header_row=2, skip_rows=[3], filename=filename)
         else:
             result.add_error(0, "Unsupported file format. Please use CSV or Excel files.")
             return result
             
-        logger.info(f"Processing {len(df)} rows from {filename}")
-        
-        # Process each row
-        for index, row in df.iterrows():
-            # Calculate correct row number for error reporting
-            # For Excel: +4 accounts for 3-row header structure (user headers, db fields, examples) + 0-based index
-            # For CSV: +2 accounts for header + 0-based index  
-            row_num = index + 4 if filename.endswith(('.xlsx', '.xls')) else index + 2
-            
-            # Skip empty rows
-            if row.isna().all():
-                continue
-                
-            investment, errors = validate_and_convert_row(row.to_dict(), row_num, db, force_upload)
+        rows_read = 0
+        for chunk in chunks:
+            # Clean column names - remove brackets from field names like '[name]' -> 'name'
+            chunk.columns = [col.strip('[]') if isinstance(col, str) else col for col in chunk.columns]
+            rows_read += len(chunk)
             
-            if errors:
-                for error in errors:
-                    result.add_error(row_num, error)
-                continue
-                
-            try:
-                # Create investment in database
-                crud.create_investment(db, investment)
-                result.add_success()
+            # Process each row
+            for row_num, row in zip(chunk.pop('_row_num'), chunk.to_dict('records')):
+                investment, errors = validate_and_convert_row(row, int(row_num), db, force_upload)
                 
-            except Exception as e:
-                result.add_error(row_num, f"Database error: {str(e)}")
+                if errors:
+                    for error in errors:
+                        result.add_error(int(row_num), error)
+                    continue
+                    
+                try:
+                    # Create investment in database
+                    crud.create_investment(db, investment)
+                    result.add_success()
+                    
+                except Exception as e:
+                    result.add_error(int(row_num), f"Database error: {str(e)}")
                 
-        logger.info(f"Import completed: {result.success_count} success, {result.error_count} errors")
+        logger.info(f"Import completed for {rows_read} rows from {filename}: {result.success_count} success, {result.error_count} errors")
         return result
         
     except Exception as e:
         result.add_error(0, f"File processing error: {str(e)}")
         return result
-
-def export_investments_to_excel(investments: List[models.Investment]) -> BytesIO:
-    """Export investments to Excel format"""
-    # Prepare data for DataFrame
-    data = []
-    
-    for investment in investments:
-        # Calculate performance metrics
-        irr = tvpi = dpi = 0.0
-        # Note: Performance calculation requires database session - simplified for export
-        
-        data.append({
-            'ID': investment.id,
-            'Name': investment.name or '',
-            'Asset Class': investment.asset_class.value if investment.asset_class else '',
-            'Investment Structure': investment.investment_structure.value if investment.investment_structure else '',
-            'Owner': investment.owner or '',
-            'Strategy': investment.strategy or '',
-            'Vintage Year': investment.vintage_year or '',
-            'Commitment Amount': investment.commitment_amount or 0,
-            'Called Amount': investment.called_amount or 0,
-            'Fees': investment.fees or 0,
-            'IRR (%)': round(irr * 100, 2) if irr else 0.0,
-            'TVPI': round(tvpi, 2) if tvpi else 0.0,
-            'DPI': round(dpi, 2) if dpi else 0.0,
-        })
-    
-    # Create DataFrame and Excel file
-    df = pd.DataFrame(data)
-    
-    excel_buffer = BytesIO()
-    with pd.ExcelWriter(excel_buffer, engine='openpyxl') as writer:
-        df.to_excel(writer, sheet_name='Investments', index=False)
-        
-        # Format the worksheet
-        worksheet = writer.sheets['Investments']
-        
-        # Auto-adjust column widths
-        for column in worksheet.columns:
-            max_length = 0
-            column_name = column[0].column_letter
-            
-            for cell in column:
-                try:
-                    if len(str(cell.value)) > max_length:
-                        max_length = len(str(cell.value))
-                except:
-                    pass
-                    
-            adjusted_width = min(max_length + 2, 50)
-            worksheet.column_dimensions[column_name].width = adjusted_width
-    
-    excel_buffer.seek(0)
-    return excel_buffer
\ No newline at end of file
@@ -0,0 +1,115 @@
+"""
+Fast JSON responses for analytics payloads
+
+Timelines, PME series and relative-performance comparisons run to tens of
+thousands of points. Routes serving them return ``FastJSONResponse`` directly,
+which skips FastAPI's ``jsonable_encoder`` walk and ``response_model``
+re-validation and encodes with orjson: dates, datetimes, enums, UUIDs, floats
+and numpy scalars are written natively and integer dict keys (benchmark ids)
+become strings, as the stdlib encoder would make them.
+
+Chart endpoints take ``layout=columns`` to receive each series as one array
+per field (``{"date": [...], "tvpi": [...]}``) instead of a list of point
+objects, so field names are sent once per series rather than once per point.
+
+``add_compression`` installs response compression on an app: Brotli when
+brotli-asgi is installed (falling back to gzip for clients without ``br``),
+otherwise gzip, for bodies of at least RESPONSE_COMPRESSION_MIN_BYTES.
+"""
+
+import os
+from decimal import Decimal
+from typing import Dict, Optional, Sequence
+
+import orjson
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+from starlette.middleware.gzip import GZipMiddleware
+
+try:
+    from brotli_asgi import BrotliMiddleware
+except ImportError:
+    BrotliMiddleware = None
+
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+# Query parameter pattern for chart endpoints
+LAYOUTS = ('rows', 'columns')
+LAYOUT_PATTERN = "^(rows|columns)$"
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, BaseModel):
+        return value.model_dump(mode="json")
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(content) -> bytes:
+    """Encode a response payload as UTF-8 JSON bytes"""
+    return orjson.dumps(content, default=_default, option=ORJSON_OPTIONS)
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse encoded with orjson; return it from a route to bypass response_model serialization"""
+
+    def render(self, content) -> bytes:
+        return dumps(content)
+
+
+def series_fields(model) -> tuple:
+    """Field names of a Pydantic point model, in declaration order"""
+    return tuple(model.model_fields)
+
+
+def chart_series(points: Sequence[Dict], fields: Optional[Sequence[str]] = None, layout: str = 'rows'):
+    """
+    A series of point dicts in the requested layout. With ``fields`` every
+    point carries each of them (None where a point lacks one), matching what
+    the point's response model would have produced; without, rows are passed
+    through and columns cover every key seen. Raises ValueError for an
+    unknown layout.
+    """
+    if layout not in LAYOUTS:
+        raise ValueError(f"layout must be one of {', '.join(LAYOUTS)}")
+    if fields is None:
+        if layout == 'rows':
+            return list(points)
+        fields = tuple(dict.fromkeys(key for point in points for key in point))
+    if layout == 'columns':
+        return {field: [point.get(field) for point in points] for field in fields}
+    return [{field: point.get(field) for field in fields} for point in points]
+
+
+def chart_payload(payload: Dict, series: Dict[str, Optional[Sequence[str]]], layout: str = 'rows') -> Dict:
+    """
+    Copy of ``payload`` with each key in ``series`` laid out by chart_series.
+    A key may hold one list of points or a dict of them (e.g. one series per
+    benchmark id); ``series`` maps each key to its fields.
+    """
+    result = dict(payload)
+    for key, fields in series.items():
+        value = payload.get(key)
+        if isinstance(value, dict):
+            result[key] = {name: chart_series(points, fields, layout) for name, points in value.items()}
+        elif value is not None:
+            result[key] = chart_series(value, fields, layout)
+    return result
+
+
+def add_compression(app: FastAPI) -> str:
+    """Install Brotli or gzip response compression on ``app``; returns the encoding used"""
+    if BrotliMiddleware is not None:
+        app.add_middleware(BrotliMiddleware, quality=RESPONSE_BROTLI_QUALITY,
+                           minimum_size=RESPONSE_COMPRESSION_MIN_BYTES, gzip_fallback=True)
+        return "br"
+    app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_COMPRESSION_MIN_BYTES,
+                       compresslevel=RESPONSE_GZIP_LEVEL)
+    return "gzip"
+
@@ -7,6 +7,8 @@ from typing import List, Dict, Tuple, Optional
 from datetime import date, datetime, timedelta
 from dateutil.relativedelta import relativedelta
 from dataclasses import dataclass
+import time
+import numpy as np
 from sqlalchemy.orm import Session
 from sqlalchemy import and_, or_, func
 
@@ -59,6 +61,159 @@ class PortfolioLiquidityForecast:
     stress_test_results: Dict[str, float] = None
     confidence_level: float = 0.68
 
+@dataclass
+class LiquidityStressResult:
+    """Monte Carlo liquidity stress test output (one value per forecast month)"""
+    n_simulations: int
+    n_investments: int
+    month_labels: List[str]
+    
+    # Percentile bands keyed 'p5', 'p25', 'p50', 'p75', 'p95'
+    net_flow_bands: Dict[str, List[float]]
+    cumulative_net_flow_bands: Dict[str, List[float]]
+    
+    # Probability that calls exceed distributions in the month
+    gap_probability: List[float]
+    # Probability that cumulative net flow falls below -cash_buffer by the month
+    buffer_breach_probability: List[float]
+    
+    probability_any_gap: float
+    probability_buffer_breach: float
+    expected_max_shortfall: float
+    cash_buffer: float
+    elapsed_seconds: float
+
+class MonteCarloLiquidityEngine:
+    """Vectorized Monte Carlo sampler for call/distribution timing and magnitude
+    
+    Each path draws, for every investment, a lognormal magnitude multiplier and an
+    integer month shift for both calls and distributions. Magnitudes share a common
+    market factor so stress is correlated across the book: paths with heavier calls
+    tend to see lighter distributions.
+    
+    Conceptually the engine works on a simulations x investments x months cube.
+    It is never materialized: for each possible timing shift the per-path weights
+    (simulations x investments) are multiplied by the shifted pacing matrix
+    (investments x months), which keeps memory at simulations x investments and
+    lets BLAS do the heavy lifting.
+    """
+    
+    PERCENTILES = (5, 25, 50, 75, 95)
+    
+    def __init__(self, call_volatility: float = 0.25, distribution_volatility: float = 0.45,
+                 call_timing_sigma: float = 1.0, distribution_timing_sigma: float = 2.0,
+                 call_timing_bias: float = -0.5, distribution_timing_bias: float = 1.0,
+                 market_correlation: float = 0.5, max_shift_months: int = 4,
+                 chunk_size: int = 2500, seed: Optional[int] = None):
+        self.call_volatility = call_volatility
+        self.distribution_volatility = distribution_volatility
+        self.call_timing_sigma = call_timing_sigma
+        self.distribution_timing_sigma = distribution_timing_sigma
+        self.call_timing_bias = call_timing_bias  # Negative = calls arrive early under stress
+        self.distribution_timing_bias = distribution_timing_bias  # Positive = distributions slip
+        self.market_correlation = market_correlation
+        self.max_shift_months = max_shift_months
+        self.chunk_size = chunk_size
+        self.rng = np.random.default_rng(seed)
+    
+    @property
+    def padding_months(self) -> int:
+        """Months of pacing needed on each side of the horizon"""
+        return self.max_shift_months
+    
+    def simulate(self, projected_calls: np.ndarray, projected_distributions: np.ndarray,
+                 fixed_calls: Optional[np.ndarray] = None, fixed_distributions: Optional[np.ndarray] = None,
+                 n_simulations: int = 10000, cash_buffer: float = 500000.0,
+                 month_labels: Optional[List[str]] = None) -> LiquidityStressResult:
+        """Simulate portfolio liquidity paths
+        
+        ``projected_*`` are investments x (months + 2 * padding_months) pacing
+        arrays; ``fixed_*`` are investments x months confirmed amounts that are
+        added to every path unchanged.
+        """
+        started = time.perf_counter()
+        
+        projected_calls = np.asarray(projected_calls, dtype=float)
+        projected_distributions = np.asarray(projected_distributions, dtype=float)
+        n_inv, width = projected_calls.shape
+        n_months = width - 2 * self.padding_months
+        if n_months < 0:
+            raise ValueError("Pacing arrays must include padding_months on each side of the horizon")
+        
+        fixed_net = np.zeros(n_months)
+        if fixed_distributions is not None:
+            fixed_net += np.asarray(fixed_distributions, dtype=float).sum(axis=0)
+        if fixed_calls is not None:
+            fixed_net -= np.asarray(fixed_calls, dtype=float).sum(axis=0)
+        
+        net_flows = np.empty((n_simulations, n_months))
+        for chunk_start in range(0, n_simulations, self.chunk_size):
+            chunk = min(self.chunk_size, n_simulations - chunk_start)
+            calls, distributions = self._simulate_chunk(
+                projected_calls, projected_distributions, chunk, n_inv, n_months
+            )
+            net_flows[chunk_start:chunk_start + chunk] = distributions - calls + fixed_net
+        
+        cumulative = np.cumsum(net_flows, axis=1)
+        net_bands = np.percentile(net_flows, self.PERCENTILES, axis=0)
+        cumulative_bands = np.percentile(cumulative, self.PERCENTILES, axis=0)
+        shortfall = np.maximum(-cumulative.min(axis=1), 0.0) if n_months else np.zeros(n_simulations)
+        breaches = cumulative < -cash_buffer
+        
+        return LiquidityStressResult(
+            n_simulations=n_simulations,
+            n_investments=n_inv,
+            month_labels=list(month_labels) if month_labels else [f"M{m + 1}" for m in range(n_months)],
+            net_flow_bands={f"p{p}": net_bands[k].tolist() for k, p in enumerate(self.PERCENTILES)},
+            cumulative_net_flow_bands={f"p{p}": cumulative_bands[k].tolist() for k, p in enumerate(self.PERCENTILES)},
+            gap_probability=(net_flows < 0).mean(axis=0).tolist(),
+            buffer_breach_probability=np.maximum.accumulate(breaches, axis=1).mean(axis=0).tolist(),
+            probability_any_gap=float((net_flows < 0).any(axis=1).mean()) if n_months else 0.0,
+            probability_buffer_breach=float(breaches.any(axis=1).mean()) if n_months else 0.0,
+            expected_max_shortfall=float(shortfall.mean()) if n_simulations else 0.0,
+            cash_buffer=cash_buffer,
+            elapsed_seconds=time.perf_counter() - started
+        )
+    
+    def _simulate_chunk(self, projected_calls: np.ndarray, projected_distributions: np.ndarray,
+                        n_sims: int, n_inv: int, n_months: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Portfolio calls and distributions (simulations x months) for one chunk of paths"""
+        
+        # float32 sampling halves memory traffic; per-shift totals accumulate in float64
+        market = self.rng.standard_normal((n_sims, 1), dtype=np.float32)
+        idiosyncratic_weight = np.float32(np.sqrt(1.0 - self.market_correlation ** 2))
+        rho = np.float32(self.market_correlation)
+        
+        call_shock = rho * market + idiosyncratic_weight * self.rng.standard_normal((n_sims, n_inv), dtype=np.float32)
+        dist_shock = -rho * market + idiosyncratic_weight * self.rng.standard_normal((n_sims, n_inv), dtype=np.float32)
+        
+        # Mean-preserving lognormal magnitudes
+        call_scale = np.exp(self.call_volatility * call_shock - 0.5 * self.call_volatility ** 2)
+        dist_scale = np.exp(self.distribution_volatility * dist_shock - 0.5 * self.distribution_volatility ** 2)
+        
+        call_shift = self._sample_shifts(self.call_timing_bias, self.call_timing_sigma, n_sims, n_inv)
+        dist_shift = self._sample_shifts(self.distribution_timing_bias, self.distribution_timing_sigma, n_sims, n_inv)
+        
+        calls = self._contract(call_scale, call_shift, projected_calls, n_months)
+        distributions = self._contract(dist_scale, dist_shift, projected_distributions, n_months)
+        return calls, distributions
+    
+    def _sample_shifts(self, bias: float, sigma: float, n_sims: int, n_inv: int) -> np.ndarray:
+        shifts = np.rint(bias + sigma * self.rng.standard_normal((n_sims, n_inv), dtype=np.float32))
+        return np.clip(shifts, -self.max_shift_months, self.max_shift_months).astype(np.int8)
+    
+    def _contract(self, scale: np.ndarray, shift: np.ndarray, pacing: np.ndarray, n_months: int) -> np.ndarray:
+        """Sum scaled, time-shifted pacing over investments for every path"""
+        
+        pad = self.padding_months
+        total = np.zeros((scale.shape[0], n_months))
+        weights = np.empty_like(scale)
+        for k in range(-self.max_shift_months, self.max_shift_months + 1):
+            np.multiply(scale, shift == k, out=weights)
+            # A flow shifted k months later lands in month m from pacing month m - k
+            total += weights @ pacing[:, pad - k:pad - k + n_months].astype(np.float32)
+        return total
+
 class LiquidityForecastService:
     """Enhanced liquidity forecasting with override capabilities"""
     
@@ -72,11 +227,7 @@ class LiquidityForecastService:
         forecast_date = date.today()
         
         # Get active investments (filter by entity if specified)
-        query = self.db.query(models.Investment).filter(models.Investment.is_active == True)
-        if entity_id:
-            query = query.filter(models.Investment.entity_id == entity_id)
-        
-        investments = query.all()
+        investments = self._get_forecast_investments(entity_id)
         
         # Generate 12 monthly periods
         periods = []
@@ -170,7 +321,7 @@ class LiquidityForecastService:
             # Track investment-level details
             if final_calls > 0 or final_distributions > 0:
                 investment_details.append({
-                    'investment_name': investment.investment_name,
+                    'investment_name': investment.name,
                     'calls': final_calls,
                     'distributions': final_distributions,
                     'has_override': calls_override > 0 or dist_override > 0,
@@ -312,96 +463,137 @@ class LiquidityForecastService:
         
         return alerts
 
-    def generate_stress_scenarios(self, base_forecast: PortfolioLiquidityForecast) -> Dict[str, PortfolioLiquidityForecast]:
-        """Generate stress test scenarios for liquidity planning"""
-        
-        scenarios = {}
-        
-        # Accelerated calls scenario (calls come 25% faster)
-        accelerated_periods = []
-        for i, period in enumerate(base_forecast.periods):
-            if i < 9:  # Move some calls forward from later months
-                accel_calls = period.total_calls * 1.25
-            else:
-                accel_calls = period.total_calls * 0.75
-            
-            accel_period = LiquidityForecastPeriod(
-                period_start=period.period_start,
-                period_end=period.period_end,
-                month_name=period.month_name,
-                projected_calls=period.projected_calls,
-                override_calls=period.override_calls,
-                total_calls=accel_calls,
-                projected_distributions=period.projected_distributions,
-                override_distributions=period.override_distributions,
-                total_distributions=period.total_distributions,
-                net_cash_flow=period.total_distributions - accel_calls,
-                cumulative_net_flow=0,  # Will recalculate
-                liquidity_required=accel_calls,
-                liquidity_available=period.total_distributions,
-                liquidity_gap=period.total_distributions - accel_calls
-            )
-            accelerated_periods.append(accel_period)
-        
-        # Recalculate cumulative flows
-        cumulative = 0.0
-        for period in accelerated_periods:
-            cumulative += period.net_cash_flow
-            period.cumulative_net_flow = cumulative
-        
-        scenarios['accelerated_calls'] = PortfolioLiquidityForecast(
-            forecast_date=base_forecast.forecast_date,
-            periods=accelerated_periods,
-            total_projected_calls=sum(p.total_calls for p in accelerated_periods),
-            total_projected_distributions=base_forecast.total_projected_distributions,
-            total_net_flow=sum(p.net_cash_flow for p in accelerated_periods),
-            max_liquidity_gap=min(p.liquidity_gap for p in accelerated_periods),
-            months_with_gaps=sum(1 for p in accelerated_periods if p.liquidity_gap < 0)
+    def generate_stress_scenarios(self, base_forecast: PortfolioLiquidityForecast,
+                                  entity_id: Optional[int] = None,
+                                  n_simulations: int = 10000,
+                                  cash_buffer: float = 500000.0,
+                                  seed: Optional[int] = None) -> LiquidityStressResult:
+        """Run a Monte Carlo stress test around the pacing curves behind a forecast
+
+        Calls and distributions are sampled per investment (timing and magnitude)
+        around the same pacing projections used by the deterministic forecast.
+        Confirmed forecast adjustments are kept fixed in every path.
+        """
+        months = [p.period_start for p in base_forecast.periods]
+        investments = self._get_forecast_investments(entity_id)
+        engine = MonteCarloLiquidityEngine(seed=seed)
+
+        projected_calls, projected_distributions, fixed_calls, fixed_distributions = \
+            self._build_pacing_matrices(investments, months, engine.padding_months)
+
+        result = engine.simulate(
+            projected_calls,
+            projected_distributions,
+            fixed_calls=fixed_calls,
+            fixed_distributions=fixed_distributions,
+            n_simulations=n_simulations,
+            cash_buffer=cash_buffer,
+            month_labels=[p.month_name for p in base_forecast.periods]
         )
-        
-        # Delayed distributions scenario (distributions come 25% slower)
-        delayed_periods = []
-        for i, period in enumerate(base_forecast.periods):
-            if i > 2:  # Delay distributions from month 3 onwards
-                delayed_distributions = period.total_distributions * 0.75
-            else:
-                delayed_distributions = period.total_distributions
-                
-            delayed_period = LiquidityForecastPeriod(
-                period_start=period.period_start,
-                period_end=period.period_end,
-                month_name=period.month_name,
-                projected_calls=period.projected_calls,
-                override_calls=period.override_calls,
-                total_calls=period.total_calls,
-                projected_distributions=period.projected_distributions,
-                override_distributions=period.override_distributions,
-                total_distributions=delayed_distributions,
-                net_cash_flow=delayed_distributions - period.total_calls,
-                cumulative_net_flow=0,  # Will recalculate
-                liquidity_required=period.total_calls,
-                liquidity_available=delayed_distributions,
-                liquidity_gap=delayed_distributions - period.total_calls
-            )
-            delayed_periods.append(delayed_period)
-        
-        # Recalculate cumulative flows
-        cumulative = 0.0
-        for period in delayed_periods:
-            cumulative += period.net_cash_flow
-            period.cumulative_net_flow = cumulative
-        
-        scenarios['delayed_distributions'] = PortfolioLiquidityForecast(
-            forecast_date=base_forecast.forecast_date,
-            periods=delayed_periods,
-            total_projected_calls=base_forecast.total_projected_calls,
-            total_projected_distributions=sum(p.total_distributions for p in delayed_periods),
-            total_net_flow=sum(p.net_cash_flow for p in delayed_periods),
-            max_liquidity_gap=min(p.liquidity_gap for p in delayed_periods),
-            months_with_gaps=sum(1 for p in delayed_periods if p.liquidity_gap < 0)
+
+        base_forecast.stress_test_results = {
+            'probability_any_gap': result.probability_any_gap,
+            'probability_buffer_breach': result.probability_buffer_breach,
+            'p05_terminal_cumulative_flow': result.cumulative_net_flow_bands['p5'][-1] if months else 0.0,
+            'expected_max_shortfall': result.expected_max_shortfall
+        }
+        return result
+
+    def _get_forecast_investments(self, entity_id: Optional[int] = None) -> List[models.Investment]:
+        """Active, non-archived investments included in liquidity forecasts"""
+
+        query = self.db.query(models.Investment).filter(
+            models.Investment.status == models.InvestmentStatus.ACTIVE,
+            models.Investment.is_archived == False
         )
-        
-        return scenarios
+        if entity_id:
+            query = query.filter(models.Investment.entity_id == entity_id)
+        return query.all()
+
+    def _build_pacing_matrices(self, investments: List[models.Investment], months: List[date],
+                               padding_months: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """Build investments x months pacing arrays for the stress engine
+
+        Projected arrays cover the horizon plus ``padding_months`` on each side so
+        that timing shifts can pull flows into (or push them out of) the horizon.
+        Fixed arrays hold confirmed adjustments over the horizon only; where an
+        adjustment exists the projection for that month is dropped, matching the
+        override precedence in ``_calculate_period_cash_flows``.
+        """
+        n_inv = len(investments)
+        n_months = len(months)
+        width = n_months + 2 * padding_months
+        projected_calls = np.zeros((n_inv, width))
+        projected_distributions = np.zeros((n_inv, width))
+        fixed_calls = np.zeros((n_inv, n_months))
+        fixed_distributions = np.zeros((n_inv, n_months))
+
+        if n_inv == 0 or n_months == 0:
+            return projected_calls, projected_distributions, fixed_calls, fixed_distributions
+
+        window_start = months[0] - relativedelta(months=padding_months)
+        month_starts = np.array(
+            [window_start + relativedelta(months=m) for m in range(width)], dtype='datetime64[D]'
+        )
+        month_ends = np.append(month_starts[1:], np.datetime64(
+            window_start + relativedelta(months=width), 'D'
+        )) - np.timedelta64(1, 'D')
+        days_in_month = (month_ends - month_starts).astype(int) + 1
+
+        index_by_id = {inv.id: i for i, inv in enumerate(investments)}
+        enabled = [inv for inv in investments if inv.forecast_enabled]
+
+        # One query for every stored base forecast; generate in memory where missing
+        stored = self.db.query(models.CashFlowForecast).filter(
+            models.CashFlowForecast.investment_id.in_([inv.id for inv in enabled]),
+            models.CashFlowForecast.scenario == models.ForecastScenario.BASE
+        ).all() if enabled else []
+
+        rows = [(f.investment_id, f.forecast_period_start, f.forecast_period_end,
+                 f.projected_calls or 0.0, f.projected_distributions or 0.0) for f in stored]
+        covered = {f.investment_id for f in stored}
+        for inv in enabled:
+            if inv.id in covered:
+                continue
+            try:
+                generated = self.pacing_engine.generate_forecast(inv)
+            except Exception:
+                continue
+            rows.extend((inv.id, f.forecast_period_start, f.forecast_period_end,
+                         f.projected_calls, f.projected_distributions) for f in generated)
+
+        if rows:
+            row_index = np.array([index_by_id[r[0]] for r in rows])
+            row_start = np.array([r[1] for r in rows], dtype='datetime64[D]')
+            row_end = np.array([r[2] for r in rows], dtype='datetime64[D]')
+            row_calls = np.array([r[3] for r in rows], dtype=float)
+            row_distributions = np.array([r[4] for r in rows], dtype=float)
+            row_days = (row_end - row_start).astype(int) + 1
+
+            # Pro-rate each forecast period onto the calendar months it fully covers
+            covers = (row_start[:, None] <= month_starts[None, :]) & (row_end[:, None] >= month_ends[None, :])
+            proration = covers * (days_in_month[None, :] / row_days[:, None])
+            np.add.at(projected_calls, row_index, row_calls[:, None] * proration)
+            np.add.at(projected_distributions, row_index, row_distributions[:, None] * proration)
+
+        adjustments = self.db.query(models.ForecastAdjustment).filter(
+            models.ForecastAdjustment.investment_id.in_(list(index_by_id)),
+            models.ForecastAdjustment.is_active == True,
+            models.ForecastAdjustment.adjustment_date >= months[0],
+            models.ForecastAdjustment.adjustment_date < months[-1] + relativedelta(months=1)
+        ).all()
+
+        for adj in adjustments:
+            i = index_by_id[adj.investment_id]
+            m = (adj.adjustment_date.year - months[0].year) * 12 + adj.adjustment_date.month - months[0].month
+            if adj.adjustment_type == "capital_call":
+                fixed_calls[i, m] += adj.adjustment_amount
+                projected_calls[i, padding_months + m] = 0.0
+            elif adj.adjustment_type == "distribution":
+                fixed_distributions[i, m] += adj.adjustment_amount
+                projected_distributions[i, padding_months + m] = 0.0
+
+        return projected_calls, projected_distributions, fixed_calls, fixed_distributions
     
     def get_cash_flow_matching_opportunities(self, forecast: PortfolioLiquidityForecast) -> List[Dict]:
         """Identify opportunities to match distributions with capital calls"""
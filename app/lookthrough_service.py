@@ -0,0 +1,291 @@
+"""
+Look-through exposure engine
+
+Answers "what does this entity own, directly and through the entities below it"
+for every entity of a tenant at once. Direct stakes come from InvestmentOwnership
+(active as of the date; investments without ownership records are owned 100% by
+their Investment.entity_id). They form a sparse entity x investment matrix D.
+EntityHierarchy parent links form a sparse entity x entity matrix A, and the
+look-through matrix is
+
+    L = D + A.D + A^2.D + ...
+
+computed with sparse products until the deepest level is reached. Commitment,
+called, distributions and NAV per investment then roll up as L times a vector.
+Results are cached per (tenant, as_of_date, data version).
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from sqlalchemy import or_, func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.report_data import get_report_dataset, get_data_version
+
+MAX_CACHED_EXPOSURES = 32
+METRICS = ('commitment', 'called', 'distributions', 'nav')
+
+
+# =============================================================================
+# Sparse COO helpers (rows, cols, values)
+# =============================================================================
+
+def _coo_sum(rows: np.ndarray, cols: np.ndarray, values: np.ndarray,
+             n_cols: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Combine duplicate (row, col) entries"""
+    if len(rows) == 0:
+        return rows, cols, values
+    keys = rows.astype(np.int64) * n_cols + cols
+    unique_keys, inverse = np.unique(keys, return_inverse=True)
+    summed = np.bincount(inverse, weights=values)
+    return unique_keys // n_cols, unique_keys % n_cols, summed
+
+
+def _coo_matmul(a: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                b: Tuple[np.ndarray, np.ndarray, np.ndarray],
+                n_cols: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Sparse product A.B for COO matrices (B sorted by row)"""
+    a_rows, a_cols, a_values = a
+    b_rows, b_cols, b_values = b
+    if len(a_rows) == 0 or len(b_rows) == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=float)
+
+    # For every A entry (i, k) pair it with every B entry in row k
+    starts = np.searchsorted(b_rows, a_cols, side='left')
+    ends = np.searchsorted(b_rows, a_cols, side='right')
+    counts = ends - starts
+    if counts.sum() == 0:
+        empty = np.array([], dtype=np.int64)
+        return empty, empty, np.array([], dtype=float)
+
+    a_index = np.repeat(np.arange(len(a_rows)), counts)
+    offsets = np.arange(counts.sum()) - np.repeat(np.cumsum(counts) - counts, counts)
+    b_index = np.repeat(starts, counts) + offsets
+
+    return _coo_sum(a_rows[a_index], b_cols[b_index], a_values[a_index] * b_values[b_index], n_cols)
+
+
+@dataclass
+class LookThroughExposure:
+    """Look-through ownership for every entity of a tenant as of a date"""
+    tenant_id: int
+    as_of_date: date
+    entity_ids: List[int]
+    entity_names: Dict[int, str]
+    investment_ids: List[int]
+    investment_names: Dict[int, str]
+    # Direct and look-through ownership fractions as COO triplets (entity index, investment index, fraction)
+    direct: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    lookthrough: Tuple[np.ndarray, np.ndarray, np.ndarray]
+    # Per-investment metric vectors aligned with investment_ids
+    metrics: Dict[str, np.ndarray]
+    max_depth: int
+
+    def _rollup(self, matrix: Tuple[np.ndarray, np.ndarray, np.ndarray]) -> Dict[str, np.ndarray]:
+        rows, cols, values = matrix
+        n = len(self.entity_ids)
+        return {
+            name: np.bincount(rows, weights=values * vector[cols], minlength=n)
+            for name, vector in self.metrics.items()
+        }
+
+    def entity_totals(self) -> List[dict]:
+        """Direct and look-through totals for every entity"""
+        direct = self._rollup(self.direct)
+        total = self._rollup(self.lookthrough)
+        counts = np.bincount(self.lookthrough[0], minlength=len(self.entity_ids))
+        return [
+            {
+                'entity_id': entity_id,
+                'entity_name': self.entity_names.get(entity_id),
+                'investment_count': int(counts[i]),
+                'direct': {name: float(direct[name][i]) for name in METRICS},
+                'look_through': {name: float(total[name][i]) for name in METRICS},
+            }
+            for i, entity_id in enumerate(self.entity_ids)
+        ]
+
+    def entity_holdings(self, entity_id: int) -> Optional[dict]:
+        """Per-investment look-through holdings for one entity (None if not in the tenant)"""
+        try:
+            index = self.entity_ids.index(entity_id)
+        except ValueError:
+            return None
+
+        def row(matrix):
+            rows, cols, values = matrix
+            mask = rows == index
+            return dict(zip(cols[mask].tolist(), values[mask].tolist()))
+
+        direct = row(self.direct)
+        holdings = []
+        for col, fraction in sorted(row(self.lookthrough).items()):
+            holding = {
+                'investment_id': self.investment_ids[col],
+                'investment_name': self.investment_names.get(self.investment_ids[col]),
+                'direct_percentage': direct.get(col, 0.0) * 100,
+                'look_through_percentage': fraction * 100,
+            }
+            holding.update({name: float(self.metrics[name][col] * fraction) for name in METRICS})
+            holdings.append(holding)
+
+        totals = next(t for t in self.entity_totals() if t['entity_id'] == entity_id)
+        totals['holdings'] = sorted(holdings, key=lambda h: h['nav'], reverse=True)
+        return totals
+
+
+class LookThroughService:
+    """Builds and caches look-through exposure per tenant"""
+
+    _cache: "OrderedDict[Tuple, LookThroughExposure]" = OrderedDict()
+    _lock = threading.Lock()
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_exposure(self, tenant_id: int, as_of_date: Optional[date] = None) -> LookThroughExposure:
+        """Cached look-through exposure for (tenant, as_of_date, data version)"""
+        as_of_date = as_of_date or date.today()
+        key = (tenant_id, as_of_date, self._data_version(tenant_id))
+
+        with self._lock:
+            exposure = self._cache.get(key)
+            if exposure is not None:
+                self._cache.move_to_end(key)
+                return exposure
+
+        exposure = self.build_exposure(tenant_id, as_of_date)
+
+        with self._lock:
+            for stale in [k for k in self._cache if k[:2] == key[:2]]:
+                del self._cache[stale]
+            self._cache[key] = exposure
+            while len(self._cache) > MAX_CACHED_EXPOSURES:
+                self._cache.popitem(last=False)
+        return exposure
+
+    @classmethod
+    def invalidate(cls, tenant_id: Optional[int] = None):
+        """Drop cached exposures (all, or one tenant's)"""
+        with cls._lock:
+            for key in [k for k in cls._cache if tenant_id is None or k[0] == tenant_id]:
+                del cls._cache[key]
+
+    def _data_version(self, tenant_id: int) -> Tuple:
+        """Report inputs plus ownership and hierarchy fingerprints"""
+        ownership = self.db.query(
+            func.count(models.InvestmentOwnership.id), func.max(models.InvestmentOwnership.updated_date)
+        ).join(models.Entity, models.InvestmentOwnership.entity_id == models.Entity.id).filter(
+            models.Entity.tenant_id == tenant_id
+        ).one()
+        hierarchy = self.db.query(
+            func.count(models.EntityHierarchy.id),
+            func.sum(func.coalesce(models.EntityHierarchy.parent_entity_id, 0)),
+            func.max(models.EntityHierarchy.created_date)
+        ).join(models.Entity, models.EntityHierarchy.entity_id == models.Entity.id).filter(
+            models.Entity.tenant_id == tenant_id
+        ).one()
+        return get_data_version(self.db, tenant_id) + (tuple(ownership), tuple(hierarchy))
+
+    def build_exposure(self, tenant_id: int, as_of_date: date) -> LookThroughExposure:
+        """Build the ownership matrices and propagate them through the hierarchy"""
+        dataset = get_report_dataset(self.db, tenant_id, as_of_date)
+
+        entity_ids = sorted(dataset.entities)
+        entity_index = {entity_id: i for i, entity_id in enumerate(entity_ids)}
+        investment_ids = sorted(dataset.positions)
+        investment_index = {investment_id: j for j, investment_id in enumerate(investment_ids)}
+        n_investments = max(len(investment_ids), 1)
+
+        # Direct stakes active on the as-of date
+        stakes = self.db.query(
+            models.InvestmentOwnership.entity_id,
+            models.InvestmentOwnership.investment_id,
+            models.InvestmentOwnership.ownership_percentage
+        ).join(models.Entity, models.InvestmentOwnership.entity_id == models.Entity.id).filter(
+            models.Entity.tenant_id == tenant_id,
+            models.InvestmentOwnership.effective_date <= as_of_date,
+            or_(models.InvestmentOwnership.end_date.is_(None), models.InvestmentOwnership.end_date > as_of_date)
+        ).all()
+
+        rows, cols, values = [], [], []
+        recorded = set()
+        for entity_id, investment_id, percentage in stakes:
+            if entity_id in entity_index and investment_id in investment_index:
+                rows.append(entity_index[entity_id])
+                cols.append(investment_index[investment_id])
+                values.append((percentage or 0.0) / 100.0)
+                recorded.add(investment_id)
+
+        # Investments without ownership records belong entirely to their owning entity
+        for investment_id, position in dataset.positions.items():
+            if investment_id not in recorded and position.entity_id in entity_index:
+                rows.append(entity_index[position.entity_id])
+                cols.append(investment_index[investment_id])
+                values.append(1.0)
+
+        direct = _coo_sum(np.array(rows, dtype=np.int64), np.array(cols, dtype=np.int64),
+                          np.array(values, dtype=float), n_investments)
+
+        # Parent -> child links
+        links = self.db.query(
+            models.EntityHierarchy.parent_entity_id, models.EntityHierarchy.entity_id
+        ).join(models.Entity, models.EntityHierarchy.entity_id == models.Entity.id).filter(
+            models.Entity.tenant_id == tenant_id,
+            models.EntityHierarchy.parent_entity_id.isnot(None)
+        ).all()
+        links = [(entity_index[p], entity_index[c]) for p, c in links
+                 if p in entity_index and c in entity_index and p != c]
+        adjacency = (
+            np.array([p for p, _ in links], dtype=np.int64),
+            np.array([c for _, c in links], dtype=np.int64),
+            np.ones(len(links))
+        )
+
+        # L = D + A.D + A^2.D + ... ; a hierarchy cannot be deeper than the number of entities
+        total_rows, total_cols, total_values = [direct[0]], [direct[1]], [direct[2]]
+        level = direct
+        depth = 0
+        while len(level[0]) and depth < len(entity_ids):
+            level = _coo_matmul(adjacency, level, n_investments)
+            if not len(level[0]):
+                break
+            depth += 1
+            total_rows.append(level[0])
+            total_cols.append(level[1])
+            total_values.append(level[2])
+        lookthrough = _coo_sum(np.concatenate(total_rows), np.concatenate(total_cols),
+                               np.concatenate(total_values), n_investments)
+
+        positions = [dataset.positions[i] for i in investment_ids]
+        metrics = {
+            'commitment': np.array([p.commitment_amount for p in positions], dtype=float),
+            'called': np.array([p.called for p in positions], dtype=float),
+            'distributions': np.array([p.distributions for p in positions], dtype=float),
+            'nav': np.array([p.current_nav for p in positions], dtype=float),
+        }
+
+        return LookThroughExposure(
+            tenant_id=tenant_id,
+            as_of_date=as_of_date,
+            entity_ids=entity_ids,
+            entity_names={entity_id: name for entity_id, (name, _) in dataset.entities.items()},
+            investment_ids=investment_ids,
+            investment_names={i: p.name for i, p in dataset.positions.items()},
+            direct=direct,
+            lookthrough=lookthrough,
+            metrics=metrics,
+            max_depth=depth
+        )
+
+
+def create_lookthrough_service(db: Session) -> LookThroughService:
+    """Factory function to create look-through service"""
+    return LookThroughService(db)
@@ -1,18 +1,24 @@
-from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query, Form, Header
-from fastapi.responses import StreamingResponse, FileResponse
+from fastapi import FastAPI, Depends, HTTPException, UploadFile, File, Query, Form, Header, Request, Response
+from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List, Optional
 from datetime import date
 from app import crud, models, schemas
-from app.database import get_db, create_database
+from app.database import get_db, get_read_db, create_database, DB_INIT_ON_STARTUP, ReadAfterWriteMiddleware, READ_AFTER_WRITE_HEADER
 from app import dashboard
-from app.import_export import import_investments_from_file, export_investments_to_excel, ImportResult
-from app.excel_template_service import excel_template_service, BulkUploadProcessor
+from app.import_export import import_investments_from_file, ImportResult
+from app.streaming_export import export_response
+from app.excel_template_service import excel_template_service, template_response, BulkUploadProcessor
+from app.json_responses import FastJSONResponse, add_compression, chart_payload, LAYOUT_PATTERN
+from app.upload_streaming import spooled_upload
+from app.executors import run_blocking, shutdown_pools
+from app.entity_listing import get_entities_with_stats, get_entity_stats
 from app.benchmark_service import get_benchmark_comparison
 from app.relative_performance_service import get_relative_performance_service
 from app.pacing_model import create_pacing_model_engine, PacingModelEngine
+from app.forecast_backtest import create_forecast_backtest_engine
 from app.calendar_service import create_calendar_service, CashFlowCalendarService
 from app.document_service import get_document_service
 from app.models import ForecastScenario, DocumentCategory, DocumentStatus, AdvancedRelationshipType, OwnershipType
@@ -20,7 +26,6 @@ from app.entity_relationships import EntityRelationshipService, InvestmentOwners
 from app.routers.pitchbook_benchmarks import router as pitchbook_router
 from app.routers.relative_performance import router as relative_performance_router
 from datetime import date, datetime
-import io
 import os
 
 app = FastAPI(title="Private Markets Portfolio Tracker", version="1.0.0")
@@ -32,11 +37,24 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],  # Allow all methods
     allow_headers=["*"],  # Allow all headers
+    expose_headers=["X-Next-Cursor", READ_AFTER_WRITE_HEADER],
 )
 
+# Keep a client's reads on the primary just after its own writes
+app.add_middleware(ReadAfterWriteMiddleware)
+
+# Compress large responses (gzip, or Brotli when brotli-asgi is installed)
+add_compression(app)
+
 @app.on_event("startup")
 def startup_event():
-    create_database()
+    # Schema and seed data normally come from python -m app.db_init
+    if DB_INIT_ON_STARTUP:
+        create_database()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    shutdown_pools()
 
 # Include PitchBook benchmarks router
 app.include_router(pitchbook_router)
@@ -66,36 +84,37 @@ def create_entity(entity: schemas.EntityCreate, db: Session = Depends(get_db), c
 
 @app.get("/api/entities", response_model=List[schemas.EntityWithMembers])
 def read_entities(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     entity_type: Optional[str] = Query(None, description="Filter by entity type"),
     search: Optional[str] = Query(None, description="Search entities by name"),
     include_inactive: bool = Query(False, description="Include inactive entities"),
+    sort_by: str = Query("name", description="name, entity_type, created_date, investment_count, total_commitment, total_called or current_nav"),
+    sort_order: str = Query("asc", pattern="^(asc|desc)$", description="asc or desc"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
     db: Session = Depends(get_db)
 ):
-    """Get entities with optional filtering"""
-    if search:
-        entities = crud.search_entities(db=db, search_term=search, skip=skip, limit=limit)
-    elif entity_type:
-        entities = crud.get_entities_by_type(db=db, entity_type=entity_type, skip=skip, limit=limit)
-    else:
-        entities = crud.get_entities(db=db, skip=skip, limit=limit, include_inactive=include_inactive)
-    
-    # Convert to EntityWithMembers schema with investment stats
-    result = []
-    for entity in entities:
-        investments = crud.get_investments_by_entity(db=db, entity_id=entity.id)
-        investment_count = len(investments)
-        total_commitment = sum(inv.commitment_amount for inv in investments)
-        
-        entity_dict = {
-            **entity.__dict__,
-            "investment_count": investment_count,
-            "total_commitment": total_commitment
-        }
-        result.append(schemas.EntityWithMembers.model_validate(entity_dict))
+    """Get entities with optional filtering, with investment stats from one grouped query"""
+    try:
+        entities, next_cursor = get_entities_with_stats(
+            db,
+            skip=skip,
+            limit=limit,
+            entity_type=entity_type,
+            search=search,
+            include_inactive=include_inactive,
+            include_archived=True,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     
-    return result
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [schemas.EntityWithMembers.model_validate(entity) for entity in entities]
 
 @app.get("/api/entities/{entity_id}", response_model=schemas.EntityWithMembers)
 def read_entity(entity_id: int, db: Session = Depends(get_db)):
@@ -105,14 +124,9 @@ def read_entity(entity_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Entity not found")
     
     # Add investment statistics
-    investments = crud.get_investments_by_entity(db=db, entity_id=entity_id)
-    investment_count = len(investments)
-    total_commitment = sum(inv.commitment_amount for inv in investments)
-    
     entity_dict = {
         **db_entity.__dict__,
-        "investment_count": investment_count,
-        "total_commitment": total_commitment
+        **get_entity_stats(db, entity_id, include_archived=True)
     }
     return schemas.EntityWithMembers.model_validate(entity_dict)
 
@@ -515,11 +529,9 @@ async def import_investments(
     if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
         raise HTTPException(400, "Only CSV and Excel files are supported")
     
-    # Read file content
-    content = await file.read()
-    
-    # Process import
-    result = import_investments_from_file(content, file.filename, db, force_upload)
+    # Spool the upload to disk and import it in row chunks
+    async with spooled_upload(file) as upload_path:
+        result = await run_blocking(import_investments_from_file, upload_path, file.filename, db, force_upload)
     
     return {
         "filename": file.filename,
@@ -532,156 +544,115 @@ async def import_investments(
     }
 
 @app.get("/api/investments/export")
-def export_investments(db: Session = Depends(get_db)):
-    """Export all investments to Excel format"""
-    investments = crud.get_investments(db, skip=0, limit=10000)  # Get all investments
-    
-    excel_buffer = export_investments_to_excel(investments)
-    
-    return StreamingResponse(
-        io.BytesIO(excel_buffer.read()),
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-        headers={"Content-Disposition": "attachment; filename=portfolio_investments.xlsx"}
-    )
+def export_investments(
+    export_format: str = Query("xlsx", alias="format", pattern="^(csv|ndjson|xlsx)$"),
+    db: Session = Depends(get_read_db)
+):
+    """Export all investments as Excel (default), CSV or NDJSON"""
+    return export_response(db, "investments", export_format,
+                           filename=f"portfolio_investments.{export_format}")
 
 # Excel Template Generation Endpoints
-@app.get("/api/templates/nav-template")
-def download_nav_template(db: Session = Depends(get_db)):
-    """Download NAV upload template"""
+def _template_download(request: Request, db: Session, kind: str, label: str) -> Response:
+    """Cached template download; a matching If-None-Match gets 304 Not Modified"""
     try:
-        excel_buffer = excel_template_service.generate_nav_template(db)
-        
-        return StreamingResponse(
-            excel_buffer,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": "attachment; filename=NAV_Upload_Template.xlsx"}
-        )
+        return template_response(request, excel_template_service.get_template(db, kind))
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating NAV template: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Error generating {label} template: {str(e)}")
+
+@app.get("/api/templates/nav-template")
+def download_nav_template(request: Request, db: Session = Depends(get_db)):
+    """Download NAV upload template"""
+    return _template_download(request, db, "nav", "NAV")
 
 @app.get("/api/templates/cashflow-template")
-def download_cashflow_template(db: Session = Depends(get_db)):
+def download_cashflow_template(request: Request, db: Session = Depends(get_db)):
     """Download Cash Flow upload template"""
-    try:
-        excel_buffer = excel_template_service.generate_cashflow_template(db)
-        
-        return StreamingResponse(
-            excel_buffer,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": "attachment; filename=CashFlow_Upload_Template.xlsx"}
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating Cash Flow template: {str(e)}")
+    return _template_download(request, db, "cashflow", "Cash Flow")
 
 @app.get("/api/templates/investment-template")
-def download_investment_template(db: Session = Depends(get_db)):
+def download_investment_template(request: Request, db: Session = Depends(get_db)):
     """Download Investment bulk upload template"""
-    try:
-        excel_buffer = excel_template_service.generate_investment_template(db)
-        
-        return StreamingResponse(
-            excel_buffer,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": "attachment; filename=Investment_Upload_Template.xlsx"}
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating Investment template: {str(e)}")
+    return _template_download(request, db, "investment", "Investment")
 
 @app.get("/api/templates/entity-template")
-def download_entity_template(db: Session = Depends(get_db)):
+def download_entity_template(request: Request, db: Session = Depends(get_db)):
     """Download Entity bulk upload template"""
-    try:
-        excel_buffer = excel_template_service.generate_entity_template(db)
-        
-        return StreamingResponse(
-            excel_buffer,
-            media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            headers={"Content-Disposition": "attachment; filename=Entity_Upload_Template.xlsx"}
-        )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating Entity template: {str(e)}")
+    return _template_download(request, db, "entity", "Entity")
 
 # Bulk Upload Endpoints
+def _bulk_upload_response(filename: str, result, full_report: bool = False) -> dict:
+    """Shared bulk upload response; errors/warnings are truncated unless full_report is set"""
+    errors = result.errors if full_report else result.errors[:20]  # Limit errors in response
+    warnings = result.warnings if full_report else result.warnings[:10]  # Limit warnings in response
+    return {
+        "filename": filename,
+        "success_count": result.success_count,
+        "error_count": result.error_count,
+        "warning_count": result.warning_count,
+        "errors": errors,
+        "warnings": warnings,
+        "message": result.message,
+        "has_more_errors": len(result.errors) > len(errors),
+        "has_more_warnings": len(result.warnings) > len(warnings)
+    }
+
 @app.post("/api/bulk-upload/navs")
-async def bulk_upload_navs(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def bulk_upload_navs(
+    file: UploadFile = File(...),
+    full_report: bool = Query(False, description="Return every error and warning instead of the first 20/10"),
+    db: Session = Depends(get_db)
+):
     """Bulk upload NAV data from Excel template"""
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(400, "Only Excel files are supported for bulk NAV upload")
     
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Process upload
-        result = BulkUploadProcessor.process_nav_upload(content, file.filename, db)
+        # Spool the upload to disk and process it in row chunks
+        async with spooled_upload(file) as upload_path:
+            result = await run_blocking(BulkUploadProcessor.process_nav_upload, upload_path, file.filename, db)
         
-        return {
-            "filename": file.filename,
-            "success_count": result.success_count,
-            "error_count": result.error_count,
-            "warning_count": result.warning_count,
-            "errors": result.errors[:20],  # Limit errors in response
-            "warnings": result.warnings[:10],  # Limit warnings in response
-            "message": result.message,
-            "has_more_errors": len(result.errors) > 20,
-            "has_more_warnings": len(result.warnings) > 10
-        }
+        return _bulk_upload_response(file.filename, result, full_report)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"NAV upload failed: {str(e)}")
 
 @app.post("/api/bulk-upload/cashflows")
-async def bulk_upload_cashflows(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def bulk_upload_cashflows(
+    file: UploadFile = File(...),
+    full_report: bool = Query(False, description="Return every error and warning instead of the first 20/10"),
+    db: Session = Depends(get_db)
+):
     """Bulk upload Cash Flow data from Excel template"""
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(400, "Only Excel files are supported for bulk Cash Flow upload")
     
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Process upload
-        result = BulkUploadProcessor.process_cashflow_upload(content, file.filename, db)
+        # Spool the upload to disk and process it in row chunks
+        async with spooled_upload(file) as upload_path:
+            result = await run_blocking(BulkUploadProcessor.process_cashflow_upload, upload_path, file.filename, db)
         
-        return {
-            "filename": file.filename,
-            "success_count": result.success_count,
-            "error_count": result.error_count,
-            "warning_count": result.warning_count,
-            "errors": result.errors[:20],  # Limit errors in response
-            "warnings": result.warnings[:10],  # Limit warnings in response
-            "message": result.message,
-            "has_more_errors": len(result.errors) > 20,
-            "has_more_warnings": len(result.warnings) > 10
-        }
+        return _bulk_upload_response(file.filename, result, full_report)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Cash Flow upload failed: {str(e)}")
 
 @app.post("/api/bulk-upload/entities")
-async def bulk_upload_entities(file: UploadFile = File(...), db: Session = Depends(get_db)):
+async def bulk_upload_entities(
+    file: UploadFile = File(...),
+    full_report: bool = Query(False, description="Return every error and warning instead of the first 20/10"),
+    db: Session = Depends(get_db)
+):
     """Bulk upload Entity data from Excel template"""
     if not file.filename.endswith(('.xlsx', '.xls')):
         raise HTTPException(400, "Only Excel files are supported for bulk Entity upload")
     
     try:
-        # Read file content
-        content = await file.read()
-        
-        # Process upload
-        result = BulkUploadProcessor.process_entity_upload(content, file.filename, db)
+        # Spool the upload to disk and process it in row chunks
+        async with spooled_upload(file) as upload_path:
+            result = await run_blocking(BulkUploadProcessor.process_entity_upload, upload_path, file.filename, db)
         
-        return {
-            "filename": file.filename,
-            "success_count": result.success_count,
-            "error_count": result.error_count,
-            "warning_count": result.warning_count,
-            "errors": result.errors[:20],  # Limit errors in response
-            "warnings": result.warnings[:10],  # Limit warnings in response
-            "message": result.message,
-            "has_more_errors": len(result.errors) > 20,
-            "has_more_warnings": len(result.warnings) > 10
-        }
+        return _bulk_upload_response(file.filename, result, full_report)
         
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Entity upload failed: {str(e)}")
@@ -880,6 +851,27 @@ def get_portfolio_cash_flow_forecast(
         distribution_peak_periods=distribution_peaks
     )
 
+@app.post("/api/forecast-accuracy/backtest")
+def run_forecast_backtest(
+    as_of_date: Optional[date] = Query(None, description="Backtest periods ending on or before this date (default today)"),
+    scenario: ForecastScenario = ForecastScenario.BASE,
+    db: Session = Depends(get_db)
+):
+    """Compare completed forecast periods with actual cash flows and NAVs and record the accuracy"""
+    result = create_forecast_backtest_engine(db).run_backtest(as_of_date, scenario)
+    return {
+        "as_of_date": result.as_of_date,
+        "scenario": result.scenario,
+        "investments": result.investments,
+        "periods": result.periods,
+        "calibration": result.calibration
+    }
+
+@app.get("/api/forecast-accuracy/calibration")
+def get_forecast_calibration(db: Session = Depends(get_db)):
+    """Forecast accuracy by call schedule and distribution timing from the last backtest"""
+    return create_forecast_backtest_engine(db).get_calibration()
+
 @app.put("/api/investments/{investment_id}/pacing-inputs")
 def update_pacing_inputs(
     investment_id: int,
@@ -1332,6 +1324,19 @@ async def upload_document(
     db: Session = Depends(get_db)
 ):
     """Upload a new document with metadata"""
+    # Only reading the upload awaits; checks, storage and inserts run in the blocking pool
+    content = await file.read()
+    return await run_blocking(
+        _store_uploaded_document, db, file.filename, content,
+        title=title, description=description, category=category, status=status,
+        document_date=document_date, due_date=due_date, investment_id=investment_id,
+        entity_id=entity_id, is_confidential=is_confidential, uploaded_by=uploaded_by, tags=tags
+    )
+
+def _store_uploaded_document(db: Session, filename: str, content: bytes, *, title, description, category,
+                             status, document_date, due_date, investment_id, entity_id, is_confidential,
+                             uploaded_by, tags):
+    """Check relationships, store the file and create the document record"""
     try:
         # Validate that at least one relationship is specified
         if not investment_id and not entity_id:
@@ -1351,13 +1356,10 @@ async def upload_document(
             if not entity:
                 raise HTTPException(status_code=404, detail="Entity not found")
         
-        # Read file content
-        content = await file.read()
-        
         # Process file upload using document service
         doc_service = get_document_service()
         file_info = doc_service.process_upload(
-            filename=file.filename,
+            filename=filename,
             content=content,
             uploaded_by=uploaded_by
         )
@@ -1508,7 +1510,7 @@ def delete_document(
     return {"message": f"Document {action} successfully"}
 
 @app.get("/api/documents/{document_id}/download")
-async def download_document(document_id: int, db: Session = Depends(get_db)):
+def download_document(document_id: int, db: Session = Depends(get_db)):
     """Download a document file"""
     document = crud.get_document(db, document_id)
     if not document:
@@ -1744,6 +1746,15 @@ def get_family_tree(db: Session = Depends(get_db)):
     """Get complete family tree structure"""
     return EntityHierarchyService.get_family_tree(db)
 
+@app.get("/api/entity-hierarchy/{entity_id}/subtree", response_model=schemas.EntitySubtreeResponse)
+def get_entity_subtree(
+    entity_id: int,
+    as_of_date: Optional[date] = Query(None, description="NAV date (default today)"),
+    db: Session = Depends(get_db)
+):
+    """Get an entity's descendants with commitment, called and NAV rolled up per node"""
+    return EntityHierarchyService.get_subtree(db, entity_id, as_of_date)
+
 @app.get("/api/entity-hierarchy/{entity_id}", response_model=schemas.EntityHierarchy)
 def get_entity_hierarchy(entity_id: int, db: Session = Depends(get_db)):
     """Get hierarchy entry for a specific entity"""
@@ -1767,19 +1778,14 @@ def update_entity_hierarchy(
         raise HTTPException(status_code=404, detail="Hierarchy entry not found")
     
     # Update fields
-    for field, value in hierarchy_update.dict(exclude_unset=True).items():
+    updates = hierarchy_update.dict(exclude_unset=True)
+    new_parent_entity_id = updates.pop('parent_entity_id', hierarchy.parent_entity_id)
+    for field, value in updates.items():
         setattr(hierarchy, field, value)
     
-    # Recalculate hierarchy level if parent changed
-    if hierarchy_update.parent_entity_id is not None:
-        if hierarchy.parent_entity_id:
-            parent_entry = db.query(models.EntityHierarchy).filter(
-                models.EntityHierarchy.entity_id == hierarchy.parent_entity_id
-            ).first()
-            if parent_entry:
-                hierarchy.hierarchy_level = parent_entry.hierarchy_level + 1
-        else:
-            hierarchy.hierarchy_level = 1
+    # Re-parenting rewrites the path and level of the entry and all its descendants
+    if new_parent_entity_id != hierarchy.parent_entity_id:
+        EntityHierarchyService.move_subtree(db, hierarchy, new_parent_entity_id)
     
     db.commit()
     db.refresh(hierarchy)
@@ -1793,24 +1799,35 @@ def update_entity_hierarchy(
 def get_user_activity(
     username: str, 
     days: int = Query(30, ge=1, le=365, description="Number of days to look back"),
-    limit: int = Query(50, ge=1, le=200, description="Limit results per category"),
+    limit: int = Query(50, ge=1, le=1000, description="Activity page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Get recent activity for a specific user"""
-    return crud.get_recent_changes_by_user(db=db, user=username, days=days, limit=limit)
+    try:
+        return crud.get_recent_changes_by_user(db=db, user=username, days=days, limit=limit, cursor=cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/api/audit/investment/{investment_id}")
 def get_investment_audit_trail(
     investment_id: int,
     days: int = Query(90, ge=1, le=365, description="Number of days to look back"),
+    limit: int = Query(200, ge=1, le=1000, description="Activity page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     db: Session = Depends(get_db)
 ):
     """Get change history for a specific investment"""
-    return crud.get_investment_change_history(db=db, investment_id=investment_id, days=days)
+    try:
+        return crud.get_investment_change_history(
+            db=db, investment_id=investment_id, days=days, limit=limit, cursor=cursor
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
 @app.get("/api/audit/system")
 def get_system_activity(
-    days: int = Query(7, ge=1, le=30, description="Number of days to look back"),
+    days: int = Query(7, ge=1, le=365, description="Number of days to look back"),
     db: Session = Depends(get_db)
 ):
     """Get system-wide activity summary"""
@@ -1839,6 +1856,7 @@ def get_audit_system_status():
             "InvestmentOwnership"
         ],
         "audit_fields": ["created_by", "updated_by", "created_date", "updated_date"],
+        "activity_log": "Append-only activity_log table with keyset pagination (cursor parameter)",
         "endpoints": {
             "/api/audit/user/{username}": "User activity tracking",
             "/api/audit/investment/{investment_id}": "Investment change history",
@@ -1853,6 +1871,9 @@ def get_audit_system_status():
 def get_12_month_liquidity_forecast(
     entity_id: Optional[int] = None,
     include_stress_tests: bool = False,
+    n_simulations: int = Query(10000, ge=100, le=100000, description="Monte Carlo paths for stress tests"),
+    cash_buffer: float = 500000.0,
+    seed: Optional[int] = Query(None, description="Random seed for reproducible stress tests"),
     current_user: str = Depends(get_current_user),
     db: Session = Depends(get_db)
 ):
@@ -1891,16 +1912,21 @@ def get_12_month_liquidity_forecast(
     }
     
     if include_stress_tests:
-        stress_scenarios = service.generate_stress_scenarios(forecast)
-        response["stress_scenarios"] = {
-            name: {
-                "summary": {
-                    "total_projected_calls": scenario.total_projected_calls,
-                    "total_projected_distributions": scenario.total_projected_distributions,
-                    "max_liquidity_gap": scenario.max_liquidity_gap,
-                    "months_with_gaps": scenario.months_with_gaps
-                }
-            } for name, scenario in stress_scenarios.items()
+        stress = service.generate_stress_scenarios(
+            forecast, entity_id=entity_id, n_simulations=n_simulations,
+            cash_buffer=cash_buffer, seed=seed
+        )
+        response["stress_test"] = {
+            "method": "monte_carlo",
+            "n_simulations": stress.n_simulations,
+            "n_investments": stress.n_investments,
+            "months": stress.month_labels,
+            "net_flow_bands": stress.net_flow_bands,
+            "cumulative_net_flow_bands": stress.cumulative_net_flow_bands,
+            "gap_probability": stress.gap_probability,
+            "buffer_breach_probability": stress.buffer_breach_probability,
+            "summary": forecast.stress_test_results,
+            "elapsed_seconds": stress.elapsed_seconds
         }
     
     return response
@@ -2022,7 +2048,8 @@ def get_investment_pme_analysis(
     investment_id: int,
     benchmark_id: int = Query(..., description="Market benchmark ID for comparison"),
     end_date: Optional[date] = Query(None, description="End date for analysis (defaults to today)"),
-    db: Session = Depends(get_db),
+    layout: str = Query("rows", pattern=LAYOUT_PATTERN, description="rows (list of points) or columns (one array per field)"),
+    db: Session = Depends(get_read_db),
     current_user: str = Depends(get_current_user)
 ):
     """Get PME analysis for a specific investment vs benchmark"""
@@ -2036,7 +2063,7 @@ def get_investment_pme_analysis(
     try:
         calculator = PMECalculator(db)
         result = calculator.calculate_investment_pme(investment_id, benchmark_id, end_date)
-        return result
+        return FastJSONResponse(chart_payload(result, {'pme_series': None}, layout))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
@@ -2049,7 +2076,8 @@ def get_portfolio_pme_analysis(
     vintage_years: Optional[str] = Query(None, description="Comma-separated vintage years"),
     investment_ids: Optional[str] = Query(None, description="Comma-separated investment IDs"),
     end_date: Optional[date] = Query(None, description="End date for analysis (defaults to today)"),
-    db: Session = Depends(get_db),
+    layout: str = Query("rows", pattern=LAYOUT_PATTERN, description="rows (list of points) or columns (one array per field)"),
+    db: Session = Depends(get_read_db),
     current_user: str = Depends(get_current_user)
 ):
     """Get PME analysis for portfolio or subset vs benchmark"""
@@ -2079,7 +2107,7 @@ def get_portfolio_pme_analysis(
             investment_ids=investment_ids_list,
             end_date=end_date
         )
-        return result
+        return FastJSONResponse(chart_payload(result, {'pme_series': None}, layout))
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
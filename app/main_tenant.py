@@ -11,7 +11,12 @@ from fastapi.responses import JSONResponse, StreamingResponse, FileResponse
 from sqlalchemy.orm import Session
 from typing import Optional, List
 
-from .database import get_db, create_database
+from .database import (
+    get_db, create_database, get_pool_metrics, read_engine, DB_INIT_ON_STARTUP,
+    ReadAfterWriteMiddleware, READ_AFTER_WRITE_HEADER
+)
+from .executors import run_blocking, shutdown_pools
+from .json_responses import add_compression
 from .auth import get_current_active_user, require_contributor
 from .models import User, Tenant, DocumentCategory, DocumentStatus
 from .routers.auth import router as auth_router
@@ -19,6 +24,7 @@ from .routers.tenant_api import router as tenant_api_router
 from .routers.pitchbook_benchmarks import router as pitchbook_router
 from .routers.relative_performance import router as relative_performance_router
 from .routers.reports import router as reports_router
+from .routers.audit import router as audit_router
 
 # Create FastAPI app
 app = FastAPI(
@@ -34,17 +40,31 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["GET", "POST", "PUT", "DELETE", "OPTIONS"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", READ_AFTER_WRITE_HEADER],
 )
 
+# Keep a client's reads on the primary just after its own writes
+app.add_middleware(ReadAfterWriteMiddleware)
+
+# Compress responses above RESPONSE_COMPRESSION_MIN_BYTES (Brotli when brotli-asgi is installed, else gzip)
+add_compression(app)
+
 @app.on_event("startup")
 def startup_event():
-    """Create database tables on startup"""
-    create_database()
+    """Create database tables on startup when DB_INIT_ON_STARTUP is set (otherwise run python -m app.db_init)"""
+    if DB_INIT_ON_STARTUP:
+        create_database()
+
+@app.on_event("shutdown")
+def shutdown_event():
+    """Stop the blocking and CPU worker pools"""
+    shutdown_pools()
 
 # Include routers
 app.include_router(auth_router)  # Authentication routes
 app.include_router(tenant_api_router)  # Tenant-aware API routes
 app.include_router(reports_router)  # Report generation routes
+app.include_router(audit_router)  # Activity log / audit routes
 
 # Include existing benchmark routers (these may need tenant filtering too)
 app.include_router(pitchbook_router)
@@ -99,7 +119,9 @@ def health_check():
     return {
         "status": "healthy",
         "version": "2.0.0",
-        "multi_tenant": True
+        "multi_tenant": True,
+        "database_pool": get_pool_metrics(),
+        "read_replica_pool": get_pool_metrics(read_engine) if read_engine else None
     }
 
 # Legacy compatibility endpoint (for testing)
@@ -231,11 +253,10 @@ async def upload_document(
 ):
     """Upload a document with tenant isolation"""
     try:
-        # Initialize document service
+        # Only reading the upload awaits; validation, storage and text extraction run in the blocking pool
+        content = await file.read()
         doc_service = get_document_service()
-
-        # Validate file
-        file_info = await doc_service.validate_and_store_file(file)
+        file_info = await run_blocking(doc_service.process_upload, file.filename, content)
 
         # Parse tags if provided
         tag_list = []
@@ -256,7 +277,8 @@ async def upload_document(
         )
 
         # Create document with tenant isolation
-        document = crud_tenant.create_document(
+        document = await run_blocking(
+            crud_tenant.create_document,
             db=db,
             tenant_id=current_user.tenant_id,
             document=document_data,
@@ -374,7 +396,7 @@ def delete_document(
     return {"message": f"Document {action} successfully"}
 
 @app.get("/api/documents/{document_id}/download")
-async def download_document(
+def download_document(
     document_id: int,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
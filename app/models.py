@@ -1112,6 +1112,34 @@ class EntityHierarchy(Base):
         Index('ix_entity_hierarchy_entity', 'entity_id'),
         Index('ix_entity_hierarchy_parent', 'parent_entity_id'),
         Index('ix_entity_hierarchy_level', 'hierarchy_level'),
+        Index('ix_entity_hierarchy_path', 'hierarchy_path',
+              postgresql_ops={'hierarchy_path': 'varchar_pattern_ops'}),
+    )
+
+class ActivityLog(Base):
+    """Append-only audit trail of create/update activity on core records"""
+    __tablename__ = "activity_log"
+    
+    id = Column(Integer, primary_key=True, index=True)
+    occurred_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    
+    # Who and where
+    tenant_id = Column(Integer, ForeignKey("tenants.id"), nullable=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=True)
+    username = Column(String, nullable=True)  # Legacy string audit user (created_by/updated_by)
+    
+    # What
+    action = Column(String, nullable=False)  # "create", "update"
+    record_type = Column(String, nullable=False)  # "Entity", "Investment", "CashFlow", "Valuation"
+    record_id = Column(Integer, nullable=False)
+    investment_id = Column(Integer, nullable=True)  # Set for investments and their cash flows/valuations
+    details = Column(Text, nullable=True)  # JSON snapshot (name, amount, changed fields, ...)
+    
+    __table_args__ = (
+        Index('ix_activity_username_time', 'username', 'occurred_at'),
+        Index('ix_activity_user_time', 'user_id', 'occurred_at'),
+        Index('ix_activity_tenant_time', 'tenant_id', 'occurred_at'),
+        Index('ix_activity_investment_time', 'investment_id', 'occurred_at'),
     )
 
 # =====================================================
@@ -1244,4 +1272,21 @@ class PitchBookQuarterlyReturns(Base):
         Index('ix_qtrly_returns_asset_period', 'asset_class', 'time_period'),
         Index('ix_qtrly_returns_quarter', 'quarter_end_date'),
         UniqueConstraint('asset_class', 'time_period', 'quarter_end_date', name='uq_qtrly_returns'),
-    )
\ No newline at end of file
+    )
+class FxRate(Base):
+    """Daily FX quote: value of one unit of a currency in USD (shared market data)"""
+    __tablename__ = "fx_rates"
+
+    id = Column(Integer, primary_key=True, index=True)
+    rate_date = Column(Date, nullable=False)
+    currency = Column(String(3), nullable=False)  # ISO 4217 code, e.g. "EUR"
+    usd_rate = Column(Float, nullable=False)  # USD per one unit of currency
+    source = Column(String, nullable=True)
+
+    created_date = Column(DateTime, default=datetime.utcnow)
+    updated_date = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    __table_args__ = (
+        Index('ix_fx_rate_date', 'rate_date'),
+        UniqueConstraint('currency', 'rate_date', name='uq_fx_rate_currency_date'),
+    )
@@ -0,0 +1,336 @@
+"""
+Precomputed report dataset
+
+Builds one as-of-date dataset per tenant with a handful of bulk queries -
+positions (investments with their entity), cash flows, latest NAVs - and the
+entity / asset-class / vintage rollups derived from them. The PDF report
+endpoints consume the dataset instead of querying per investment or per cash
+flow row. Datasets are cached by (tenant, as_of_date, data version), where the
+data version is a cheap fingerprint of the tenant's entities, investments,
+cash flows and valuations (plus its reporting currency and the FX rates), so
+any write produces a fresh dataset.
+
+Amounts are expressed in the tenant's reporting currency: cash flows convert
+at their own date, commitments and NAVs at the as-of date. Currencies without
+rates are left unconverted and listed in ``unconverted_currencies``.
+"""
+
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from datetime import date
+from typing import Dict, List, Optional, Tuple, Any
+
+import pandas as pd
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app import models
+from app.fx_service import (
+    DEFAULT_REPORTING_CURRENCY, get_fx_version, get_reporting_currency, get_reporting_fx, reporting_rates,
+    unconverted_currencies
+)
+from app.models import CashFlowType
+from app.performance import CashFlowEvent
+
+OUTFLOW_TYPES = [CashFlowType.CAPITAL_CALL, CashFlowType.CONTRIBUTION, CashFlowType.FEES]
+INFLOW_TYPES = [CashFlowType.DISTRIBUTION, CashFlowType.YIELD, CashFlowType.RETURN_OF_PRINCIPAL]
+
+MAX_CACHED_DATASETS = 64
+
+
+def format_asset_class(asset_class: str) -> str:
+    """Convert database asset class values to formal display names."""
+    asset_class_map = {
+        'PRIVATE_EQUITY': 'Private Equity',
+        'VENTURE_CAPITAL': 'Venture Capital',
+        'REAL_ESTATE': 'Real Estate',
+        'REAL_ASSETS': 'Real Assets',
+        'INFRASTRUCTURE': 'Infrastructure',
+        'PRIVATE_DEBT': 'Private Debt',
+        'HEDGE_FUNDS': 'Hedge Funds',
+        'NATURAL_RESOURCES': 'Natural Resources',
+        'CO_INVESTMENTS': 'Co-Investments',
+        'SECONDARIES': 'Secondaries',
+        'Unknown': 'Other/Unknown'
+    }
+    return asset_class_map.get(asset_class, asset_class.replace('_', ' ').title())
+
+
+@dataclass
+class ReportPosition:
+    """One investment as of the report date"""
+    investment_id: int
+    name: str
+    entity_id: Optional[int]
+    entity_name: Optional[str]
+    asset_class: Any
+    vintage_year: Optional[int]
+    status: Any
+    commitment_amount: float
+    current_nav: float = 0.0
+    # Sign-based totals (amount < 0 / amount > 0)
+    paid_in: float = 0.0
+    paid_out: float = 0.0
+    # Type-based totals (capital calls, contributions, fees / distributions, yield, return of principal)
+    called: float = 0.0
+    distributions: float = 0.0
+
+    @property
+    def uncalled(self) -> float:
+        return self.commitment_amount - self.called
+
+    @property
+    def tvpi(self) -> float:
+        return (self.distributions + self.current_nav) / self.called if self.called > 0 else 0
+
+    @property
+    def dpi(self) -> float:
+        return self.distributions / self.called if self.called > 0 else 0
+
+
+@dataclass
+class ReportRollup:
+    """Aggregate over a group of positions (entity, asset class, vintage)"""
+    key: Any
+    investment_ids: List[int] = field(default_factory=list)
+    total_commitment: float = 0.0
+    current_nav: float = 0.0
+    paid_in: float = 0.0
+    paid_out: float = 0.0
+    called: float = 0.0
+    distributions: float = 0.0
+
+    @property
+    def count(self) -> int:
+        return len(self.investment_ids)
+
+    def add(self, position: ReportPosition):
+        self.investment_ids.append(position.investment_id)
+        self.total_commitment += position.commitment_amount
+        self.current_nav += position.current_nav
+        self.paid_in += position.paid_in
+        self.paid_out += position.paid_out
+        self.called += position.called
+        self.distributions += position.distributions
+
+
+@dataclass
+class ReportDataset:
+    """Tenant positions, flows and rollups as of one date"""
+    tenant_id: int
+    as_of_date: date
+    data_version: Tuple
+    positions: Dict[int, ReportPosition]
+    entities: Dict[int, Any]  # entity_id -> (name, entity_type)
+    flows: pd.DataFrame  # investment_id, date, type, amount, notes (date <= as_of_date)
+    reporting_currency: str = DEFAULT_REPORTING_CURRENCY
+    unconverted_currencies: List[str] = field(default_factory=list)
+
+    def positions_list(self, status=None) -> List[ReportPosition]:
+        positions = list(self.positions.values())
+        if status is not None:
+            positions = [p for p in positions if p.status == status]
+        return positions
+
+    def rollup(self, key_func, positions: Optional[List[ReportPosition]] = None) -> Dict[Any, ReportRollup]:
+        """Group positions by ``key_func(position)``; positions mapping to None are skipped"""
+        rollups: Dict[Any, ReportRollup] = {}
+        for position in positions if positions is not None else self.positions.values():
+            key = key_func(position)
+            if key is None:
+                continue
+            if key not in rollups:
+                rollups[key] = ReportRollup(key=key)
+            rollups[key].add(position)
+        return rollups
+
+    def for_entities(self, entity_ids) -> "ReportDataset":
+        """The dataset restricted to the positions, flows and entities of the given entities"""
+        entity_ids = set(entity_ids)
+        positions = {i: p for i, p in self.positions.items() if p.entity_id in entity_ids}
+        return replace(
+            self,
+            positions=positions,
+            entities={i: e for i, e in self.entities.items() if i in entity_ids},
+            flows=self.flows[self.flows['investment_id'].isin(list(positions))]
+        )
+
+    def by_entity(self) -> Dict[int, ReportRollup]:
+        return self.rollup(lambda p: p.entity_id)
+
+    def by_asset_class(self) -> Dict[Any, ReportRollup]:
+        return self.rollup(lambda p: p.asset_class or "Unknown")
+
+    def by_vintage(self) -> Dict[int, ReportRollup]:
+        return self.rollup(lambda p: p.vintage_year or None)
+
+    def irr_flows(self, investment_ids: Optional[List[int]] = None,
+                  terminal_value: float = 0.0) -> List[CashFlowEvent]:
+        """
+        Dated flows for an IRR over a set of investments, netted per day (which
+        leaves the NPV unchanged), plus the terminal NAV on the report date.
+        """
+        flows = self.flows
+        if investment_ids is not None:
+            flows = flows[flows['investment_id'].isin(investment_ids)]
+        daily = flows.groupby('date', sort=True)['amount'].sum()
+        events = [CashFlowEvent(date=d, amount=float(a)) for d, a in daily.items()]
+        if terminal_value > 0:
+            events.append(CashFlowEvent(date=self.as_of_date, amount=terminal_value))
+        return events
+
+
+# =============================================================================
+# Building
+# =============================================================================
+
+def get_data_version(db: Session, tenant_id: int) -> Tuple:
+    """
+    Fingerprint of the tenant's report inputs: row count and last update per
+    table, then the reporting currency and the FX rate table version
+    """
+    version = []
+    for model in (models.Entity, models.Investment, models.CashFlow, models.Valuation):
+        count, last_updated = db.query(
+            func.count(model.id), func.max(model.updated_date)
+        ).filter(model.tenant_id == tenant_id).one()
+        version.append((count, last_updated.isoformat() if last_updated else None))
+    version.append((get_reporting_currency(db, tenant_id), get_fx_version(db)))
+    return tuple(version)
+
+
+def build_report_dataset(db: Session, tenant_id: int, as_of_date: date,
+                         data_version: Optional[Tuple] = None) -> ReportDataset:
+    """
+    Build the dataset with bulk queries: entities, investments, cash flows and
+    latest NAVs, converted into the tenant's reporting currency
+    """
+    Investment, Entity, CashFlow, Valuation = models.Investment, models.Entity, models.CashFlow, models.Valuation
+
+    entities = {
+        entity_id: (name, entity_type)
+        for entity_id, name, entity_type in db.query(Entity.id, Entity.name, Entity.entity_type).filter(
+            Entity.tenant_id == tenant_id
+        )
+    }
+
+    investment_rows = db.query(
+        Investment.id, Investment.name, Investment.entity_id, Investment.asset_class,
+        Investment.vintage_year, Investment.status, Investment.commitment_amount, Investment.currency
+    ).filter(Investment.tenant_id == tenant_id).all()
+
+    reporting_currency = get_reporting_currency(db, tenant_id)
+    currencies = {row.id: row.currency or DEFAULT_REPORTING_CURRENCY for row in investment_rows}
+    fx = get_reporting_fx(db, currencies.values(), reporting_currency)
+    # One unit of each investment's currency at the as-of date
+    spot = dict(zip(currencies, reporting_rates(fx, list(currencies.values()), [as_of_date] * len(currencies),
+                                                reporting_currency)))
+
+    positions = {}
+    for row in investment_rows:
+        entity = entities.get(row.entity_id)
+        positions[row.id] = ReportPosition(
+            investment_id=row.id,
+            name=row.name,
+            entity_id=row.entity_id,
+            entity_name=entity[0] if entity else None,
+            asset_class=row.asset_class,
+            vintage_year=row.vintage_year,
+            status=row.status,
+            commitment_amount=(row.commitment_amount or 0) * spot[row.id]
+        )
+
+    flow_rows = db.query(
+        CashFlow.investment_id, CashFlow.date, CashFlow.type, CashFlow.amount, CashFlow.notes
+    ).join(Investment, CashFlow.investment_id == Investment.id).filter(
+        Investment.tenant_id == tenant_id,
+        CashFlow.date <= as_of_date
+    ).all()
+    flows = pd.DataFrame(flow_rows, columns=['investment_id', 'date', 'type', 'amount', 'notes'])
+
+    if not flows.empty:
+        if fx is not None:
+            flows['amount'] = flows['amount'].astype(float) * reporting_rates(
+                fx, flows['investment_id'].map(currencies).to_numpy(), flows['date'].to_numpy(), reporting_currency
+            )
+        amounts = flows['amount'].astype(float)
+        totals = pd.DataFrame({
+            'investment_id': flows['investment_id'],
+            'paid_in': amounts.where(amounts < 0, 0.0),
+            'paid_out': amounts.where(amounts > 0, 0.0),
+            'called': amounts.where(flows['type'].isin(OUTFLOW_TYPES), 0.0),
+            'distributions': amounts.where(flows['type'].isin(INFLOW_TYPES), 0.0),
+        }).groupby('investment_id').sum()
+        for investment_id, paid_in, paid_out, called, distributions in totals.itertuples(name=None):
+            position = positions.get(investment_id)
+            if position is not None:
+                position.paid_in = abs(paid_in)
+                position.paid_out = paid_out
+                position.called = abs(called)
+                position.distributions = abs(distributions)
+
+    latest_dates = db.query(
+        Valuation.investment_id, func.max(Valuation.date).label('latest_date')
+    ).join(Investment, Valuation.investment_id == Investment.id).filter(
+        Investment.tenant_id == tenant_id,
+        Valuation.date <= as_of_date
+    ).group_by(Valuation.investment_id).subquery()
+    for investment_id, nav_value in db.query(Valuation.investment_id, Valuation.nav_value).join(
+        latest_dates,
+        (Valuation.investment_id == latest_dates.c.investment_id) & (Valuation.date == latest_dates.c.latest_date)
+    ):
+        if investment_id in positions:
+            positions[investment_id].current_nav = (nav_value or 0) * spot[investment_id]
+
+    return ReportDataset(
+        tenant_id=tenant_id,
+        as_of_date=as_of_date,
+        data_version=data_version if data_version is not None else get_data_version(db, tenant_id),
+        positions=positions,
+        entities=entities,
+        flows=flows,
+        reporting_currency=reporting_currency,
+        unconverted_currencies=unconverted_currencies(fx, currencies.values(), reporting_currency, as_of_date)
+    )
+
+
+# =============================================================================
+# Cache
+# =============================================================================
+
+_dataset_cache: "OrderedDict[Tuple, ReportDataset]" = OrderedDict()
+_dataset_cache_lock = threading.Lock()
+
+
+def get_report_dataset(db: Session, tenant_id: int, as_of_date: date) -> ReportDataset:
+    """Cached dataset for (tenant, as_of_date, current data version)"""
+    data_version = get_data_version(db, tenant_id)
+    key = (tenant_id, as_of_date, data_version)
+
+    with _dataset_cache_lock:
+        dataset = _dataset_cache.get(key)
+        if dataset is not None:
+            _dataset_cache.move_to_end(key)
+            return dataset
+
+    dataset = build_report_dataset(db, tenant_id, as_of_date, data_version)
+
+    with _dataset_cache_lock:
+        # Drop superseded versions for this tenant/date, then bound the cache
+        for stale in [k for k in _dataset_cache if k[:2] == key[:2]]:
+            del _dataset_cache[stale]
+        _dataset_cache[key] = dataset
+        while len(_dataset_cache) > MAX_CACHED_DATASETS:
+            _dataset_cache.popitem(last=False)
+    return dataset
+
+
+def clear_report_dataset_cache(tenant_id: Optional[int] = None):
+    """Drop cached datasets (all, or one tenant's)"""
+    with _dataset_cache_lock:
+        if tenant_id is None:
+            _dataset_cache.clear()
+        else:
+            for key in [k for k in _dataset_cache if k[0] == tenant_id]:
+                del _dataset_cache[key]
@@ -0,0 +1,361 @@
+"""
+Report generation jobs
+
+PDF reports are rendered as jobs rather than inline in the request. A job is
+identified by what it renders - tenant, report type, parameters and the
+tenant's data version - hashed into a cache key:
+
+* if a finished PDF for the key is in the report cache it is served without
+  rendering;
+* if an identical job is already queued or running, that job is returned, so
+  repeated clicks and concurrent users share one render;
+* otherwise the dataset is loaded in the blocking thread pool and the PDF is
+  rendered in the CPU worker pool (app.executors).
+
+Batches submit many jobs at once - e.g. the month-end run of each report for
+every family member's entity - and share one dataset load per as-of date
+through the report dataset cache.
+
+Job state lives in the process that accepted the job. Finished PDFs live in
+REPORT_CACHE_DIR as <tenant_id>/<key>.pdf, so download links work from any
+worker sharing the directory. The cache is bounded by REPORT_CACHE_MAX_MB
+and evicts the least recently used files first.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from enum import Enum
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app import models
+from app.executors import run_blocking, run_cpu_bound
+from app.report_data import ReportDataset, get_data_version, get_report_dataset
+
+logger = logging.getLogger(__name__)
+
+REPORT_CACHE_DIR = os.getenv("REPORT_CACHE_DIR", "report_cache")
+REPORT_CACHE_MAX_MB = float(os.getenv("REPORT_CACHE_MAX_MB", "512"))
+REPORT_JOB_HISTORY = 1000
+
+CACHE_KEY_PATTERN = re.compile(r'^[0-9a-f]{64}$')
+
+
+@dataclass(frozen=True)
+class ReportType:
+    class_name: str  # report_service class
+    filename_prefix: str
+    defaults: Dict[str, Any] = field(default_factory=dict)  # generate_from_dataset options
+
+
+REPORT_TYPES = {
+    'portfolio-summary': ReportType('PortfolioSummaryReport', 'portfolio_summary'),
+    'holdings': ReportType('HoldingsReport', 'holdings_report',
+                           {'grouped_by': 'entity', 'status_filter': 'ACTIVE'}),
+    'entity-performance': ReportType('EntityPerformanceReport', 'entity_performance'),
+    'cash-flow-activity': ReportType('CashFlowActivityReport', 'cash_flow_activity',
+                                     {'start_date': None, 'end_date': None, 'cash_flow_types': (), 'group_by': 'none'}),
+}
+
+
+@dataclass(frozen=True)
+class ReportSpec:
+    """What to render: report type, as-of date, optional entity and generate_from_dataset options"""
+    report_type: str
+    as_of_date: date
+    entity_id: Optional[int] = None
+    options: Tuple[Tuple[str, Any], ...] = ()
+
+    @classmethod
+    def create(cls, report_type: str, as_of_date: date, entity_id: Optional[int] = None, **options) -> "ReportSpec":
+        report = REPORT_TYPES.get(report_type)
+        if report is None:
+            raise ValueError(f"Unknown report type: {report_type}. Must be one of: {sorted(REPORT_TYPES)}")
+        unknown = set(options) - set(report.defaults)
+        if unknown:
+            raise ValueError(f"Unsupported options for {report_type}: {sorted(unknown)}")
+        merged = {**report.defaults, **{k: v for k, v in options.items() if v is not None}}
+        return cls(report_type, as_of_date, entity_id, tuple(sorted(
+            (name, tuple(value) if isinstance(value, list) else value) for name, value in merged.items()
+        )))
+
+    def filename(self) -> str:
+        entity = f"_entity{self.entity_id}" if self.entity_id is not None else ""
+        return f"{REPORT_TYPES[self.report_type].filename_prefix}{entity}_{self.as_of_date.strftime('%Y%m%d')}.pdf"
+
+
+def _key_value(value):
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, (list, tuple)):
+        return [_key_value(v) for v in value]
+    return value
+
+
+def report_cache_key(tenant_id: int, spec: ReportSpec, data_version: Tuple) -> str:
+    """Content address of a rendered report: hash of tenant, spec and data version"""
+    payload = [tenant_id, spec.report_type, _key_value(spec.as_of_date), spec.entity_id,
+               [[name, _key_value(value)] for name, value in spec.options], _key_value(data_version)]
+    return hashlib.sha256(json.dumps(payload, separators=(',', ':')).encode()).hexdigest()
+
+
+# =============================================================================
+# Disk cache
+# =============================================================================
+
+class ReportCache:
+    """Rendered PDFs as <directory>/<tenant_id>/<key>.pdf, evicted least recently used first"""
+
+    def __init__(self, directory: str = REPORT_CACHE_DIR, max_bytes: int = int(REPORT_CACHE_MAX_MB * 1024 * 1024)):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+
+    def path(self, tenant_id: int, key: str) -> str:
+        if not CACHE_KEY_PATTERN.match(key):
+            raise ValueError("Invalid report cache key")
+        return os.path.join(self.directory, str(int(tenant_id)), f"{key}.pdf")
+
+    def get(self, tenant_id: int, key: str) -> Optional[str]:
+        """Path of a cached PDF, marking it recently used, or None"""
+        path = self.path(tenant_id, key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put(self, tenant_id: int, key: str, pdf: bytes) -> str:
+        """Store a PDF atomically, then evict old files beyond the size limit"""
+        path = self.path(tenant_id, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, temp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(handle, 'wb') as temp_file:
+            temp_file.write(pdf)
+        os.replace(temp_path, path)
+        self.evict(keep=path)
+        return path
+
+    def evict(self, keep: Optional[str] = None) -> int:
+        """Delete least recently used PDFs until the cache fits; returns the bytes freed"""
+        with self._lock:
+            files = []
+            for tenant_dir in os.scandir(self.directory) if os.path.isdir(self.directory) else []:
+                if not tenant_dir.is_dir():
+                    continue
+                for entry in os.scandir(tenant_dir.path):
+                    if entry.name.endswith('.pdf'):
+                        stat = entry.stat()
+                        files.append((stat.st_mtime, stat.st_size, entry.path))
+            total = sum(size for _, size, _ in files)
+            freed = 0
+            for _, size, path in sorted(files):
+                if total - freed <= self.max_bytes:
+                    break
+                if path == keep:
+                    continue
+                try:
+                    os.remove(path)
+                    freed += size
+                except FileNotFoundError:
+                    pass  # removed by another worker
+            return freed
+
+
+# =============================================================================
+# Jobs
+# =============================================================================
+
+@dataclass
+class ReportJob:
+    job_id: str
+    tenant_id: int
+    spec: ReportSpec
+    cache_key: str
+    status: str = 'queued'  # queued, running, complete, failed
+    batch_id: Optional[str] = None
+    cached: bool = False  # served from the report cache without rendering
+    error: Optional[str] = None
+    created_at: datetime = field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+    task: Optional[asyncio.Task] = field(default=None, repr=False, compare=False)
+
+    @property
+    def download_url(self) -> Optional[str]:
+        if self.status != 'complete':
+            return None
+        return f"/api/reports/files/{self.cache_key}/{self.spec.filename()}"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'job_id': self.job_id,
+            'batch_id': self.batch_id,
+            'report_type': self.spec.report_type,
+            'as_of_date': self.spec.as_of_date,
+            'entity_id': self.spec.entity_id,
+            'status': self.status,
+            'cached': self.cached,
+            'error': self.error,
+            'created_at': self.created_at,
+            'completed_at': self.completed_at,
+            'download_url': self.download_url,
+        }
+
+
+def load_job_inputs(tenant_id: int, spec: ReportSpec) -> Tuple[str, ReportDataset]:
+    """Tenant (and entity) name and the dataset for a job; opens its own session as the request has ended"""
+    from app.database import read_router
+
+    db = read_router.session()
+    try:
+        tenant = db.get(models.Tenant, tenant_id)
+        title = tenant.name if tenant else "Portfolio"
+        dataset = get_report_dataset(db, tenant_id, spec.as_of_date)
+    finally:
+        db.close()
+
+    if spec.entity_id is not None:
+        entity = dataset.entities.get(spec.entity_id)
+        if entity is None:
+            raise ValueError(f"Entity {spec.entity_id} not found")
+        title = f"{title} - {entity[0]}"
+        dataset = dataset.for_entities([spec.entity_id])
+    return title, dataset
+
+
+def render_arguments(spec: ReportSpec, dataset: ReportDataset) -> Tuple[type, Dict[str, Any]]:
+    """Report class and generate_from_dataset options, with open-ended periods resolved from the dataset"""
+    from app import report_service
+
+    options = dict(spec.options)
+    if 'end_date' in options and options['end_date'] is None:
+        options['end_date'] = dataset.as_of_date
+    if 'start_date' in options and options['start_date'] is None:
+        # Since inception: the earliest cash flow
+        options['start_date'] = dataset.flows['date'].min() if not dataset.flows.empty else date(2000, 1, 1)
+    if 'cash_flow_types' in options:
+        options['cash_flow_types'] = list(options['cash_flow_types'])
+    return getattr(report_service, REPORT_TYPES[spec.report_type].class_name), options
+
+
+def month_end_entity_ids(db: Session, tenant_id: int, family_members_only: bool = True) -> List[int]:
+    """Active entities for a month-end batch; by default those with an active family member"""
+    query = db.query(models.Entity.id).filter(
+        models.Entity.tenant_id == tenant_id,
+        models.Entity.is_active == True
+    )
+    if family_members_only:
+        query = query.join(models.FamilyMember, models.FamilyMember.entity_id == models.Entity.id).filter(
+            models.FamilyMember.is_active == True
+        ).distinct()
+    return [entity_id for (entity_id,) in query.order_by(models.Entity.id)]
+
+
+class ReportJobManager:
+    """
+    Accepts report jobs, deduplicates identical in-flight jobs and renders the rest.
+
+    Submission and status calls run on the event loop; the loading and
+    rendering run in the executor pools.
+    """
+
+    def __init__(self, cache: Optional[ReportCache] = None,
+                 load_inputs: Callable[[int, ReportSpec], Tuple[str, ReportDataset]] = load_job_inputs,
+                 render: Optional[Callable[..., bytes]] = None, history: int = REPORT_JOB_HISTORY):
+        self.cache = cache or ReportCache()
+        self._load_inputs = load_inputs
+        self._render = render
+        self.history = history
+        self._jobs: "OrderedDict[str, ReportJob]" = OrderedDict()
+        self._batches: "OrderedDict[str, List[str]]" = OrderedDict()
+        self._inflight: Dict[Tuple[int, str], ReportJob] = {}
+
+    async def submit(self, db: Session, tenant_id: int, spec: ReportSpec) -> ReportJob:
+        data_version = await run_blocking(get_data_version, db, tenant_id)
+        return self.enqueue(tenant_id, spec, data_version)
+
+    async def submit_batch(self, db: Session, tenant_id: int, specs: List[ReportSpec]) -> Tuple[str, List[ReportJob]]:
+        """Submit many reports under one batch id; all share one data version read"""
+        data_version = await run_blocking(get_data_version, db, tenant_id)
+        batch_id = uuid.uuid4().hex
+        jobs = [self.enqueue(tenant_id, spec, data_version, batch_id) for spec in specs]
+        self._batches[batch_id] = [job.job_id for job in jobs]
+        while len(self._batches) > self.history:
+            self._batches.popitem(last=False)
+        return batch_id, jobs
+
+    def enqueue(self, tenant_id: int, spec: ReportSpec, data_version: Tuple,
+                batch_id: Optional[str] = None) -> ReportJob:
+        """Cached job, the identical in-flight job, or a newly started one"""
+        key = report_cache_key(tenant_id, spec, data_version)
+        inflight = self._inflight.get((tenant_id, key))
+        if inflight is not None:
+            return inflight
+
+        job = ReportJob(job_id=uuid.uuid4().hex, tenant_id=tenant_id, spec=spec, cache_key=key, batch_id=batch_id)
+        self._jobs[job.job_id] = job
+        while len(self._jobs) > self.history:
+            self._jobs.popitem(last=False)
+
+        if self.cache.get(tenant_id, key) is not None:
+            job.status, job.cached, job.completed_at = 'complete', True, datetime.utcnow()
+            return job
+
+        self._inflight[(tenant_id, key)] = job
+        job.task = asyncio.get_running_loop().create_task(self._run(job))
+        return job
+
+    async def _run(self, job: ReportJob):
+        submitted_key = job.cache_key
+        job.status = 'running'
+        try:
+            title, dataset = await run_blocking(self._load_inputs, job.tenant_id, job.spec)
+            report_class, options = render_arguments(job.spec, dataset)
+            if self._render is None:
+                from app.report_service import render_report
+                pdf = await run_cpu_bound(render_report, report_class, title, dataset, **options)
+            else:
+                pdf = await run_blocking(self._render, report_class, title, dataset, **options)
+            # Stored under the version actually rendered, in case data changed since submission
+            job.cache_key = report_cache_key(job.tenant_id, job.spec, dataset.data_version)
+            await run_blocking(self.cache.put, job.tenant_id, job.cache_key, pdf)
+            job.status = 'complete'
+        except Exception as e:
+            logger.exception("Report job %s (%s) failed", job.job_id, job.spec.report_type)
+            job.status, job.error = 'failed', str(e)
+        finally:
+            job.completed_at = datetime.utcnow()
+            self._inflight.pop((job.tenant_id, submitted_key), None)
+
+    async def wait(self, job: ReportJob) -> ReportJob:
+        """Wait for a job to finish; cancelling the waiter leaves the job running"""
+        if job.task is not None:
+            await asyncio.shield(job.task)
+        return job
+
+    def get(self, tenant_id: int, job_id: str) -> Optional[ReportJob]:
+        job = self._jobs.get(job_id)
+        return job if job is not None and job.tenant_id == tenant_id else None
+
+    def batch(self, tenant_id: int, batch_id: str) -> Optional[List[ReportJob]]:
+        job_ids = self._batches.get(batch_id)
+        if job_ids is None:
+            return None
+        jobs = [self._jobs[job_id] for job_id in job_ids if job_id in self._jobs]
+        return jobs if all(job.tenant_id == tenant_id for job in jobs) else None
+
+
+report_jobs = ReportJobManager()
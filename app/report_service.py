@@ -3,19 +3,31 @@ PDF Report Generation Service
 
 Provides professional PDF report generation for portfolio analytics.
 Uses ReportLab for high-quality output with consistent branding.
+
+Data tables are laid out with ChunkedTable: fixed column widths and row
+heights let each page take exactly the rows that fit, so reports with
+thousands of holdings or transactions render in full without ReportLab
+measuring and re-splitting one giant Table.
 """
 
+from dataclasses import dataclass
+from functools import lru_cache
 from io import BytesIO
 from datetime import date, datetime
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+from reportlab import rl_config
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, A4
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.units import inch
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, PageBreak, Flowable
 from reportlab.platypus.flowables import HRFlowable
 from reportlab.lib.enums import TA_LEFT, TA_CENTER, TA_RIGHT
 
+from app.models import CashFlowType, InvestmentStatus
+from app.performance import calculate_irr
+from app.report_data import ReportDataset, OUTFLOW_TYPES, INFLOW_TYPES, format_asset_class
+
 # Professional color scheme
 BRAND_PRIMARY = colors.HexColor('#1a1a2e')
 BRAND_SECONDARY = colors.HexColor('#16213e')
@@ -24,6 +36,120 @@ HEADER_GRAY = colors.HexColor('#e8e8e8')
 TABLE_HEADER = colors.HexColor('#2c3e50')
 TABLE_ALT_ROW = colors.HexColor('#f8f9fa')
 
+# Write page streams as plain zlib rather than ASCII85-wrapped zlib; the text
+# encoding costs more than the table layout on long reports and makes files larger
+rl_config.useA85 = 0
+
+
+@dataclass(frozen=True)
+class TableFormat:
+    """Fonts, padding and alignment for a data table; row heights follow from these"""
+    header_font_size: float = 10
+    font_size: float = 9
+    header_padding: float = 10
+    padding: float = 6
+    grid_color: colors.Color = colors.lightgrey
+    header_align: Optional[str] = None
+    column_align: Tuple[Tuple[int, int, str], ...] = ()  # (first column, last column, alignment)
+
+    @property
+    def header_height(self) -> float:
+        return self.header_font_size * 1.2 + 2 * self.header_padding
+
+    @property
+    def row_height(self) -> float:
+        return self.font_size * 1.2 + 2 * self.padding
+
+    def table_style(self, band_offset: int = 0) -> TableStyle:
+        """Style for one block; band_offset keeps the row banding continuous across blocks"""
+        bands = [colors.white, TABLE_ALT_ROW]
+        commands = [
+            # Header styling
+            ('BACKGROUND', (0, 0), (-1, 0), TABLE_HEADER),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), self.header_font_size),
+
+            # Data rows styling
+            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
+            ('FONTSIZE', (0, 1), (-1, -1), self.font_size),
+
+            # Alternating row colors
+            ('ROWBACKGROUNDS', (0, 1), (-1, -1), bands[band_offset % 2:] + bands[:band_offset % 2]),
+
+            # Grid
+            ('GRID', (0, 0), (-1, -1), 0.5, self.grid_color),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+        ]
+        if self.header_align:
+            commands.append(('ALIGN', (0, 0), (-1, 0), self.header_align))
+        for first, last, align in self.column_align:
+            commands.append(('ALIGN', (first, 1), (last, -1), align))
+        return TableStyle(commands)
+
+
+@lru_cache(maxsize=None)
+def _banded_styles(table_format: TableFormat) -> Tuple[TableStyle, TableStyle]:
+    """Styles for blocks starting on an even and an odd data row, built once per format"""
+    return table_format.table_style(0), table_format.table_style(1)
+
+
+DATA_TABLE = TableFormat()
+GROUP_TABLE = TableFormat(header_padding=12, padding=8, grid_color=colors.grey, header_align='CENTER',
+                          column_align=((0, 0, 'LEFT'), (1, -1, 'RIGHT')))
+DETAIL_TABLE = TableFormat(header_font_size=9, font_size=8, grid_color=colors.grey, header_align='CENTER',
+                           column_align=((0, 1, 'LEFT'), (2, -1, 'RIGHT')))
+
+
+class ChunkedTable(Flowable):
+    """
+    A data table of single-line rows, drawn as one Table block per page.
+
+    Column widths and row heights are fixed, so when the table reaches the end
+    of a frame it is split arithmetically into the rows that fit and the rest,
+    each block repeating the header. The banding styles are built once per
+    TableFormat and shared by every block.
+    """
+
+    def __init__(self, headers: List[str], rows: List[List[str]], col_widths: List[float],
+                 table_format: TableFormat = DATA_TABLE, first_row: int = 0):
+        super().__init__()
+        self.hAlign = 'CENTER'
+        self.headers = headers
+        self.rows = rows
+        self.col_widths = col_widths
+        self.table_format = table_format
+        self.first_row = first_row  # position of rows[0] in the full table, for banding
+
+    def _block(self, rows: List[List[str]]) -> Table:
+        table_format = self.table_format
+        return Table(
+            [self.headers] + rows,
+            colWidths=self.col_widths,
+            rowHeights=[table_format.header_height] + [table_format.row_height] * len(rows),
+            style=_banded_styles(table_format)[self.first_row % 2]
+        )
+
+    def wrap(self, availWidth, availHeight):
+        self.width = sum(self.col_widths)
+        self.height = self.table_format.header_height + len(self.rows) * self.table_format.row_height
+        return self.width, self.height
+
+    def split(self, availWidth, availHeight):
+        fit = int((availHeight - self.table_format.header_height) // self.table_format.row_height)
+        if fit < 1:
+            return []  # not even one row fits; move to the next frame
+        if fit >= len(self.rows):
+            return [self]
+        rest = ChunkedTable(self.headers, self.rows[fit:], self.col_widths, self.table_format,
+                            self.first_row + fit)
+        return [self._block(self.rows[:fit]), rest]
+
+    def draw(self):
+        block = self._block(self.rows)
+        block.wrapOn(self.canv, self.width, self.height)
+        block.drawOn(self.canv, 0, 0)
+
 
 class ReportGenerator:
     """Base class for generating professional PDF reports"""
@@ -149,35 +275,10 @@ class ReportGenerator:
         ]))
         return table
 
-    def _create_data_table(self, headers: List[str], data: List[List[str]], col_widths: List[float] = None) -> Table:
-        """Create a styled data table with headers"""
-        # Combine headers and data
-        table_data = [headers] + data
-
-        table = Table(table_data, colWidths=col_widths, repeatRows=1)
-        table.setStyle(TableStyle([
-            # Header styling
-            ('BACKGROUND', (0, 0), (-1, 0), TABLE_HEADER),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 10),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-            ('TOPPADDING', (0, 0), (-1, 0), 10),
-
-            # Data rows styling
-            ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-            ('FONTSIZE', (0, 1), (-1, -1), 9),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-            ('TOPPADDING', (0, 1), (-1, -1), 6),
-
-            # Alternating row colors
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, TABLE_ALT_ROW]),
-
-            # Grid
-            ('GRID', (0, 0), (-1, -1), 0.5, colors.lightgrey),
-            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
-        ]))
-        return table
+    def _create_data_table(self, headers: List[str], data: List[List[str]], col_widths: List[float],
+                           table_format: TableFormat = DATA_TABLE) -> ChunkedTable:
+        """Create a styled data table with headers, split into per-page blocks"""
+        return ChunkedTable(headers, data, col_widths, table_format)
 
     def build_pdf(self, elements: List) -> BytesIO:
         """Build the PDF document"""
@@ -293,6 +394,67 @@ class PortfolioSummaryReport(ReportGenerator):
 
         return self.build_pdf(elements)
 
+    def generate_from_dataset(self, dataset: ReportDataset) -> BytesIO:
+        """Generate portfolio summary report from a precomputed report dataset"""
+        positions = dataset.positions_list()
+        total_commitments = sum(p.commitment_amount for p in positions)
+        total_called = sum(p.paid_in for p in positions)
+        total_distributions = sum(p.paid_out for p in positions)
+        total_nav = sum(p.current_nav for p in positions)
+
+        # Calculate performance metrics
+        all_cash_flows = dataset.irr_flows(terminal_value=total_nav)
+        portfolio_irr = calculate_irr(all_cash_flows) if all_cash_flows else None
+        if portfolio_irr is None:
+            portfolio_irr = 0
+
+        summary_stats = {
+            'total_nav': total_nav,
+            'total_commitments': total_commitments,
+            'total_called': total_called,
+            'uncalled_commitments': total_commitments - total_called,
+            'total_distributions': total_distributions,
+            'irr': portfolio_irr * 100,  # Convert to percentage
+            'tvpi': (total_distributions + total_nav) / total_called if total_called > 0 else 0,
+            'dpi': total_distributions / total_called if total_called > 0 else 0,
+            'rvpi': total_nav / total_called if total_called > 0 else 0,
+            'active_count': sum(1 for p in positions if p.status == InvestmentStatus.ACTIVE),
+            'realized_count': sum(1 for p in positions if p.status == InvestmentStatus.REALIZED),
+            'total_count': len(positions)
+        }
+
+        # Asset allocation, merged on display name
+        asset_allocation = {}
+        for asset_class, rollup in dataset.by_asset_class().items():
+            name = format_asset_class(asset_class)
+            row = asset_allocation.setdefault(name, {
+                'asset_class': name, 'count': 0, 'total_commitment': 0, 'current_nav': 0
+            })
+            row['count'] += rollup.count
+            row['total_commitment'] += rollup.total_commitment
+            row['current_nav'] += rollup.current_nav
+        for row in asset_allocation.values():
+            row['percentage'] = (row['current_nav'] / total_nav * 100) if total_nav > 0 else 0
+
+        vintage_analysis = [
+            {
+                'vintage_year': str(vintage),
+                'count': rollup.count,
+                'total_commitment': rollup.total_commitment,
+                'current_nav': rollup.current_nav,
+                'total_called': rollup.paid_in,
+                'total_distributions': rollup.paid_out,
+                'tvpi': (rollup.paid_out + rollup.current_nav) / rollup.paid_in if rollup.paid_in > 0 else 0
+            }
+            for vintage, rollup in dataset.by_vintage().items()
+        ]
+
+        return self.generate(
+            summary_stats=summary_stats,
+            asset_allocation=sorted(asset_allocation.values(), key=lambda x: x['current_nav'], reverse=True),
+            vintage_analysis=sorted(vintage_analysis, key=lambda x: x['vintage_year']),
+            as_of_date=dataset.as_of_date
+        )
 
 class HoldingsReport(ReportGenerator):
     """Holdings Report Generator"""
@@ -363,6 +525,37 @@ class HoldingsReport(ReportGenerator):
 
         return self.build_pdf(elements)
 
+    def generate_from_dataset(self, dataset: ReportDataset, grouped_by: str = "entity",
+                              status_filter: Optional[str] = "ACTIVE") -> BytesIO:
+        """Generate holdings report from a precomputed report dataset"""
+        status = InvestmentStatus(status_filter) if status_filter and status_filter != "ALL" else None
+        holdings = [
+            {
+                'investment_name': p.name,
+                'entity_name': p.entity_name or "N/A",
+                'asset_class': p.asset_class or 'Unknown',
+                'vintage_year': p.vintage_year,
+                'commitment_amount': p.commitment_amount,
+                'called_amount': p.called,
+                'uncalled_amount': p.uncalled,
+                'current_nav': p.current_nav,
+                'distributions': p.distributions,
+                'tvpi': p.tvpi
+            }
+            for p in dataset.positions_list(status)
+        ]
+
+        # Sort holdings by group
+        if grouped_by == "entity":
+            holdings.sort(key=lambda x: (x['entity_name'], x['investment_name']))
+        elif grouped_by == "asset_class":
+            holdings.sort(key=lambda x: (x['asset_class'], x['investment_name']))
+        elif grouped_by == "vintage":
+            holdings.sort(key=lambda x: (x['vintage_year'] or 0, x['investment_name']))
+        else:
+            holdings.sort(key=lambda x: x['investment_name'])
+
+        return self.generate(holdings=holdings, grouped_by=grouped_by, as_of_date=dataset.as_of_date)
 
 class EntityPerformanceReport(ReportGenerator):
     """Entity-Level Performance Report Generator"""
@@ -435,6 +628,34 @@ class EntityPerformanceReport(ReportGenerator):
 
         return self.build_pdf(elements)
 
+    def generate_from_dataset(self, dataset: ReportDataset) -> BytesIO:
+        """Generate entity-level performance report from a precomputed report dataset"""
+        entity_data = []
+        for entity_id, rollup in dataset.by_entity().items():
+            if entity_id not in dataset.entities:
+                continue
+            name, entity_type = dataset.entities[entity_id]
+
+            entity_irr = calculate_irr(dataset.irr_flows(rollup.investment_ids, terminal_value=rollup.current_nav))
+            if entity_irr is None:
+                entity_irr = 0
+
+            entity_data.append({
+                'entity_name': name,
+                'entity_type': entity_type,
+                'investment_count': rollup.count,
+                'total_commitment': rollup.total_commitment,
+                'total_called': rollup.called,
+                'total_distributions': rollup.distributions,
+                'current_nav': rollup.current_nav,
+                'tvpi': (rollup.distributions + rollup.current_nav) / rollup.called if rollup.called > 0 else 0,
+                'irr': entity_irr * 100  # Convert to percentage
+            })
+
+        # Sort by NAV descending
+        entity_data.sort(key=lambda x: x['current_nav'], reverse=True)
+
+        return self.generate(entity_data=entity_data, as_of_date=dataset.as_of_date)
 
 class CashFlowActivityReport(ReportGenerator):
     """Cash Flow Activity Report generator"""
@@ -466,114 +687,126 @@ class CashFlowActivityReport(ReportGenerator):
         if grouped_data and group_by != 'none':
             elements.append(Paragraph(f"Cash Flows by {self._format_group_by(group_by)}", self.styles['SectionHeading']))
 
-            # Create grouped table
-            group_table_data = [["Name", "Capital Calls", "Distributions", "Net Cash Flow", "Count"]]
-            for item in grouped_data[:50]:  # Limit to top 50 for readability
-                group_table_data.append([
+            group_rows = [
+                [
                     item['name'],
                     self._format_currency(item['calls']),
                     self._format_currency(item['distributions']),
                     self._format_currency(item['net']),
                     str(item['count'])
-                ])
-
-            group_table = Table(group_table_data, colWidths=[2.5*inch, 1.5*inch, 1.5*inch, 1.5*inch, 0.75*inch])
-            group_table.setStyle(TableStyle([
-                # Header styling
-                ('BACKGROUND', (0, 0), (-1, 0), TABLE_HEADER),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('TOPPADDING', (0, 0), (-1, 0), 12),
-
-                # Data rows styling
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 9),
-                ('ALIGN', (1, 1), (-1, -1), 'RIGHT'),
-                ('ALIGN', (0, 1), (0, -1), 'LEFT'),
-                ('TOPPADDING', (0, 1), (-1, -1), 8),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 8),
-
-                # Alternating row colors
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, TABLE_ALT_ROW]),
-
-                # Grid
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ]))
-            elements.append(group_table)
+                ]
+                for item in grouped_data
+            ]
+            elements.append(self._create_data_table(
+                ["Name", "Capital Calls", "Distributions", "Net Cash Flow", "Count"],
+                group_rows,
+                [2.5*inch, 1.5*inch, 1.5*inch, 1.5*inch, 0.75*inch],
+                GROUP_TABLE
+            ))
             elements.append(Spacer(1, 0.3 * inch))
 
-        # Detailed transaction listing (if no grouping or as supplement)
-        if group_by == 'none' or len(cash_flows) <= 100:
-            elements.append(Paragraph("Transaction Details", self.styles['SectionHeading']))
-
-            # Create detailed table
-            detail_table_data = [["Date", "Investment", "Type", "Amount", "Balance"]]
-
-            running_balance = 0
-            # Show transactions in chronological order for running balance
-            sorted_flows = sorted(cash_flows, key=lambda x: x['date'])
-
-            # Limit to most recent 100 transactions for PDF size
-            display_flows = sorted_flows[-100:] if len(sorted_flows) > 100 else sorted_flows
-
-            for cf in display_flows:
-                amount = cf['amount']
-                running_balance += amount
-
-                # Format amount based on type
-                cf_type_str = str(cf['type'])
-                is_capital_call = 'CAPITAL_CALL' in cf_type_str.upper() or 'Capital Call' in cf_type_str
-                amount_display = self._format_currency(abs(amount))
-                if is_capital_call and amount < 0:
-                    amount_display += ' (call)'
-
-                detail_table_data.append([
-                    cf['date'].strftime('%Y-%m-%d'),
-                    cf['investment_name'][:30] + '...' if len(cf['investment_name']) > 30 else cf['investment_name'],
-                    self._format_cf_type(cf['type']),
-                    amount_display,
-                    self._format_currency(running_balance)
-                ])
+        # Detailed transaction listing (every transaction, after the grouped summary if any)
+        elements.append(Paragraph("Transaction Details", self.styles['SectionHeading']))
+
+        detail_rows = []
+        running_balance = 0
+        # Show transactions in chronological order for running balance
+        for cf in sorted(cash_flows, key=lambda x: x['date']):
+            amount = cf['amount']
+            running_balance += amount
+
+            # Format amount based on type
+            cf_type_str = str(cf['type'])
+            is_capital_call = 'CAPITAL_CALL' in cf_type_str.upper() or 'Capital Call' in cf_type_str
+            amount_display = self._format_currency(abs(amount))
+            if is_capital_call and amount < 0:
+                amount_display += ' (call)'
+
+            detail_rows.append([
+                cf['date'].strftime('%Y-%m-%d'),
+                cf['investment_name'][:30] + '...' if len(cf['investment_name']) > 30 else cf['investment_name'],
+                self._format_cf_type(cf['type']),
+                amount_display,
+                self._format_currency(running_balance)
+            ])
 
-            detail_table = Table(detail_table_data, colWidths=[0.9*inch, 2.5*inch, 1.3*inch, 1.5*inch, 1.3*inch])
-            detail_table.setStyle(TableStyle([
-                # Header styling
-                ('BACKGROUND', (0, 0), (-1, 0), TABLE_HEADER),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 9),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                ('TOPPADDING', (0, 0), (-1, 0), 10),
-
-                # Data rows styling
-                ('FONTNAME', (0, 1), (-1, -1), 'Helvetica'),
-                ('FONTSIZE', (0, 1), (-1, -1), 8),
-                ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
-                ('ALIGN', (0, 1), (1, -1), 'LEFT'),
-                ('TOPPADDING', (0, 1), (-1, -1), 6),
-                ('BOTTOMPADDING', (0, 1), (-1, -1), 6),
-
-                # Alternating row colors
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, TABLE_ALT_ROW]),
-
-                # Grid
-                ('GRID', (0, 0), (-1, -1), 0.5, colors.grey),
-            ]))
-            elements.append(detail_table)
-
-            if len(cash_flows) > 100:
-                elements.append(Spacer(1, 0.2 * inch))
-                elements.append(Paragraph(
-                    f"<i>Note: Showing most recent 100 of {len(cash_flows)} transactions</i>",
-                    self.styles['Normal']
-                ))
+        elements.append(self._create_data_table(
+            ["Date", "Investment", "Type", "Amount", "Balance"],
+            detail_rows,
+            [0.9*inch, 2.5*inch, 1.3*inch, 1.5*inch, 1.3*inch],
+            DETAIL_TABLE
+        ))
 
         return self.build_pdf(elements)
 
+    def generate_from_dataset(self, dataset: ReportDataset, start_date: date, end_date: date,
+                              cash_flow_types: Optional[List[CashFlowType]] = None,
+                              group_by: str = "none") -> BytesIO:
+        """Generate Cash Flow Activity Report from a precomputed dataset (as of ``end_date``)"""
+        flows = dataset.flows
+        flows = flows[flows['date'] >= start_date]
+        if cash_flow_types:
+            flows = flows[flows['type'].isin(cash_flow_types)]
+        flows = flows.sort_values('date', ascending=False, kind='stable')
+
+        cash_flows = []
+        for investment_id, cf_date, cf_type, amount, notes in flows.itertuples(index=False, name=None):
+            position = dataset.positions[investment_id]
+            cash_flows.append({
+                'date': cf_date,
+                'investment_name': position.name,
+                'investment_id': investment_id,
+                'entity_name': position.entity_name,
+                'entity_id': position.entity_id,
+                'asset_class': format_asset_class(position.asset_class) if position.asset_class else "Other",
+                'type': cf_type,
+                'amount': amount,
+                'notes': notes
+            })
+
+        total_calls = float(flows.loc[flows['type'].isin(OUTFLOW_TYPES), 'amount'].abs().sum())
+        total_distributions = float(flows.loc[flows['type'].isin(INFLOW_TYPES), 'amount'].abs().sum())
+
+        # Group data if requested
+        grouped_data = None
+        if group_by != 'none':
+            key_funcs = {
+                'investment': lambda cf: cf['investment_name'],
+                'entity': lambda cf: cf['entity_name'] or 'No Entity',
+                'asset_class': lambda cf: cf['asset_class'],
+                'month': lambda cf: cf['date'].strftime('%Y-%m'),
+                'quarter': lambda cf: f"{cf['date'].year}-Q{(cf['date'].month - 1) // 3 + 1}",
+            }
+            key_func = key_funcs.get(group_by)
+            if key_func is not None:
+                groups = {}
+                for cf in cash_flows:
+                    key = key_func(cf)
+                    group = groups.setdefault(key, {'name': key, 'calls': 0, 'distributions': 0, 'net': 0, 'count': 0})
+                    if cf['type'] in OUTFLOW_TYPES:
+                        group['calls'] += abs(cf['amount'])
+                    elif cf['type'] in INFLOW_TYPES:
+                        group['distributions'] += abs(cf['amount'])
+                    group['net'] = group['distributions'] - group['calls']
+                    group['count'] += 1
+                grouped_data = sorted(groups.values(), key=lambda x: abs(x['net']), reverse=True)
+            else:
+                grouped_data = []
+
+        return self.generate(
+            cash_flows=cash_flows,
+            grouped_data=grouped_data,
+            group_by=group_by,
+            start_date=start_date,
+            end_date=end_date,
+            summary_stats={
+                'total_calls': total_calls,
+                'total_distributions': total_distributions,
+                'net_cash_flow': total_distributions - total_calls,
+                'transaction_count': len(cash_flows)
+            }
+        )
+
     def _format_group_by(self, group_by: str) -> str:
         """Format group_by value for display"""
         mapping = {
@@ -590,3 +823,14 @@ class CashFlowActivityReport(ReportGenerator):
         """Format cash flow type for display"""
         # cf_type comes as enum value like "Capital Call"
         return str(cf_type)
+
+
+def render_report(report_class: type, tenant_name: str, dataset: ReportDataset, **options) -> bytes:
+    """
+    Render one report to PDF bytes.
+
+    Module-level so the reports router can run it in the CPU worker pool
+    (app.executors.run_cpu_bound); ``options`` go to generate_from_dataset.
+    """
+    report_gen = report_class(tenant_name=tenant_name)
+    return report_gen.generate_from_dataset(dataset, **options).getvalue()
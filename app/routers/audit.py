@@ -0,0 +1,108 @@
+"""
+Tenant-aware audit endpoints served from the activity_log table
+
+Every query is a single indexed range scan over (tenant|user|investment, occurred_at)
+with keyset pagination: pass the returned ``next_cursor`` back as ``cursor``.
+"""
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+from typing import Optional
+from datetime import datetime, timedelta
+
+from ..database import get_db
+from ..auth import require_manager
+from ..models import User, Investment
+from .. import activity_log, crud
+
+router = APIRouter(prefix="/api/audit", tags=["Audit"])
+
+
+def _page(db: Session, limit: int, cursor: Optional[str], **scope) -> dict:
+    try:
+        activity, next_cursor = activity_log.get_activity_page(db, limit=limit, cursor=cursor, **scope)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return {"activity": activity, "next_cursor": next_cursor}
+
+
+@router.get("/activity")
+def get_tenant_activity(
+    days: int = Query(30, ge=1, le=3650, description="Number of days to look back"),
+    user_id: Optional[int] = Query(None, description="Only activity by this user"),
+    record_type: Optional[str] = Query(None, description="Entity, Investment, CashFlow or Valuation"),
+    limit: int = Query(100, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: User = Depends(require_manager),
+    db: Session = Depends(get_db)
+):
+    """Keyset-paginated activity feed for the current tenant"""
+    since = datetime.utcnow() - timedelta(days=days)
+    return _page(
+        db, limit, cursor,
+        tenant_id=current_user.tenant_id, user_id=user_id, record_type=record_type, since=since
+    )
+
+
+@router.get("/user/{user_id}")
+def get_user_activity(
+    user_id: int,
+    days: int = Query(30, ge=1, le=3650, description="Number of days to look back"),
+    limit: int = Query(50, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: User = Depends(require_manager),
+    db: Session = Depends(get_db)
+):
+    """Activity summary and feed for one user in the current tenant"""
+    since = datetime.utcnow() - timedelta(days=days)
+    scope = dict(tenant_id=current_user.tenant_id, user_id=user_id, since=since)
+
+    counts = activity_log.count_activity(db, **scope)
+    response = _page(db, limit, cursor, **scope)
+    response.update({
+        "user_id": user_id,
+        "period_days": days,
+        "summary": {f"{record_type}.{action}": count for (record_type, action), count in counts.items()},
+        "total_actions": sum(counts.values())
+    })
+    return response
+
+
+@router.get("/investment/{investment_id}")
+def get_investment_audit_trail(
+    investment_id: int,
+    days: int = Query(90, ge=1, le=3650, description="Number of days to look back"),
+    limit: int = Query(200, ge=1, le=1000, description="Page size"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    current_user: User = Depends(require_manager),
+    db: Session = Depends(get_db)
+):
+    """Change history for an investment and its cash flows and valuations"""
+    investment = db.query(Investment).filter(
+        Investment.id == investment_id,
+        Investment.tenant_id == current_user.tenant_id
+    ).first()
+    if not investment:
+        raise HTTPException(status_code=404, detail="Investment not found")
+
+    since = datetime.utcnow() - timedelta(days=days)
+    response = _page(
+        db, limit, cursor,
+        tenant_id=current_user.tenant_id, investment_id=investment_id, since=since
+    )
+    response.update({
+        "investment_id": investment_id,
+        "investment_name": investment.name,
+        "period_days": days
+    })
+    return response
+
+
+@router.get("/system")
+def get_system_activity(
+    days: int = Query(7, ge=1, le=3650, description="Number of days to look back"),
+    current_user: User = Depends(require_manager),
+    db: Session = Depends(get_db)
+):
+    """Activity summary for the current tenant"""
+    return crud.get_system_activity_summary(db=db, days=days, tenant_id=current_user.tenant_id)
@@ -11,7 +11,7 @@ from ..database import get_db
 from ..auth import (
     authenticate_user, create_user_tokens, refresh_access_token,
     get_current_active_user, require_admin, require_manager,
-    get_tenant_context, verify_password, get_password_hash
+    get_tenant_context, verify_password, get_password_hash, invalidate_principal
 )
 from ..models import User, UserRole
 from ..schemas_auth.auth import (
@@ -29,7 +29,7 @@ security = HTTPBearer()
 # =============================================================================
 
 @router.post("/login", response_model=TokenResponse)
-async def login(
+def login(
     login_request: LoginRequest,
     db: Session = Depends(get_db)
 ):
@@ -69,7 +69,7 @@ async def login(
     )
 
 @router.post("/refresh", response_model=TokenResponse)
-async def refresh_token(
+def refresh_token(
     refresh_request: RefreshTokenRequest,
     db: Session = Depends(get_db)
 ):
@@ -117,7 +117,7 @@ async def refresh_token(
         )
 
 @router.post("/logout")
-async def logout(current_user: User = Depends(get_current_active_user)):
+def logout(current_user: User = Depends(get_current_active_user)):
     """Logout user (client should discard tokens)"""
     return {"message": "Successfully logged out"}
 
@@ -126,7 +126,7 @@ async def logout(current_user: User = Depends(get_current_active_user)):
 # =============================================================================
 
 @router.get("/profile", response_model=UserProfile)
-async def get_profile(
+def get_profile(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
@@ -153,7 +153,7 @@ async def get_profile(
     )
 
 @router.put("/profile", response_model=UserResponse)
-async def update_profile(
+def update_profile(
     profile_update: UpdateProfileRequest,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -178,7 +178,7 @@ async def update_profile(
     return UserResponse.model_validate(updated_user)
 
 @router.post("/change-password")
-async def change_password(
+def change_password(
     password_change: ChangePasswordRequest,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
@@ -194,6 +194,7 @@ async def change_password(
     # Update password
     current_user.hashed_password = get_password_hash(password_change.new_password)
     db.commit()
+    invalidate_principal(current_user.id, current_user.tenant_id)
 
     return {"message": "Password changed successfully"}
 
@@ -202,7 +203,7 @@ async def change_password(
 # =============================================================================
 
 @router.get("/users", response_model=UserListResponse)
-async def get_users(
+def get_users(
     skip: int = 0,
     limit: int = 100,
     active_only: bool = True,
@@ -225,7 +226,7 @@ async def get_users(
     )
 
 @router.post("/users", response_model=UserResponse)
-async def create_user(
+def create_user(
     user_create: UserCreate,
     current_user: User = Depends(require_manager),
     db: Session = Depends(get_db)
@@ -260,7 +261,7 @@ async def create_user(
     return UserResponse.model_validate(new_user)
 
 @router.get("/users/{user_id}", response_model=UserResponse)
-async def get_user(
+def get_user(
     user_id: int,
     current_user: User = Depends(require_manager),
     db: Session = Depends(get_db)
@@ -277,7 +278,7 @@ async def get_user(
     return UserResponse.model_validate(user)
 
 @router.put("/users/{user_id}", response_model=UserResponse)
-async def update_user(
+def update_user(
     user_id: int,
     user_update: UserUpdate,
     current_user: User = Depends(require_manager),
@@ -313,7 +314,7 @@ async def update_user(
     return UserResponse.model_validate(updated_user)
 
 @router.delete("/users/{user_id}")
-async def deactivate_user(
+def deactivate_user(
     user_id: int,
     current_user: User = Depends(require_admin),
     db: Session = Depends(get_db)
@@ -347,7 +348,7 @@ async def deactivate_user(
 # =============================================================================
 
 @router.get("/tenant/info")
-async def get_tenant_info(
+def get_tenant_info(
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
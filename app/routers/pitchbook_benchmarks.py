@@ -8,12 +8,11 @@ This module provides API endpoints for:
 - Querying benchmark data
 """
 
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, Query, Request
 from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional, Dict, Any
 import os
-import tempfile
 import io
 import csv
 import logging
@@ -21,11 +20,14 @@ from datetime import datetime, date
 
 logger = logging.getLogger(__name__)
 
-from app.database import get_db
-from app.services.pitchbook_importer import PitchBookImporter, PitchBookImportError
-from app.services.pdf_parser import PitchBookPDFParser, PDFParsingError
+from app.database import get_db, get_read_db
+from app.upload_streaming import spool_upload
+from app.executors import run_blocking, run_cpu_bound
+# The PDF parser and importer (pdfplumber, pandas) are imported inside the
+# import endpoints so they are not loaded on every worker start
+from app.services.benchmark_cache import benchmark_cache
 from app.models import PitchBookPerformanceByVintage, PitchBookQuarterlyReturns, PitchBookMultiplesQuantiles
-from pydantic import BaseModel
+from pydantic import BaseModel, TypeAdapter
 
 router = APIRouter(prefix="/api/pitchbook", tags=["PitchBook Benchmarks"])
 
@@ -108,12 +110,17 @@ class PDFPreviewData(BaseModel):
     quarterly_data: List[Dict[str, Any]] = []
     csv_preview: str = ""
 
+# Serializers for the cached benchmark responses
+_benchmark_data_adapter = TypeAdapter(List[BenchmarkData])
+_multiples_data_adapter = TypeAdapter(List[MultiplesData])
+_quarterly_returns_adapter = TypeAdapter(List[QuarterlyReturn])
+
 # =====================================================
 # TEMPLATE DOWNLOAD ENDPOINTS
 # =====================================================
 
 @router.get("/templates/performance-data", response_class=FileResponse)
-async def download_performance_template():
+def download_performance_template():
     """Download CSV template for performance data"""
     template_path = "/home/will/Tmux-Orchestrator/private-markets-tracker/docs/benchmarks/templates/pitchbook_performance_data_template.csv"
 
@@ -127,7 +134,7 @@ async def download_performance_template():
     )
 
 @router.get("/templates/quarterly-returns", response_class=FileResponse)
-async def download_quarterly_template():
+def download_quarterly_template():
     """Download CSV template for quarterly returns data"""
     template_path = "/home/will/Tmux-Orchestrator/private-markets-tracker/docs/benchmarks/templates/pitchbook_quarterly_returns_template.csv"
 
@@ -141,7 +148,7 @@ async def download_quarterly_template():
     )
 
 @router.get("/templates/complete", response_class=FileResponse)
-async def download_complete_template():
+def download_complete_template():
     """Download complete CSV template with both performance and quarterly data"""
     template_path = "/home/will/Tmux-Orchestrator/private-markets-tracker/docs/benchmarks/templates/pitchbook_complete_template_Q4_2024.csv"
 
@@ -155,7 +162,7 @@ async def download_complete_template():
     )
 
 @router.get("/templates/instructions", response_class=FileResponse)
-async def download_instructions():
+def download_instructions():
     """Download template instructions"""
     instructions_path = "/home/will/Tmux-Orchestrator/private-markets-tracker/docs/benchmarks/templates/README_Template_Instructions.md"
 
@@ -189,6 +196,7 @@ async def import_benchmark_data(
     Returns:
         Import results with statistics
     """
+    from app.services.pitchbook_importer import PitchBookImportError
 
     # Validate file type
     if not file.filename.endswith('.csv'):
@@ -207,15 +215,12 @@ async def import_benchmark_data(
 
     # Save uploaded file temporarily
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.csv') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Spool the upload to a temporary file block by block
+        temp_file_path = await spool_upload(file, suffix='.csv')
 
         # Import the data
-        importer = PitchBookImporter(db)
-        results = importer.import_from_csv(temp_file_path, import_type)
+        results = await run_blocking(_import_benchmark_csv, db, temp_file_path, import_type)
+        benchmark_cache.invalidate()
 
         # Clean up temporary file
         os.unlink(temp_file_path)
@@ -259,6 +264,11 @@ async def import_benchmark_data(
             detail=f"Import failed: {str(e)}"
         )
 
+def _import_benchmark_csv(db: Session, csv_path: str, import_type: str) -> Dict[str, Any]:
+    """Run a CSV import; called through run_blocking since it queries and commits"""
+    from app.services.pitchbook_importer import PitchBookImporter
+    return PitchBookImporter(db).import_from_csv(csv_path, import_type)
+
 @router.post("/validate", response_model=Dict[str, Any])
 async def validate_benchmark_data(
     file: UploadFile = File(...),
@@ -282,33 +292,11 @@ async def validate_benchmark_data(
         )
 
     try:
-        # Read file content
-        content = await file.read()
-
-        # Create temporary file for validation
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.csv') as temp_file:
-            temp_file.write(content.decode('utf-8'))
-            temp_file_path = temp_file.name
-
-        # Validate using the importer's validation logic
-        import pandas as pd
-        from app.services.pitchbook_importer import PitchBookDataValidator
-
-        df = pd.read_csv(temp_file_path, comment='#')
-        validator = PitchBookDataValidator()
-
-        # Determine data type and validate accordingly
-        validation_errors = []
-        data_type = "unknown"
+        # Spool the upload to a temporary file for validation
+        temp_file_path = await spool_upload(file, suffix='.csv')
 
-        if 'metric_code' in df.columns and 'vintage_year' in df.columns:
-            data_type = "performance"
-            validation_errors = validator.validate_performance_data(df)
-        elif 'quarter_year' in df.columns and 'quarter_date' in df.columns:
-            data_type = "quarterly"
-            validation_errors = validator.validate_quarterly_data(df)
-        else:
-            validation_errors = ["Could not determine data type. File must contain either performance or quarterly data columns."]
+        # Read and validate off the event loop
+        validation_errors, data_type, total_rows = await run_blocking(_validate_benchmark_csv, temp_file_path)
 
         # Clean up temporary file
         os.unlink(temp_file_path)
@@ -316,7 +304,7 @@ async def validate_benchmark_data(
         return {
             "valid": len(validation_errors) == 0,
             "data_type": data_type,
-            "total_rows": len(df),
+            "total_rows": total_rows,
             "validation_errors": validation_errors[:20],  # Limit to first 20 errors
             "error_count": len(validation_errors)
         }
@@ -334,6 +322,30 @@ async def validate_benchmark_data(
             detail=f"Validation failed: {str(e)}"
         )
 
+def _validate_benchmark_csv(csv_path: str):
+    """Validation errors, detected data type and row count of a benchmark CSV"""
+    # Validate using the importer's validation logic
+    import pandas as pd
+    from app.services.pitchbook_importer import PitchBookDataValidator
+
+    df = pd.read_csv(csv_path, comment='#')
+    validator = PitchBookDataValidator()
+
+    # Determine data type and validate accordingly
+    validation_errors = []
+    data_type = "unknown"
+
+    if 'metric_code' in df.columns and 'vintage_year' in df.columns:
+        data_type = "performance"
+        validation_errors = validator.validate_performance_data(df)
+    elif 'quarter_year' in df.columns and 'quarter_date' in df.columns:
+        data_type = "quarterly"
+        validation_errors = validator.validate_quarterly_data(df)
+    else:
+        validation_errors = ["Could not determine data type. File must contain either performance or quarterly data columns."]
+
+    return validation_errors, data_type, len(df)
+
 # =====================================================
 # PDF PROCESSING ENDPOINTS
 # =====================================================
@@ -355,6 +367,7 @@ async def upload_pdf_for_extraction(
     Returns:
         Extraction results with preview data
     """
+    from app.services.pdf_parser import PitchBookPDFParser, PDFParsingError
 
     # Validate file type
     if not file.filename.endswith('.pdf'):
@@ -365,15 +378,12 @@ async def upload_pdf_for_extraction(
 
     # Save uploaded file temporarily
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Spool the upload to a temporary file block by block
+        temp_file_path = await spool_upload(file, suffix='.pdf')
 
         # Extract data from PDF
         parser = PitchBookPDFParser()
-        extracted_data = parser.extract_data_from_pdf(temp_file_path, report_period)
+        extracted_data = await run_blocking(parser.extract_data_from_pdf, temp_file_path, report_period)
 
         # Clean up temporary file
         os.unlink(temp_file_path)
@@ -434,6 +444,7 @@ async def extract_pdf_preview(
     Returns:
         Preview of extracted data including CSV format
     """
+    from app.services.pdf_parser import PitchBookPDFParser, PDFParsingError
 
     if not file.filename.endswith('.pdf'):
         raise HTTPException(
@@ -442,15 +453,12 @@ async def extract_pdf_preview(
         )
 
     try:
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as temp_file:
-            content = await file.read()
-            temp_file.write(content)
-            temp_file_path = temp_file.name
+        # Spool the upload to a temporary file block by block
+        temp_file_path = await spool_upload(file, suffix='.pdf')
 
         # Extract data from PDF
         parser = PitchBookPDFParser()
-        extracted_data = parser.extract_data_from_pdf(temp_file_path, report_period)
+        extracted_data = await run_blocking(parser.extract_data_from_pdf, temp_file_path, report_period)
 
         # Generate CSV preview
         csv_content = parser.generate_csv_content(extracted_data)
@@ -513,6 +521,8 @@ async def import_from_pdf(
     Returns:
         Import results with statistics
     """
+    from app.services.pdf_parser import extract_pitchbook_pdf, PDFParsingError
+    from app.services.pitchbook_importer import PitchBookImportError
 
     # Validate file type
     if not file.filename.endswith('.pdf'):
@@ -530,11 +540,8 @@ async def import_from_pdf(
         )
 
     try:
-        # Create temporary files
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as pdf_temp_file:
-            content = await file.read()
-            pdf_temp_file.write(content)
-            pdf_temp_file_path = pdf_temp_file.name
+        # Spool the upload to a temporary file block by block
+        pdf_temp_file_path = await spool_upload(file, suffix='.pdf')
 
         # Save debug copy of PDF for analysis
         debug_pdf_path = "/tmp/uploaded_pdf_debug.pdf"
@@ -545,12 +552,12 @@ async def import_from_pdf(
         except Exception as debug_e:
             print(f"⚠️ Could not save debug PDF copy: {debug_e}")
 
-        # Extract comprehensive data from PDF using new method
-        parser = PitchBookPDFParser()
-        extracted_data = parser.extract_comprehensive_data_from_pdf(pdf_temp_file_path, report_period)
+        # Extract comprehensive data from PDF in a worker process (parsing is CPU-bound)
+        extracted_data = await run_cpu_bound(extract_pitchbook_pdf, pdf_temp_file_path, report_period)
 
         # Import directly into database using the new comprehensive data
-        results = await import_comprehensive_benchmark_data(extracted_data, import_type, db)
+        results = await run_blocking(import_comprehensive_benchmark_data, extracted_data, import_type, db)
+        benchmark_cache.invalidate()
 
         # Clean up temporary files
         os.unlink(pdf_temp_file_path)
@@ -613,6 +620,7 @@ async def validate_pdf_data(
     Returns:
         Validation results
     """
+    from app.services.pdf_parser import PitchBookPDFParser, PDFParsingError
 
     if not file.filename.endswith('.pdf'):
         raise HTTPException(
@@ -621,15 +629,12 @@ async def validate_pdf_data(
         )
 
     try:
-        # Create temporary files
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.pdf') as pdf_temp_file:
-            content = await file.read()
-            pdf_temp_file.write(content)
-            pdf_temp_file_path = pdf_temp_file.name
+        # Spool the upload to a temporary file block by block
+        pdf_temp_file_path = await spool_upload(file, suffix='.pdf')
 
         # Extract data from PDF
         parser = PitchBookPDFParser()
-        extracted_data = parser.extract_data_from_pdf(pdf_temp_file_path, report_period)
+        extracted_data = await run_blocking(parser.extract_data_from_pdf, pdf_temp_file_path, report_period)
 
         # Convert to DataFrames for validation
         performance_df, quarterly_df = parser.convert_to_csv_format(extracted_data)
@@ -707,16 +712,20 @@ async def validate_pdf_data(
 # =====================================================
 
 @router.get("/performance-data", response_model=List[BenchmarkData])
-async def get_performance_data(
+def get_performance_data(
+    request: Request,
     asset_class: Optional[str] = Query(None, description="Filter by asset class"),
     metric_code: Optional[str] = Query(None, description="Filter by metric code"),
     vintage_year: Optional[int] = Query(None, description="Filter by vintage year"),
     report_period: Optional[str] = Query(None, description="Filter by report period"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get performance benchmark data with optional filters
 
+    Responses are served from the benchmark reference cache with an ETag;
+    a matching If-None-Match returns 304 Not Modified.
+
     Args:
         asset_class: Filter by asset class
         metric_code: Filter by metric code (IRR, PME, TVPI, etc.)
@@ -727,58 +736,62 @@ async def get_performance_data(
     Returns:
         List of benchmark performance data
     """
-
-    # Query the PitchBook performance database
     try:
-        query = db.query(PitchBookPerformanceByVintage)
-
-        # Apply filters
-        if asset_class:
-            query = query.filter(PitchBookPerformanceByVintage.asset_class == asset_class)
-        if vintage_year:
-            query = query.filter(PitchBookPerformanceByVintage.vintage_year == vintage_year)
-        if metric_code:
-            # For performance data, we default to IRR metrics unless specified
-            if metric_code.upper() == "IRR":
-                # IRR data comes from the performance table
-                pass  # Already querying the right table
-
-        # Order by vintage year descending (newest first)
-        query = query.order_by(PitchBookPerformanceByVintage.vintage_year.desc())
-
-        results = query.all()
-
-        # Convert to BenchmarkData format
-        benchmark_data = []
-        for record in results:
-            benchmark_data.append(BenchmarkData(
-                asset_class=record.asset_class,
-                metric_code="IRR",  # This table contains IRR data
-                vintage_year=record.vintage_year,
-                top_quartile_value=record.top_quartile,
-                median_value=record.median_irr,
-                bottom_quartile_value=record.bottom_quartile,
-                pooled_irr=record.pooled_irr,
-                equal_weighted_pooled_irr=record.equal_weighted_pooled_irr,
-                sample_size=record.number_of_funds,
-                methodology_notes=f"Data as of {record.quarter_end_date}" if record.quarter_end_date else None
-            ))
-
-        return benchmark_data
+        # IRR data comes from the performance table whatever the metric code
+        return benchmark_cache.response(
+            request, db, ('performance-data', asset_class, vintage_year),
+            lambda: _benchmark_data_adapter.dump_json(_query_performance_data(db, asset_class, vintage_year))
+        )
 
     except Exception as e:
         logger.error(f"Error querying PitchBook performance data: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+def _query_performance_data(db: Session, asset_class: Optional[str], vintage_year: Optional[int]) -> List[BenchmarkData]:
+    """Performance benchmark rows as BenchmarkData, newest vintage first"""
+    query = db.query(PitchBookPerformanceByVintage)
+
+    # Apply filters
+    if asset_class:
+        query = query.filter(PitchBookPerformanceByVintage.asset_class == asset_class)
+    if vintage_year:
+        query = query.filter(PitchBookPerformanceByVintage.vintage_year == vintage_year)
+
+    # Order by vintage year descending (newest first)
+    query = query.order_by(PitchBookPerformanceByVintage.vintage_year.desc())
+
+    results = query.all()
+
+    # Convert to BenchmarkData format
+    benchmark_data = []
+    for record in results:
+        benchmark_data.append(BenchmarkData(
+            asset_class=record.asset_class,
+            metric_code="IRR",  # This table contains IRR data
+            vintage_year=record.vintage_year,
+            top_quartile_value=record.top_quartile,
+            median_value=record.median_irr,
+            bottom_quartile_value=record.bottom_quartile,
+            pooled_irr=record.pooled_irr,
+            equal_weighted_pooled_irr=record.equal_weighted_pooled_irr,
+            sample_size=record.number_of_funds,
+            methodology_notes=f"Data as of {record.quarter_end_date}" if record.quarter_end_date else None
+        ))
+
+    return benchmark_data
+
 @router.get("/multiples-data", response_model=List[MultiplesData])
-async def get_multiples_data(
+def get_multiples_data(
+    request: Request,
     asset_class: Optional[str] = Query(None, description="Filter by asset class"),
     vintage_year: Optional[int] = Query(None, description="Filter by vintage year"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get multiples benchmark data (TVPI, DPI, RVPI quartiles) with optional filters
 
+    Served from the benchmark reference cache with an ETag, like /performance-data.
+
     Args:
         asset_class: Filter by asset class
         vintage_year: Filter by vintage year
@@ -788,57 +801,67 @@ async def get_multiples_data(
         List of multiples benchmark data
     """
     try:
-        query = db.query(PitchBookMultiplesQuantiles)
-
-        # Apply filters
-        if asset_class:
-            query = query.filter(PitchBookMultiplesQuantiles.asset_class == asset_class)
-        if vintage_year:
-            query = query.filter(PitchBookMultiplesQuantiles.vintage_year == vintage_year)
-
-        # Order by vintage year descending
-        query = query.order_by(PitchBookMultiplesQuantiles.vintage_year.desc())
-        results = query.all()
-
-        # Convert to MultiplesData format
-        multiples_data = []
-        for record in results:
-            multiples_data.append(MultiplesData(
-                asset_class=record.asset_class,
-                vintage_year=record.vintage_year,
-                # TVPI quartiles
-                tvpi_top_quartile=record.tvpi_top_quartile,
-                tvpi_median=record.tvpi_median,
-                tvpi_bottom_quartile=record.tvpi_bottom_quartile,
-                tvpi_top_decile=record.tvpi_top_decile,
-                tvpi_bottom_decile=record.tvpi_bottom_decile,
-                # DPI quartiles
-                dpi_top_quartile=record.dpi_top_quartile,
-                dpi_median=record.dpi_median,
-                dpi_bottom_quartile=record.dpi_bottom_quartile,
-                dpi_top_decile=record.dpi_top_decile,
-                dpi_bottom_decile=record.dpi_bottom_decile,
-                # Fund count
-                fund_count=record.number_of_funds
-            ))
-
-        return multiples_data
+        return benchmark_cache.response(
+            request, db, ('multiples-data', asset_class, vintage_year),
+            lambda: _multiples_data_adapter.dump_json(_query_multiples_data(db, asset_class, vintage_year))
+        )
 
     except Exception as e:
         logger.error(f"Error querying PitchBook multiples data: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+def _query_multiples_data(db: Session, asset_class: Optional[str], vintage_year: Optional[int]) -> List[MultiplesData]:
+    """Multiples quantile rows as MultiplesData, newest vintage first"""
+    query = db.query(PitchBookMultiplesQuantiles)
+
+    # Apply filters
+    if asset_class:
+        query = query.filter(PitchBookMultiplesQuantiles.asset_class == asset_class)
+    if vintage_year:
+        query = query.filter(PitchBookMultiplesQuantiles.vintage_year == vintage_year)
+
+    # Order by vintage year descending
+    query = query.order_by(PitchBookMultiplesQuantiles.vintage_year.desc())
+    results = query.all()
+
+    # Convert to MultiplesData format
+    multiples_data = []
+    for record in results:
+        multiples_data.append(MultiplesData(
+            asset_class=record.asset_class,
+            vintage_year=record.vintage_year,
+            # TVPI quartiles
+            tvpi_top_quartile=record.tvpi_top_quartile,
+            tvpi_median=record.tvpi_median,
+            tvpi_bottom_quartile=record.tvpi_bottom_quartile,
+            tvpi_top_decile=record.tvpi_top_decile,
+            tvpi_bottom_decile=record.tvpi_bottom_decile,
+            # DPI quartiles
+            dpi_top_quartile=record.dpi_top_quartile,
+            dpi_median=record.dpi_median,
+            dpi_bottom_quartile=record.dpi_bottom_quartile,
+            dpi_top_decile=record.dpi_top_decile,
+            dpi_bottom_decile=record.dpi_bottom_decile,
+            # Fund count
+            fund_count=record.number_of_funds
+        ))
+
+    return multiples_data
+
 @router.get("/quarterly-returns", response_model=List[QuarterlyReturn])
-async def get_quarterly_returns(
+def get_quarterly_returns(
+    request: Request,
     asset_class: Optional[str] = Query(None, description="Filter by asset class"),
     start_date: Optional[date] = Query(None, description="Filter by start date"),
     end_date: Optional[date] = Query(None, description="Filter by end date"),
     report_period: Optional[str] = Query(None, description="Filter by report period"),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Get quarterly returns data with optional filters
 
+    Served from the benchmark reference cache with an ETag, like /performance-data.
+
     Args:
         asset_class: Filter by asset class
         start_date: Filter returns from this date
@@ -849,53 +872,59 @@ async def get_quarterly_returns(
     Returns:
         List of quarterly returns data
     """
-
-    # Query the PitchBookQuarterlyReturns table which contains 665 records
     try:
-        query = db.query(PitchBookQuarterlyReturns)
-
-        # Apply filters
-        if asset_class:
-            query = query.filter(PitchBookQuarterlyReturns.asset_class == asset_class)
-        if start_date:
-            query = query.filter(PitchBookQuarterlyReturns.quarter_end_date >= start_date)
-        if end_date:
-            query = query.filter(PitchBookQuarterlyReturns.quarter_end_date <= end_date)
-
-        # Order by date and asset class for consistent results
-        query = query.order_by(
-            PitchBookQuarterlyReturns.quarter_end_date.desc(),
-            PitchBookQuarterlyReturns.asset_class
+        return benchmark_cache.response(
+            request, db, ('quarterly-returns', asset_class, start_date, end_date),
+            lambda: _quarterly_returns_adapter.dump_json(_query_quarterly_returns(db, asset_class, start_date, end_date))
         )
 
-        results = query.all()
-
-        quarterly_returns = []
-        for record in results:
-            quarterly_returns.append(QuarterlyReturn(
-                asset_class=record.asset_class,
-                quarter_year=record.time_period,  # Use time_period field (e.g., "2024-Q1")
-                quarter_date=record.quarter_end_date,
-                # Since PitchBookQuarterlyReturns stores single return values, not quartiles,
-                # we'll put the single return value in the median field and leave quartiles as null
-                top_quartile_return=None,
-                median_return=float(record.return_value) if record.return_value else None,
-                bottom_quartile_return=None,
-                sample_size=None  # Not available in this table
-            ))
-
-        logger.info(f"Returning {len(quarterly_returns)} quarterly return records")
-        return quarterly_returns
-
     except Exception as e:
         logger.error(f"Failed to query quarterly returns: {e}")
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
+def _query_quarterly_returns(db: Session, asset_class: Optional[str], start_date: Optional[date],
+                             end_date: Optional[date]) -> List[QuarterlyReturn]:
+    """Quarterly return rows as QuarterlyReturn, latest quarter first"""
+    query = db.query(PitchBookQuarterlyReturns)
+
+    # Apply filters
+    if asset_class:
+        query = query.filter(PitchBookQuarterlyReturns.asset_class == asset_class)
+    if start_date:
+        query = query.filter(PitchBookQuarterlyReturns.quarter_end_date >= start_date)
+    if end_date:
+        query = query.filter(PitchBookQuarterlyReturns.quarter_end_date <= end_date)
+
+    # Order by date and asset class for consistent results
+    query = query.order_by(
+        PitchBookQuarterlyReturns.quarter_end_date.desc(),
+        PitchBookQuarterlyReturns.asset_class
+    )
+
+    results = query.all()
+
+    quarterly_returns = []
+    for record in results:
+        quarterly_returns.append(QuarterlyReturn(
+            asset_class=record.asset_class,
+            quarter_year=record.time_period,  # Use time_period field (e.g., "2024-Q1")
+            quarter_date=record.quarter_end_date,
+            # Since PitchBookQuarterlyReturns stores single return values, not quartiles,
+            # we'll put the single return value in the median field and leave quartiles as null
+            top_quartile_return=None,
+            median_return=float(record.return_value) if record.return_value else None,
+            bottom_quartile_return=None,
+            sample_size=None  # Not available in this table
+        ))
+
+    logger.info(f"Serialized {len(quarterly_returns)} quarterly return records")
+    return quarterly_returns
+
 # =====================================================
 # COMPREHENSIVE IMPORT FUNCTIONS
 # =====================================================
 
-async def import_comprehensive_benchmark_data(extracted_data: Dict[str, Any], import_type: str, db: Session) -> Dict[str, Any]:
+def import_comprehensive_benchmark_data(extracted_data: Dict[str, Any], import_type: str, db: Session) -> Dict[str, Any]:
     """
     Import comprehensive benchmark data into all 4 table types
 
@@ -1072,7 +1101,7 @@ async def import_comprehensive_benchmark_data(extracted_data: Dict[str, Any], im
 # =====================================================
 
 @router.get("/import-history", response_model=List[ImportLog])
-async def get_import_history(
+def get_import_history(
     limit: int = Query(default=50, le=200, description="Maximum number of records to return"),
     status: Optional[str] = Query(None, description="Filter by import status"),
     db: Session = Depends(get_db)
@@ -1111,7 +1140,7 @@ async def get_import_history(
     return mock_data
 
 @router.get("/import-log/{import_id}", response_model=ImportLog)
-async def get_import_log(
+def get_import_log(
     import_id: int,
     db: Session = Depends(get_db)
 ):
@@ -1148,7 +1177,7 @@ async def get_import_log(
 # =====================================================
 
 @router.get("/asset-classes")
-async def get_asset_classes():
+def get_asset_classes():
     """Get list of valid asset classes"""
     return {
         "asset_classes": [
@@ -1163,7 +1192,7 @@ async def get_asset_classes():
     }
 
 @router.get("/metric-codes")
-async def get_metric_codes():
+def get_metric_codes():
     """Get list of valid metric codes"""
     return {
         "metric_codes": [
@@ -1176,7 +1205,7 @@ async def get_metric_codes():
     }
 
 @router.get("/reports")
-async def get_reports(db: Session = Depends(get_db)):
+def get_reports(db: Session = Depends(get_db)):
     """Get list of available PitchBook reports"""
     # This would query the pitchbook_reports table
     return {
@@ -1193,7 +1222,7 @@ async def get_reports(db: Session = Depends(get_db)):
     }
 
 @router.get("/health")
-async def health_check():
+def health_check():
     """Health check endpoint"""
     return {
         "status": "healthy",
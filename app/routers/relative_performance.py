@@ -14,10 +14,11 @@ from typing import List, Optional, Union, Dict, Any
 from datetime import date, datetime
 import logging
 
-from app.database import get_db
+from app.database import get_read_db
 from app.auth import get_current_active_user
 from app.models import User
 from app.relative_performance_service import get_relative_performance_service
+from app.json_responses import FastJSONResponse, chart_payload, series_fields, LAYOUT_PATTERN
 from pydantic import BaseModel
 
 logger = logging.getLogger(__name__)
@@ -54,8 +55,11 @@ class BenchmarkResponse(BaseModel):
     category: str
     description: Optional[str] = None
 
+POINT_FIELDS = series_fields(PerformanceDataPoint)
+LAYOUT_DESCRIPTION = "rows (list of points) or columns (one array per field for each series)"
+
 @router.get("/benchmarks", response_model=List[BenchmarkResponse])
-def get_available_benchmarks(db: Session = Depends(get_db)):
+def get_available_benchmarks(db: Session = Depends(get_read_db)):
     """Get list of available benchmarks for comparison"""
     try:
         service = get_relative_performance_service(db)
@@ -73,8 +77,9 @@ def compare_performance(
     start_date: Optional[date] = Query(None, description="Start date for comparison (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date for comparison (YYYY-MM-DD)"),
     view_mode: str = Query("absolute", description="Performance view mode: 'absolute' or 'rebased'"),
+    layout: str = Query("rows", pattern=LAYOUT_PATTERN, description=LAYOUT_DESCRIPTION),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Compare investment/portfolio performance against selected benchmarks
@@ -84,6 +89,7 @@ def compare_performance(
     - **benchmark_ids**: Comma-separated list of benchmark IDs to compare against
     - **start_date**: Optional start date for comparison period
     - **end_date**: Optional end date for comparison period
+    - **layout**: 'rows' (default) or 'columns' for one array per field in each series
     """
     try:
         # Validate selection_type
@@ -152,7 +158,12 @@ def compare_performance(
         if "error" in result:
             raise HTTPException(status_code=404, detail=result["error"])
 
-        return result
+        comparison = {key: result[key] for key in ComparisonResult.model_fields}
+        return FastJSONResponse(chart_payload(
+            comparison,
+            {"investment_performance": POINT_FIELDS, "benchmark_performances": POINT_FIELDS},
+            layout
+        ))
 
     except HTTPException:
         raise
@@ -163,7 +174,7 @@ def compare_performance(
 @router.get("/investments")
 def get_investments_and_asset_classes(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get list of investments and asset classes for selection dropdowns"""
     try:
@@ -226,8 +237,9 @@ def get_investment_tvpi_progression(
     investment_id: int,
     start_date: Optional[date] = Query(None, description="Start date for progression (YYYY-MM-DD)"),
     end_date: Optional[date] = Query(None, description="End date for progression (YYYY-MM-DD)"),
+    layout: str = Query("rows", pattern=LAYOUT_PATTERN, description=LAYOUT_DESCRIPTION),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get TVPI progression over time for a specific investment"""
     try:
@@ -244,14 +256,14 @@ def get_investment_tvpi_progression(
                 detail=f"No TVPI progression data found for investment {investment_id}"
             )
 
-        return {
+        return FastJSONResponse(chart_payload({
             "investment_id": investment_id,
             "tvpi_progression": progression,
             "date_range": {
                 "start": progression[0]["date"] if progression else None,
                 "end": progression[-1]["date"] if progression else None
             }
-        }
+        }, {"tvpi_progression": None}, layout))
 
     except HTTPException:
         raise
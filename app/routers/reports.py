@@ -3,47 +3,95 @@ Reports API Router
 
 Provides tenant-scoped PDF report generation endpoints for portfolio analytics.
 All reports are isolated by tenant and require authentication.
+
+The GET endpoints render through the report job subsystem (app.report_jobs)
+and wait for the PDF, so repeated requests are served from the report cache.
+The /jobs and /batches endpoints submit without waiting and return download
+links once the PDFs are ready.
 """
 
 from fastapi import APIRouter, Depends, HTTPException, Query
-from fastapi.responses import StreamingResponse
+from fastapi.responses import FileResponse
+from pydantic import BaseModel
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Optional
-from datetime import date, datetime
+from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta
+import logging
 
-from ..database import get_db
+from ..database import get_read_db
 from ..auth import get_current_active_user
-from ..models import User, Investment as InvestmentModel, Entity as EntityModel, CashFlow, Valuation, InvestmentStatus, CashFlowType
-from ..report_service import PortfolioSummaryReport, HoldingsReport, EntityPerformanceReport, CashFlowActivityReport
-from ..performance import calculate_irr, calculate_investment_performance, CashFlowEvent
+from ..models import User, CashFlowType
+from ..executors import run_blocking
+from ..report_jobs import report_jobs, ReportSpec, month_end_entity_ids
 
-router = APIRouter(prefix="/api/reports", tags=["Reports"])
+logger = logging.getLogger(__name__)
 
+router = APIRouter(prefix="/api/reports", tags=["Reports"])
 
-def format_asset_class(asset_class: str) -> str:
-    """Convert database asset class values to formal display names."""
-    asset_class_map = {
-        'PRIVATE_EQUITY': 'Private Equity',
-        'VENTURE_CAPITAL': 'Venture Capital',
-        'REAL_ESTATE': 'Real Estate',
-        'REAL_ASSETS': 'Real Assets',
-        'INFRASTRUCTURE': 'Infrastructure',
-        'PRIVATE_DEBT': 'Private Debt',
-        'HEDGE_FUNDS': 'Hedge Funds',
-        'NATURAL_RESOURCES': 'Natural Resources',
-        'CO_INVESTMENTS': 'Co-Investments',
-        'SECONDARIES': 'Secondaries',
-        'Unknown': 'Other/Unknown'
-    }
-    return asset_class_map.get(asset_class, asset_class.replace('_', ' ').title())
+# Map frontend cash flow type values to backend enum values
+CASH_FLOW_TYPE_MAPPING = {
+    'CAPITAL_CALL': CashFlowType.CAPITAL_CALL,
+    'DISTRIBUTION': CashFlowType.DISTRIBUTION,
+    'RETURN_OF_CAPITAL': CashFlowType.RETURN_OF_PRINCIPAL,
+    'RETURN_OF_PRINCIPAL': CashFlowType.RETURN_OF_PRINCIPAL,
+    'INCOME': CashFlowType.YIELD,
+    'YIELD': CashFlowType.YIELD,
+    'RECALLABLE_RETURN': CashFlowType.DISTRIBUTION,  # Treat as distribution
+    'FEE': CashFlowType.FEES,
+    'FEES': CashFlowType.FEES,
+    'OTHER': CashFlowType.CONTRIBUTION
+}
+
+
+class ReportJobRequest(BaseModel):
+    report_type: str  # portfolio-summary, holdings, entity-performance, cash-flow-activity
+    as_of_date: Optional[date] = None
+    entity_id: Optional[int] = None  # restrict the report to one entity's holdings
+    group_by: Optional[str] = None
+    status_filter: Optional[str] = None  # holdings
+    start_date: Optional[date] = None  # cash-flow-activity; omitted means since inception
+    cash_flow_types: Optional[List[str]] = None  # cash-flow-activity
+
+
+class ReportBatchRequest(BaseModel):
+    as_of_date: Optional[date] = None  # defaults to the last month end
+    report_types: List[str] = ["holdings"]
+    per_entity: bool = True  # one report per entity instead of one for the portfolio
+    family_members_only: bool = True  # entities with an active family member
+    entity_ids: Optional[List[int]] = None  # explicit entities instead of the family member lookup
+
+
+def _parse_cash_flow_types(values: List[str]) -> List[CashFlowType]:
+    return [CASH_FLOW_TYPE_MAPPING.get(value.strip().upper().replace(' ', '_'), CashFlowType.CONTRIBUTION)
+            for value in values if value.strip()]
+
+
+def _job_spec(request: ReportJobRequest, as_of_date: date, entity_id: Optional[int]) -> ReportSpec:
+    options: Dict[str, Any] = {}
+    if request.report_type == 'holdings':
+        options = {'grouped_by': request.group_by, 'status_filter': request.status_filter}
+    elif request.report_type == 'cash-flow-activity':
+        options = {'start_date': request.start_date, 'end_date': as_of_date, 'group_by': request.group_by,
+                   'cash_flow_types': _parse_cash_flow_types(request.cash_flow_types or [])}
+    return ReportSpec.create(request.report_type, as_of_date, entity_id, **options)
+
+
+async def _render(db: Session, user: User, spec: ReportSpec, filename: str) -> FileResponse:
+    """Submit a report job, wait for it and return the cached PDF"""
+    job = await report_jobs.wait(await report_jobs.submit(db, user.tenant_id, spec))
+    if job.status != 'complete':
+        raise RuntimeError(job.error or "report job failed")
+    path = report_jobs.cache.get(job.tenant_id, job.cache_key)
+    if path is None:
+        raise RuntimeError("rendered report was evicted before download")
+    return FileResponse(path, media_type="application/pdf", filename=filename)
 
 
 @router.get("/portfolio-summary")
 async def generate_portfolio_summary_report(
     as_of_date: Optional[str] = Query(None, description="Report as-of date (YYYY-MM-DD)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Generate Portfolio Summary Report (PDF)
@@ -61,162 +109,15 @@ async def generate_portfolio_summary_report(
         if as_of_date:
             report_date = datetime.strptime(as_of_date, "%Y-%m-%d").date()
 
-        # Get all investments for tenant
-        investments = db.query(InvestmentModel).filter(
-            InvestmentModel.tenant_id == current_user.tenant_id
-        ).all()
-
-        # Calculate summary statistics
-        total_commitments = 0
-        total_called = 0
-        total_distributions = 0
-        total_nav = 0
-        active_count = 0
-        realized_count = 0
-        all_cash_flows = []
-
-        # Asset allocation tracking
-        asset_allocation = {}
-        vintage_analysis = {}
-
-        for inv in investments:
-            commitment = inv.commitment_amount or 0
-            total_commitments += commitment
-
-            # Count by status
-            if inv.status == InvestmentStatus.ACTIVE:
-                active_count += 1
-            elif inv.status == InvestmentStatus.REALIZED:
-                realized_count += 1
-
-            # Get cash flows
-            cash_flows = db.query(CashFlow).filter(
-                CashFlow.investment_id == inv.id,
-                CashFlow.date <= report_date
-            ).all()
-
-            # Calculate called and distributions
-            called = sum(cf.amount for cf in cash_flows if cf.amount < 0)
-            distributions = sum(cf.amount for cf in cash_flows if cf.amount > 0)
-            total_called += abs(called)
-            total_distributions += distributions
-
-            # Get latest valuation
-            latest_val = db.query(Valuation).filter(
-                Valuation.investment_id == inv.id,
-                Valuation.date <= report_date
-            ).order_by(Valuation.date.desc()).first()
-
-            current_nav = latest_val.nav_value if latest_val else 0
-            total_nav += current_nav
-
-            # Track asset allocation
-            asset_class_raw = inv.asset_class or "Unknown"
-            asset_class_formatted = format_asset_class(asset_class_raw)
-            if asset_class_formatted not in asset_allocation:
-                asset_allocation[asset_class_formatted] = {
-                    'asset_class': asset_class_formatted,
-                    'count': 0,
-                    'total_commitment': 0,
-                    'current_nav': 0
-                }
-            asset_allocation[asset_class_formatted]['count'] += 1
-            asset_allocation[asset_class_formatted]['total_commitment'] += commitment
-            asset_allocation[asset_class_formatted]['current_nav'] += current_nav
-
-            # Track vintage year
-            if inv.vintage_year:
-                vintage = str(inv.vintage_year)
-                if vintage not in vintage_analysis:
-                    vintage_analysis[vintage] = {
-                        'vintage_year': vintage,
-                        'count': 0,
-                        'total_commitment': 0,
-                        'current_nav': 0,
-                        'total_called': 0,
-                        'total_distributions': 0
-                    }
-                vintage_analysis[vintage]['count'] += 1
-                vintage_analysis[vintage]['total_commitment'] += commitment
-                vintage_analysis[vintage]['current_nav'] += current_nav
-                vintage_analysis[vintage]['total_called'] += abs(called)
-                vintage_analysis[vintage]['total_distributions'] += distributions
-
-            # Collect cash flows for IRR calculation
-            all_cash_flows.extend([
-                CashFlowEvent(date=cf.date, amount=cf.amount) for cf in cash_flows
-            ])
-
-        # Add current NAV as final cash flow
-        if total_nav > 0:
-            all_cash_flows.append(CashFlowEvent(date=report_date, amount=total_nav))
-
-        # Calculate performance metrics
-        portfolio_irr = calculate_irr(all_cash_flows) if all_cash_flows else None
-        if portfolio_irr is None:
-            portfolio_irr = 0
-        tvpi = (total_distributions + total_nav) / total_called if total_called > 0 else 0
-        dpi = total_distributions / total_called if total_called > 0 else 0
-        rvpi = total_nav / total_called if total_called > 0 else 0
-        uncalled = total_commitments - total_called
-
-        # Calculate percentages for asset allocation
-        for ac in asset_allocation.values():
-            ac['percentage'] = (ac['current_nav'] / total_nav * 100) if total_nav > 0 else 0
-
-        # Calculate TVPI for vintage years
-        for vy in vintage_analysis.values():
-            called = vy['total_called']
-            vy['tvpi'] = (vy['total_distributions'] + vy['current_nav']) / called if called > 0 else 0
-
-        # Prepare summary stats
-        summary_stats = {
-            'total_nav': total_nav,
-            'total_commitments': total_commitments,
-            'total_called': total_called,
-            'uncalled_commitments': uncalled,
-            'total_distributions': total_distributions,
-            'irr': portfolio_irr * 100,  # Convert to percentage
-            'tvpi': tvpi,
-            'dpi': dpi,
-            'rvpi': rvpi,
-            'active_count': active_count,
-            'realized_count': realized_count,
-            'total_count': len(investments)
-        }
-
-        # Sort asset allocation and vintage by NAV
-        asset_allocation_list = sorted(
-            asset_allocation.values(),
-            key=lambda x: x['current_nav'],
-            reverse=True
-        )
-
-        vintage_analysis_list = sorted(
-            vintage_analysis.values(),
-            key=lambda x: x['vintage_year']
-        )
-
-        # Generate PDF
-        report_gen = PortfolioSummaryReport(tenant_name=current_user.tenant.name if current_user.tenant else "Portfolio")
-        pdf_buffer = report_gen.generate(
-            summary_stats=summary_stats,
-            asset_allocation=asset_allocation_list,
-            vintage_analysis=vintage_analysis_list,
-            as_of_date=report_date
-        )
-
-        # Return PDF as streaming response
-        return StreamingResponse(
-            pdf_buffer,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=portfolio_summary_{report_date.strftime('%Y%m%d')}.pdf"
-            }
-        )
+        # Served from the report cache when the tenant's data has not changed
+        spec = ReportSpec.create('portfolio-summary', report_date)
+        return await _render(db, current_user, spec, f"portfolio_summary_{report_date.strftime('%Y%m%d')}.pdf")
 
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error generating portfolio summary report")
+        raise HTTPException(status_code=500, detail="Error generating portfolio summary report")
 
 
 @router.get("/holdings")
@@ -225,7 +126,7 @@ async def generate_holdings_report(
     group_by: Optional[str] = Query("entity", description="Group holdings by: entity, asset_class, or vintage"),
     status_filter: Optional[str] = Query("ACTIVE", description="Filter by status: ACTIVE, REALIZED, ALL"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Generate Holdings Report (PDF)
@@ -242,98 +143,21 @@ async def generate_holdings_report(
         if as_of_date:
             report_date = datetime.strptime(as_of_date, "%Y-%m-%d").date()
 
-        # Build query
-        query = db.query(InvestmentModel).filter(
-            InvestmentModel.tenant_id == current_user.tenant_id
-        )
+        spec = ReportSpec.create('holdings', report_date, grouped_by=group_by, status_filter=status_filter)
+        return await _render(db, current_user, spec, f"holdings_report_{report_date.strftime('%Y%m%d')}.pdf")
 
-        # Apply status filter
-        if status_filter and status_filter != "ALL":
-            query = query.filter(InvestmentModel.status == status_filter)
-
-        investments = query.all()
-
-        # Build holdings data
-        holdings = []
-        for inv in investments:
-            # Get entity name
-            entity = db.query(EntityModel).filter(EntityModel.id == inv.entity_id).first()
-            entity_name = entity.name if entity else "N/A"
-
-            # Get cash flows
-            cash_flows = db.query(CashFlow).filter(
-                CashFlow.investment_id == inv.id,
-                CashFlow.date <= report_date
-            ).all()
-
-            # Use type-based filtering for accuracy
-            outflow_types = [CashFlowType.CAPITAL_CALL, CashFlowType.CONTRIBUTION, CashFlowType.FEES]
-            inflow_types = [CashFlowType.DISTRIBUTION, CashFlowType.YIELD, CashFlowType.RETURN_OF_PRINCIPAL]
-
-            called = abs(sum(cf.amount for cf in cash_flows if cf.type in outflow_types))
-            distributions = abs(sum(cf.amount for cf in cash_flows if cf.type in inflow_types))
-            uncalled = (inv.commitment_amount or 0) - called
-
-            # Get latest valuation
-            latest_val = db.query(Valuation).filter(
-                Valuation.investment_id == inv.id,
-                Valuation.date <= report_date
-            ).order_by(Valuation.date.desc()).first()
-
-            current_nav = latest_val.nav_value if latest_val else 0
-
-            # Calculate TVPI
-            tvpi = (distributions + current_nav) / called if called > 0 else 0
-
-            holdings.append({
-                'investment_name': inv.name,
-                'entity_name': entity_name,
-                'asset_class': inv.asset_class or 'Unknown',
-                'vintage_year': inv.vintage_year,
-                'commitment_amount': inv.commitment_amount or 0,
-                'called_amount': called,
-                'uncalled_amount': uncalled,
-                'current_nav': current_nav,
-                'distributions': distributions,
-                'tvpi': tvpi
-            })
-
-        # Sort holdings by group
-        if group_by == "entity":
-            holdings.sort(key=lambda x: (x['entity_name'], x['investment_name']))
-        elif group_by == "asset_class":
-            holdings.sort(key=lambda x: (x['asset_class'], x['investment_name']))
-        elif group_by == "vintage":
-            holdings.sort(key=lambda x: (x['vintage_year'] or 0, x['investment_name']))
-        else:
-            holdings.sort(key=lambda x: x['investment_name'])
-
-        # Generate PDF
-        report_gen = HoldingsReport(tenant_name=current_user.tenant.name if current_user.tenant else "Portfolio")
-        pdf_buffer = report_gen.generate(
-            holdings=holdings,
-            grouped_by=group_by,
-            as_of_date=report_date
-        )
-
-        # Return PDF
-        return StreamingResponse(
-            pdf_buffer,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=holdings_report_{report_date.strftime('%Y%m%d')}.pdf"
-            }
-        )
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error generating holdings report")
+        raise HTTPException(status_code=500, detail="Error generating holdings report")
 
 
 @router.get("/entity-performance")
 async def generate_entity_performance_report(
     as_of_date: Optional[str] = Query(None, description="Report as-of date (YYYY-MM-DD)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Generate Entity-Level Performance Report (PDF)
@@ -349,104 +173,14 @@ async def generate_entity_performance_report(
         if as_of_date:
             report_date = datetime.strptime(as_of_date, "%Y-%m-%d").date()
 
-        # Get all entities for tenant
-        entities = db.query(EntityModel).filter(
-            EntityModel.tenant_id == current_user.tenant_id
-        ).all()
-
-        entity_data = []
-
-        for entity in entities:
-            # Get investments for this entity
-            investments = db.query(InvestmentModel).filter(
-                InvestmentModel.entity_id == entity.id,
-                InvestmentModel.tenant_id == current_user.tenant_id
-            ).all()
-
-            if not investments:
-                continue
-
-            total_commitment = 0
-            total_called = 0
-            total_distributions = 0
-            total_nav = 0
-            all_cash_flows = []
-
-            for inv in investments:
-                total_commitment += inv.commitment_amount or 0
-
-                # Get cash flows
-                cash_flows = db.query(CashFlow).filter(
-                    CashFlow.investment_id == inv.id,
-                    CashFlow.date <= report_date
-                ).all()
-
-                # Use type-based filtering for accuracy
-                outflow_types = [CashFlowType.CAPITAL_CALL, CashFlowType.CONTRIBUTION, CashFlowType.FEES]
-                inflow_types = [CashFlowType.DISTRIBUTION, CashFlowType.YIELD, CashFlowType.RETURN_OF_PRINCIPAL]
-
-                called = abs(sum(cf.amount for cf in cash_flows if cf.type in outflow_types))
-                distributions = abs(sum(cf.amount for cf in cash_flows if cf.type in inflow_types))
-                total_called += called
-                total_distributions += distributions
-
-                # Get latest valuation
-                latest_val = db.query(Valuation).filter(
-                    Valuation.investment_id == inv.id,
-                    Valuation.date <= report_date
-                ).order_by(Valuation.date.desc()).first()
-
-                current_nav = latest_val.nav_value if latest_val else 0
-                total_nav += current_nav
-
-                # Collect cash flows for IRR
-                all_cash_flows.extend([
-                    CashFlowEvent(date=cf.date, amount=cf.amount) for cf in cash_flows
-                ])
-
-            # Add current NAV for IRR calculation
-            if total_nav > 0:
-                all_cash_flows.append(CashFlowEvent(date=report_date, amount=total_nav))
-
-            # Calculate metrics
-            entity_irr = calculate_irr(all_cash_flows) if all_cash_flows else None
-            if entity_irr is None:
-                entity_irr = 0
-            tvpi = (total_distributions + total_nav) / total_called if total_called > 0 else 0
-
-            entity_data.append({
-                'entity_name': entity.name,
-                'entity_type': entity.entity_type,
-                'investment_count': len(investments),
-                'total_commitment': total_commitment,
-                'total_called': total_called,
-                'total_distributions': total_distributions,
-                'current_nav': total_nav,
-                'tvpi': tvpi,
-                'irr': entity_irr * 100  # Convert to percentage
-            })
-
-        # Sort by NAV descending
-        entity_data.sort(key=lambda x: x['current_nav'], reverse=True)
-
-        # Generate PDF
-        report_gen = EntityPerformanceReport(tenant_name=current_user.tenant.name if current_user.tenant else "Portfolio")
-        pdf_buffer = report_gen.generate(
-            entity_data=entity_data,
-            as_of_date=report_date
-        )
+        spec = ReportSpec.create('entity-performance', report_date)
+        return await _render(db, current_user, spec, f"entity_performance_{report_date.strftime('%Y%m%d')}.pdf")
 
-        # Return PDF
-        return StreamingResponse(
-            pdf_buffer,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=entity_performance_{report_date.strftime('%Y%m%d')}.pdf"
-            }
-        )
-
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"Error generating report: {str(e)}")
+    except HTTPException:
+        raise
+    except Exception:
+        logger.exception("Error generating entity performance report")
+        raise HTTPException(status_code=500, detail="Error generating entity performance report")
 
 
 @router.get("/cash-flow-activity")
@@ -457,7 +191,7 @@ async def generate_cash_flow_activity_report(
     cash_flow_types: str = Query("", description="Comma-separated cash flow types to include"),
     group_by: str = Query("none", description="Grouping: none, investment, entity, asset_class, month, quarter"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """
     Generate Cash Flow Activity Report (PDF)
@@ -498,195 +232,113 @@ async def generate_cash_flow_activity_report(
         elif time_period == "last_3_years":
             start_dt = date(end_dt.year - 3, 1, 1)
         elif time_period == "inception":
-            # Get earliest cash flow date
-            earliest_cf = db.query(func.min(CashFlow.date)).filter(
-                CashFlow.investment_id.in_(
-                    db.query(InvestmentModel.id).filter(
-                        InvestmentModel.tenant_id == current_user.tenant_id
-                    )
-                )
-            ).scalar()
-            start_dt = earliest_cf if earliest_cf else date(2000, 1, 1)
+            # The report job starts from the earliest cash flow
+            start_dt = None
         else:
             raise HTTPException(status_code=400, detail=f"Invalid time period: {time_period}")
 
         # Parse cash flow types filter
-        cf_types_list = []
-        if cash_flow_types:
-            cf_types_str = [t.strip().upper().replace(' ', '_') for t in cash_flow_types.split(',')]
-            # Map frontend values to backend enum values
-            type_mapping = {
-                'CAPITAL_CALL': CashFlowType.CAPITAL_CALL,
-                'DISTRIBUTION': CashFlowType.DISTRIBUTION,
-                'RETURN_OF_CAPITAL': CashFlowType.RETURN_OF_PRINCIPAL,
-                'RETURN_OF_PRINCIPAL': CashFlowType.RETURN_OF_PRINCIPAL,
-                'INCOME': CashFlowType.YIELD,
-                'YIELD': CashFlowType.YIELD,
-                'RECALLABLE_RETURN': CashFlowType.DISTRIBUTION,  # Treat as distribution
-                'FEE': CashFlowType.FEES,
-                'FEES': CashFlowType.FEES,
-                'OTHER': CashFlowType.CONTRIBUTION
-            }
-            cf_types_list = [type_mapping.get(t, CashFlowType.CONTRIBUTION) for t in cf_types_str]
-
-        # Query cash flows
-        query = db.query(CashFlow, InvestmentModel).join(
-            InvestmentModel, CashFlow.investment_id == InvestmentModel.id
-        ).filter(
-            InvestmentModel.tenant_id == current_user.tenant_id,
-            CashFlow.date >= start_dt,
-            CashFlow.date <= end_dt
-        )
+        cf_types_list = _parse_cash_flow_types(cash_flow_types.split(',')) if cash_flow_types else []
 
-        # Apply cash flow type filter
-        if cf_types_list:
-            query = query.filter(CashFlow.type.in_(cf_types_list))
-
-        cash_flows_data = query.order_by(CashFlow.date.desc()).all()
-
-        # Process cash flows based on grouping
-        cash_flows = []
-        for cf, inv in cash_flows_data:
-            # Get entity name
-            entity_name = None
-            if inv.entity_id:
-                entity = db.query(EntityModel).filter(EntityModel.id == inv.entity_id).first()
-                entity_name = entity.name if entity else None
-
-            cash_flows.append({
-                'date': cf.date,
-                'investment_name': inv.name,
-                'investment_id': inv.id,
-                'entity_name': entity_name,
-                'entity_id': inv.entity_id,
-                'asset_class': format_asset_class(inv.asset_class) if inv.asset_class else "Other",
-                'type': cf.type,
-                'amount': cf.amount,
-                'notes': cf.notes
-            })
-
-        # Calculate summary statistics - use type-based filtering for safety
-        outflow_types = [CashFlowType.CAPITAL_CALL, CashFlowType.CONTRIBUTION, CashFlowType.FEES]
-        inflow_types = [CashFlowType.DISTRIBUTION, CashFlowType.YIELD, CashFlowType.RETURN_OF_PRINCIPAL]
-
-        total_calls = sum(abs(cf['amount']) for cf in cash_flows if cf['type'] in outflow_types)
-        total_distributions = sum(abs(cf['amount']) for cf in cash_flows if cf['type'] in inflow_types)
-        net_cash_flow = total_distributions - total_calls
-
-        # Group data if requested
-        grouped_data = None
-        if group_by != 'none':
-            grouped_data = {}
-
-            if group_by == 'investment':
-                for cf in cash_flows:
-                    key = cf['investment_name']
-                    if key not in grouped_data:
-                        grouped_data[key] = {
-                            'name': key,
-                            'calls': 0,
-                            'distributions': 0,
-                            'net': 0,
-                            'count': 0
-                        }
-                    if cf['type'] in outflow_types:
-                        grouped_data[key]['calls'] += abs(cf['amount'])
-                    elif cf['type'] in inflow_types:
-                        grouped_data[key]['distributions'] += abs(cf['amount'])
-                    grouped_data[key]['net'] = grouped_data[key]['distributions'] - grouped_data[key]['calls']
-                    grouped_data[key]['count'] += 1
-
-            elif group_by == 'entity':
-                for cf in cash_flows:
-                    key = cf['entity_name'] or 'No Entity'
-                    if key not in grouped_data:
-                        grouped_data[key] = {
-                            'name': key,
-                            'calls': 0,
-                            'distributions': 0,
-                            'net': 0,
-                            'count': 0
-                        }
-                    if cf['type'] in outflow_types:
-                        grouped_data[key]['calls'] += abs(cf['amount'])
-                    elif cf['type'] in inflow_types:
-                        grouped_data[key]['distributions'] += abs(cf['amount'])
-                    grouped_data[key]['net'] = grouped_data[key]['distributions'] - grouped_data[key]['calls']
-                    grouped_data[key]['count'] += 1
-
-            elif group_by == 'asset_class':
-                for cf in cash_flows:
-                    key = cf['asset_class']
-                    if key not in grouped_data:
-                        grouped_data[key] = {
-                            'name': key,
-                            'calls': 0,
-                            'distributions': 0,
-                            'net': 0,
-                            'count': 0
-                        }
-                    if cf['type'] in outflow_types:
-                        grouped_data[key]['calls'] += abs(cf['amount'])
-                    elif cf['type'] in inflow_types:
-                        grouped_data[key]['distributions'] += abs(cf['amount'])
-                    grouped_data[key]['net'] = grouped_data[key]['distributions'] - grouped_data[key]['calls']
-                    grouped_data[key]['count'] += 1
-
-            elif group_by in ['month', 'quarter']:
-                for cf in cash_flows:
-                    if group_by == 'month':
-                        key = cf['date'].strftime('%Y-%m')
-                    else:  # quarter
-                        quarter = (cf['date'].month - 1) // 3 + 1
-                        key = f"{cf['date'].year}-Q{quarter}"
-
-                    if key not in grouped_data:
-                        grouped_data[key] = {
-                            'name': key,
-                            'calls': 0,
-                            'distributions': 0,
-                            'net': 0,
-                            'count': 0
-                        }
-                    if cf['type'] in outflow_types:
-                        grouped_data[key]['calls'] += abs(cf['amount'])
-                    elif cf['type'] in inflow_types:
-                        grouped_data[key]['distributions'] += abs(cf['amount'])
-                    grouped_data[key]['net'] = grouped_data[key]['distributions'] - grouped_data[key]['calls']
-                    grouped_data[key]['count'] += 1
-
-            # Convert to list and sort
-            grouped_data = sorted(grouped_data.values(), key=lambda x: abs(x['net']), reverse=True)
-
-        # Generate PDF
-        report_gen = CashFlowActivityReport(tenant_name=current_user.tenant.name if current_user.tenant else "Portfolio")
-        pdf_buffer = report_gen.generate(
-            cash_flows=cash_flows,
-            grouped_data=grouped_data,
-            group_by=group_by,
+        spec = ReportSpec.create(
+            'cash-flow-activity', end_dt,
             start_date=start_dt,
             end_date=end_dt,
-            summary_stats={
-                'total_calls': total_calls,
-                'total_distributions': total_distributions,
-                'net_cash_flow': net_cash_flow,
-                'transaction_count': len(cash_flows)
-            }
-        )
-
-        # Return PDF
-        return StreamingResponse(
-            pdf_buffer,
-            media_type="application/pdf",
-            headers={
-                "Content-Disposition": f"attachment; filename=cash_flow_activity_{start_dt.strftime('%Y%m%d')}_{end_dt.strftime('%Y%m%d')}.pdf"
-            }
+            cash_flow_types=cf_types_list,
+            group_by=group_by
         )
+        period = start_dt.strftime('%Y%m%d') if start_dt else 'inception'
+        return await _render(db, current_user, spec, f"cash_flow_activity_{period}_{end_dt.strftime('%Y%m%d')}.pdf")
 
     except HTTPException:
         raise
-    except Exception as e:
-        import traceback
-        error_detail = f"Error generating cash flow activity report: {str(e)}\n{traceback.format_exc()}"
-        print(error_detail)  # Log to console
-        raise HTTPException(status_code=500, detail=error_detail)
+    except Exception:
+        logger.exception("Error generating cash flow activity report")
+        raise HTTPException(status_code=500, detail="Error generating cash flow activity report")
+
+
+# =============================================================================
+# Report jobs
+# =============================================================================
+
+@router.post("/jobs", status_code=202)
+async def submit_report_job(
+    request: ReportJobRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Submit a report for background rendering
+
+    Identical requests share one job while it runs, and a report whose
+    inputs have not changed since it was last rendered completes immediately
+    from the cache. Poll /jobs/{job_id} for the download link.
+    """
+    try:
+        spec = _job_spec(request, request.as_of_date or date.today(), request.entity_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    job = await report_jobs.submit(db, current_user.tenant_id, spec)
+    return job.to_dict()
+
+
+@router.post("/batches", status_code=202)
+async def submit_report_batch(
+    request: ReportBatchRequest,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """
+    Submit a month-end batch: each requested report for every selected entity
+
+    By default renders the holdings report as of the last month end for
+    every active entity with an active family member.
+    """
+    as_of_date = request.as_of_date or date.today().replace(day=1) - timedelta(days=1)
+    if not request.per_entity:
+        entity_ids = [None]
+    elif request.entity_ids is not None:
+        entity_ids = request.entity_ids
+    else:
+        entity_ids = await run_blocking(month_end_entity_ids, db, current_user.tenant_id,
+                                        request.family_members_only)
+
+    try:
+        specs = [_job_spec(ReportJobRequest(report_type=report_type), as_of_date, entity_id)
+                 for report_type in request.report_types for entity_id in entity_ids]
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    batch_id, jobs = await report_jobs.submit_batch(db, current_user.tenant_id, specs)
+    return {"batch_id": batch_id, "as_of_date": as_of_date, "jobs": [job.to_dict() for job in jobs]}
+
+
+@router.get("/jobs/{job_id}")
+def get_report_job(job_id: str, current_user: User = Depends(get_current_active_user)):
+    """Status of a report job, with its download link once complete"""
+    job = report_jobs.get(current_user.tenant_id, job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Report job not found")
+    return job.to_dict()
+
+
+@router.get("/batches/{batch_id}")
+def get_report_batch(batch_id: str, current_user: User = Depends(get_current_active_user)):
+    """Status of every job in a batch"""
+    jobs = report_jobs.batch(current_user.tenant_id, batch_id)
+    if jobs is None:
+        raise HTTPException(status_code=404, detail="Report batch not found")
+    counts = {status: sum(job.status == status for job in jobs) for status in ('queued', 'running', 'complete', 'failed')}
+    return {"batch_id": batch_id, "counts": counts, "jobs": [job.to_dict() for job in jobs]}
+
+
+@router.get("/files/{cache_key}/{filename}")
+def download_report_file(cache_key: str, filename: str, current_user: User = Depends(get_current_active_user)):
+    """Download a rendered report from the cache; links stay valid until the PDF is evicted"""
+    try:
+        path = report_jobs.cache.get(current_user.tenant_id, cache_key)
+    except ValueError:
+        path = None
+    if path is None or not filename.endswith('.pdf') or '/' in filename:
+        raise HTTPException(status_code=404, detail="Report not found or expired; submit it again")
+    return FileResponse(path, media_type="application/pdf", filename=filename)
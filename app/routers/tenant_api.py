@@ -5,15 +5,17 @@ This router contains all the main CRUD operations for entities, investments,
 cash flows, and valuations with proper tenant isolation.
 """
 
-from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, Query, UploadFile, File, Request, Response
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from datetime import date, datetime
 from uuid import UUID
 
-from ..database import get_db
-from ..auth import get_current_active_user, get_tenant_context, require_contributor
+from ..database import get_db, get_read_db
+from ..auth import (
+    get_current_active_user, get_tenant_context, require_contributor, require_manager, require_platform_admin
+)
 from ..models import User
 from .. import models
 from ..schemas import (
@@ -22,14 +24,31 @@ from ..schemas import (
     CashFlow, CashFlowCreate, CashFlowUpdate, Valuation, ValuationCreate, ValuationUpdate,
     PortfolioPerformance, InvestmentPerformance, CommitmentVsCalledData, AssetAllocationData,
     VintageAllocationData, TimelineDataPoint, JCurveDataPoint, DashboardSummaryStats,
-    EntityRelationship, EntityRelationshipCreate, EntityRelationshipUpdate, EntityRelationshipWithEntities
+    EntityRelationship, EntityRelationshipCreate, EntityRelationshipUpdate, EntityRelationshipWithEntities,
+    EntitySubtreeResponse
 )
 from .. import crud_tenant
 from .. import dashboard
 from ..tenant_calendar_service import create_tenant_calendar_service
+from ..lookthrough_service import create_lookthrough_service
+from ..entity_listing import get_entities_with_stats, get_entity_stats
+from ..fx_service import (
+    get_fx_table, get_reporting_currency, get_reporting_fx, import_fx_rates_csv, reporting_rates
+)
+from ..upload_streaming import spooled_upload
+from ..executors import run_blocking
+from ..entity_relationships import EntityHierarchyService
+from ..forecast_backtest import create_forecast_backtest_engine
+from ..benchmark_ranking_service import create_benchmark_ranking_service
+from ..cashflow_listing import list_rows, iter_rows, iter_json_array, parse_fields
+from ..streaming_export import export_response
+from ..excel_template_service import excel_template_service, template_response, TEMPLATE_FILENAMES
+from ..json_responses import FastJSONResponse, chart_series, series_fields, LAYOUT_PATTERN
 
 router = APIRouter(prefix="/api", tags=["Tenant API"])
 
+TIMELINE_FIELDS = series_fields(TimelineDataPoint)
+
 # =============================================================================
 # Entity Management Endpoints
 # =============================================================================
@@ -50,57 +69,38 @@ def create_entity(
 
 @router.get("/entities", response_model=List[EntityWithMembers])
 def read_entities(
+    response: Response,
     skip: int = 0,
     limit: int = 100,
     entity_type: Optional[str] = Query(None, description="Filter by entity type"),
     search: Optional[str] = Query(None, description="Search entities by name"),
     include_inactive: bool = Query(False, description="Include inactive entities"),
+    sort_by: str = Query("name", description="name, entity_type, created_date, investment_count, total_commitment, total_called or current_nav"),
+    sort_order: str = Query("asc", pattern="^(asc|desc)$", description="asc or desc"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor header from the previous page"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get entities with optional filtering"""
-    if search:
-        entities = crud_tenant.search_entities(
-            db=db,
-            tenant_id=current_user.tenant_id,
-            search_term=search,
-            skip=skip,
-            limit=limit
-        )
-    elif entity_type:
-        entities = crud_tenant.get_entities_by_type(
-            db=db,
-            tenant_id=current_user.tenant_id,
-            entity_type=entity_type,
-            skip=skip,
-            limit=limit
-        )
-    else:
-        entities = crud_tenant.get_entities(
-            db=db,
+    """Get entities with optional filtering, with investment stats from one grouped query"""
+    try:
+        entities, next_cursor = get_entities_with_stats(
+            db,
             tenant_id=current_user.tenant_id,
             skip=skip,
             limit=limit,
-            include_inactive=include_inactive
-        )
-
-    # Convert to EntityWithMembers schema with investment stats
-    result = []
-    for entity in entities:
-        investments = crud_tenant.get_investments_by_entity(
-            db=db, entity_id=entity.id, tenant_id=current_user.tenant_id
+            entity_type=entity_type,
+            search=search,
+            include_inactive=include_inactive,
+            sort_by=sort_by,
+            sort_order=sort_order,
+            cursor=cursor
         )
-        investment_count = len(investments)
-        total_commitment = sum(inv.commitment_amount for inv in investments)
-
-        entity_dict = {
-            **entity.__dict__,
-            "investment_count": investment_count,
-            "total_commitment": total_commitment
-        }
-        result.append(EntityWithMembers.model_validate(entity_dict))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-    return result
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
+    return [EntityWithMembers.model_validate(entity) for entity in entities]
 
 @router.get("/entities/{entity_id}", response_model=EntityWithMembers)
 def read_entity(
@@ -114,16 +114,9 @@ def read_entity(
         raise HTTPException(status_code=404, detail="Entity not found")
 
     # Add investment stats
-    investments = crud_tenant.get_investments_by_entity(
-        db=db, entity_id=entity.id, tenant_id=current_user.tenant_id
-    )
-    investment_count = len(investments)
-    total_commitment = sum(inv.commitment_amount for inv in investments)
-
     entity_dict = {
         **entity.__dict__,
-        "investment_count": investment_count,
-        "total_commitment": total_commitment
+        **get_entity_stats(db, entity.id, tenant_id=current_user.tenant_id)
     }
 
     return EntityWithMembers.model_validate(entity_dict)
@@ -265,24 +258,37 @@ def get_investment_performance(
             detail=f"Error retrieving investment performance: {str(e)} | {type(e).__name__}"
         )
 
+def _listing_response(db: Session, model, tenant_id: int, fields: Optional[str], limit: Optional[int],
+                      cursor: Optional[str], sort_order: str, **filters) -> FastJSONResponse:
+    """Projected, keyset-paged rows returned without per-row model validation"""
+    try:
+        rows, next_cursor = list_rows(
+            db, model, tenant_id, parse_fields(model, fields),
+            limit=limit, cursor=cursor, sort_order=sort_order, **filters
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor else None
+    return FastJSONResponse(content=rows, headers=headers)
+
 @router.get("/investments/{investment_id}/cashflows", response_model=List[CashFlow])
 def get_investment_cashflows(
     investment_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size (default: all rows)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get cash flows for a specific investment by ID or UUID"""
+    """Get cash flows for a specific investment by ID or UUID, ordered by date"""
     # First verify the investment exists and belongs to the user's tenant
     investment = crud_tenant.get_investment(db, investment_id, current_user.tenant_id)
     if not investment:
         raise HTTPException(status_code=404, detail="Investment not found")
 
-    # Get cash flows for this investment
-    cashflows = db.query(models.CashFlow).filter(
-        models.CashFlow.investment_id == investment_id
-    ).all()
-
-    return cashflows
+    return _listing_response(db, models.CashFlow, current_user.tenant_id, fields, limit, cursor, sort_order,
+                             investment_id=investment.id)
 
 @router.post("/investments/{investment_id}/cashflows", response_model=CashFlow)
 def create_investment_cashflow(
@@ -372,21 +378,21 @@ def delete_investment_cashflow(
 @router.get("/investments/{investment_id}/valuations", response_model=List[Valuation])
 def get_investment_valuations(
     investment_id: str,
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size (default: all rows)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get valuations for a specific investment by ID or UUID"""
+    """Get valuations for a specific investment by ID or UUID, ordered by date"""
     # First verify the investment exists and belongs to the user's tenant
     investment = crud_tenant.get_investment(db, investment_id, current_user.tenant_id)
     if not investment:
         raise HTTPException(status_code=404, detail="Investment not found")
 
-    # Get valuations for this investment
-    valuations = db.query(models.Valuation).filter(
-        models.Valuation.investment_id == investment_id
-    ).all()
-
-    return valuations
+    return _listing_response(db, models.Valuation, current_user.tenant_id, fields, limit, cursor, sort_order,
+                             investment_id=investment.id)
 
 @router.post("/investments/{investment_id}/valuations", response_model=Valuation)
 def create_investment_valuation(
@@ -497,23 +503,41 @@ def read_cashflows(
     investment_id: Optional[int] = Query(None, description="Filter by investment"),
     start_date: Optional[date] = Query(None, description="Start date filter"),
     end_date: Optional[date] = Query(None, description="End date filter"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size (default: all rows)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get cash flows with optional filtering"""
+    """Get cash flows with optional filtering, ordered by date"""
     # If investment_id is specified, verify it belongs to the same tenant
     if investment_id:
         investment = crud_tenant.get_investment(db, investment_id, current_user.tenant_id)
         if not investment:
             raise HTTPException(status_code=400, detail="Investment not found or not accessible")
 
-    return crud_tenant.get_cashflows(
-        db=db,
-        tenant_id=current_user.tenant_id,
-        investment_id=investment_id,
-        start_date=start_date,
-        end_date=end_date
-    )
+    return _listing_response(db, models.CashFlow, current_user.tenant_id, fields, limit, cursor, sort_order,
+                             investment_id=investment_id, start_date=start_date, end_date=end_date)
+
+@router.get("/cashflows/export")
+def export_cashflows(
+    investment_id: Optional[int] = Query(None, description="Filter by investment"),
+    start_date: Optional[date] = Query(None, description="Start date filter"),
+    end_date: Optional[date] = Query(None, description="End date filter"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Stream the tenant's full cash flow history as a JSON array, oldest first"""
+    try:
+        selected = parse_fields(models.CashFlow, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    batches = iter_rows(db, models.CashFlow, current_user.tenant_id, selected,
+                        investment_id=investment_id, start_date=start_date, end_date=end_date)
+    return StreamingResponse(iter_json_array(batches), media_type="application/json")
 
 # =============================================================================
 # Valuation Management Endpoints
@@ -541,21 +565,22 @@ def create_valuation(
 @router.get("/valuations", response_model=List[Valuation])
 def read_valuations(
     investment_id: Optional[int] = Query(None, description="Filter by investment"),
+    fields: Optional[str] = Query(None, description="Comma-separated fields to return"),
+    limit: Optional[int] = Query(None, ge=1, le=10000, description="Page size (default: all rows)"),
+    cursor: Optional[str] = Query(None, description="X-Next-Cursor value from the previous page"),
+    sort_order: str = Query("desc", pattern="^(asc|desc)$"),
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db)
 ):
-    """Get valuations with optional filtering"""
+    """Get valuations with optional filtering, ordered by date"""
     # If investment_id is specified, verify it belongs to the same tenant
     if investment_id:
         investment = crud_tenant.get_investment(db, investment_id, current_user.tenant_id)
         if not investment:
             raise HTTPException(status_code=400, detail="Investment not found or not accessible")
 
-    return crud_tenant.get_valuations(
-        db=db,
-        tenant_id=current_user.tenant_id,
-        investment_id=investment_id
-    )
+    return _listing_response(db, models.Valuation, current_user.tenant_id, fields, limit, cursor, sort_order,
+                             investment_id=investment_id)
 
 # =============================================================================
 # Dashboard Endpoints
@@ -564,7 +589,7 @@ def read_valuations(
 @router.get("/dashboard/summary")
 def get_dashboard_summary(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get dashboard summary for the current tenant"""
     from .. import dashboard
@@ -583,7 +608,7 @@ def get_dashboard_summary(
 @router.get("/dashboard/asset-class-breakdown")
 def get_asset_class_breakdown(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get asset class breakdown for the current tenant"""
     from .. import dashboard
@@ -599,7 +624,7 @@ def get_asset_class_breakdown(
 @router.get("/dashboard/entity-breakdown")
 def get_entity_breakdown(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get entity breakdown for the current tenant"""
     from .. import dashboard
@@ -631,56 +656,137 @@ def get_tenant_stats(
 
 @router.get("/portfolio/performance", response_model=PortfolioPerformance)
 def get_portfolio_performance(
+    currency: Optional[str] = Query(None, min_length=3, max_length=3, description="Reporting currency (default: tenant setting, else USD)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get portfolio performance metrics for the current tenant"""
-    return crud_tenant.get_portfolio_performance(db, current_user.tenant_id)
+    return crud_tenant.get_portfolio_performance(db, current_user.tenant_id, currency)
+
+# =============================================================================
+# FX Rate Endpoints
+# =============================================================================
+
+@router.post("/fx-rates/import")
+async def import_fx_rates(
+    file: UploadFile = File(..., description="CSV with date, currency, usd_rate columns"),
+    current_user: User = Depends(require_platform_admin),
+    db: Session = Depends(get_db)
+):
+    """
+    Import or update FX rates (USD per one unit of currency) from CSV
+
+    The rates are shared by every tenant, so only platform administrators
+    (PLATFORM_ADMIN_TENANT_IDS) may import them; operators can also run
+    ``python -m app.fx_service rates.csv``.
+    """
+    if not file.filename.lower().endswith('.csv'):
+        raise HTTPException(status_code=400, detail="FX rates must be uploaded as a .csv file")
+
+    async with spooled_upload(file) as upload_path:
+        result = await run_blocking(import_fx_rates_csv, db, upload_path, source=file.filename)
+
+    if result["errors"]:
+        raise HTTPException(status_code=400, detail={"errors": result["errors"][:50]})
+    return {"filename": file.filename, **result}
+
+
+@router.get("/fx-rates/{currency}")
+def get_fx_rate(
+    currency: str,
+    to_currency: str = Query("USD", min_length=3, max_length=3, description="Quote currency"),
+    as_of_date: Optional[date] = Query(None, description="Rate date (default today); the latest quote on or before it is used"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """As-of conversion rate between two currencies"""
+    as_of_date = as_of_date or date.today()
+    rate = get_fx_table(db).rate(currency.upper(), to_currency.upper(), as_of_date)
+    if rate is None:
+        raise HTTPException(status_code=404, detail=f"No FX rates for {currency.upper()}/{to_currency.upper()}")
+    return {"currency": currency.upper(), "to_currency": to_currency.upper(), "as_of_date": as_of_date, "rate": rate}
+
+# =============================================================================
+# Upload Template Endpoints
+# =============================================================================
+
+@router.get("/templates/{template_name}")
+def download_upload_template(
+    template_name: str,
+    request: Request,
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Download an Excel upload template (nav-, cashflow-, investment- or entity-template)
+
+    Dropdowns list the tenant's own investments or entities. Templates are
+    cached per tenant until those names change; a matching If-None-Match
+    returns 304 Not Modified.
+    """
+    kind = template_name.removesuffix("-template")
+    if kind not in TEMPLATE_FILENAMES:
+        raise HTTPException(status_code=404, detail=f"Unknown template: {template_name}")
+    return template_response(request, excel_template_service.get_template(db, kind, current_user.tenant_id))
 
 # =============================================================================
 # Dashboard Endpoints (Tenant-Aware)
 # =============================================================================
 
+def _dashboard_currency(db: Session, tenant_id: int, currency: Optional[str], investments):
+    """Reporting currency, rate table (None when every investment is already in it) and today's rate per investment"""
+    reporting_currency = (currency or get_reporting_currency(db, tenant_id)).upper()
+    currencies = [inv.currency for inv in investments]
+    fx = get_reporting_fx(db, currencies, reporting_currency)
+    spot = reporting_rates(fx, currencies, [date.today()] * len(investments), reporting_currency)
+    return reporting_currency, fx, spot
+
 @router.get("/dashboard/commitment-vs-called", response_model=CommitmentVsCalledData)
 def get_commitment_vs_called_data(
+    currency: Optional[str] = Query(None, min_length=3, max_length=3, description="Reporting currency (default: tenant setting, else USD)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get commitment vs called data for the current tenant"""
+    """Get commitment vs called data for the current tenant, in the reporting currency at today's rates"""
     # Get tenant investments and calculate manually to ensure tenant isolation
     investments = crud_tenant.get_investments(db, current_user.tenant_id)
+    reporting_currency, _, spot = _dashboard_currency(db, current_user.tenant_id, currency, investments)
 
-    total_commitment = sum(inv.commitment_amount for inv in investments)
-    total_called = sum(inv.called_amount for inv in investments)
+    total_commitment = float(sum(inv.commitment_amount * rate for inv, rate in zip(investments, spot)))
+    total_called = float(sum(inv.called_amount * rate for inv, rate in zip(investments, spot)))
     total_uncalled = total_commitment - total_called
 
     return CommitmentVsCalledData(
         commitment_amount=total_commitment,
         called_amount=total_called,
-        uncalled_amount=total_uncalled
+        uncalled_amount=total_uncalled,
+        reporting_currency=reporting_currency
     )
 
 @router.get("/dashboard/allocation-by-asset-class", response_model=List[AssetAllocationData])
 def get_allocation_by_asset_class(
+    currency: Optional[str] = Query(None, min_length=3, max_length=3, description="Reporting currency (default: tenant setting, else USD)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get asset class allocation for the current tenant"""
+    """Get asset class allocation for the current tenant, in the reporting currency at today's rates"""
     from collections import defaultdict
 
     investments = crud_tenant.get_investments(db, current_user.tenant_id)
 
     if not investments:
         return []
+    _, _, spot = _dashboard_currency(db, current_user.tenant_id, currency, investments)
 
     # Group by asset class
     asset_class_data = defaultdict(lambda: {"commitment": 0, "count": 0})
     total_commitment = 0
 
-    for inv in investments:
-        asset_class_data[inv.asset_class]["commitment"] += inv.commitment_amount
+    for inv, rate in zip(investments, spot):
+        commitment = float(inv.commitment_amount * rate)
+        asset_class_data[inv.asset_class]["commitment"] += commitment
         asset_class_data[inv.asset_class]["count"] += 1
-        total_commitment += inv.commitment_amount
+        total_commitment += commitment
 
     # Convert to list with percentages
     result = []
@@ -699,25 +805,28 @@ def get_allocation_by_asset_class(
 
 @router.get("/dashboard/allocation-by-vintage", response_model=List[VintageAllocationData])
 def get_allocation_by_vintage(
+    currency: Optional[str] = Query(None, min_length=3, max_length=3, description="Reporting currency (default: tenant setting, else USD)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get vintage year allocation for the current tenant"""
+    """Get vintage year allocation for the current tenant, in the reporting currency at today's rates"""
     from collections import defaultdict
 
     investments = crud_tenant.get_investments(db, current_user.tenant_id)
 
     if not investments:
         return []
+    _, _, spot = _dashboard_currency(db, current_user.tenant_id, currency, investments)
 
     # Group by vintage year
     vintage_data = defaultdict(lambda: {"commitment": 0, "count": 0})
     total_commitment = 0
 
-    for inv in investments:
-        vintage_data[inv.vintage_year]["commitment"] += inv.commitment_amount
+    for inv, rate in zip(investments, spot):
+        commitment = float(inv.commitment_amount * rate)
+        vintage_data[inv.vintage_year]["commitment"] += commitment
         vintage_data[inv.vintage_year]["count"] += 1
-        total_commitment += inv.commitment_amount
+        total_commitment += commitment
 
     # Convert to list with percentages
     result = []
@@ -736,17 +845,22 @@ def get_allocation_by_vintage(
 
 @router.get("/dashboard/portfolio-value-timeline", response_model=List[TimelineDataPoint])
 def get_portfolio_value_timeline(
+    layout: str = Query("rows", pattern=LAYOUT_PATTERN, description="rows (list of points) or columns (one array per field)"),
+    currency: Optional[str] = Query(None, min_length=3, max_length=3, description="Reporting currency (default: tenant setting, else USD)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get portfolio value timeline for the current tenant"""
+    """
+    Get portfolio value timeline for the current tenant in the reporting
+    currency: cash flows convert at their own date, NAVs at each timeline date
+    """
     from datetime import date, timedelta
     from collections import defaultdict
 
     investments = crud_tenant.get_investments(db, current_user.tenant_id)
 
     if not investments:
-        return []
+        return FastJSONResponse(chart_series([], TIMELINE_FIELDS, layout))
 
     # Collect all dates where we have data points (valuations and cash flows)
     date_points = set()
@@ -764,53 +878,64 @@ def get_portfolio_value_timeline(
                 date_points.add(cf.date)
 
     if not date_points:
-        return []
+        return FastJSONResponse(chart_series([], TIMELINE_FIELDS, layout))
 
     # Sort dates
     sorted_dates = sorted(date_points)
 
+    # Rates for every cash flow, and for each investment on every timeline date
+    reporting_currency, fx, _ = _dashboard_currency(db, current_user.tenant_id, currency, investments)
+    flow_currencies = [inv.currency for inv in investments for _ in inv.cashflows]
+    flow_rates = iter(reporting_rates(fx, flow_currencies, [cf.date for inv in investments for cf in inv.cashflows],
+                                      reporting_currency))
+    converted_flows = [[(cf, cf.amount * next(flow_rates)) for cf in inv.cashflows] for inv in investments]
+    nav_rates = reporting_rates(
+        fx, [inv.currency for inv in investments for _ in sorted_dates], sorted_dates * len(investments),
+        reporting_currency
+    ).reshape(len(investments), len(sorted_dates))
+
     # Calculate cumulative values for each date
     timeline_data = []
 
-    for current_date in sorted_dates:
+    for date_index, current_date in enumerate(sorted_dates):
         cumulative_contributions = 0
         cumulative_distributions = 0
         nav_value = 0
 
-        for investment in investments:
+        for index, investment in enumerate(investments):
             # Sum all contributions up to this date
-            for cf in investment.cashflows:
+            for cf, amount in converted_flows[index]:
                 if cf.date <= current_date:
                     if cf.type in ['Capital Call', 'Contribution']:
-                        cumulative_contributions += abs(cf.amount)
+                        cumulative_contributions += abs(amount)
                     elif cf.type in [models.CashFlowType.DISTRIBUTION,
                                    models.CashFlowType.YIELD,
                                    models.CashFlowType.RETURN_OF_PRINCIPAL]:
-                        cumulative_distributions += cf.amount
+                        cumulative_distributions += amount
 
             # Get NAV as of this date (use most recent valuation up to this date)
             relevant_valuations = [v for v in investment.valuations if v.date <= current_date]
             if relevant_valuations:
                 latest_val = max(relevant_valuations, key=lambda v: v.date)
-                nav_value += latest_val.nav_value
+                nav_value += latest_val.nav_value * nav_rates[index, date_index]
 
         # Calculate net value (NAV + cumulative distributions)
         net_value = nav_value + cumulative_distributions
 
-        timeline_data.append(TimelineDataPoint(
-            date=current_date.isoformat(),
-            nav_value=nav_value,
-            cumulative_contributions=cumulative_contributions,
-            cumulative_distributions=cumulative_distributions,
-            net_value=net_value
-        ))
+        timeline_data.append({
+            "date": current_date.isoformat(),
+            "nav_value": float(nav_value),
+            "cumulative_contributions": float(cumulative_contributions),
+            "cumulative_distributions": float(cumulative_distributions),
+            "net_value": float(net_value)
+        })
 
-    return timeline_data
+    return FastJSONResponse(chart_series(timeline_data, TIMELINE_FIELDS, layout))
 
 @router.get("/dashboard/j-curve-data", response_model=List[JCurveDataPoint])
 def get_j_curve_data(
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
     """Get J-curve data for the current tenant"""
     # For now, return empty list - this is a complex calculation
@@ -819,11 +944,16 @@ def get_j_curve_data(
 
 @router.get("/dashboard/summary-stats", response_model=DashboardSummaryStats)
 def get_dashboard_summary_stats(
+    currency: Optional[str] = Query(None, min_length=3, max_length=3, description="Reporting currency (default: tenant setting, else USD)"),
     current_user: User = Depends(get_current_active_user),
-    db: Session = Depends(get_db)
+    db: Session = Depends(get_read_db)
 ):
-    """Get dashboard summary statistics for the current tenant"""
+    """
+    Get dashboard summary statistics for the current tenant in the reporting
+    currency: distributions at their own date, NAV and commitments at today's rates
+    """
     investments = crud_tenant.get_investments(db, current_user.tenant_id)
+    reporting_currency, fx, spot = _dashboard_currency(db, current_user.tenant_id, currency, investments)
 
     # Calculate NAV and distributions from valuations and cash flows
     from datetime import date
@@ -835,11 +965,11 @@ def get_dashboard_summary_stats(
     asset_classes = set()
     vintage_years = set()
 
-    for investment in investments:
+    for investment, rate in zip(investments, spot):
         # Get latest valuation for NAV
         if investment.valuations:
             latest_valuation = max(investment.valuations, key=lambda v: v.date)
-            total_nav += latest_valuation.nav_value
+            total_nav += latest_valuation.nav_value * rate
 
         # Count distributions from cash flows - ONLY actual distributions through today
         distributions = [cf for cf in investment.cashflows
@@ -847,7 +977,9 @@ def get_dashboard_summary_stats(
                                      models.CashFlowType.YIELD,
                                      models.CashFlowType.RETURN_OF_PRINCIPAL]
                         and cf.date <= today]
-        total_distributions += sum(cf.amount for cf in distributions)
+        total_distributions += float(sum(reporting_rates(
+            fx, investment.currency, [cf.date for cf in distributions], reporting_currency
+        ) * [cf.amount for cf in distributions]))
 
         # Track asset classes and vintage years
         asset_classes.add(investment.asset_class)
@@ -859,13 +991,14 @@ def get_dashboard_summary_stats(
 
     return DashboardSummaryStats(
         total_investments=len(investments),
-        total_commitment=sum(inv.commitment_amount for inv in investments),
-        total_called=sum(inv.called_amount for inv in investments),
-        total_nav=total_nav,
+        total_commitment=float(sum(inv.commitment_amount * rate for inv, rate in zip(investments, spot))),
+        total_called=float(sum(inv.called_amount * rate for inv, rate in zip(investments, spot))),
+        total_nav=float(total_nav),
         total_distributions=total_distributions,
         asset_classes=len(asset_classes),
         vintage_years=len(vintage_years),
-        active_investments=active_investments
+        active_investments=active_investments,
+        reporting_currency=reporting_currency
     )
 
 # =============================================================================
@@ -1432,3 +1565,123 @@ def delete_entity_relationship(
 
     return {"message": "Relationship deleted successfully"}
 
+
+
+# =============================================================================
+# Look-Through Exposure Endpoints
+# =============================================================================
+
+@router.get("/look-through/entities")
+def get_lookthrough_exposure(
+    as_of_date: Optional[date] = Query(None, description="Ownership and valuation date (default today)"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Direct and look-through commitment, called, distributions and NAV for every entity"""
+    exposure = create_lookthrough_service(db).get_exposure(current_user.tenant_id, as_of_date)
+    return {
+        "as_of_date": exposure.as_of_date,
+        "max_hierarchy_depth": exposure.max_depth,
+        "entities": exposure.entity_totals()
+    }
+
+
+@router.get("/look-through/entities/{entity_id}")
+def get_entity_lookthrough_holdings(
+    entity_id: int,
+    as_of_date: Optional[date] = Query(None, description="Ownership and valuation date (default today)"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Everything an entity owns directly or through the entities below it"""
+    exposure = create_lookthrough_service(db).get_exposure(current_user.tenant_id, as_of_date)
+    holdings = exposure.entity_holdings(entity_id)
+    if holdings is None:
+        raise HTTPException(status_code=404, detail="Entity not found")
+    holdings["as_of_date"] = exposure.as_of_date
+    return holdings
+
+
+# =============================================================================
+# Entity Hierarchy Endpoints
+# =============================================================================
+
+@router.get("/entity-hierarchy/{entity_id}/subtree", response_model=EntitySubtreeResponse)
+def get_entity_subtree(
+    entity_id: int,
+    as_of_date: Optional[date] = Query(None, description="NAV date (default today)"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """An entity's descendants with commitment, called and NAV rolled up per node"""
+    return EntityHierarchyService.get_subtree(db, entity_id, as_of_date, tenant_id=current_user.tenant_id)
+
+
+# =============================================================================
+# Benchmark Ranking Endpoints
+# =============================================================================
+
+@router.get("/portfolio/benchmark-ranking")
+def get_portfolio_benchmark_ranking(
+    as_of_date: Optional[date] = Query(None, description="Performance date (default today)"),
+    quarter_end_date: Optional[date] = Query(None, description="Use benchmarks up to this quarter (default latest)"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """IRR, TVPI and DPI quartiles and percentiles of every investment vs PitchBook vintage benchmarks"""
+    return create_benchmark_ranking_service(db).rank_portfolio(
+        current_user.tenant_id, as_of_date, quarter_end_date
+    )
+
+
+# =============================================================================
+# Forecast Accuracy Endpoints
+# =============================================================================
+
+@router.post("/forecast-accuracy/backtest")
+def run_forecast_backtest(
+    as_of_date: Optional[date] = Query(None, description="Backtest periods ending on or before this date (default today)"),
+    scenario: models.ForecastScenario = models.ForecastScenario.BASE,
+    current_user: User = Depends(require_manager),
+    db: Session = Depends(get_db)
+):
+    """Compare completed forecast periods with actual cash flows and NAVs and record the accuracy"""
+    result = create_forecast_backtest_engine(db).run_backtest(as_of_date, scenario, tenant_id=current_user.tenant_id)
+    return {
+        "as_of_date": result.as_of_date,
+        "scenario": result.scenario,
+        "investments": result.investments,
+        "periods": result.periods,
+        "calibration": result.calibration
+    }
+
+
+@router.get("/forecast-accuracy/calibration")
+def get_forecast_calibration(
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Forecast accuracy by call schedule and distribution timing from the last backtest"""
+    return create_forecast_backtest_engine(db).get_calibration(tenant_id=current_user.tenant_id)
+
+
+# =============================================================================
+# Export Endpoints
+# =============================================================================
+
+@router.get("/export/{dataset}")
+def export_dataset(
+    dataset: str,
+    export_format: str = Query("csv", alias="format", pattern="^(csv|ndjson|xlsx)$"),
+    investment_id: Optional[int] = Query(None, description="Filter by investment"),
+    start_date: Optional[date] = Query(None, description="Start date filter (cash flows and valuations)"),
+    end_date: Optional[date] = Query(None, description="End date filter (cash flows and valuations)"),
+    current_user: User = Depends(get_current_active_user),
+    db: Session = Depends(get_read_db)
+):
+    """Stream the tenant's cashflows, valuations or investments as CSV, NDJSON or XLSX"""
+    try:
+        return export_response(db, dataset, export_format, current_user.tenant_id,
+                               investment_id=investment_id, start_date=start_date, end_date=end_date)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -117,6 +117,8 @@ class EntityWithMembers(Entity):
     family_members: List[FamilyMember] = []
     investment_count: Optional[int] = 0
     total_commitment: Optional[float] = 0.0
+    total_called: Optional[float] = 0.0
+    current_nav: Optional[float] = 0.0
 
 class InvestmentBase(BaseModel):
     name: str = Field(..., min_length=1, max_length=255)
@@ -276,11 +278,14 @@ class PortfolioPerformance(BaseModel):
     realized_investment_count: int
     total_commitment: float
     total_called: float
+    reporting_currency: Optional[str] = None
+    unconverted_currencies: List[str] = []  # Investment currencies without FX rates (left as-is)
 
 class CommitmentVsCalledData(BaseModel):
     commitment_amount: float
     called_amount: float
     uncalled_amount: float
+    reporting_currency: str = "USD"
 
 class AssetAllocationData(BaseModel):
     asset_class: str
@@ -316,6 +321,7 @@ class DashboardSummaryStats(BaseModel):
     asset_classes: int
     vintage_years: int
     active_investments: int
+    reporting_currency: str = "USD"
 
 # Benchmark Performance Schemas
 class BenchmarkData(BaseModel):
@@ -739,6 +745,27 @@ class EntityHierarchyNode(BaseModel):
     children: List['EntityHierarchyNode'] = []
     relationship_summary: str = ""  # Summary of key relationships
 
+class EntitySubtreeNode(BaseModel):
+    """Entity hierarchy node with its own and its subtree's investment totals"""
+    entity_id: int
+    entity_name: str
+    entity_type: EntityType
+    parent_entity_id: Optional[int] = None
+    hierarchy_level: int
+    hierarchy_path: str
+    sort_order: int = 0
+    # Investments held directly by this entity
+    investment_count: int = 0
+    total_commitment: float = 0.0
+    called_amount: float = 0.0
+    current_nav: float = 0.0
+    # This entity plus everything below it
+    subtree_investment_count: int = 0
+    subtree_commitment: float = 0.0
+    subtree_called: float = 0.0
+    subtree_nav: float = 0.0
+    children: List['EntitySubtreeNode'] = []
+
 # Response schemas for complex queries
 
 class EntityWithRelationships(Entity):
@@ -760,6 +787,13 @@ class FamilyTreeResponse(BaseModel):
     total_entities: int
     max_hierarchy_depth: int
 
+class EntitySubtreeResponse(BaseModel):
+    """One entity's subtree with per-node rollups"""
+    as_of_date: date
+    root: EntitySubtreeNode
+    total_entities: int
+    max_hierarchy_depth: int
+
 class OwnershipVisualizationData(BaseModel):
     """Data for ownership visualization charts"""
     investment_id: int
@@ -0,0 +1,134 @@
+"""
+PitchBook Benchmark Reference Cache
+
+Benchmark tables only change when a report is imported, so the read endpoints
+serve pre-serialized JSON bodies from memory, one per filter combination.
+Each body carries a content hash ETag; a request whose If-None-Match matches
+gets an empty 304.
+
+Entries belong to a data version: a fingerprint (row count, max id, latest
+import date and quarter) of the benchmark tables plus a local generation that
+imports bump through invalidate(). The fingerprint is re-read at most every
+BENCHMARK_CACHE_VERSION_CHECK_SECONDS, so imports made by other workers are
+picked up too; a changed version drops every entry.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Callable, Hashable, Optional, Tuple
+
+from fastapi import Request, Response
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models import PitchBookPerformanceByVintage, PitchBookMultiplesQuantiles, PitchBookQuarterlyReturns
+
+BENCHMARK_CACHE_VERSION_CHECK_SECONDS = float(os.getenv("BENCHMARK_CACHE_VERSION_CHECK_SECONDS", "30"))
+BENCHMARK_CACHE_MAX_ENTRIES = 256
+
+REFERENCE_TABLES = (PitchBookPerformanceByVintage, PitchBookMultiplesQuantiles, PitchBookQuarterlyReturns)
+
+
+@dataclass
+class CachedBody:
+    body: bytes
+    etag: str
+
+
+def benchmark_data_version(db: Session) -> Tuple:
+    """Fingerprint of the benchmark tables: count, max id, latest import and quarter per table"""
+    version = []
+    for model in REFERENCE_TABLES:
+        count, max_id, last_import, last_quarter = db.query(
+            func.count(model.id), func.max(model.id), func.max(model.import_date), func.max(model.quarter_end_date)
+        ).one()
+        version.append((
+            count, max_id,
+            last_import.isoformat() if last_import else None,
+            last_quarter.isoformat() if last_quarter else None
+        ))
+    return tuple(version)
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """True if an If-None-Match header value covers the ETag (weak comparison)"""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+    tags = [tag.strip() for tag in if_none_match.split(',')]
+    return etag in tags or f"W/{etag}" in tags
+
+
+class BenchmarkReferenceCache:
+    """Versioned in-memory cache of serialized benchmark responses"""
+
+    def __init__(self, version_check_seconds: float = BENCHMARK_CACHE_VERSION_CHECK_SECONDS,
+                 max_entries: int = BENCHMARK_CACHE_MAX_ENTRIES):
+        self.version_check_seconds = version_check_seconds
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedBody]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._version: Optional[Tuple] = None
+        self._version_checked_at = float('-inf')
+
+    def invalidate(self):
+        """Drop every entry; call after importing benchmark data"""
+        with self._lock:
+            self._generation += 1
+            self._version = None
+            self._version_checked_at = float('-inf')
+            self._entries.clear()
+
+    def _refresh_version(self, db: Session):
+        now = time.monotonic()
+        with self._lock:
+            if now - self._version_checked_at < self.version_check_seconds:
+                return
+            generation = self._generation
+        version = benchmark_data_version(db)
+        with self._lock:
+            if generation != self._generation:
+                return  # invalidated meanwhile; the next request re-checks
+            if version != self._version:
+                self._entries.clear()
+                self._version = version
+            self._version_checked_at = now
+
+    def get(self, db: Session, key: Hashable, build: Callable[[], bytes]) -> CachedBody:
+        """Cached body for key, building and serializing it on a miss"""
+        self._refresh_version(db)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+            generation = self._generation
+
+        body = build()
+        entry = CachedBody(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+        with self._lock:
+            if generation == self._generation:
+                self._entries[key] = entry
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def response(self, request: Request, db: Session, key: Hashable, build: Callable[[], bytes]) -> Response:
+        """JSON response for key, or 304 Not Modified when the client's ETag is current"""
+        entry = self.get(db, key, build)
+        headers = {"ETag": entry.etag, "Cache-Control": "no-cache"}
+        if etag_matches(request.headers.get("if-none-match"), entry.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+benchmark_cache = BenchmarkReferenceCache()
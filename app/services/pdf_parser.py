@@ -21,6 +21,13 @@ import logging
 import io
 import tempfile
 import os
+import gc
+from operator import itemgetter
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
 
 try:
     import pdfplumber
@@ -36,6 +43,97 @@ class PDFParsingError(Exception):
     """Custom exception for PDF parsing errors"""
     pass
 
+# HTML parser line/word grouping tolerances (points)
+HTML_STYLE_Y_TOLERANCE = 5
+HTML_STYLE_WORD_GAP = 3
+
+# Pages scanned for the report period before table extraction starts
+REPORT_PERIOD_SCAN_PAGES = 3
+# Resident memory a single parse may add before a warning is logged (MB, 0 = no check)
+PDF_PARSE_MEMORY_BUDGET_MB = float(os.getenv("PDF_PARSE_MEMORY_BUDGET_MB", "512"))
+
+
+def current_rss_mb() -> Optional[float]:
+    """Resident set size of this process in MB, or None where it can't be read"""
+    try:
+        with open('/proc/self/statm') as statm:
+            return int(statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    if resource is None:
+        return None
+    # No /proc (macOS): fall back to the process high-water mark (bytes on macOS)
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / (1024 * 1024)
+
+
+def release_page(page) -> None:
+    """Drop a pdfplumber page's cached layout, objects, edges and text map"""
+    page.flush_cache()
+    get_textmap = getattr(page, 'get_textmap', None)
+    if hasattr(get_textmap, 'cache_clear'):
+        get_textmap.cache_clear()
+
+
+def chars_to_word_lines(chars: List[Dict[str, Any]], y_tolerance: float = HTML_STYLE_Y_TOLERANCE,
+                        word_gap: float = HTML_STYLE_WORD_GAP) -> List[List[str]]:
+    """
+    Group pdfplumber chars into lines of words using the HTML parser's rules:
+    chars are ordered top to bottom (rounded y0 descending) then left to right,
+    a new line starts when y0 moves ``y_tolerance`` or more from the previous
+    char, each line is re-sorted by x0, and a new word starts when the gap to
+    the previous char is over ``word_gap``. Words are stripped; empty words and
+    lines are dropped.
+
+    Coordinates are loaded into NumPy arrays so sorting and line / word breaks
+    are vectorized; word texts are slices of one joined string, so there is no
+    per-character string concatenation.
+    """
+    n = len(chars)
+    if n == 0:
+        return []
+    x0 = np.fromiter(map(itemgetter('x0'), chars), dtype=float, count=n)
+    x1 = np.fromiter(map(itemgetter('x1'), chars), dtype=float, count=n)
+    y0 = np.fromiter(map(itemgetter('y0'), chars), dtype=float, count=n)
+
+    # Y descending (top first), then X ascending - lexsort is stable, so ties keep sorted()'s order
+    order = np.lexsort((x0, np.round(-y0)))
+
+    # A line continues while y0 is within tolerance of the previous char's y0
+    y_sorted = y0[order]
+    line_break = ~(np.abs(np.diff(y_sorted)) < y_tolerance) & (y_sorted[:-1] != -1)
+    line_ids = np.concatenate(([0], np.cumsum(line_break)))
+
+    # Re-sort each line left to right (line ids are already non-decreasing)
+    order = order[np.lexsort((x0[order], line_ids))]
+
+    # A word starts at each line start and wherever the gap to the previous char exceeds word_gap
+    gaps = x0[order][1:] - x1[order][:-1]
+    word_start = np.concatenate(([True], (np.diff(line_ids) != 0) | ~(gaps <= word_gap)))
+    starts = np.flatnonzero(word_start)
+
+    page_texts = list(map(itemgetter('text'), chars))
+    texts = [page_texts[i] for i in order.tolist()]
+    offsets = np.concatenate(([0], np.cumsum(np.fromiter(map(len, texts), dtype=np.int64, count=n))))
+    text = ''.join(texts)
+
+    word_lines = []
+    words = []
+    last_line = None
+    for line, begin, end in zip(line_ids[starts].tolist(), offsets[starts].tolist(),
+                                offsets[np.append(starts[1:], n)].tolist()):
+        if line != last_line:
+            if words:
+                word_lines.append(words)
+            words = []
+            last_line = line
+        word = text[begin:end].strip()
+        if word:
+            words.append(word)
+    if words:
+        word_lines.append(words)
+    return word_lines
+
+
 class PitchBookPDFParser:
     """
     Parser for PitchBook PDF reports that extracts comprehensive benchmark data
@@ -140,11 +238,19 @@ class PitchBookPDFParser:
             pdf_path: Path to the PDF file
             report_period: Report period (e.g., 'Q4-2024'). If None, will attempt to extract from PDF
 
+        Pages are processed one at a time: each page's text is extracted once and
+        its cached layout is released as soon as its tables are read, so memory
+        stays flat however long the report is. Without a report_period, the
+        period is detected from the first pages before any table is parsed, so
+        every record gets its quarter date. Resident memory is sampled per
+        page and reported in the metadata as peak_memory_mb/memory_growth_mb.
+
         Returns:
             Dictionary containing all extracted benchmark data organized by type
         """
         try:
             with pdfplumber.open(pdf_path) as pdf:
+                pages = pdf.pages
                 results = {
                     'performance_by_vintage': [],
                     'multiples_by_vintage': [],
@@ -153,13 +259,33 @@ class PitchBookPDFParser:
                     'metadata': {
                         'report_period': report_period,
                         'extraction_date': datetime.now().isoformat(),
-                        'total_pages': len(pdf.pages)
+                        'total_pages': len(pages)
                     }
                 }
 
+                start_rss = peak_rss = current_rss_mb()
+                over_budget_logged = False
+
+                # Detect the report period from the cover pages; their text is reused below
+                page_texts = []
+                if not report_period:
+                    for page in pages[:REPORT_PERIOD_SCAN_PAGES]:
+                        page_texts.append(page.extract_text() or "")
+                        report_period = self._find_report_period(''.join(page_texts))
+                        if report_period:
+                            logger.debug(f"Report period {report_period} detected on page {len(page_texts)}")
+                            results['metadata']['report_period'] = report_period
+                            break
+
                 # Process each page systematically
-                for page_num, page in enumerate(pdf.pages):
-                    page_text = page.extract_text() or ""
+                for page_num, page in enumerate(pages):
+                    if page_num < len(page_texts):
+                        page_text = page_texts[page_num]
+                    else:
+                        page_text = page.extract_text() or ""
+                        if not report_period:
+                            # Kept only for the end-of-document period fallback
+                            page_texts.append(page_text)
                     logger.debug(f"Processing page {page_num + 1}")
 
                     # TEMPORARILY DISABLED: Check for targeted IRR tables on specific pages first
@@ -178,6 +304,20 @@ class PitchBookPDFParser:
 
                     # Extract tables from page using multiple strategies
                     page_tables = self._extract_tables_with_fallbacks(page)
+                    release_page(page)
+
+                    rss = current_rss_mb()
+                    if rss is not None:
+                        peak_rss = max(peak_rss, rss)
+                        growth = rss - start_rss
+                        if PDF_PARSE_MEMORY_BUDGET_MB and growth > PDF_PARSE_MEMORY_BUDGET_MB and not over_budget_logged:
+                            gc.collect()
+                            growth = (current_rss_mb() or rss) - start_rss
+                            if growth > PDF_PARSE_MEMORY_BUDGET_MB:
+                                logger.warning(f"PDF parse of {pdf_path} grew memory by {growth:.0f} MB at page {page_num + 1} "
+                                               f"(budget {PDF_PARSE_MEMORY_BUDGET_MB:.0f} MB)")
+                                over_budget_logged = True
+
                     if not page_tables:
                         continue
 
@@ -223,8 +363,13 @@ class PitchBookPDFParser:
 
                 # Determine report period if not provided
                 if not results['metadata']['report_period']:
-                    full_text = ''.join([page.extract_text() or '' for page in pdf.pages])
-                    results['metadata']['report_period'] = self._extract_report_period(full_text)
+                    results['metadata']['report_period'] = self._extract_report_period(''.join(page_texts))
+
+                if start_rss is not None:
+                    results['metadata']['peak_memory_mb'] = round(peak_rss, 1)
+                    results['metadata']['memory_growth_mb'] = round(peak_rss - start_rss, 1)
+                    logger.info(f"Parsed {len(pages)} pages, peak memory {peak_rss:.0f} MB "
+                                f"(+{peak_rss - start_rss:.0f} MB)")
 
                 # Deduplicate results to prevent constraint violations
                 results = self._deduplicate_extracted_data(results)
@@ -239,7 +384,18 @@ class PitchBookPDFParser:
 
 
     def _extract_report_period(self, text: str) -> str:
-        """Extract report period from PDF text"""
+        """Extract report period from PDF text, defaulting to the current quarter"""
+        report_period = self._find_report_period(text)
+        if report_period:
+            return report_period
+
+        # Default to current quarter/year if can't extract
+        current_date = datetime.now()
+        quarter = ((current_date.month - 1) // 3) + 1
+        return f"Q{quarter}-{current_date.year}"
+
+    def _find_report_period(self, text: str) -> Optional[str]:
+        """Report period (e.g. 'Q4-2024') mentioned in the text, or None"""
         # Look for patterns like "Q4 2024", "Q1-2025", "Fourth Quarter 2024"
         patterns = [
             r'Q([1-4])[- ]?(\d{4})',
@@ -265,10 +421,7 @@ class PitchBookPDFParser:
                     if len(match) == 2:
                         return f"Q{match[0]}-{match[1]}"
 
-        # Default to current quarter/year if can't extract
-        current_date = datetime.now()
-        quarter = ((current_date.month - 1) // 3) + 1
-        return f"Q{quarter}-{current_date.year}"
+        return None
 
 
 
@@ -638,67 +791,8 @@ class PitchBookPDFParser:
 
             logger.debug(f"HTML-style extraction: Found {len(chars)} characters")
 
-            # Sort items by Y (top to bottom) then X (left to right) - EXACT HTML PARSER LOGIC
-            # HTML: items.sort((a, b) => { if (Math.abs(a.transform[5] - b.transform[5]) > Y_TOLERANCE) return b.transform[5] - a.transform[5]; return a.transform[4] - b.transform[4]; })
-            Y_TOLERANCE = 5
-            sorted_chars = sorted(chars, key=lambda c: (
-                round(-c['y0']), c['x0']  # Y descending (top first), then X ascending (left to right)
-            ))
-
-            # Group characters into lines based on Y-coordinate - EXACT HTML PARSER LOGIC
-            lines = []
-            current_line = []
-            last_y = -1
-
-            for char in sorted_chars:
-                char_y = char['y0']
-                if last_y == -1 or abs(char_y - last_y) < Y_TOLERANCE:
-                    current_line.append(char)
-                else:
-                    if current_line:
-                        # Sort line by X coordinate (left to right)
-                        current_line.sort(key=lambda c: c['x0'])
-                        lines.append(current_line)
-                    current_line = [char]
-                last_y = char_y
-
-            # Add final line
-            if current_line:
-                current_line.sort(key=lambda c: c['x0'])
-                lines.append(current_line)
-
-            logger.debug(f"HTML-style extraction: Grouped into {len(lines)} lines")
-
-            # Convert character lines to word lines (merge adjacent characters into words)
-            word_lines = []
-            for line in lines:
-                words = []
-                current_word = ""
-                word_x0 = None
-
-                for i, char in enumerate(line):
-                    if current_word == "":
-                        # Start new word
-                        current_word = char['text']
-                        word_x0 = char['x0']
-                    else:
-                        # Check if we should continue the current word or start a new one
-                        prev_char = line[i-1] if i > 0 else None
-                        if prev_char and char['x0'] - prev_char['x1'] <= 3:  # Within 3 points = same word
-                            current_word += char['text']
-                        else:
-                            # Finish current word and start new one
-                            if current_word.strip():
-                                words.append(current_word.strip())
-                            current_word = char['text']
-                            word_x0 = char['x0']
-
-                # Add final word
-                if current_word.strip():
-                    words.append(current_word.strip())
-
-                if words:
-                    word_lines.append(words)
+            # Group characters into lines, then merge adjacent characters into words
+            word_lines = chars_to_word_lines(chars)
 
             logger.debug(f"HTML-style extraction: Converted to {len(word_lines)} word lines")
 
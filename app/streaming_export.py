@@ -0,0 +1,220 @@
+"""
+Streaming exports of cash flows, valuations and investments
+
+Rows come from a server-side cursor (``yield_per``) in fixed-size partitions
+and are encoded batch by batch, so a full history export never holds more than
+one partition in memory:
+
+- CSV and NDJSON are written straight into the response stream
+- XLSX is written with xlsxwriter in ``constant_memory`` mode (each row is
+  flushed to disk as it is written) to a temporary file that is then streamed;
+  column widths are fixed per column instead of measured per cell
+"""
+
+import csv
+import enum
+import io
+import json
+import tempfile
+import uuid
+from dataclasses import dataclass
+from datetime import date
+from typing import Iterator, List, Optional, Sequence
+
+import xlsxwriter
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import models
+from app.cashflow_listing import serialize_rows
+
+EXPORT_FORMATS = ('csv', 'ndjson', 'xlsx')
+EXPORT_DATASETS = ('cashflows', 'valuations', 'investments')
+EXPORT_BATCH_ROWS = 5000
+STREAM_BLOCK_BYTES = 64 * 1024
+
+MEDIA_TYPES = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'xlsx': 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+}
+
+
+@dataclass
+class ExportColumn:
+    key: str
+    header: str
+    expression: object
+    width: int = 14
+
+
+def export_columns(dataset: str) -> List[ExportColumn]:
+    """Column layout for an export dataset; raises ValueError for an unknown dataset"""
+    CashFlow, Valuation, Investment, Entity = models.CashFlow, models.Valuation, models.Investment, models.Entity
+    if dataset == 'cashflows':
+        return [
+            ExportColumn('id', 'ID', CashFlow.id, 8),
+            ExportColumn('investment_id', 'Investment ID', CashFlow.investment_id),
+            ExportColumn('investment_name', 'Investment', Investment.name, 32),
+            ExportColumn('date', 'Date', CashFlow.date, 12),
+            ExportColumn('type', 'Type', CashFlow.type, 20),
+            ExportColumn('amount', 'Amount', CashFlow.amount, 16),
+            ExportColumn('distribution_type', 'Distribution Type', CashFlow.distribution_type, 18),
+            ExportColumn('tax_year', 'Tax Year', CashFlow.tax_year, 10),
+            ExportColumn('notes', 'Notes', CashFlow.notes, 40),
+        ]
+    if dataset == 'valuations':
+        return [
+            ExportColumn('id', 'ID', Valuation.id, 8),
+            ExportColumn('investment_id', 'Investment ID', Valuation.investment_id),
+            ExportColumn('investment_name', 'Investment', Investment.name, 32),
+            ExportColumn('date', 'Date', Valuation.date, 12),
+            ExportColumn('nav_value', 'NAV', Valuation.nav_value, 16),
+        ]
+    if dataset == 'investments':
+        return [
+            ExportColumn('id', 'ID', Investment.id, 8),
+            ExportColumn('name', 'Name', Investment.name, 32),
+            ExportColumn('entity_name', 'Entity', Entity.name, 28),
+            ExportColumn('asset_class', 'Asset Class', Investment.asset_class, 20),
+            ExportColumn('investment_structure', 'Investment Structure', Investment.investment_structure, 22),
+            ExportColumn('strategy', 'Strategy', Investment.strategy, 20),
+            ExportColumn('manager', 'Manager', Investment.manager, 24),
+            ExportColumn('vintage_year', 'Vintage Year', Investment.vintage_year, 12),
+            ExportColumn('currency', 'Currency', Investment.currency, 10),
+            ExportColumn('commitment_amount', 'Commitment Amount', Investment.commitment_amount, 18),
+            ExportColumn('called_amount', 'Called Amount', Investment.called_amount, 16),
+            ExportColumn('fees', 'Fees', Investment.fees, 12),
+            ExportColumn('is_archived', 'Archived', Investment.is_archived, 10),
+        ]
+    raise ValueError(f"Unknown export dataset {dataset}; choose one of {', '.join(EXPORT_DATASETS)}")
+
+
+def export_statement(dataset: str, columns: Sequence[ExportColumn], tenant_id: Optional[int] = None,
+                     investment_id: Optional[int] = None, start_date: Optional[date] = None,
+                     end_date: Optional[date] = None):
+    """SELECT for an export dataset, filtered and in a stable order"""
+    if dataset == 'investments':
+        Investment = models.Investment
+        stmt = select(*(c.expression for c in columns)).join(models.Entity, Investment.entity_id == models.Entity.id)
+        if tenant_id is not None:
+            stmt = stmt.where(Investment.tenant_id == tenant_id)
+        if investment_id is not None:
+            stmt = stmt.where(Investment.id == investment_id)
+        return stmt.order_by(Investment.id)
+
+    model = models.CashFlow if dataset == 'cashflows' else models.Valuation
+    stmt = select(*(c.expression for c in columns)).join(models.Investment, model.investment_id == models.Investment.id)
+    if tenant_id is not None:
+        stmt = stmt.where(model.tenant_id == tenant_id)
+    if investment_id is not None:
+        stmt = stmt.where(model.investment_id == investment_id)
+    if start_date:
+        stmt = stmt.where(model.date >= start_date)
+    if end_date:
+        stmt = stmt.where(model.date <= end_date)
+    return stmt.order_by(model.date, model.id)
+
+
+def iter_batches(db: Session, stmt, batch_rows: int = EXPORT_BATCH_ROWS) -> Iterator[List[tuple]]:
+    """Rows from a server-side cursor, one yield_per partition at a time"""
+    result = db.execute(stmt.execution_options(yield_per=batch_rows))
+    try:
+        for partition in result.partitions():
+            yield [tuple(row) for row in partition]
+    finally:
+        result.close()
+
+
+def iter_csv(columns: Sequence[ExportColumn], batches: Iterator[List[tuple]]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow([c.header for c in columns])
+    yield buffer.getvalue()
+    for batch in batches:
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(serialize_rows(batch))
+        yield buffer.getvalue()
+
+
+def iter_ndjson(columns: Sequence[ExportColumn], batches: Iterator[List[tuple]]) -> Iterator[str]:
+    keys = [c.key for c in columns]
+    for batch in batches:
+        yield ''.join(
+            json.dumps(dict(zip(keys, values)), separators=(',', ':')) + '\n'
+            for values in serialize_rows(batch)
+        )
+
+
+def _xlsx_value(value):
+    # Dates stay native so Excel sees real dates; enums and UUIDs become text
+    if isinstance(value, enum.Enum):
+        return value.value
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    return value
+
+
+def write_xlsx(columns: Sequence[ExportColumn], batches: Iterator[List[tuple]], sheet_name: str):
+    """Write rows to a temporary XLSX file in constant memory; returns the file rewound to the start"""
+    output = tempfile.TemporaryFile()
+    workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'default_date_format': 'yyyy-mm-dd'})
+    try:
+        worksheet = workbook.add_worksheet(sheet_name)
+        header_format = workbook.add_format({'bold': True})
+        for col, column in enumerate(columns):
+            worksheet.set_column(col, col, column.width)
+        worksheet.write_row(0, 0, [c.header for c in columns], header_format)
+        worksheet.freeze_panes(1, 0)
+
+        row_num = 1
+        for batch in batches:
+            for values in batch:
+                worksheet.write_row(row_num, 0, [_xlsx_value(v) for v in values])
+                row_num += 1
+    finally:
+        workbook.close()
+    output.seek(0)
+    return output
+
+
+def iter_file(handle, block_bytes: int = STREAM_BLOCK_BYTES) -> Iterator[bytes]:
+    """Stream a file in blocks and close it afterwards"""
+    try:
+        while True:
+            block = handle.read(block_bytes)
+            if not block:
+                break
+            yield block
+    finally:
+        handle.close()
+
+
+def export_response(db: Session, dataset: str, export_format: str, tenant_id: Optional[int] = None,
+                    investment_id: Optional[int] = None, start_date: Optional[date] = None,
+                    end_date: Optional[date] = None, filename: Optional[str] = None) -> StreamingResponse:
+    """
+    StreamingResponse exporting a dataset as CSV, NDJSON or XLSX.
+    Raises ValueError for an unknown dataset or format.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format {export_format}; choose one of {', '.join(EXPORT_FORMATS)}")
+    columns = export_columns(dataset)
+    stmt = export_statement(dataset, columns, tenant_id, investment_id, start_date, end_date)
+    batches = iter_batches(db, stmt)
+
+    if export_format == 'csv':
+        body = iter_csv(columns, batches)
+    elif export_format == 'ndjson':
+        body = iter_ndjson(columns, batches)
+    else:
+        body = iter_file(write_xlsx(columns, batches, dataset.capitalize()))
+
+    filename = filename or f"{dataset}_{date.today().isoformat()}.{export_format}"
+    return StreamingResponse(
+        body,
+        media_type=MEDIA_TYPES[export_format],
+        headers={"Content-Disposition": f"attachment; filename={filename}"}
+    )
@@ -0,0 +1,144 @@
+"""
+Streaming ingestion for large spreadsheet uploads
+
+Uploads are spooled to a temporary file in fixed-size blocks instead of being
+buffered with ``await file.read()``, and sheets are read with openpyxl in
+``read_only`` mode in row chunks. Each chunk is a small DataFrame with a
+``_row_num`` column holding the sheet row number, so validators can run
+chunk-by-chunk with bounded memory and still report exact rows.
+"""
+
+import itertools
+import os
+import tempfile
+import logging
+from contextlib import asynccontextmanager
+from io import BytesIO
+from typing import Iterator, Optional, Sequence, Union
+
+import pandas as pd
+from fastapi import UploadFile
+
+logger = logging.getLogger(__name__)
+
+SPOOL_BLOCK_BYTES = 1024 * 1024
+DEFAULT_CHUNK_ROWS = 5000
+
+UploadSource = Union[bytes, str]
+
+
+async def spool_upload(upload: UploadFile, suffix: Optional[str] = None) -> str:
+    """Copy an upload to a temporary file block by block; the caller removes the file"""
+    if suffix is None:
+        suffix = os.path.splitext(upload.filename or "")[1]
+
+    await upload.seek(0)
+    with tempfile.NamedTemporaryFile(delete=False, suffix=suffix) as temp_file:
+        while True:
+            block = await upload.read(SPOOL_BLOCK_BYTES)
+            if not block:
+                break
+            temp_file.write(block)
+        return temp_file.name
+
+
+@asynccontextmanager
+async def spooled_upload(upload: UploadFile, suffix: Optional[str] = None):
+    """Spool an upload to disk for the duration of the block"""
+    path = await spool_upload(upload, suffix)
+    try:
+        yield path
+    finally:
+        try:
+            os.unlink(path)
+        except OSError:
+            logger.warning(f"Could not remove spooled upload {path}")
+
+
+def _open_source(source: UploadSource):
+    return BytesIO(source) if isinstance(source, (bytes, bytearray)) else source
+
+
+def _is_blank(values: Sequence) -> bool:
+    return all(v is None or (isinstance(v, str) and not v.strip()) for v in values)
+
+
+def _header_columns(values: Sequence) -> list:
+    columns = list(values)
+    # Trim trailing empty header cells (read-only sheets often report extra columns)
+    while columns and columns[-1] is None:
+        columns.pop()
+    return [col if col is not None else f"Unnamed: {i}" for i, col in enumerate(columns)]
+
+
+def _chunk_frame(rows: list, row_nums: list, columns: list) -> pd.DataFrame:
+    width = len(columns)
+    records = [tuple(row[:width]) + (None,) * (width - len(row)) for row in rows]
+    df = pd.DataFrame.from_records(records, columns=columns)
+    df['_row_num'] = row_nums
+    return df
+
+
+def iter_excel_chunks(source: UploadSource, sheet_name: str, header_row: int = 1,
+                      skip_rows: Sequence[int] = (), chunk_size: int = DEFAULT_CHUNK_ROWS,
+                      filename: Optional[str] = None) -> Iterator[pd.DataFrame]:
+    """
+    Yield a sheet as DataFrame chunks of at most ``chunk_size`` rows.
+
+    ``header_row`` and ``skip_rows`` are 1-based sheet rows; rows above the header
+    and blank rows are skipped. Every chunk carries a ``_row_num`` column.
+    Legacy .xls files are not readable by openpyxl and fall back to pandas.
+    """
+    name = filename or (source if isinstance(source, str) else "")
+    if name.lower().endswith('.xls'):
+        yield from _iter_legacy_excel(source, sheet_name, header_row, skip_rows, chunk_size)
+        return
+
+    from openpyxl import load_workbook  # loaded on first Excel upload, not at worker start
+    workbook = load_workbook(_open_source(source), read_only=True, data_only=True)
+    try:
+        if sheet_name not in workbook.sheetnames:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        skipped = set(skip_rows)
+        columns = None
+        rows, row_nums = [], []
+
+        for row_num, values in enumerate(workbook[sheet_name].iter_rows(values_only=True), start=1):
+            if row_num < header_row or row_num in skipped:
+                continue
+            if row_num == header_row:
+                columns = _header_columns(values)
+                continue
+            if _is_blank(values):
+                continue
+            rows.append(values)
+            row_nums.append(row_num)
+            if len(rows) >= chunk_size:
+                yield _chunk_frame(rows, row_nums, columns)
+                rows, row_nums = [], []
+
+        if rows:
+            yield _chunk_frame(rows, row_nums, columns)
+    finally:
+        workbook.close()
+
+
+def _iter_legacy_excel(source: UploadSource, sheet_name: str, header_row: int,
+                       skip_rows: Sequence[int], chunk_size: int) -> Iterator[pd.DataFrame]:
+    skipped = set(skip_rows)
+    df = pd.read_excel(_open_source(source), sheet_name=sheet_name,
+                       skiprows=[r - 1 for r in range(1, header_row)] + [r - 1 for r in skipped], header=0)
+    data_rows = (r for r in itertools.count(header_row + 1) if r not in skipped)
+    df['_row_num'] = list(itertools.islice(data_rows, len(df)))
+    df = df.dropna(how='all', subset=[c for c in df.columns if c != '_row_num'])
+    for start in range(0, len(df), chunk_size):
+        yield df.iloc[start:start + chunk_size]
+
+
+def iter_csv_chunks(source: UploadSource, chunk_size: int = DEFAULT_CHUNK_ROWS,
+                    **read_csv_kwargs) -> Iterator[pd.DataFrame]:
+    """Yield a CSV as DataFrame chunks with a ``_row_num`` column (line 1 is the header)"""
+    for chunk in pd.read_csv(_open_source(source), chunksize=chunk_size, **read_csv_kwargs):
+        chunk = chunk.dropna(how='all')
+        chunk['_row_num'] = chunk.index + 2
+        yield chunk
@@ -57,6 +57,9 @@ start_backend() {
     echo -e "${BLUE}📡 Backend will be accessible from Windows at: http://localhost:$BACKEND_PORT${NC}"
     echo -e "${BLUE}📖 API Documentation: http://localhost:$BACKEND_PORT/docs${NC}"
 
+    # Create tables and seed reference data once, outside the workers' startup
+    python -m app.db_init
+
     # Start with WSL2-optimized settings
     uvicorn app.main:app --reload --host 0.0.0.0 --port $BACKEND_PORT &
     BACKEND_PID=$!
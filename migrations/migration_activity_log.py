@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Activity Log
+Creates the append-only activity_log table used by the /api/audit endpoints
+and backfills it from the existing created_by/updated_by audit fields.
+
+Uses the application's configured DATABASE_URL (SQLite or PostgreSQL).
+Safe to re-run: the table is created only if missing and the backfill only
+runs against an empty log.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.database import engine, SessionLocal
+from app.models import ActivityLog
+from app.activity_log import backfill_activity_log
+
+
+def run_migration():
+    """Create the activity_log table and backfill historical activity"""
+
+    print("🔄 Creating activity_log table...")
+    ActivityLog.__table__.create(bind=engine, checkfirst=True)
+    print("✅ activity_log table ready")
+
+    db = SessionLocal()
+    try:
+        print("🔄 Backfilling activity from audit fields...")
+        inserted = backfill_activity_log(db)
+        if inserted:
+            print(f"✅ Backfilled {inserted} activity records")
+        else:
+            print("✅ Activity log already populated, backfill skipped")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Migration failed: {e}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if not run_migration():
+        sys.exit(1)
@@ -0,0 +1,53 @@
+#!/usr/bin/env python3
+"""
+Database Migration: FX Rates
+Creates the fx_rates table used to express portfolio aggregates in a single
+reporting currency, optionally loading an initial CSV of rates
+(date, currency, usd_rate).
+
+Uses the application's configured DATABASE_URL (SQLite or PostgreSQL).
+Safe to re-run: the table is created only if missing and imported rates are
+upserted by (currency, date).
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.database import engine, SessionLocal
+from app.models import FxRate
+from app.fx_service import import_fx_rates_csv
+
+
+def run_migration(rates_csv=None):
+    """Create the fx_rates table and load an optional rates file"""
+
+    print("🔄 Creating fx_rates table...")
+    FxRate.__table__.create(bind=engine, checkfirst=True)
+    print("✅ fx_rates table ready")
+
+    if not rates_csv:
+        return True
+
+    db = SessionLocal()
+    try:
+        print(f"🔄 Importing FX rates from {rates_csv}...")
+        result = import_fx_rates_csv(db, rates_csv, source=os.path.basename(rates_csv))
+        if result["errors"]:
+            for error in result["errors"][:20]:
+                print(f"❌ {error}")
+            return False
+        print(f"✅ {result['inserted']} rates inserted, {result['updated']} updated")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Migration failed: {e}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if not run_migration(sys.argv[1] if len(sys.argv) > 1 else None):
+        sys.exit(1)
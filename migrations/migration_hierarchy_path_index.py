@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""
+Database Migration: Entity Hierarchy Path Index
+Adds the hierarchy_path index used by the subtree endpoints and rebuilds the
+materialized paths and levels from the parent links (re-parenting previously
+left descendants' paths stale).
+
+Uses the application's configured DATABASE_URL (SQLite or PostgreSQL).
+Safe to re-run: the index is created only if missing and paths that are
+already correct are left untouched.
+"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), '..'))
+
+from app.database import engine, SessionLocal
+from app.models import EntityHierarchy
+from app.entity_relationships import EntityHierarchyService
+
+
+def run_migration():
+    """Create the hierarchy_path index and rebuild hierarchy paths"""
+
+    print("🔄 Creating entity_hierarchy path index...")
+    for index in EntityHierarchy.__table__.indexes:
+        if index.name == 'ix_entity_hierarchy_path':
+            index.create(bind=engine, checkfirst=True)
+    print("✅ ix_entity_hierarchy_path ready")
+
+    db = SessionLocal()
+    try:
+        print("🔄 Rebuilding hierarchy paths from parent links...")
+        changed = EntityHierarchyService.rebuild_hierarchy_paths(db)
+        print(f"✅ {changed} hierarchy entries updated")
+        return True
+    except Exception as e:
+        db.rollback()
+        print(f"❌ Migration failed: {e}")
+        return False
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    if not run_migration():
+        sys.exit(1)
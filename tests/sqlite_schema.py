@@ -0,0 +1,63 @@
+"""
+Temporary SQLite databases with the full application schema, for tests
+
+The models declare PostgreSQL UUID columns, which SQLite cannot render. The
+schema is created from a copy of the metadata with those columns swapped for
+the generic Uuid type, so the mapped models (and every other test) are left
+untouched.
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+
+from sqlalchemy import MetaData, Uuid
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import sessionmaker
+
+from app import models
+from app.database import create_db_engine
+
+
+def create_schema(engine):
+    metadata = MetaData()
+    for table in models.Base.metadata.sorted_tables:
+        for column in table.to_metadata(metadata).columns:
+            if isinstance(column.type, UUID):
+                column.type = Uuid()
+    metadata.create_all(engine)
+
+
+@contextmanager
+def temporary_session(configure=None):
+    """A session on a fresh file database; ``configure`` receives the sessionmaker first"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'test.db')}")
+        create_schema(engine)
+        factory = sessionmaker(bind=engine)
+        if configure is not None:
+            configure(factory)
+        db = factory()
+        try:
+            yield db
+        finally:
+            db.close()
+            engine.dispose()
+
+
+def seed_tenant(db, name="Smith Family Office"):
+    tenant = models.Tenant(name=name)
+    db.add(tenant)
+    db.flush()
+    return tenant
+
+
+def make_investment(tenant, entity, name="Fund I", **fields):
+    """An investment with every required column filled in; ``fields`` override the defaults"""
+    values = dict(
+        name=name, asset_class=models.AssetClass.PRIVATE_EQUITY,
+        investment_structure=models.InvestmentStructure.LIMITED_PARTNERSHIP, entity_id=entity.id,
+        tenant_id=tenant.id, strategy="Buyout", vintage_year=2020, commitment_amount=1_000_000.0,
+    )
+    values.update(fields)
+    return models.Investment(**values)
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Tests for the append-only activity log behind the audit endpoints
+Uses a temporary SQLite database with the full schema (see sqlite_schema.py)
+"""
+
+import sys
+sys.path.append('.')
+
+from datetime import date, datetime, timedelta
+from types import SimpleNamespace
+
+from fastapi import HTTPException
+
+from app import crud, models
+from app.activity_log import (
+    backfill_activity_log, count_activity, get_activity_page, install_activity_log
+)
+from app.models import ActivityLog
+from app.routers import audit
+from sqlite_schema import make_investment, seed_tenant, temporary_session
+
+
+def _database(recorded=True):
+    """A session on a fresh schema; ``recorded`` attaches the activity recorder"""
+    return temporary_session(install_activity_log if recorded else None)
+
+
+def _seed_owner(db):
+    tenant = seed_tenant(db)
+    users = [models.User(username=name, email=f"{name}@example.com", hashed_password="x", tenant_id=tenant.id)
+             for name in ("alice", "bob")]
+    entity = models.Entity(name="Smith Trust", entity_type=models.EntityType.TRUST, tenant_id=tenant.id)
+    db.add_all(users + [entity])
+    db.commit()
+    return tenant, users, entity
+
+
+def _investment(tenant, entity, user, **fields):
+    return make_investment(tenant, entity, created_by_user_id=user.id, created_by=user.username, **fields)
+
+
+def test_creates_and_updates_are_recorded():
+    with _database() as db:
+        tenant, (alice, bob), entity = _seed_owner(db)
+        investment = _investment(tenant, entity, alice)
+        db.add(investment)
+        db.flush()
+        db.add(models.CashFlow(investment_id=investment.id, tenant_id=tenant.id, date=date(2024, 3, 31),
+                               type=models.CashFlowType.CAPITAL_CALL, amount=-250_000.0,
+                               created_by_user_id=alice.id, created_by="alice"))
+        db.commit()
+
+        activity, _ = get_activity_page(db, tenant_id=tenant.id)
+        created = {row['record_type']: row for row in activity if row['action'] == 'create'}
+        assert created['Investment']['user_id'] == alice.id and created['Investment']['username'] == 'alice'
+        assert created['Investment']['investment_id'] == investment.id
+        assert created['Investment']['details'] == {'name': 'Fund I', 'asset_class': 'Private Equity'}
+        assert created['CashFlow']['investment_id'] == investment.id
+        assert created['CashFlow']['tenant_id'] == tenant.id and created['CashFlow']['user_id'] == alice.id
+
+        bob_id = bob.id  # loaded first so the update below is a single flush
+        investment.name = "Fund I (Renamed)"
+        investment.updated_by_user_id, investment.updated_by = bob_id, "bob"
+        db.commit()
+        updates, _ = get_activity_page(db, record_type='Investment', user_id=bob_id)
+        assert len(updates) == 1 and updates[0]['action'] == 'update'
+        assert updates[0]['investment_id'] == investment.id and updates[0]['tenant_id'] == tenant.id
+        assert 'name' in updates[0]['details']['changed_fields']
+
+        # Recomputed columns are not user activity
+        logged = db.query(ActivityLog).count()
+        investment.called_amount, investment.fees = 250_000.0, 1_250.0
+        db.commit()
+        assert db.query(ActivityLog).count() == logged
+
+        # The crud audit reports read the same rows
+        report = crud.get_recent_changes_by_user(db, "alice")
+        assert report['summary']['investments_created'] == 1 and report['summary']['cashflows_created'] == 1
+        assert report['details']['investments_created'][0]['created_by'] == 'alice'
+        history = crud.get_investment_change_history(db, investment.id)
+        assert history['summary'] == {'total_cashflow_changes': 1, 'total_valuation_changes': 0,
+                                      'total_recent_activity': 3}
+
+
+def test_pages_are_keyset_ordered_across_shared_timestamps():
+    with _database(recorded=False) as db:
+        now = datetime(2025, 3, 31, 12, 0, 0)
+        kinds = [('Investment', 'create'), ('CashFlow', 'create'), ('CashFlow', 'create'), ('Investment', 'update')]
+        db.add_all([
+            ActivityLog(occurred_at=now - timedelta(minutes=i // 4), tenant_id=1, action=kinds[i % 4][1],
+                        record_type=kinds[i % 4][0], record_id=i, investment_id=7)
+            for i in range(11)
+        ] + [ActivityLog(occurred_at=now, tenant_id=2, action='create', record_type='Entity', record_id=99)])
+        db.commit()
+
+        seen, cursor = [], None
+        while True:
+            page, cursor = get_activity_page(db, limit=3, cursor=cursor, tenant_id=1)
+            seen.extend(page)
+            if cursor is None:
+                break
+        ids = [row['id'] for row in seen]
+        assert len(ids) == len(set(ids)) == 11
+        keys = [(row['occurred_at'], row['id']) for row in seen]
+        assert keys == sorted(keys, reverse=True)
+
+        assert count_activity(db, tenant_id=1) == {
+            ('Investment', 'create'): 3, ('CashFlow', 'create'): 6, ('Investment', 'update'): 2
+        }
+        assert count_activity(db, tenant_id=1, since=now) == {
+            ('Investment', 'create'): 1, ('CashFlow', 'create'): 2, ('Investment', 'update'): 1
+        }
+
+        try:
+            audit.get_tenant_activity(days=30, user_id=None, record_type=None, limit=10, cursor="not-a-cursor",
+                                      current_user=SimpleNamespace(tenant_id=1), db=db)
+            assert False, "expected HTTPException"
+        except HTTPException as e:
+            assert e.status_code == 400
+
+
+def test_backfill_runs_once_against_an_empty_log():
+    with _database(recorded=False) as db:
+        tenant, (alice, bob), entity = _seed_owner(db)
+        created = datetime(2024, 1, 15, 9, 0, 0)
+        investment = _investment(tenant, entity, alice, created_date=created,
+                                 updated_date=created + timedelta(days=30), updated_by="bob")
+        db.add(investment)
+        db.flush()
+        db.add(models.Valuation(investment_id=investment.id, tenant_id=tenant.id, date=date(2024, 3, 31),
+                                nav_value=900_000.0, created_by="alice", created_date=created,
+                                updated_date=created + timedelta(microseconds=20)))
+        db.commit()
+
+        # Entity create, investment create + update, valuation create (no update: same second)
+        assert backfill_activity_log(db) == 4
+        assert count_activity(db, tenant_id=tenant.id) == {
+            ('Entity', 'create'): 1, ('Investment', 'create'): 1, ('Investment', 'update'): 1,
+            ('Valuation', 'create'): 1
+        }
+        update, = db.query(ActivityLog).filter(ActivityLog.action == 'update').all()
+        assert update.username == 'bob' and update.investment_id == investment.id
+
+        assert backfill_activity_log(db) == 0
+        assert db.query(ActivityLog).count() == 4
+
+
+if __name__ == "__main__":
+    test_creates_and_updates_are_recorded()
+    test_pages_are_keyset_ordered_across_shared_timestamps()
+    test_backfill_runs_once_against_an_empty_log()
+    print("✅ All activity log tests passed")
@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+"""
+Lint-style checks that async route handlers do not block the event loop
+Parses the application modules with ast - no database or server required
+
+An ``async def`` handler must await something (otherwise it should be a plain
+``def``, which FastAPI runs in its thread pool), and must hand DB sessions,
+file reads, PDF parsing and report rendering to app.executors instead of
+calling them directly.
+"""
+
+import sys
+sys.path.append('.')
+
+import ast
+import asyncio
+import glob
+import os
+
+from app import executors
+
+HANDLER_MODULES = ['app/main.py', 'app/main_tenant.py'] + sorted(glob.glob('app/routers/*.py'))
+ROUTE_METHODS = {'get', 'post', 'put', 'patch', 'delete'}
+SESSION_NAMES = {'db'}
+OFFLOAD_CALLS = {'run_blocking', 'run_cpu_bound'}
+BLOCKING_CALLS = {
+    'open', 'sleep', 'read_csv', 'read_excel',
+    'get_report_dataset', 'generate_from_dataset', 'render_report',
+    'extract_data_from_pdf', 'extract_comprehensive_data_from_pdf', 'extract_pitchbook_pdf',
+    'import_from_csv', 'process_upload',
+}
+
+
+def _call_name(call: ast.Call) -> str:
+    func = call.func
+    if isinstance(func, ast.Attribute):
+        return func.attr
+    return func.id if isinstance(func, ast.Name) else ''
+
+
+def _is_blocking(call: ast.Call) -> bool:
+    if _call_name(call) in BLOCKING_CALLS:
+        return True
+    func = call.func
+    if isinstance(func, ast.Attribute) and isinstance(func.value, ast.Name) and func.value.id in SESSION_NAMES:
+        return True  # db.query(...), db.commit(), ...
+    arguments = list(call.args) + [keyword.value for keyword in call.keywords]
+    return any(isinstance(arg, ast.Name) and arg.id in SESSION_NAMES for arg in arguments)
+
+
+def blocking_calls(node: ast.AST):
+    """Blocking calls made directly in a coroutine body, skipping nested functions and offloaded calls"""
+    found = []
+    for child in ast.iter_child_nodes(node):
+        if isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)):
+            continue
+        if isinstance(child, ast.Await) and isinstance(child.value, ast.Call):
+            call = child.value
+            if _call_name(call) in OFFLOAD_CALLS:
+                continue  # the callable and its arguments run in a pool
+            # An awaited coroutine does not block; its arguments are still evaluated here
+            for arg in list(call.args) + [keyword.value for keyword in call.keywords]:
+                found.extend(blocking_calls(ast.Expr(value=arg)))
+            continue
+        if isinstance(child, ast.Call) and _is_blocking(child):
+            found.append((child.lineno, ast.unparse(child.func)))
+        found.extend(blocking_calls(child))
+    return found
+
+
+def route_handlers(source: str):
+    for node in ast.walk(ast.parse(source)):
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            continue
+        for decorator in node.decorator_list:
+            if (isinstance(decorator, ast.Call) and isinstance(decorator.func, ast.Attribute)
+                    and decorator.func.attr in ROUTE_METHODS):
+                yield node
+                break
+
+
+def lint_source(source: str, filename: str = '<source>'):
+    """Problems with the async route handlers in one module"""
+    problems = []
+    for handler in route_handlers(source):
+        if not isinstance(handler, ast.AsyncFunctionDef):
+            continue
+        where = f"{filename}:{handler.lineno} {handler.name}"
+        if not any(isinstance(n, (ast.Await, ast.AsyncWith, ast.AsyncFor)) for n in ast.walk(handler)):
+            problems.append(f"{where}: async handler never awaits; declare it with def")
+        for lineno, call in blocking_calls(handler):
+            problems.append(f"{where}: blocking call {call}() on line {lineno}; use run_blocking/run_cpu_bound")
+    return problems
+
+
+def test_checker_flags_blocking_handlers():
+    source = '''
+@router.get("/a")
+async def never_awaits(db: Session = Depends(get_db)):
+    return db.query(Model).all()
+
+@router.post("/b")
+async def blocks_after_upload(file: UploadFile, db: Session = Depends(get_db)):
+    path = await spool_upload(file)
+    rows = import_rows(db, path)
+    await asyncio.sleep(0)
+    return rows
+
+@router.post("/c")
+async def offloads(file: UploadFile, db: Session = Depends(get_db)):
+    path = await spool_upload(file)
+    pdf = await run_cpu_bound(render_report, Report, "Tenant", await run_blocking(load, db))
+    return await run_blocking(import_rows, db, path)
+
+@router.get("/d")
+def sync_handler(db: Session = Depends(get_db)):
+    return db.query(Model).all()
+'''
+    problems = lint_source(source)
+    assert len(problems) == 3
+    assert 'never_awaits' in problems[0] and 'declare it with def' in problems[0]
+    assert 'never_awaits' in problems[1] and 'db.query()' in problems[1]
+    assert 'blocks_after_upload' in problems[2] and 'import_rows()' in problems[2]
+
+
+def test_async_route_handlers_do_not_block():
+    problems = []
+    for path in HANDLER_MODULES:
+        with open(path, encoding='utf-8') as module:
+            problems.extend(lint_source(module.read(), path))
+    assert not problems, "\n".join(problems)
+
+
+def test_pools_run_work_off_the_loop():
+    async def run():
+        thread_result = await executors.run_blocking(sum, [1, 2, 3])
+        worker_pid = await executors.run_cpu_bound(os.getpid)
+        return thread_result, worker_pid
+
+    try:
+        thread_result, worker_pid = asyncio.run(run())
+    finally:
+        executors.shutdown_pools()
+    assert thread_result == 6
+    if executors.CPU_POOL_SIZE > 0:
+        assert worker_pid != os.getpid()
+
+
+if __name__ == "__main__":
+    test_checker_flags_blocking_handlers()
+    test_async_route_handlers_do_not_block()
+    test_pools_run_work_off_the_loop()
+    print("✅ All async handler tests passed")
@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the PitchBook benchmark reference cache
+Uses a temporary SQLite database holding only the benchmark tables
+"""
+
+import sys
+sys.path.append('.')
+
+import os
+import tempfile
+from datetime import date
+
+from sqlalchemy.orm import sessionmaker
+from starlette.requests import Request
+
+from app.database import create_db_engine
+from app.models import PitchBookPerformanceByVintage
+from app.services.benchmark_cache import BenchmarkReferenceCache, REFERENCE_TABLES, etag_matches
+
+
+def _request(if_none_match=None):
+    headers = [(b'if-none-match', if_none_match.encode())] if if_none_match else []
+    return Request({'type': 'http', 'method': 'GET', 'path': '/', 'headers': headers})
+
+
+def _add_vintage(db, vintage_year):
+    db.add(PitchBookPerformanceByVintage(asset_class='private_equity', vintage_year=vintage_year,
+                                         median_irr=0.1, quarter_end_date=date(2024, 12, 31)))
+    db.commit()
+
+
+def test_etag_matching():
+    assert etag_matches('"abc"', '"abc"')
+    assert etag_matches('"x", W/"abc"', '"abc"')
+    assert etag_matches('*', '"abc"')
+    assert not etag_matches('"abd"', '"abc"')
+    assert not etag_matches(None, '"abc"')
+
+
+def test_cached_bodies_follow_data_version():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'benchmarks.db')}")
+        try:
+            for model in REFERENCE_TABLES:
+                model.__table__.create(engine)
+            db = sessionmaker(bind=engine)()
+            _add_vintage(db, 2019)
+
+            cache = BenchmarkReferenceCache(version_check_seconds=0)
+            builds = []
+
+            def build():
+                builds.append(1)
+                return f'[{db.query(PitchBookPerformanceByVintage).count()}]'.encode()
+
+            first = cache.response(_request(), db, ('performance-data',), build)
+            assert first.status_code == 200 and first.body == b'[1]'
+            etag = first.headers['etag']
+
+            # Repeated lookups are served from memory; a current ETag gets a bodiless 304
+            not_modified = cache.response(_request(etag), db, ('performance-data',), build)
+            assert not_modified.status_code == 304 and not_modified.body == b''
+            assert len(builds) == 1
+
+            # New benchmark rows change the version and rebuild the body and its ETag
+            _add_vintage(db, 2020)
+            changed = cache.response(_request(etag), db, ('performance-data',), build)
+            assert changed.status_code == 200 and changed.body == b'[2]'
+            assert changed.headers['etag'] != etag and len(builds) == 2
+
+            # Explicit invalidation drops entries even between version checks
+            slow_cache = BenchmarkReferenceCache(version_check_seconds=3600)
+            slow_cache.get(db, 'key', build)
+            slow_cache.invalidate()
+            assert len(slow_cache) == 0
+            db.close()
+        finally:
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_etag_matching()
+    test_cached_bodies_follow_data_version()
+    print("✅ All benchmark cache tests passed")
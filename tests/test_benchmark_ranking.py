@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Tests for the portfolio benchmark ranking engine
+Ranks values against in-memory breakpoint arrays, then loads benchmarks and
+ranks a portfolio on a temporary SQLite database
+"""
+
+import sys
+sys.path.append('.')
+
+from datetime import date
+
+import numpy as np
+
+from app import models
+from app.models import AssetClass, CashFlowType
+from app.benchmark_ranking_service import (
+    rank_against_quantiles, build_heatmaps, load_benchmark_index, create_benchmark_ranking_service,
+    BenchmarkQuantileIndex, InvestmentRanking, RANK_METRICS
+)
+from app.report_data import clear_report_dataset_cache
+from sqlite_schema import make_investment, seed_tenant, temporary_session
+
+NAN = np.nan
+BREAKPOINTS = [0.0, 0.1, 0.2, 0.3, 0.4]  # 10th, 25th, 50th, 75th, 90th percentile
+
+
+def test_quartiles_match_single_investment_rule():
+    values = np.array([0.35, 0.3, 0.25, 0.2, 0.15, 0.1, 0.05])
+    quartile, _ = rank_against_quantiles(values, np.array([BREAKPOINTS] * len(values)))
+    # >= top quartile -> 1, >= median -> 2, >= bottom quartile -> 3, else 4
+    assert quartile.tolist() == [1, 1, 2, 2, 3, 3, 4]
+
+
+def test_percentiles_interpolate_and_extrapolate():
+    values = np.array([0.15, 0.3, 0.45, 0.6, -0.05, -1.0])
+    _, percentile = rank_against_quantiles(values, np.array([BREAKPOINTS] * len(values)))
+    assert np.allclose(percentile, [37.5, 75.0, 97.5, 100.0, 2.5, 0.0])
+
+
+def test_missing_breakpoints():
+    quantiles = np.array([
+        [NAN, 0.1, 0.2, 0.3, NAN],   # quartiles only: interpolate between them
+        [NAN, NAN, 0.2, NAN, 0.4],   # no quartiles: percentile but no quartile
+        [NAN, NAN, 0.2, NAN, NAN],   # a single breakpoint: nothing to interpolate
+        [NAN] * 5,                   # no benchmark
+        BREAKPOINTS,                 # no value
+    ])
+    quartile, percentile = rank_against_quantiles(np.array([0.15, 0.3, 0.1, 0.2, NAN]), quantiles)
+    assert quartile[0] == 3 and np.isnan(quartile[1:]).all()
+    assert np.allclose(percentile[:2], [37.5, 70.0])
+    assert np.isnan(percentile[2:]).all()
+
+
+def test_index_lookup_falls_back_to_infrastructure():
+    quantiles = np.arange(2 * len(RANK_METRICS) * 5, dtype=float).reshape(2, len(RANK_METRICS), 5)
+    index = BenchmarkQuantileIndex(
+        keys={('infrastructure', 2020): 0, ('private_equity', 2020): 1},
+        quantiles=quantiles,
+        quarter_end_dates=[None, None]
+    )
+    rows = index.lookup(
+        [AssetClass.REAL_ASSETS, AssetClass.PRIVATE_EQUITY, AssetClass.PRIVATE_EQUITY, AssetClass.PUBLIC_EQUITY],
+        [2020, 2020, 2019, 2020]
+    )
+    assert rows.tolist() == [0, 1, -1, -1]
+    gathered = index.gather(rows)
+    assert (gathered[1] == quantiles[1]).all() and np.isnan(gathered[2:]).all()
+
+
+def test_heatmap_cells_weight_by_commitment():
+    rankings = [
+        InvestmentRanking(1, 'A', 'Private Equity', 2020, 300.0, irr_quartile=1, irr_percentile=90.0),
+        InvestmentRanking(2, 'B', 'Private Equity', 2020, 100.0, irr_quartile=3, irr_percentile=30.0),
+        InvestmentRanking(3, 'C', 'Private Equity', 2020, 100.0),
+        InvestmentRanking(4, 'D', 'Venture Capital', 2021, 50.0, irr_quartile=4, irr_percentile=5.0),
+    ]
+    heatmaps = build_heatmaps(rankings)
+    assert set(heatmaps) == set(RANK_METRICS)
+    pe = heatmaps['irr'][0]
+    assert (pe['asset_class'], pe['vintage_year'], pe['investments'], pe['ranked']) == ('Private Equity', 2020, 3, 2)
+    assert pe['quartile_counts'] == {1: 1, 2: 0, 3: 1, 4: 0}
+    assert pe['average_quartile'] == 1.5 and pe['average_percentile'] == 75.0
+    assert heatmaps['tvpi'][0]['average_quartile'] is None
+
+
+def _irr_row(asset_class, vintage_year, quarter_end_date, breakpoints):
+    return models.PitchBookPerformanceByVintage(
+        asset_class=asset_class, vintage_year=vintage_year, quarter_end_date=quarter_end_date,
+        **dict(zip(('bottom_decile', 'bottom_quartile', 'median_irr', 'top_quartile', 'top_decile'), breakpoints))
+    )
+
+
+def test_load_index_and_rank_portfolio_from_the_database():
+    clear_report_dataset_cache()
+    with temporary_session() as db:
+        pe_irr = [-0.05, 0.05, 0.10, 0.15, 0.25]
+        db.add_all([
+            _irr_row('private_equity', 2020, date(2023, 12, 31), [0.0, 0.1, 0.2, 0.3, 0.4]),
+            _irr_row('private_equity', 2020, date(2024, 3, 31), pe_irr),
+            _irr_row('private_equity', 2020, date(2024, 9, 30), [0.5] * 5),  # after the requested quarter
+            _irr_row('infrastructure', 2021, date(2024, 3, 31), [-0.1, 0.0, 0.05, 0.1, 0.2]),
+            models.PitchBookMultiplesQuantiles(
+                asset_class='private_equity', vintage_year=2020, quarter_end_date=date(2024, 3, 31),
+                tvpi_bottom_decile=0.8, tvpi_bottom_quartile=1.0, tvpi_median=1.2, tvpi_top_quartile=1.5,
+                tvpi_top_decile=2.0, dpi_bottom_decile=0.0, dpi_bottom_quartile=0.1, dpi_median=0.3,
+                dpi_top_quartile=0.5, dpi_top_decile=0.8
+            ),
+        ])
+        db.flush()
+
+        index = load_benchmark_index(db, date(2024, 6, 30))
+        assert sorted(index.keys) == [('infrastructure', 2021), ('private_equity', 2020)]
+        pe = index.keys[('private_equity', 2020)]
+        assert np.allclose(index.quantiles[pe, 0], pe_irr)
+        assert np.allclose(index.quantiles[pe, 1], [0.8, 1.0, 1.2, 1.5, 2.0])
+        assert index.quarter_end_dates[pe] == date(2024, 3, 31)
+        assert np.isnan(index.quantiles[index.keys[('infrastructure', 2021)], 1]).all()
+        latest = load_benchmark_index(db)
+        assert np.allclose(latest.quantiles[latest.keys[('private_equity', 2020)], 0], [0.5] * 5)
+
+        tenant = seed_tenant(db)
+        entity = models.Entity(name="Smith Trust", entity_type=models.EntityType.TRUST, tenant_id=tenant.id)
+        db.add(entity)
+        db.flush()
+        buyout, infra, venture, unfunded = investments = [
+            make_investment(tenant, entity, "Buyout", asset_class=AssetClass.PRIVATE_EQUITY, vintage_year=2020,
+                            commitment_amount=300.0),
+            make_investment(tenant, entity, "Infra", asset_class=AssetClass.REAL_ASSETS, vintage_year=2021,
+                            commitment_amount=100.0),
+            make_investment(tenant, entity, "Venture", asset_class=AssetClass.VENTURE_CAPITAL, vintage_year=2020),
+            make_investment(tenant, entity, "Unfunded", asset_class=AssetClass.PRIVATE_EQUITY, vintage_year=2020),
+        ]
+        db.add_all(investments)
+        db.flush()
+        for investment, nav in ((buyout, 100.0), (infra, 90.0), (venture, 130.0)):
+            db.add(models.CashFlow(investment_id=investment.id, tenant_id=tenant.id, date=date(2021, 6, 30),
+                                   type=CashFlowType.CAPITAL_CALL, amount=-100.0))
+            db.add(models.Valuation(investment_id=investment.id, tenant_id=tenant.id, date=date(2024, 3, 31),
+                                    nav_value=nav))
+        db.add(models.CashFlow(investment_id=buyout.id, tenant_id=tenant.id, date=date(2023, 6, 30),
+                               type=CashFlowType.DISTRIBUTION, amount=50.0))
+        db.commit()
+
+        ranking = create_benchmark_ranking_service(db).rank_portfolio(tenant.id, date(2024, 6, 30), date(2024, 6, 30))
+        ranked = {r.name: r for r in ranking.investments}
+
+        assert ranked["Buyout"].benchmark_asset_class == 'private_equity'
+        assert ranked["Buyout"].benchmark_quarter_end_date == date(2024, 3, 31)
+        assert ranked["Buyout"].tvpi == 1.5 and ranked["Buyout"].tvpi_quartile == 1
+        assert ranked["Buyout"].tvpi_percentile == 75.0
+        assert ranked["Buyout"].dpi == 0.5
+        assert (ranked["Buyout"].dpi_quartile, ranked["Buyout"].dpi_percentile) == (1, 75.0)
+        quartile, percentile = rank_against_quantiles(np.array([ranked["Buyout"].irr]), np.array([pe_irr]))
+        assert ranked["Buyout"].irr_quartile == int(quartile[0])
+        assert ranked["Buyout"].irr_percentile == round(float(percentile[0]), 1)
+
+        # Real assets fall back to the infrastructure tables, which carry no multiples
+        assert ranked["Infra"].benchmark_asset_class == 'infrastructure'
+        assert ranked["Infra"].irr_quartile is not None and ranked["Infra"].tvpi_quartile is None
+        assert ranked["Venture"].benchmark_asset_class is None and ranked["Venture"].irr_quartile is None
+        assert ranked["Unfunded"].irr is None and ranked["Unfunded"].tvpi_quartile is None
+
+        cell = next(c for c in ranking.heatmaps['tvpi'] if c['asset_class'] == AssetClass.PRIVATE_EQUITY.value)
+        assert (cell['investments'], cell['ranked'], cell['quartile_counts'][1]) == (2, 1, 1)
+    clear_report_dataset_cache()
+
+
+if __name__ == "__main__":
+    test_quartiles_match_single_investment_rule()
+    test_percentiles_interpolate_and_extrapolate()
+    test_missing_breakpoints()
+    test_index_lookup_falls_back_to_infrastructure()
+    test_heatmap_cells_weight_by_commitment()
+    test_load_index_and_rank_portfolio_from_the_database()
+    print("✅ All benchmark ranking tests passed")
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the boot profiler and the lazy worker startup
+Runs the import checks in a fresh interpreter - no database required
+"""
+
+import sys
+sys.path.append('.')
+
+import subprocess
+
+from app.boot_profile import parse_importtime, package_totals, PROJECT_ROOT
+from app.db_init import available_migrations
+
+SAMPLE = """import time: self [us] | cumulative | imported package
+import time:       120 |        120 |   _io
+import time:      2000 |       5000 |     pandas._libs
+import time:      3000 |       8000 |   pandas
+import time:       500 |        500 |   app.models
+import time:       400 |       8900 | app.main
+"""
+
+
+def test_parse_importtime():
+    timings = parse_importtime(SAMPLE)
+    assert [t.module for t in timings] == ['_io', 'pandas._libs', 'pandas', 'app.models', 'app.main']
+    assert [t.depth for t in timings] == [1, 2, 1, 1, 0]
+    assert timings[2].self_us == 3000 and timings[2].cumulative_us == 8000
+
+
+def test_package_totals_are_exclusive():
+    totals = dict(package_totals(parse_importtime(SAMPLE)))
+    assert totals == {'pandas': 5.0, 'app': 0.9, '_io': 0.12}
+
+
+def test_routers_do_not_load_pdf_or_report_libraries():
+    check = (
+        "import sys\n"
+        "import app.routers.pitchbook_benchmarks, app.routers.reports\n"
+        "print(','.join(m for m in ('pdfplumber', 'reportlab', 'openpyxl') if m in sys.modules))\n"
+    )
+    result = subprocess.run([sys.executable, '-c', check], cwd=PROJECT_ROOT, capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+    assert result.stdout.strip() == ''
+
+
+def test_migrations_are_discovered():
+    migrations = available_migrations()
+    assert 'migration_fx_rates' in migrations and 'migration_activity_log' in migrations
+
+
+if __name__ == "__main__":
+    test_parse_importtime()
+    test_package_totals_are_exclusive()
+    test_routers_do_not_load_pdf_or_report_libraries()
+    test_migrations_are_discovered()
+    print("✅ All boot profile tests passed")
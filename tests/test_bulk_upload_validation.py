@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Tests for the column-wise bulk upload validation
+Validates template frames directly against a name index - no database required
+"""
+
+import sys
+sys.path.append('.')
+
+import io
+from datetime import date, datetime
+
+import pandas as pd
+from openpyxl import Workbook
+
+from app.excel_template_service import BulkUploadProcessor, BulkUploadResult
+from app.models import CashFlowType
+from app.upload_streaming import iter_excel_chunks
+
+
+def _nav_frame(rows):
+    df = pd.DataFrame(rows, columns=["Investment Name", "NAV Date", "NAV Value", "Notes"])
+    return BulkUploadProcessor._prepare_template_frame(df, first_row=3)
+
+
+def test_nav_validation_reports_every_failing_row():
+    df = _nav_frame([
+        ["Select from dropdown", "Format: YYYY-MM-DD", "Format: number", None],
+        ["Fund A", "2024-12-31", 1500000, None],
+        ["Unknown Fund", "2024-12-31", 100, None],
+        ["Fund B", "31/12/2024", 100, None],
+        ["Fund B", None, 100, None],
+        [None, None, None, None],
+        ["Fund A", "2024-06-30", -5, None],
+        ["Fund B", pd.Timestamp("2024-09-30"), "250000", None],
+    ])
+    result = BulkUploadResult("navs.xlsx")
+    valid = BulkUploadProcessor._validate_nav_frame(df, {"Fund A": 1, "Fund B": 2}, result)
+
+    assert result.errors == [
+        {"row": 5, "message": "Investment 'Unknown Fund' not found"},
+        {"row": 6, "message": "Invalid NAV Date format. Use YYYY-MM-DD"},
+        {"row": 7, "message": "NAV Date is required"},
+        {"row": 9, "message": "NAV Value must be greater than 0"},
+    ]
+    assert valid['investment_id'].tolist() == [1, 2]
+    assert [str(d) for d in valid['date']] == ["2024-12-31", "2024-09-30"]
+    assert valid['nav_value'].tolist() == [1500000.0, 250000.0]
+    assert valid['_row_num'].tolist() == [4, 10]
+
+
+def test_name_index_is_not_capped():
+    index = {f"Fund {i}": i for i in range(5000)}
+    df = _nav_frame([["Fund 4999", "2024-12-31", 1.0, None]])
+    result = BulkUploadResult()
+    valid = BulkUploadProcessor._validate_nav_frame(df, index, result)
+
+    assert result.error_count == 0
+    assert valid['investment_id'].tolist() == [4999]
+
+
+def test_cashflow_types_are_mapped_case_insensitively():
+    df = pd.DataFrame([
+        ["Fund A", "2024-03-15", "capital_call", -250000, "", "Q1 call"],
+        ["Fund A", "2024-03-15", "Distribution", 0, "", None],
+        ["Fund A", "2024-03-15", "Dividend", 10, "", None],
+    ], columns=["Investment Name", "Date", "Cash Flow Type", "Amount", "Description", "Notes"])
+    df = BulkUploadProcessor._prepare_template_frame(df, first_row=3)
+    result = BulkUploadResult()
+    valid = BulkUploadProcessor._validate_cashflow_frame(df, {"Fund A": 1}, result)
+
+    assert result.errors == [
+        {"row": 4, "message": "Amount cannot be zero or empty"},
+        {"row": 5, "message": "Invalid Cash Flow Type: DIVIDEND"},
+    ]
+    assert valid['type'].tolist() == [CashFlowType.CAPITAL_CALL]
+    assert valid['notes'].tolist() == ["Q1 call"]
+
+
+def _template_chunk(sheet_name, headers, rows):
+    """First chunk of a workbook laid out like the upload templates: headers, then the Format row"""
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = sheet_name
+    sheet.append(headers)
+    sheet.append(["Select from dropdown", "Format: YYYY-MM-DD"] + [None] * (len(headers) - 2))
+    for row in rows:
+        sheet.append(row)
+    buffer = io.BytesIO()
+    workbook.save(buffer)
+    chunk = next(iter_excel_chunks(buffer.getvalue(), sheet_name, filename="upload.xlsx"))
+    return BulkUploadProcessor._prepare_template_frame(chunk)
+
+
+def test_excel_date_cells_below_format_row():
+    # Only date cells remain once the Format row is dropped, so the column holds datetimes, not text
+    df = _template_chunk("NAV Data", ["Investment Name", "NAV Date", "NAV Value", "Notes"], [
+        ["Fund A", datetime(2024, 12, 31), 1500000, None],
+        ["Fund B", date(2024, 9, 30), 250000, None],
+    ])
+    result = BulkUploadResult()
+    valid = BulkUploadProcessor._validate_nav_frame(df, {"Fund A": 1, "Fund B": 2}, result)
+    assert result.errors == []
+    assert [str(d) for d in valid['date']] == ["2024-12-31", "2024-09-30"]
+
+    df = _template_chunk("Cash Flow Data", ["Investment Name", "Date", "Cash Flow Type", "Amount", "Description", "Notes"], [
+        ["Fund A", datetime(2024, 3, 15), "Capital_Call", -250000, None, None],
+        ["Fund A", datetime(2024, 6, 30), "Distribution", 40000, None, None],
+    ])
+    result = BulkUploadResult()
+    valid = BulkUploadProcessor._validate_cashflow_frame(df, {"Fund A": 1}, result)
+    assert result.errors == []
+    assert [str(d) for d in valid['date']] == ["2024-03-15", "2024-06-30"]
+    assert valid['type'].tolist() == [CashFlowType.CAPITAL_CALL, CashFlowType.DISTRIBUTION]
+
+
+if __name__ == "__main__":
+    test_nav_validation_reports_every_failing_row()
+    test_name_index_is_not_capped()
+    test_cashflow_types_are_mapped_case_insensitively()
+    test_excel_date_cells_below_format_row()
+    print("✅ All bulk upload validation tests passed")
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+"""
+Tests for cash flow and valuation listing helpers
+Checks cursors, field selection and row serialization, then pages through a
+temporary SQLite database
+"""
+
+import sys
+sys.path.append('.')
+
+import json
+import uuid
+from datetime import date
+
+import pytest
+
+from app import models
+from app.cashflow_listing import (
+    encode_cursor, decode_cursor, parse_fields, rows_to_dicts, iter_json_array, iter_rows, list_rows, DEFAULT_FIELDS
+)
+from app.models import CashFlow, Valuation, CashFlowType
+from sqlite_schema import make_investment, seed_tenant, temporary_session
+
+
+def test_cursor_round_trip_and_validation():
+    assert decode_cursor(encode_cursor(date(2024, 3, 31), 42)) == (date(2024, 3, 31), 42)
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+def test_parse_fields_defaults_and_rejects_unknown():
+    assert parse_fields(CashFlow, None) == DEFAULT_FIELDS[CashFlow]
+    assert parse_fields(Valuation, "date, nav_value,date") == ("date", "nav_value")
+    with pytest.raises(ValueError):
+        parse_fields(Valuation, "date,amount")
+
+
+def test_rows_to_dicts_serializes_columns():
+    row_uuid = uuid.uuid4()
+    rows = [
+        (1, row_uuid, date(2024, 1, 15), CashFlowType.CAPITAL_CALL, -100.0),
+        (2, None, date(2024, 2, 15), None, 50.0),
+    ]
+    result = rows_to_dicts(("id", "uuid", "date", "type", "amount"), rows)
+
+    assert result == [
+        {"id": 1, "uuid": str(row_uuid), "date": "2024-01-15", "type": "Capital Call", "amount": -100.0},
+        {"id": 2, "uuid": None, "date": "2024-02-15", "type": None, "amount": 50.0},
+    ]
+    assert rows_to_dicts(("id",), []) == []
+
+
+def test_json_array_streams_batches():
+    batches = iter([[{"id": 1}], [], [{"id": 2}, {"id": 3}]])
+    assert json.loads("".join(iter_json_array(batches))) == [{"id": 1}, {"id": 2}, {"id": 3}]
+    assert json.loads("".join(iter_json_array(iter([])))) == []
+
+
+def test_keyset_pages_and_batches_cover_duplicate_dates():
+    with temporary_session() as db:
+        tenant, other = seed_tenant(db), seed_tenant(db, "Other Office")
+        entities = [models.Entity(name=f"Trust {t.id}", entity_type=models.EntityType.TRUST, tenant_id=t.id)
+                    for t in (tenant, other)]
+        db.add_all(entities)
+        db.flush()
+        first, second, outsider = investments = [
+            make_investment(tenant, entities[0], "Fund I"), make_investment(tenant, entities[0], "Fund II"),
+            make_investment(other, entities[1], "Fund I"),
+        ]
+        db.add_all(investments)
+        db.flush()
+
+        # Twelve flows on four dates, inserted out of date order so ids and dates disagree
+        days = [date(2024, 6, 30), date(2024, 3, 31), date(2024, 6, 30), date(2023, 12, 31)] * 3
+        flows = [CashFlow(investment_id=(first if i % 2 else second).id, tenant_id=tenant.id, date=day,
+                          type=CashFlowType.CAPITAL_CALL, amount=-float(i + 1)) for i, day in enumerate(days)]
+        flows.append(CashFlow(investment_id=outsider.id, tenant_id=other.id, date=date(2024, 3, 31),
+                              type=CashFlowType.DISTRIBUTION, amount=5.0))
+        db.add_all(flows)
+        db.add(Valuation(investment_id=first.id, tenant_id=tenant.id, date=date(2024, 3, 31), nav_value=100.0))
+        db.commit()
+        ascending = [flow.id for flow in sorted(flows[:-1], key=lambda flow: (flow.date, flow.id))]
+
+        for sort_order, expected in [('asc', ascending), ('desc', ascending[::-1])]:
+            seen, cursor = [], None
+            while True:
+                page, cursor = list_rows(db, CashFlow, tenant.id, fields=('id', 'date', 'amount'),
+                                         limit=5, cursor=cursor, sort_order=sort_order)
+                seen.extend(page)
+                if cursor is None:
+                    break
+            assert [row['id'] for row in seen] == expected, sort_order
+        assert isinstance(seen[0]['date'], str)
+
+        # Exactly a multiple of the batch size: the last batch is followed by an empty read
+        batches = list(iter_rows(db, CashFlow, tenant.id, fields=('id', 'type'), batch_rows=4))
+        assert [len(batch) for batch in batches] == [4, 4, 4]
+        assert [row['id'] for batch in batches for row in batch] == ascending
+        assert batches[0][0]['type'] == CashFlowType.CAPITAL_CALL.value
+
+        in_range = [row['id'] for batch in iter_rows(db, CashFlow, tenant.id, investment_id=first.id,
+                                                     start_date=date(2024, 1, 1), end_date=date(2024, 3, 31),
+                                                     batch_rows=2) for row in batch]
+        assert in_range == [flow.id for flow in sorted(flows[:-1], key=lambda flow: (flow.date, flow.id))
+                            if flow.investment_id == first.id and flow.date == date(2024, 3, 31)]
+
+        rows, cursor = list_rows(db, Valuation, tenant.id)
+        assert cursor is None and rows == [{'id': rows[0]['id'], 'uuid': rows[0]['uuid'],
+                                            'investment_id': first.id, 'date': '2024-03-31', 'nav_value': 100.0}]
+        assert list_rows(db, CashFlow, other.id, limit=5)[0][0]['amount'] == 5.0
+
+
+if __name__ == "__main__":
+    test_cursor_round_trip_and_validation()
+    test_parse_fields_defaults_and_rejects_unknown()
+    test_rows_to_dicts_serializes_columns()
+    test_json_array_streams_batches()
+    test_keyset_pages_and_batches_cover_duplicate_dates()
+    print("✅ All cash flow listing tests passed")
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Tests for the database engine factory
+Checks SQLite pragmas and pool checkout metrics against a temporary database file
+"""
+
+import sys
+sys.path.append('.')
+
+import os
+import tempfile
+import threading
+
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from app.database import create_db_engine, get_pool_metrics, SQLITE_BUSY_TIMEOUT_MS
+
+
+def test_sqlite_file_engine_uses_wal_and_busy_timeout():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'pool.db')}")
+        try:
+            with engine.connect() as conn:
+                assert conn.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+                assert conn.execute(text("PRAGMA synchronous")).scalar() == 1  # NORMAL
+                assert conn.execute(text("PRAGMA busy_timeout")).scalar() == SQLITE_BUSY_TIMEOUT_MS
+        finally:
+            engine.dispose()
+
+
+def test_pool_metrics_count_checkouts_and_timeouts():
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_db_engine(f"sqlite:///{os.path.join(directory, 'pool.db')}",
+                                  pool_size=1, max_overflow=0, pool_timeout=0.5)
+        try:
+            for _ in range(3):
+                with engine.connect() as conn:
+                    conn.execute(text("SELECT 1"))
+
+            held = engine.connect()
+            with pytest.raises(PoolTimeoutError):
+                engine.connect()
+            assert get_pool_metrics(engine)["checked_out"] == 1
+            held.close()
+
+            # A waiting checkout completes once the connection is returned
+            waiter = threading.Thread(target=lambda: engine.connect().close())
+            held = engine.connect()
+            waiter.start()
+            threading.Timer(0.02, held.close).start()
+            waiter.join()
+
+            metrics = get_pool_metrics(engine)
+            assert metrics["pool_class"] == "MeteredQueuePool"
+            assert metrics["checkouts"] == 6
+            assert metrics["timeouts"] == 1
+            assert metrics["max_wait_ms"] >= 20
+            assert metrics["checked_out"] == 0
+
+            engine.dispose()
+            assert get_pool_metrics(engine)["checkouts"] == 6
+        finally:
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    test_sqlite_file_engine_uses_wal_and_busy_timeout()
+    test_pool_metrics_count_checkouts_and_timeouts()
+    print("✅ All database engine tests passed")
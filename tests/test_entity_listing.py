@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Tests for entity listing keyset cursors and the grouped stats query
+Cursor tests need no database; the listing runs on a temporary SQLite database
+"""
+
+import sys
+sys.path.append('.')
+
+from datetime import date, datetime
+
+from app import models
+from app.entity_listing import encode_cursor, decode_cursor, get_entities_with_stats, get_entity_stats
+from app.models import EntityType
+from sqlite_schema import make_investment, seed_tenant, temporary_session
+
+
+def test_cursor_round_trips_sort_values():
+    created = datetime(2024, 5, 1, 12, 30, 15, 250000)
+    assert decode_cursor(encode_cursor('created_date', created, 7), 'created_date') == (created, 7)
+    assert decode_cursor(encode_cursor('total_commitment', 1500000.25, 3), 'total_commitment') == (1500000.25, 3)
+    assert decode_cursor(encode_cursor('entity_type', EntityType.TRUST, 9), 'entity_type') == (EntityType.TRUST, 9)
+
+
+def test_cursor_rejects_other_sort_and_garbage():
+    cursor = encode_cursor('name', 'Smith Family Trust', 4)
+    for bad_cursor, sort_by in [(cursor, 'current_nav'), ('not-a-cursor', 'name')]:
+        try:
+            decode_cursor(bad_cursor, sort_by)
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+def _walk(db, tenant_id, sort_by, sort_order, limit=2):
+    """Every page of the listing, following cursors until exhausted"""
+    seen, cursor = [], None
+    while True:
+        page, cursor = get_entities_with_stats(db, tenant_id, limit=limit, sort_by=sort_by,
+                                               sort_order=sort_order, cursor=cursor)
+        assert len(page) <= limit
+        seen.extend(page)
+        if cursor is None:
+            return seen
+
+
+def test_listing_stats_sorting_and_keyset_pages():
+    with temporary_session() as db:
+        tenant, other = seed_tenant(db), seed_tenant(db, "Other Office")
+        names = ["Delta", "Alpha", "Echo", "Charlie", "Bravo"]
+        entities = {name: models.Entity(name=name, entity_type=EntityType.TRUST, tenant_id=tenant.id)
+                    for name in names}
+        inactive = models.Entity(name="Inactive", entity_type=EntityType.TRUST, tenant_id=tenant.id, is_active=False)
+        outsider = models.Entity(name="Outsider", entity_type=EntityType.TRUST, tenant_id=other.id)
+        db.add_all(list(entities.values()) + [inactive, outsider])
+        db.flush()
+
+        funds = {
+            name: make_investment(other if entity is outsider else tenant, entity, name,
+                                  commitment_amount=commitment, called_amount=called, is_archived=archived)
+            for name, entity, commitment, called, archived in [
+                ("alpha", entities["Alpha"], 100.0, 40.0, False),
+                ("alpha_archived", entities["Alpha"], 1000.0, 0.0, True),
+                ("bravo_1", entities["Bravo"], 50.0, 10.0, False),
+                ("bravo_2", entities["Bravo"], 50.0, None, False),
+                ("charlie", entities["Charlie"], 300.0, 300.0, False),
+                ("echo", entities["Echo"], 100.0, 5.0, False),
+                ("outsider", outsider, 5000.0, 0.0, False),
+            ]
+        }
+        db.add_all(funds.values())
+        db.flush()
+        db.add_all([
+            models.Valuation(investment_id=funds[key].id, tenant_id=funds[key].tenant_id, date=on, nav_value=nav)
+            for key, on, nav in [
+                ("alpha", date(2023, 12, 31), 50.0), ("alpha", date(2024, 6, 30), 60.0),
+                ("alpha_archived", date(2024, 6, 30), 900.0),
+                ("bravo_1", date(2024, 6, 30), 20.0), ("bravo_1", date(2024, 6, 30), 25.0),
+                ("bravo_2", date(2024, 3, 31), 15.0),
+                ("echo", date(2024, 6, 30), 60.0),
+                ("outsider", date(2024, 6, 30), 4000.0),
+            ]
+        ])
+        db.commit()
+
+        expected = {
+            "Alpha": (1, 100.0, 40.0, 60.0), "Bravo": (2, 100.0, 10.0, 40.0), "Charlie": (1, 300.0, 300.0, 0.0),
+            "Delta": (0, 0.0, 0.0, 0.0), "Echo": (1, 100.0, 5.0, 60.0),
+        }
+        fields = ('investment_count', 'total_commitment', 'total_called', 'current_nav')
+        listed = _walk(db, tenant.id, 'name', 'asc')
+        assert [row['name'] for row in listed] == sorted(names)
+        assert {row['name']: tuple(row[f] for f in fields) for row in listed} == expected
+        assert tuple(get_entity_stats(db, entities["Bravo"].id, tenant.id)[f] for f in fields) == expected["Bravo"]
+
+        # Stat sorts page to the end in (value, id) order, ties included, with no repeats or gaps
+        ids = {name: entity.id for name, entity in entities.items()}
+        for sort_by, position in [('total_commitment', 1), ('current_nav', 3), ('investment_count', 0)]:
+            for sort_order in ('asc', 'desc'):
+                order = sorted(expected, key=lambda name: (expected[name][position], ids[name]),
+                               reverse=sort_order == 'desc')
+                assert [row['name'] for row in _walk(db, tenant.id, sort_by, sort_order)] == order, (sort_by, sort_order)
+
+        page, cursor = get_entities_with_stats(db, tenant.id, limit=10, sort_by='total_commitment')
+        assert len(page) == 5 and cursor is None
+        try:
+            get_entities_with_stats(db, tenant.id, sort_by='investment_count', cursor=encode_cursor('name', 'x', 1))
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+if __name__ == "__main__":
+    test_cursor_round_trips_sort_values()
+    test_cursor_rejects_other_sort_and_garbage()
+    test_listing_stats_sorting_and_keyset_pages()
+    print("✅ All entity listing tests passed")
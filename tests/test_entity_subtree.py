@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""
+Tests for entity subtree rollups
+Rolls hand-built hierarchy nodes up, then runs the subtree queries on a temporary SQLite database
+"""
+
+import sys
+sys.path.append('.')
+
+from datetime import date
+
+from fastapi import HTTPException
+
+from app import models
+from app.entity_relationships import EntityHierarchyService
+from app.models import EntityType
+from app.schemas import EntitySubtreeNode
+from sqlite_schema import make_investment, seed_tenant, temporary_session
+
+
+def _node(entity_id, parent_id, path, commitment, nav, sort_order=0):
+    return EntitySubtreeNode(
+        entity_id=entity_id, entity_name=f"Entity {entity_id}", entity_type=EntityType.TRUST,
+        parent_entity_id=parent_id, hierarchy_level=path.count('.') + 1, hierarchy_path=path,
+        sort_order=sort_order, investment_count=1 if commitment else 0,
+        total_commitment=commitment, called_amount=commitment / 2, current_nav=nav
+    )
+
+
+def test_subtree_totals_include_all_descendants():
+    # 1 -> (3 -> 7, 4); the root of the query is 3's parent 1, whose own parent 9 is outside the subtree
+    nodes = {n.entity_id: n for n in [
+        _node(1, 9, "9.1", 100.0, 80.0),
+        _node(3, 1, "9.1.3", 200.0, 150.0, sort_order=2),
+        _node(4, 1, "9.1.4", 0.0, 0.0, sort_order=1),
+        _node(7, 3, "9.1.3.7", 50.0, 60.0),
+    ]}
+
+    root = EntityHierarchyService._roll_up_subtree(nodes, root_entity_id=1)
+
+    assert root.subtree_commitment == 350.0
+    assert root.subtree_called == 175.0
+    assert root.subtree_nav == 290.0
+    assert root.subtree_investment_count == 3
+    assert [child.entity_id for child in root.children] == [4, 3]
+    assert nodes[3].subtree_nav == 210.0
+    assert nodes[7].subtree_commitment == 50.0
+
+
+def test_path_prefix_does_not_match_sibling_ids():
+    assert EntityHierarchyService._is_in_subtree("1.3", "1.3")
+    assert EntityHierarchyService._is_in_subtree("1.3.7", "1.3")
+    assert not EntityHierarchyService._is_in_subtree("1.30", "1.3")
+    assert not EntityHierarchyService._is_in_subtree("1", "1.3")
+
+
+def test_subtree_queries_are_scoped_to_the_tenant_and_subtree():
+    with temporary_session() as db:
+        tenant, other = seed_tenant(db), seed_tenant(db, "Other Office")
+        entities = {name: models.Entity(name=name, entity_type=EntityType.TRUST, tenant_id=tenant.id)
+                    for name in ("Root", "Child", "Grandchild", "Sibling")}
+        outsider = models.Entity(name="Outsider", entity_type=EntityType.TRUST, tenant_id=other.id)
+        db.add_all(list(entities.values()) + [outsider])
+        db.flush()
+        root, child, grandchild, sibling = (entities[n].id for n in ("Root", "Child", "Grandchild", "Sibling"))
+        db.add_all([
+            models.EntityHierarchy(entity_id=root, hierarchy_level=1, hierarchy_path=f"{root}"),
+            models.EntityHierarchy(entity_id=child, parent_entity_id=root, hierarchy_level=2,
+                                   hierarchy_path=f"{root}.{child}"),
+            models.EntityHierarchy(entity_id=grandchild, parent_entity_id=child, hierarchy_level=3,
+                                   hierarchy_path=f"{root}.{child}.{grandchild}"),
+            models.EntityHierarchy(entity_id=sibling, hierarchy_level=1, hierarchy_path=None),
+        ])
+        investments = [
+            make_investment(tenant, entities["Child"], "Fund A", commitment_amount=100.0, called_amount=40.0),
+            make_investment(tenant, entities["Grandchild"], "Fund B", commitment_amount=50.0),
+            make_investment(tenant, entities["Sibling"], "Fund C", commitment_amount=999.0),
+            make_investment(other, outsider, "Fund D", commitment_amount=999.0),
+        ]
+        db.add_all(investments)
+        db.flush()
+        db.add_all([
+            models.Valuation(investment_id=investments[0].id, tenant_id=tenant.id, date=date(2024, 3, 31), nav_value=30.0),
+            models.Valuation(investment_id=investments[0].id, tenant_id=tenant.id, date=date(2024, 6, 30), nav_value=45.0),
+            models.Valuation(investment_id=investments[0].id, tenant_id=tenant.id, date=date(2024, 9, 30), nav_value=99.0),
+            models.Valuation(investment_id=investments[1].id, tenant_id=tenant.id, date=date(2024, 6, 30), nav_value=20.0),
+            models.Valuation(investment_id=investments[2].id, tenant_id=tenant.id, date=date(2024, 6, 30), nav_value=500.0),
+        ])
+        db.commit()
+
+        subtree = EntityHierarchyService.get_subtree(db, root, date(2024, 6, 30), tenant_id=tenant.id)
+        assert subtree.total_entities == 3 and subtree.max_hierarchy_depth == 3
+        assert subtree.root.subtree_commitment == 150.0 and subtree.root.subtree_called == 40.0
+        assert subtree.root.subtree_nav == 65.0  # latest NAV on or before the as-of date
+        assert [c.entity_id for c in subtree.root.children] == [child]
+
+        # Another tenant cannot read the subtree
+        try:
+            EntityHierarchyService.get_subtree(db, root, tenant_id=other.id)
+            assert False, "expected HTTPException"
+        except HTTPException as e:
+            assert e.status_code == 404
+
+        # A missing path is reported, not repaired on the read path
+        try:
+            EntityHierarchyService.get_subtree(db, sibling, tenant_id=tenant.id)
+            assert False, "expected HTTPException"
+        except HTTPException as e:
+            assert e.status_code == 409
+        assert not db.dirty and db.query(models.EntityHierarchy.hierarchy_path).filter(
+            models.EntityHierarchy.entity_id == sibling).scalar() is None
+
+
+if __name__ == "__main__":
+    test_subtree_totals_include_all_descendants()
+    test_path_prefix_does_not_match_sibling_ids()
+    test_subtree_queries_are_scoped_to_the_tenant_and_subtree()
+    print("✅ All entity subtree tests passed")
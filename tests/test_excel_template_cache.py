@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""
+Tests for the cached Excel upload templates
+Renders the workbooks and reads them back with openpyxl - no database required
+"""
+
+import sys
+sys.path.append('.')
+
+import io
+
+from openpyxl import load_workbook
+from starlette.requests import Request
+
+from app.excel_template_service import ExcelTemplateService, template_response
+from app.upload_streaming import iter_excel_chunks
+
+ENTITIES = [f"Entity {i} (TRUST)" for i in range(40)]
+
+
+def _request(if_none_match=None):
+    headers = [(b'if-none-match', if_none_match.encode())] if if_none_match else []
+    return Request({'type': 'http', 'method': 'GET', 'path': '/', 'headers': headers})
+
+
+def _validations(sheet):
+    return {str(dv.sqref): dv.formula1 for dv in sheet.data_validations.dataValidation}
+
+
+def test_investment_template_layout_and_dropdowns():
+    body = ExcelTemplateService().render_template("investment", ENTITIES)
+    workbook = load_workbook(io.BytesIO(body))
+    assert workbook.sheetnames == ['Investment Data', 'Instructions', 'Validation Data']
+
+    sheet = workbook['Investment Data']
+    assert sheet['A1'].value == "Entity Owner*" and sheet['A2'].value == "entity_id"
+    assert sheet['A1'].fill.fgColor.rgb.endswith("D32F2F")
+    assert sheet.max_row == 103
+
+    # Each dropdown sits on its own column and lists every option through a named range
+    validations = _validations(sheet)
+    assert validations['A4:A103'] == 'Entities'
+    assert validations['C4:C103'] == 'AssetClasses'
+    assert validations['P4:P103'] == 'Currencies'
+    entities = workbook.defined_names['Entities'].attr_text
+    assert entities == "'Validation Data'!$A$2:$A$41"
+    assert workbook['Validation Data']['A41'].value == ENTITIES[-1]
+
+    # The importer reads the field-name row as the header and skips the examples
+    chunk = next(iter_excel_chunks(body, 'Investment Data', header_row=2, skip_rows=[3], filename='t.xlsx'))
+    assert {'entity_id', 'name', 'asset_class', 'commitment_amount'} <= set(chunk.columns)
+    assert int(chunk['_row_num'].iloc[0]) == 4
+
+
+def test_nav_and_entity_templates():
+    service = ExcelTemplateService()
+    nav = load_workbook(io.BytesIO(service.render_template("nav", ["Fund A", "Fund B"])))
+    assert _validations(nav['NAV Data'])['A3:A1000'] == 'InvestmentNames'
+    assert nav['NAV Data']['A3'].value == "Example Fund LP"
+
+    # No investments yet: no dropdown, and a placeholder on the validation sheet
+    empty = load_workbook(io.BytesIO(service.render_template("nav", [])))
+    assert 'A3:A1000' not in _validations(empty['NAV Data'])
+    assert empty['Validation Data']['A2'].value.startswith("No investments found")
+
+    entity = load_workbook(io.BytesIO(service.render_template("entity", [])))
+    assert _validations(entity['Entity Data'])['B4:B53'] == 'EntityTypes'
+    assert entity['Entity Data']['A6'].value == "Acme Holdings LLC"
+
+
+def test_templates_are_cached_until_names_change():
+    service = ExcelTemplateService(cache_size=3)
+    names = {1: ["Fund A"], 2: ["Fund Z"]}
+    renders = []
+    service._template_names = lambda db, kind, tenant_id: list(names[tenant_id])
+    render = service.render_template
+
+    def counting_render(kind, template_names):
+        renders.append((kind, template_names))
+        return render(kind, template_names)
+
+    service.render_template = counting_render
+
+    first = service.get_template(None, "nav", 1)
+    assert service.get_template(None, "nav", 1) is first
+    assert service.get_template(None, "nav", 2) is not first
+    assert len(renders) == 2
+
+    names[1].append("Fund B")
+    updated = service.get_template(None, "nav", 1)
+    assert updated is not first and updated.etag != first.etag
+    assert renders[-1] == ("nav", ["Fund A", "Fund B"])
+
+    service.get_template(None, "cashflow", 1)
+    service.get_template(None, "cashflow", 2)  # evicts the least recently used entry (tenant 2's NAV)
+    service.get_template(None, "nav", 1)
+    assert len(renders) == 5
+    service.clear_cache(tenant_id=1)
+    service.get_template(None, "nav", 1)
+    assert len(renders) == 6
+
+    try:
+        service.get_template(None, "fx-rates", 1)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_template_response_uses_etag():
+    service = ExcelTemplateService()
+    service._template_names = lambda db, kind, tenant_id: []
+    template = service.get_template(None, "entity")
+
+    response = template_response(_request(), template)
+    assert response.status_code == 200 and response.body == template.body
+    assert response.headers['content-disposition'] == "attachment; filename=Entity_Upload_Template.xlsx"
+
+    not_modified = template_response(_request(template.etag), template)
+    assert not_modified.status_code == 304 and not_modified.body == b''
+
+
+if __name__ == "__main__":
+    test_investment_template_layout_and_dropdowns()
+    test_nav_and_entity_templates()
+    test_templates_are_cached_until_names_change()
+    test_template_response_uses_etag()
+    print("✅ All Excel template cache tests passed")
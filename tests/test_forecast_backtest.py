@@ -0,0 +1,139 @@
+#!/usr/bin/env python3
+"""
+Tests for forecast-vs-actual backtesting
+Checks the variance and calibration helpers, then backtests on a temporary
+SQLite database
+"""
+
+import sys
+sys.path.append('.')
+
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+from app import models
+from app.forecast_backtest import relative_variance, calibration_statistics, create_forecast_backtest_engine
+from app.models import CallScheduleType, CashFlowType, DistributionTimingType, ForecastScenario
+from sqlite_schema import make_investment, seed_tenant, temporary_session
+
+
+def test_relative_variance_handles_zero_forecasts():
+    actual = np.array([120.0, 80.0, 0.0, 50.0])
+    forecast = np.array([100.0, 100.0, 0.0, 0.0])
+
+    variance = relative_variance(actual, forecast)
+
+    assert np.allclose(variance[:3], [0.2, -0.2, 0.0])
+    assert np.isnan(variance[3])
+
+
+def test_calibration_statistics_groups_by_pacing_parameters():
+    frame = pd.DataFrame({
+        'investment_id': [1, 1, 2, 3],
+        'call_schedule': [CallScheduleType.STEADY, CallScheduleType.STEADY,
+                          CallScheduleType.STEADY, CallScheduleType.FRONT_LOADED],
+        'distribution_timing': [DistributionTimingType.BACKEND] * 4,
+        'forecast_calls': [100.0, 100.0, 200.0, 50.0],
+        'actual_calls': [120.0, 80.0, 260.0, 50.0],
+        'forecast_distributions': [0.0, 10.0, 0.0, 0.0],
+        'actual_distributions': [5.0, 10.0, 0.0, 0.0],
+        'forecast_nav': [100.0] * 4,
+        'actual_nav': [100.0] * 4,
+    })
+    for metric in ('calls', 'distributions', 'nav'):
+        frame[f'{metric}_variance'] = relative_variance(frame[f'actual_{metric}'], frame[f'forecast_{metric}'])
+
+    stats = {entry['call_schedule']: entry for entry in calibration_statistics(frame)}
+
+    steady = stats[CallScheduleType.STEADY.value]
+    assert steady['investments'] == 2 and steady['periods'] == 3
+    assert abs(steady['calls']['bias'] - (460.0 / 400.0 - 1)) < 1e-9
+    assert abs(steady['calls']['mape'] - (0.2 + 0.2 + 0.3) / 3) < 1e-9
+    # The period with no forecast distributions but an actual one has no variance
+    assert steady['distributions']['mape'] == 0.0
+    assert stats[CallScheduleType.FRONT_LOADED.value]['calls']['bias'] == 0.0
+
+    by_schedule = calibration_statistics(frame, group_by=('call_schedule',))
+    assert sorted(entry['periods'] for entry in by_schedule) == [1, 3]
+    assert calibration_statistics(frame.iloc[0:0]) == []
+
+
+def _forecast(investment, year, calls, distributions, nav, scenario=ForecastScenario.BASE):
+    return models.CashFlowForecast(
+        investment_id=investment.id, forecast_date=date(2020, 12, 31), scenario=scenario,
+        forecast_year=year - 2021, forecast_period_start=date(year, 1, 1), forecast_period_end=date(year, 12, 31),
+        projected_calls=calls, projected_distributions=distributions, projected_nav=nav, model_version="1.0"
+    )
+
+
+def _flow(investment, on, flow_type, amount):
+    return models.CashFlow(investment_id=investment.id, tenant_id=investment.tenant_id, date=on,
+                           type=flow_type, amount=amount)
+
+
+def test_backtest_against_actuals_in_the_database():
+    with temporary_session() as db:
+        tenant, other = seed_tenant(db), seed_tenant(db, "Other Office")
+        entities = [models.Entity(name=f"Trust {t.id}", entity_type=models.EntityType.TRUST, tenant_id=t.id)
+                    for t in (tenant, other)]
+        db.add_all(entities)
+        db.flush()
+        fund, outsider = investments = [
+            make_investment(t, e, call_schedule=CallScheduleType.STEADY,
+                            distribution_timing=DistributionTimingType.BACKEND)
+            for t, e in zip((tenant, other), entities)
+        ]
+        db.add_all(investments)
+        db.flush()
+        db.add_all([
+            _forecast(fund, 2021, 120.0, 0.0, 150.0),
+            _forecast(fund, 2022, 50.0, 20.0, 170.0),
+            _forecast(fund, 2024, 10.0, 10.0, 10.0),  # not completed by the as-of date
+            _forecast(fund, 2021, 999.0, 0.0, 0.0, scenario=ForecastScenario.BULL),
+            _forecast(outsider, 2021, 100.0, 0.0, 100.0),
+            _flow(fund, date(2021, 3, 31), CashFlowType.CAPITAL_CALL, -100.0),
+            _flow(fund, date(2021, 9, 30), CashFlowType.CONTRIBUTION, -50.0),
+            _flow(fund, date(2022, 6, 30), CashFlowType.DISTRIBUTION, 30.0),
+            _flow(fund, date(2023, 3, 31), CashFlowType.CAPITAL_CALL, -75.0),
+            _flow(outsider, date(2021, 3, 31), CashFlowType.CAPITAL_CALL, -500.0),
+            models.Valuation(investment_id=fund.id, tenant_id=tenant.id, date=date(2021, 6, 30), nav_value=90.0),
+            models.Valuation(investment_id=fund.id, tenant_id=tenant.id, date=date(2021, 12, 31), nav_value=140.0),
+            models.Valuation(investment_id=fund.id, tenant_id=tenant.id, date=date(2022, 9, 30), nav_value=160.0),
+            # Stale results for this tenant are replaced; the other tenant's are left alone
+            models.ForecastAccuracy(investment_id=fund.id, forecast_period=date(2020, 12, 31)),
+            models.ForecastAccuracy(investment_id=outsider.id, forecast_period=date(2021, 12, 31)),
+        ])
+        db.commit()
+
+        engine = create_forecast_backtest_engine(db)
+        frame = engine.build_backtest_frame(date(2023, 6, 30), tenant_id=tenant.id)
+        assert list(frame['forecast_period']) == [date(2021, 12, 31), date(2022, 12, 31)]
+        assert list(frame['actual_calls']) == [150.0, 0.0] and list(frame['actual_distributions']) == [0.0, 30.0]
+        assert list(frame['actual_nav']) == [140.0, 160.0]  # latest valuation on or before each period end
+        assert np.allclose(frame['calls_variance'], [0.25, -1.0])
+        assert np.allclose(frame['distributions_variance'], [0.0, 0.5])
+
+        result = engine.run_backtest(date(2023, 6, 30), tenant_id=tenant.id)
+        assert result.investments == 1 and result.periods == 2
+        stored = db.query(models.ForecastAccuracy).order_by(models.ForecastAccuracy.id).all()
+        assert [(row.investment_id, row.forecast_period) for row in stored] == [
+            (outsider.id, date(2021, 12, 31)), (fund.id, date(2021, 12, 31)), (fund.id, date(2022, 12, 31))
+        ]
+        assert stored[1].actual_calls == 150.0 and stored[2].distributions_variance == 0.5
+
+        # Re-running replaces rather than duplicates
+        engine.run_backtest(date(2023, 6, 30), tenant_id=tenant.id)
+        assert db.query(models.ForecastAccuracy).filter(models.ForecastAccuracy.investment_id == fund.id).count() == 2
+
+        calibration, = engine.get_calibration(tenant_id=tenant.id)
+        assert calibration['call_schedule'] == CallScheduleType.STEADY.value and calibration['periods'] == 2
+        assert abs(calibration['calls']['bias'] - (150.0 / 170.0 - 1)) < 1e-9
+
+
+if __name__ == "__main__":
+    test_relative_variance_handles_zero_forecasts()
+    test_calibration_statistics_groups_by_pacing_parameters()
+    test_backtest_against_actuals_in_the_database()
+    print("✅ All forecast backtest tests passed")
@@ -0,0 +1,161 @@
+#!/usr/bin/env python3
+"""
+Tests for the FX normalization engine
+Builds rate tables by hand, then converts reports and dashboards on a
+temporary SQLite database
+"""
+
+import sys
+sys.path.append('.')
+
+import json
+from datetime import date
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+from fastapi import HTTPException
+
+from app import auth, models
+from app.fx_service import (
+    FxRateTable, FxRateError, import_fx_rates_csv, normalize_portfolio_flows, FLOW_CONTRIBUTION, FLOW_DISTRIBUTION
+)
+from app.performance import PerformanceMetrics
+from app.report_data import build_report_dataset, get_data_version
+from app.routers import tenant_api
+from sqlite_schema import make_investment, seed_tenant, temporary_session
+
+
+def _table():
+    quotes = pd.DataFrame([
+        (date(2020, 1, 1), "EUR", 1.20),
+        (date(2022, 1, 1), "eur", 1.10),
+        (date(2021, 1, 1), "GBP", 1.30),
+    ], columns=['rate_date', 'currency', 'usd_rate'])
+    return FxRateTable.from_quotes(quotes)
+
+
+def _metrics(contributions, distributions, nav):
+    return PerformanceMetrics(
+        irr=None, tvpi=None, dpi=None, rvpi=None, total_contributions=contributions,
+        total_distributions=distributions, current_nav=nav, total_value=nav + distributions,
+        trailing_yield=None, forward_yield=None, yield_frequency=None,
+        trailing_yield_amount=None, latest_yield_amount=None
+    )
+
+
+def test_as_of_lookup_and_cross_rates():
+    fx = _table()
+    assert fx.rate("EUR", "USD", date(2021, 6, 30)) == 1.20
+    assert fx.rate("EUR", "USD", date(2023, 1, 1)) == 1.10
+    assert fx.rate("EUR", "USD", date(2019, 1, 1)) == 1.20  # before the first quote
+    assert abs(fx.rate("GBP", "EUR", date(2022, 6, 30)) - 1.30 / 1.10) < 1e-12
+    assert fx.rate("JPY", "USD", date(2022, 6, 30)) is None
+
+    converted = fx.convert([100.0, 100.0, 100.0], ["EUR", "USD", "EUR"],
+                           [date(2020, 6, 1), date(2020, 6, 1), date(2022, 6, 1)], "USD")
+    assert np.allclose(converted, [120.0, 100.0, 110.0])
+
+    try:
+        fx.convert([1.0], ["JPY"], [date(2022, 1, 1)], "USD")
+        assert False, "expected FxRateError"
+    except FxRateError as e:
+        assert "JPY" in str(e)
+    assert fx.convert([5.0], ["JPY"], [date(2022, 1, 1)], "USD", strict=False)[0] == 5.0
+
+
+def test_portfolio_flows_convert_at_flow_dates():
+    fx = _table()
+    metrics = [_metrics(-100.0, 50.0, 80.0), _metrics(-200.0, 0.0, 200.0)]
+    converted, events, missing = normalize_portfolio_flows(
+        fx, "USD", ["EUR", "USD"], metrics,
+        flow_investment=[0, 0, 1],
+        flow_dates=[date(2020, 6, 1), date(2022, 6, 1), date(2021, 1, 1)],
+        flow_amounts=[-100.0, 50.0, -200.0],
+        flow_kinds=[FLOW_CONTRIBUTION, FLOW_DISTRIBUTION, FLOW_CONTRIBUTION],
+        as_of_date=date(2024, 12, 31)
+    )
+
+    assert missing == []
+    assert abs(converted[0].total_contributions - -120.0) < 1e-9
+    assert abs(converted[0].total_distributions - 55.0) < 1e-9
+    assert abs(converted[0].current_nav - 88.0) < 1e-9
+    assert converted[1].total_contributions == -200.0
+    assert sorted(round(e.amount, 6) for e in events) == [-200.0, -120.0, 55.0, 88.0, 200.0]
+
+
+def test_reports_and_dashboards_convert_to_reporting_currency():
+    with temporary_session() as db:
+        tenant = seed_tenant(db)
+        entity = models.Entity(name="Smith Trust", entity_type=models.EntityType.TRUST, tenant_id=tenant.id)
+        db.add(entity)
+        db.flush()
+        euro, dollar, yen = investments = [
+            make_investment(tenant, entity, "Euro Fund", currency="EUR", commitment_amount=1000.0, called_amount=100.0),
+            make_investment(tenant, entity, "Dollar Fund", currency="USD", commitment_amount=500.0, called_amount=0.0),
+            make_investment(tenant, entity, "Yen Fund", currency="JPY", commitment_amount=10.0, called_amount=0.0),
+        ]
+        db.add_all(investments)
+        db.flush()
+        db.add_all([
+            models.CashFlow(investment_id=euro.id, tenant_id=tenant.id, date=date(2020, 6, 1),
+                            type=models.CashFlowType.CAPITAL_CALL, amount=-100.0),
+            models.CashFlow(investment_id=euro.id, tenant_id=tenant.id, date=date(2022, 6, 1),
+                            type=models.CashFlowType.DISTRIBUTION, amount=50.0),
+            models.Valuation(investment_id=euro.id, tenant_id=tenant.id, date=date(2022, 6, 1), nav_value=80.0),
+        ])
+        db.commit()
+
+        version = get_data_version(db, tenant.id)
+        csv = b"date,currency,usd_rate\n2020-01-01,EUR,1.20\n2022-01-01,eur,1.10\n"
+        assert import_fx_rates_csv(db, csv, source="rates.csv") == {"inserted": 2, "updated": 0, "errors": []}
+        assert get_data_version(db, tenant.id) != version  # new rates invalidate cached reports
+
+        dataset = build_report_dataset(db, tenant.id, date(2024, 6, 30))
+        assert dataset.reporting_currency == "USD" and dataset.unconverted_currencies == ["JPY"]
+        position = dataset.positions[euro.id]
+        assert abs(position.commitment_amount - 1100.0) < 1e-9 and abs(position.current_nav - 88.0) < 1e-9
+        assert abs(position.called - 120.0) < 1e-9 and abs(position.distributions - 55.0) < 1e-9
+        assert dataset.positions[dollar.id].commitment_amount == 500.0
+        assert dataset.positions[yen.id].commitment_amount == 10.0  # no rates: left unconverted
+
+        user = SimpleNamespace(tenant_id=tenant.id)
+        called = tenant_api.get_commitment_vs_called_data(currency=None, current_user=user, db=db)
+        assert abs(called.commitment_amount - 1610.0) < 1e-9 and abs(called.called_amount - 110.0) < 1e-9
+        assert called.reporting_currency == "USD"
+        in_euros = tenant_api.get_commitment_vs_called_data(currency="eur", current_user=user, db=db)
+        assert in_euros.reporting_currency == "EUR" and abs(in_euros.commitment_amount - (1000 + 500 / 1.1 + 10)) < 1e-9
+
+        allocation = tenant_api.get_allocation_by_vintage(currency=None, current_user=user, db=db)
+        assert len(allocation) == 1 and abs(allocation[0].commitment_amount - 1610.0) < 1e-9
+
+        stats = tenant_api.get_dashboard_summary_stats(currency=None, current_user=user, db=db)
+        assert abs(stats.total_nav - 88.0) < 1e-9 and abs(stats.total_distributions - 55.0) < 1e-9
+
+        timeline = json.loads(tenant_api.get_portfolio_value_timeline(
+            layout="rows", currency=None, current_user=user, db=db).body)
+        assert [point["date"] for point in timeline] == ["2020-06-01", "2022-06-01"]
+        assert abs(timeline[0]["cumulative_contributions"] - 120.0) < 1e-9
+        assert abs(timeline[1]["nav_value"] - 88.0) < 1e-9 and abs(timeline[1]["net_value"] - 143.0) < 1e-9
+
+
+def test_fx_imports_require_a_platform_admin():
+    admin = SimpleNamespace(tenant_id=42, role=models.UserRole.ADMIN)
+    try:
+        auth.require_platform_admin(admin)
+        assert False, "expected HTTPException"
+    except HTTPException as e:
+        assert e.status_code == 403
+
+    auth.PLATFORM_ADMIN_TENANT_IDS.add(42)
+    try:
+        assert auth.require_platform_admin(admin) is admin
+    finally:
+        auth.PLATFORM_ADMIN_TENANT_IDS.discard(42)
+
+
+if __name__ == "__main__":
+    test_as_of_lookup_and_cross_rates()
+    test_portfolio_flows_convert_at_flow_dates()
+    test_reports_and_dashboards_convert_to_reporting_currency()
+    test_fx_imports_require_a_platform_admin()
+    print("✅ All FX rate tests passed")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Tests for the orjson responses, columnar chart payloads and response compression
+Drives a small ASGI app directly - no database or server required
+
+test_serialization_benchmark compares the default response_model path with the
+fast path for a 20-year monthly series across 500 investments and prints the
+encode time and bytes on the wire for each layout.
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import gzip
+import json
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, List, Optional
+
+import numpy as np
+from fastapi import FastAPI
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel, TypeAdapter
+
+from app.json_responses import FastJSONResponse, add_compression, chart_payload, chart_series, dumps, series_fields
+from app.models import CashFlowType
+
+
+class PerformanceDataPoint(BaseModel):
+    date: str
+    cumulative_contributions: Optional[float] = None
+    cumulative_distributions: Optional[float] = None
+    current_nav: Optional[float] = None
+    total_nav: Optional[float] = None
+    tvpi: Optional[float] = None
+    indexed_value: float
+    monthly_return: Optional[float] = None
+
+
+POINT_FIELDS = series_fields(PerformanceDataPoint)
+
+
+def _monthly_series(n_investments: int = 500, n_months: int = 240) -> Dict[int, List[Dict]]:
+    months = [date(2005 + m // 12, m % 12 + 1, 1).isoformat() for m in range(n_months)]
+    return {
+        i: [{
+            'date': month,
+            'cumulative_contributions': 1_000_000.0 * (k + 1) / n_months,
+            'cumulative_distributions': 400_000.0 * k / n_months + i,
+            'current_nav': 1_100_000.0 + k * 13.7 - i,
+            'tvpi': 1.0 + k / 1000.3,
+            'indexed_value': 100.0 + k / 3.1,
+            'monthly_return': (k * 0.0123 + i * 0.0007) % 0.05,
+        } for k, month in enumerate(months)]
+        for i in range(n_investments)
+    }
+
+
+def _get(app: FastAPI, path: str, accept_encoding: str = 'gzip'):
+    """Status, headers and body of a GET request sent straight to the ASGI app"""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': 'GET',
+             'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+             'root_path': '', 'headers': [(b'accept-encoding', accept_encoding.encode())],
+             'client': ('test', 0), 'server': ('test', 80)}
+    asyncio.run(app(scope, receive, send))
+    start = next(m for m in messages if m['type'] == 'http.response.start')
+    headers = {k.decode(): v.decode() for k, v in start['headers']}
+    body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    return start['status'], headers, body
+
+
+def test_dumps_encodes_analytics_types_natively():
+    payload = {
+        'as_of': date(2024, 6, 30),
+        'updated': datetime(2024, 7, 1, 9, 30),
+        'type': CashFlowType.DISTRIBUTION,
+        'uuid': uuid.UUID(int=1),
+        'amount': Decimal('1250.50'),
+        'irr': np.float64(0.1234),
+        'benchmark_performances': {3: [{'tvpi': 1.5}]},
+        'point': PerformanceDataPoint(date='2024-06-30', indexed_value=101.5),
+    }
+    decoded = json.loads(dumps(payload))
+    assert decoded['as_of'] == '2024-06-30' and decoded['updated'] == '2024-07-01T09:30:00'
+    assert decoded['type'] == CashFlowType.DISTRIBUTION.value
+    assert decoded['uuid'] == str(uuid.UUID(int=1))
+    assert decoded['amount'] == 1250.5 and decoded['irr'] == 0.1234
+    assert decoded['benchmark_performances'] == {'3': [{'tvpi': 1.5}]}
+    assert decoded['point']['indexed_value'] == 101.5 and decoded['point']['tvpi'] is None
+
+    response = FastJSONResponse({'as_of': date(2024, 6, 30)}, headers={'X-Next-Cursor': 'abc'})
+    assert response.body == b'{"as_of":"2024-06-30"}' and response.media_type == 'application/json'
+    assert response.headers['x-next-cursor'] == 'abc'
+
+
+def test_chart_series_layouts():
+    points = [{'date': '2024-01-31', 'indexed_value': 100.0, 'tvpi': 1.0},
+              {'date': '2024-02-29', 'indexed_value': 101.0, 'tvpi': 1.01, 'monthly_return': 0.01}]
+
+    # With fields, rows match what the response model produced: every field present, in order
+    rows = chart_series(points, POINT_FIELDS)
+    adapter = TypeAdapter(List[PerformanceDataPoint])
+    assert rows == adapter.dump_python(adapter.validate_python(points))
+    assert list(rows[0]) == list(POINT_FIELDS)
+
+    columns = chart_series(points, POINT_FIELDS, 'columns')
+    assert columns['date'] == ['2024-01-31', '2024-02-29']
+    assert columns['monthly_return'] == [None, 0.01] and columns['total_nav'] == [None, None]
+    assert chart_series([], POINT_FIELDS, 'columns')['date'] == []
+
+    # Without fields, rows pass through untouched and columns cover every key seen
+    assert chart_series(points) == points
+    assert list(chart_series(points, layout='columns')) == ['date', 'indexed_value', 'tvpi', 'monthly_return']
+
+    payload = {'benchmarks': [{'id': 3}], 'investment_performance': points, 'benchmark_performances': {3: points}}
+    laid_out = chart_payload(payload, {'investment_performance': None, 'benchmark_performances': None}, 'columns')
+    assert laid_out['benchmarks'] == [{'id': 3}]
+    assert laid_out['benchmark_performances'][3]['tvpi'] == [1.0, 1.01]
+    assert payload['investment_performance'] is points  # the input is not modified
+
+    try:
+        chart_series(points, layout='csv')
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+
+
+def test_compression_threshold():
+    app = FastAPI()
+    encoding = add_compression(app)
+    series = _monthly_series(3, 240)
+
+    @app.get("/series")
+    def get_series():
+        return FastJSONResponse(chart_payload({'series': series}, {'series': POINT_FIELDS}, 'columns'))
+
+    @app.get("/small")
+    def get_small():
+        return FastJSONResponse({'status': 'ok'})
+
+    status, headers, body = _get(app, "/series")
+    assert status == 200 and headers['content-encoding'] == encoding
+    if encoding == 'gzip':
+        assert json.loads(gzip.decompress(body))['series']['0']['date'][0] == '2005-01-01'
+
+    status, headers, body = _get(app, "/small")
+    assert 'content-encoding' not in headers and json.loads(body) == {'status': 'ok'}
+
+    status, headers, body = _get(app, "/series", accept_encoding='identity')
+    assert 'content-encoding' not in headers and len(json.loads(body)['series']) == 3
+
+
+def test_serialization_benchmark():
+    series = _monthly_series()
+    payload = {'benchmark_performances': series}
+    adapter = TypeAdapter(Dict[int, List[PerformanceDataPoint]])
+
+    def default_path():
+        # What FastAPI does for a response_model route: validate, serialize, then json.dumps
+        content = adapter.dump_python(adapter.validate_python(series), mode='json')
+        return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(',', ':')).encode()
+
+    def untyped_path():
+        # Routes without a response_model go through jsonable_encoder instead
+        return json.dumps(jsonable_encoder(series), ensure_ascii=False, separators=(',', ':')).encode()
+
+    results = {}
+    for name, encode in [
+        ('response_model + json', default_path),
+        ('jsonable_encoder + json', untyped_path),
+        ('orjson rows', lambda: dumps(chart_payload(payload, {'benchmark_performances': POINT_FIELDS}))),
+        ('orjson columns', lambda: dumps(chart_payload(payload, {'benchmark_performances': POINT_FIELDS}, 'columns'))),
+    ]:
+        started = time.perf_counter()
+        body = encode()
+        results[name] = (time.perf_counter() - started, body)
+
+    print("\n  500 investments x 240 months (120,000 points):")
+    for name, (elapsed, body) in results.items():
+        print(f"  {name:<26} {elapsed * 1000:8.0f} ms {len(body) / 1e6:8.1f} MB raw"
+              f" {len(gzip.compress(body, 6)) / 1e6:8.2f} MB gzip")
+
+    default_time = results['response_model + json'][0]
+    rows_time, rows_body = results['orjson rows']
+    columns_time, columns_body = results['orjson columns']
+    assert rows_time * 4 < default_time and columns_time * 4 < default_time
+    assert rows_time < 1.5 and columns_time < 1.5
+
+    # Same values either way; columns send field names once per series
+    assert json.loads(rows_body)['benchmark_performances']['7'][12] == \
+        json.loads(results['response_model + json'][1])['7'][12]
+    assert len(columns_body) * 2 < len(rows_body)
+    assert len(gzip.compress(columns_body, 6)) * 10 < len(columns_body)
+
+
+if __name__ == "__main__":
+    test_dumps_encodes_analytics_types_natively()
+    test_chart_series_layouts()
+    test_compression_threshold()
+    test_serialization_benchmark()
+    print("✅ All JSON response tests passed")
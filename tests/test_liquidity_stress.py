@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Tests for the Monte Carlo liquidity stress engine
+Runs the engine directly on synthetic pacing arrays - no database required
+"""
+
+import sys
+sys.path.append('.')
+
+import time
+import numpy as np
+
+from app.liquidity_forecast_service import MonteCarloLiquidityEngine
+
+
+def _pacing(n_investments, n_months, padding, seed=0):
+    rng = np.random.default_rng(seed)
+    width = n_months + 2 * padding
+    calls = rng.uniform(0, 100000, (n_investments, width))
+    distributions = rng.uniform(0, 100000, (n_investments, width))
+    return calls, distributions
+
+
+def test_zero_volatility_matches_deterministic_flows():
+    """With no timing or magnitude noise every path equals the base projection"""
+    engine = MonteCarloLiquidityEngine(
+        call_volatility=0.0, distribution_volatility=0.0,
+        call_timing_sigma=0.0, distribution_timing_sigma=0.0,
+        call_timing_bias=0.0, distribution_timing_bias=0.0, seed=1
+    )
+    calls, distributions = _pacing(25, 12, engine.padding_months)
+    result = engine.simulate(calls, distributions, n_simulations=200)
+
+    pad = engine.padding_months
+    expected_net = (distributions - calls)[:, pad:pad + 12].sum(axis=0)
+    assert np.allclose(result.net_flow_bands['p5'], expected_net, rtol=1e-4)
+    assert np.allclose(result.net_flow_bands['p95'], expected_net, rtol=1e-4)
+    assert np.allclose(result.cumulative_net_flow_bands['p50'], np.cumsum(expected_net), rtol=1e-4)
+    assert result.gap_probability == [float(v < 0) for v in expected_net]
+
+
+def test_fixed_adjustments_are_added_to_every_path():
+    engine = MonteCarloLiquidityEngine(seed=2)
+    n_months = 6
+    width = n_months + 2 * engine.padding_months
+    zeros = np.zeros((3, width))
+    fixed_calls = np.zeros((3, n_months))
+    fixed_calls[1, 2] = 750000.0
+
+    result = engine.simulate(zeros, zeros, fixed_calls=fixed_calls,
+                             n_simulations=500, cash_buffer=500000.0)
+
+    assert result.gap_probability == [0.0, 0.0, 1.0, 0.0, 0.0, 0.0]
+    assert result.buffer_breach_probability == [0.0, 0.0, 1.0, 1.0, 1.0, 1.0]
+    assert result.probability_buffer_breach == 1.0
+    assert abs(result.expected_max_shortfall - 750000.0) < 1e-6
+
+
+def test_bands_are_ordered_and_seed_is_reproducible():
+    calls, distributions = _pacing(40, 12, MonteCarloLiquidityEngine().padding_months)
+    first = MonteCarloLiquidityEngine(seed=7).simulate(calls, distributions, n_simulations=1000)
+    second = MonteCarloLiquidityEngine(seed=7).simulate(calls, distributions, n_simulations=1000)
+
+    assert first.cumulative_net_flow_bands == second.cumulative_net_flow_bands
+    bands = first.cumulative_net_flow_bands
+    for month in range(12):
+        assert bands['p5'][month] <= bands['p25'][month] <= bands['p50'][month]
+        assert bands['p50'][month] <= bands['p75'][month] <= bands['p95'][month]
+    assert all(0.0 <= p <= 1.0 for p in first.gap_probability)
+
+
+def test_large_book_performance():
+    """10k paths over a 600-fund book should stay interactive"""
+    engine = MonteCarloLiquidityEngine(seed=3)
+    calls, distributions = _pacing(600, 12, engine.padding_months)
+
+    started = time.perf_counter()
+    result = engine.simulate(calls, distributions, n_simulations=10000)
+    elapsed = time.perf_counter() - started
+
+    print(f"\n  10,000 paths x 600 investments x 12 months: {elapsed:.2f}s")
+    assert result.n_simulations == 10000
+    assert elapsed < 5.0
+
+
+if __name__ == "__main__":
+    test_zero_volatility_matches_deterministic_flows()
+    test_fixed_adjustments_are_added_to_every_path()
+    test_bands_are_ordered_and_seed_is_reproducible()
+    test_large_book_performance()
+    print("✅ All liquidity stress tests passed")
@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""
+Tests for the look-through exposure engine's sparse propagation
+Checks the COO products against dense numpy - no database required
+"""
+
+import sys
+sys.path.append('.')
+
+from datetime import date
+import numpy as np
+
+from app.lookthrough_service import _coo_sum, _coo_matmul, LookThroughExposure
+
+
+def _coo(dense):
+    rows, cols = np.nonzero(dense)
+    return _coo_sum(rows, cols, dense[rows, cols], dense.shape[1])
+
+
+def _dense(coo, shape):
+    out = np.zeros(shape)
+    np.add.at(out, (coo[0], coo[1]), coo[2])
+    return out
+
+
+def test_coo_matmul_matches_dense_product():
+    rng = np.random.default_rng(0)
+    a = (rng.random((30, 30)) < 0.1) * rng.random((30, 30))
+    b = (rng.random((30, 200)) < 0.05) * rng.random((30, 200))
+
+    product = _coo_matmul(_coo(a), _coo(b), 200)
+
+    assert np.allclose(_dense(product, (30, 200)), a @ b)
+
+
+def test_hierarchy_propagation_sums_all_levels():
+    # Trust (0) -> LLC (1) -> Partnership (2); entity 3 stands alone
+    adjacency = np.zeros((4, 4))
+    adjacency[0, 1] = adjacency[1, 2] = 1.0
+    direct = np.array([
+        [1.0, 0.0, 0.0],
+        [0.0, 0.6, 0.0],
+        [0.0, 0.0, 1.0],
+        [0.0, 0.4, 0.0],
+    ])
+
+    level, total = _coo(direct), [_coo(direct)]
+    while len(level[0]):
+        level = _coo_matmul(_coo(adjacency), level, 3)
+        total.append(level)
+    lookthrough = _coo_sum(*(np.concatenate(parts) for parts in zip(*total)), 3)
+
+    expected = direct + adjacency @ direct + adjacency @ adjacency @ direct
+    assert np.allclose(_dense(lookthrough, (4, 3)), expected)
+
+    exposure = LookThroughExposure(
+        tenant_id=1, as_of_date=date(2024, 12, 31),
+        entity_ids=[10, 11, 12, 13], entity_names={10: "Trust", 11: "LLC", 12: "LP", 13: "Other"},
+        investment_ids=[100, 101, 102], investment_names={100: "A", 101: "B", 102: "C"},
+        direct=_coo(direct), lookthrough=lookthrough,
+        metrics={name: np.array([100.0, 200.0, 300.0]) for name in ('commitment', 'called', 'distributions', 'nav')},
+        max_depth=2
+    )
+    totals = {t['entity_id']: t for t in exposure.entity_totals()}
+    assert totals[10]['direct']['nav'] == 100.0
+    assert totals[10]['look_through']['nav'] == 100.0 + 120.0 + 300.0
+    assert totals[13]['look_through']['commitment'] == 80.0
+
+    holdings = exposure.entity_holdings(10)['holdings']
+    assert [h['investment_id'] for h in holdings] == [102, 101, 100]
+    assert abs(holdings[1]['look_through_percentage'] - 60.0) < 1e-9
+    assert exposure.entity_holdings(99) is None
+
+
+if __name__ == "__main__":
+    test_coo_matmul_matches_dense_product()
+    test_hierarchy_propagation_sums_all_levels()
+    print("✅ All look-through tests passed")
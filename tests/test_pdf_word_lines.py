@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Regression tests for the PDF parser's HTML-style line/word grouping
+Compares the vectorized chars_to_word_lines with the original per-character loop
+on synthetic pages and on every page of the sample PDFs in docs/benchmarks.
+Run directly for a timing comparison.
+"""
+
+import sys
+sys.path.append('.')
+
+import glob
+import os
+import random
+import time
+
+import pytest
+
+from app.services.pdf_parser import chars_to_word_lines
+
+SAMPLE_PDFS = sorted(
+    path for path in glob.glob('docs/benchmarks/source_documents/*.pdf') if os.path.getsize(path) > 0
+)
+
+
+def reference_word_lines(chars):
+    """The original dict-sorting, string-concatenating implementation"""
+    Y_TOLERANCE = 5
+    sorted_chars = sorted(chars, key=lambda c: (round(-c['y0']), c['x0']))
+
+    lines = []
+    current_line = []
+    last_y = -1
+    for char in sorted_chars:
+        char_y = char['y0']
+        if last_y == -1 or abs(char_y - last_y) < Y_TOLERANCE:
+            current_line.append(char)
+        else:
+            if current_line:
+                current_line.sort(key=lambda c: c['x0'])
+                lines.append(current_line)
+            current_line = [char]
+        last_y = char_y
+    if current_line:
+        current_line.sort(key=lambda c: c['x0'])
+        lines.append(current_line)
+
+    word_lines = []
+    for line in lines:
+        words = []
+        current_word = ""
+        for i, char in enumerate(line):
+            if current_word == "":
+                current_word = char['text']
+            else:
+                prev_char = line[i-1] if i > 0 else None
+                if prev_char and char['x0'] - prev_char['x1'] <= 3:
+                    current_word += char['text']
+                else:
+                    if current_word.strip():
+                        words.append(current_word.strip())
+                    current_word = char['text']
+        if current_word.strip():
+            words.append(current_word.strip())
+        if words:
+            word_lines.append(words)
+    return word_lines
+
+
+def _synthetic_chars(seed, n=400):
+    rnd = random.Random(seed)
+    chars = []
+    for _ in range(n):
+        x0 = rnd.choice([rnd.uniform(0, 600), float(rnd.randint(0, 60) * 10)])
+        y0 = rnd.choice([rnd.uniform(0, 800), float(rnd.randint(0, 40) * 20) + rnd.choice([0, 0.5, 2.5, 4.9])])
+        width = rnd.choice([4.0, 5.5, 6.0])
+        text = rnd.choice(['a', 'B', '1', '%', ' ', '.', 'fi', '-'])
+        chars.append({'x0': x0, 'x1': x0 + width, 'y0': y0, 'text': text})
+    return chars
+
+
+def test_matches_reference_on_synthetic_pages():
+    for seed in range(25):
+        chars = _synthetic_chars(seed)
+        assert chars_to_word_lines(chars) == reference_word_lines(chars)
+
+
+def test_matches_reference_on_ties_and_chained_lines():
+    chars = [
+        # Same rounded y0 and x0: original order must be kept
+        {'x0': 10.0, 'x1': 14.0, 'y0': 100.2, 'text': 'A'},
+        {'x0': 10.0, 'x1': 14.0, 'y0': 99.8, 'text': 'B'},
+        # y0 drifts by < 5 per char, so the line keeps growing
+        {'x0': 30.0, 'x1': 34.0, 'y0': 97.0, 'text': 'C'},
+        {'x0': 20.0, 'x1': 24.0, 'y0': 93.0, 'text': 'D'},
+        {'x0': 24.5, 'x1': 28.0, 'y0': 89.5, 'text': 'E'},
+        {'x0': 50.0, 'x1': 54.0, 'y0': 60.0, 'text': ' '},
+        {'x0': 70.0, 'x1': 74.0, 'y0': 60.0, 'text': 'F'},
+    ]
+    assert chars_to_word_lines(chars) == reference_word_lines(chars)
+
+
+def test_blank_pages():
+    assert chars_to_word_lines([]) == reference_word_lines([]) == []
+    whitespace = [{'x0': 10.0, 'x1': 14.0, 'y0': 100.0, 'text': ' '}]
+    assert chars_to_word_lines(whitespace) == reference_word_lines(whitespace) == []
+
+
+@pytest.mark.skipif(not SAMPLE_PDFS, reason="no sample PDFs")
+def test_matches_reference_on_sample_pdfs():
+    pdfplumber = pytest.importorskip('pdfplumber')
+    for path in SAMPLE_PDFS:
+        with pdfplumber.open(path) as pdf:
+            for page in pdf.pages:
+                chars = page.chars
+                if len(chars) < 10:
+                    continue
+                assert chars_to_word_lines(chars) == reference_word_lines(chars), f"{path} page {page.page_number}"
+
+
+if __name__ == "__main__":
+    test_matches_reference_on_synthetic_pages()
+    test_matches_reference_on_ties_and_chained_lines()
+    test_blank_pages()
+    test_matches_reference_on_sample_pdfs()
+
+    import pdfplumber
+    for path in SAMPLE_PDFS:
+        with pdfplumber.open(path) as pdf:
+            pages = [page.chars for page in pdf.pages]
+        timings = {'original': [], 'vectorized': []}
+        for _ in range(10):
+            for name, func in (('original', reference_word_lines), ('vectorized', chars_to_word_lines)):
+                started = time.perf_counter()
+                for chars in pages:
+                    func(chars)
+                timings[name].append(time.perf_counter() - started)
+        timings = {name: min(runs) for name, runs in timings.items()}
+        print(f"{os.path.basename(path)}: {len(pages)} pages, {sum(map(len, pages))} chars - "
+              f"original {timings['original'] * 1000:.0f} ms, vectorized {timings['vectorized'] * 1000:.0f} ms "
+              f"({timings['original'] / timings['vectorized']:.1f}x)")
+    print("✅ All PDF word line tests passed")
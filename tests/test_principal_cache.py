@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the short-TTL principal cache used by get_current_user
+No database required
+"""
+
+import sys
+sys.path.append('.')
+
+from app import auth
+from app.models import User, UserRole
+
+
+def _user(user_id=1, tenant_id=10, role=UserRole.MANAGER):
+    return User(id=user_id, tenant_id=tenant_id, username=f"user{user_id}", email=f"user{user_id}@example.com",
+                hashed_password="x", role=role, is_active=True)
+
+
+def test_cached_principal_is_a_detached_copy():
+    auth.invalidate_principal()
+    user = _user()
+    auth.cache_principal(user)
+
+    cached = auth.get_cached_principal(1, 10)
+    assert cached is not user
+    assert (cached.id, cached.tenant_id, cached.role) == (1, 10, UserRole.MANAGER)
+    assert auth.get_cached_principal(1, 11) is None
+
+
+def test_invalidation_and_expiry():
+    auth.invalidate_principal()
+    for user in (_user(1, 10), _user(2, 10), _user(3, 20)):
+        auth.cache_principal(user)
+
+    auth.invalidate_principal(user_id=1, tenant_id=10)
+    assert auth.get_cached_principal(1, 10) is None
+    assert auth.get_cached_principal(2, 10) is not None
+
+    auth.invalidate_principal(tenant_id=10)
+    assert auth.get_cached_principal(2, 10) is None
+    assert auth.get_cached_principal(3, 20) is not None
+
+    ttl = auth.PRINCIPAL_CACHE_TTL_SECONDS
+    try:
+        auth.PRINCIPAL_CACHE_TTL_SECONDS = -1
+        auth.cache_principal(_user(4, 20))
+        assert auth.get_cached_principal(4, 20) is None
+    finally:
+        auth.PRINCIPAL_CACHE_TTL_SECONDS = ttl
+        auth.invalidate_principal()
+
+
+if __name__ == "__main__":
+    test_cached_principal_is_a_detached_copy()
+    test_invalidation_and_expiry()
+    print("✅ All principal cache tests passed")
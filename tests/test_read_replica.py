@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""
+Tests for read-replica session routing
+Uses a temporary SQLite primary and a snapshot file as the replica, and drives
+a small ASGI app directly for the per-client read-after-write cookie
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import os
+import tempfile
+import time
+
+from fastapi import Depends, FastAPI, Request
+from sqlalchemy import Column, Integer, MetaData, Table, insert, select, func
+from sqlalchemy.orm import sessionmaker
+
+from app.database import (
+    READ_AFTER_WRITE_COOKIE, READ_AFTER_WRITE_HEADER, ReadAfterWriteMiddleware, ReadSessionRouter,
+    _install_write_tracking, client_last_write_at, create_db_engine, snapshot_sqlite_replica
+)
+
+metadata = MetaData()
+items = Table("items", metadata, Column("id", Integer, primary_key=True))
+
+
+def _count(session):
+    return session.execute(select(func.count()).select_from(items)).scalar()
+
+
+def _request(app: FastAPI, method: str, path: str, headers=()):
+    """Status, headers (values joined per name) and body of a request sent straight to the ASGI app"""
+    messages = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': b'', 'more_body': False}
+
+    async def send(message):
+        messages.append(message)
+
+    scope = {'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1', 'method': method,
+             'scheme': 'http', 'path': path, 'raw_path': path.encode(), 'query_string': b'',
+             'root_path': '', 'headers': [(k.lower().encode(), v.encode()) for k, v in headers],
+             'client': ('test', 0), 'server': ('test', 80)}
+    asyncio.run(app(scope, receive, send))
+    start = next(m for m in messages if m['type'] == 'http.response.start')
+    response_headers = {}
+    for k, v in start['headers']:
+        response_headers.setdefault(k.decode(), []).append(v.decode())
+    body = b''.join(m.get('body', b'') for m in messages if m['type'] == 'http.response.body')
+    return start['status'], response_headers, body
+
+
+def test_reads_follow_freshness_guard():
+    with tempfile.TemporaryDirectory() as directory:
+        primary_url = f"sqlite:///{os.path.join(directory, 'primary.db')}"
+        replica_url = f"sqlite:///{os.path.join(directory, 'replica.db')}"
+        primary, replica = create_db_engine(primary_url), create_db_engine(replica_url)
+        try:
+            metadata.create_all(primary)
+            snapshot_sqlite_replica(primary_url, replica_url)
+
+            Primary, Replica = sessionmaker(bind=primary), sessionmaker(bind=replica)
+            router = ReadSessionRouter(Primary, Replica, max_lag_seconds=60)
+            _install_write_tracking(Primary)
+
+            with Primary() as session:
+                session.execute(insert(items).values(id=1))
+                session.commit()
+
+            # A write outside any request marks no client; reads go to the replica snapshot
+            assert router.use_replica()
+            with router.session() as session:
+                assert _count(session) == 0
+
+            # A client that wrote recently reads from the primary and sees the row
+            assert not router.use_replica(time.time() - 5)
+            with router.session(time.time() - 5) as session:
+                assert _count(session) == 1
+            assert router.use_replica(time.time() - 61)
+
+            snapshot_sqlite_replica(primary_url, replica_url)
+            with router.session() as session:
+                assert _count(session) == 1
+        finally:
+            primary.dispose()
+            replica.dispose()
+
+
+def test_read_after_write_is_tracked_per_client():
+    with tempfile.TemporaryDirectory() as directory:
+        primary_url = f"sqlite:///{os.path.join(directory, 'primary.db')}"
+        replica_url = f"sqlite:///{os.path.join(directory, 'replica.db')}"
+        primary, replica = create_db_engine(primary_url), create_db_engine(replica_url)
+        try:
+            metadata.create_all(primary)
+            snapshot_sqlite_replica(primary_url, replica_url)
+            Primary, Replica = sessionmaker(bind=primary), sessionmaker(bind=replica)
+            router = ReadSessionRouter(Primary, Replica, max_lag_seconds=60)
+            _install_write_tracking(Primary)
+
+            def get_db():
+                with Primary() as db:
+                    yield db
+
+            def get_read_db(request: Request):
+                with router.session(client_last_write_at(request)) as db:
+                    yield db
+
+            app = FastAPI()
+            app.add_middleware(ReadAfterWriteMiddleware, max_age_seconds=60)
+
+            @app.post("/items/{item_id}")
+            def add_item(item_id: int, db=Depends(get_db)):
+                db.execute(insert(items).values(id=item_id))
+                db.commit()
+                return {"id": item_id}
+
+            @app.get("/items/count")
+            def count_items(db=Depends(get_read_db)):
+                # A read-only commit is not a write
+                count = _count(db)
+                db.commit()
+                return {"count": count}
+
+            status, headers, body = _request(app, "GET", "/items/count")
+            assert status == 200 and body == b'{"count":0}'
+            assert 'set-cookie' not in headers and READ_AFTER_WRITE_HEADER.lower() not in headers
+
+            status, headers, _ = _request(app, "POST", "/items/1")
+            assert status == 200
+            cookie, = headers['set-cookie']
+            assert cookie.startswith(f"{READ_AFTER_WRITE_COOKIE}=") and "Max-Age=60" in cookie
+            written_at, = headers[READ_AFTER_WRITE_HEADER.lower()]
+            assert abs(float(written_at) - time.time()) < 5
+
+            # The writer reads its own write from the primary, by cookie or by header
+            cookie_value = cookie.split(';')[0]
+            assert _request(app, "GET", "/items/count", [('Cookie', cookie_value)])[2] == b'{"count":1}'
+            assert _request(app, "GET", "/items/count", [(READ_AFTER_WRITE_HEADER, written_at)])[2] == b'{"count":1}'
+
+            # Other clients, stale or malformed markers stay on the replica
+            assert _request(app, "GET", "/items/count")[2] == b'{"count":0}'
+            stale = str(float(written_at) - 120)
+            assert _request(app, "GET", "/items/count", [(READ_AFTER_WRITE_HEADER, stale)])[2] == b'{"count":0}'
+            for malformed in ('soon', 'nan', 'inf'):
+                assert _request(app, "GET", "/items/count",
+                                [('Cookie', f"{READ_AFTER_WRITE_COOKIE}={malformed}")])[2] == b'{"count":0}'
+        finally:
+            primary.dispose()
+            replica.dispose()
+
+
+def test_without_replica_reads_use_primary():
+    Primary = sessionmaker()
+    router = ReadSessionRouter(Primary)
+    assert not router.use_replica()
+    assert not router.use_replica(time.time() - 3600)
+
+
+if __name__ == "__main__":
+    test_reads_follow_freshness_guard()
+    test_read_after_write_is_tracked_per_client()
+    test_without_replica_reads_use_primary()
+    print("✅ All read replica tests passed")
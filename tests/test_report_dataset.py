@@ -0,0 +1,85 @@
+#!/usr/bin/env python3
+"""
+Tests for the precomputed report dataset
+Builds a dataset by hand and renders the reports from it - no database required
+"""
+
+import sys
+sys.path.append('.')
+
+from datetime import date
+import pandas as pd
+
+from app.models import CashFlowType, InvestmentStatus
+from app.performance import calculate_irr, CashFlowEvent
+from app.report_data import ReportDataset, ReportPosition
+from app.report_service import PortfolioSummaryReport, HoldingsReport, EntityPerformanceReport, CashFlowActivityReport
+
+
+def _dataset():
+    positions = {
+        1: ReportPosition(1, "Fund A", 10, "Family Trust", "PRIVATE_EQUITY", 2020, InvestmentStatus.ACTIVE, 1000.0,
+                          current_nav=900.0, paid_in=600.0, paid_out=100.0, called=600.0, distributions=100.0),
+        2: ReportPosition(2, "Fund B", 10, "Family Trust", "VENTURE_CAPITAL", 2021, InvestmentStatus.ACTIVE, 500.0,
+                          current_nav=250.0, paid_in=200.0, paid_out=0.0, called=200.0, distributions=0.0),
+        3: ReportPosition(3, "Fund C", 20, "Holdings LLC", "PRIVATE_EQUITY", None, InvestmentStatus.REALIZED, 300.0,
+                          current_nav=0.0, paid_in=300.0, paid_out=450.0, called=300.0, distributions=450.0),
+    }
+    flows = pd.DataFrame([
+        (1, date(2020, 3, 31), CashFlowType.CAPITAL_CALL, -600.0, None),
+        (1, date(2022, 6, 30), CashFlowType.DISTRIBUTION, 100.0, None),
+        (2, date(2021, 3, 31), CashFlowType.CAPITAL_CALL, -200.0, None),
+        (3, date(2020, 3, 31), CashFlowType.CAPITAL_CALL, -300.0, None),
+        (3, date(2023, 12, 31), CashFlowType.DISTRIBUTION, 450.0, "Final"),
+    ], columns=['investment_id', 'date', 'type', 'amount', 'notes'])
+    return ReportDataset(
+        tenant_id=1, as_of_date=date(2024, 6, 30), data_version=(),
+        positions=positions, entities={10: ("Family Trust", "TRUST"), 20: ("Holdings LLC", "LLC")}, flows=flows
+    )
+
+
+def test_rollups():
+    dataset = _dataset()
+
+    by_entity = dataset.by_entity()
+    assert by_entity[10].count == 2
+    assert by_entity[10].current_nav == 1150.0
+    assert by_entity[20].distributions == 450.0
+
+    by_asset_class = dataset.by_asset_class()
+    assert by_asset_class["PRIVATE_EQUITY"].investment_ids == [1, 3]
+
+    # Positions without a vintage are left out of the vintage rollup
+    assert sorted(dataset.by_vintage()) == [2020, 2021]
+
+
+def test_irr_flows_net_same_day_flows_without_changing_irr():
+    dataset = _dataset()
+    netted = dataset.irr_flows(terminal_value=1150.0)
+    unnetted = [CashFlowEvent(d, a) for d, a in zip(dataset.flows['date'], dataset.flows['amount'])]
+    unnetted.append(CashFlowEvent(dataset.as_of_date, 1150.0))
+
+    assert len(netted) == len(unnetted) - 1  # two calls on 2020-03-31 merge
+    assert abs(calculate_irr(netted) - calculate_irr(unnetted)) < 1e-9
+
+
+def test_all_reports_render_from_dataset():
+    dataset = _dataset()
+    pdfs = [
+        PortfolioSummaryReport().generate_from_dataset(dataset),
+        HoldingsReport().generate_from_dataset(dataset, grouped_by="entity", status_filter="ALL"),
+        EntityPerformanceReport().generate_from_dataset(dataset),
+        CashFlowActivityReport().generate_from_dataset(
+            dataset, start_date=date(2021, 1, 1), end_date=dataset.as_of_date,
+            cash_flow_types=[CashFlowType.DISTRIBUTION], group_by="entity"
+        ),
+    ]
+    for pdf in pdfs:
+        assert pdf.getvalue().startswith(b"%PDF")
+
+
+if __name__ == "__main__":
+    test_rollups()
+    test_irr_flows_net_same_day_flows_without_changing_irr()
+    test_all_reports_render_from_dataset()
+    print("✅ All report dataset tests passed")
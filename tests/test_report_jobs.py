@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""
+Tests for report generation jobs and the on-disk report cache
+Uses an in-memory dataset and a stub renderer - no database required
+"""
+
+import sys
+sys.path.append('.')
+
+import asyncio
+import os
+import tempfile
+import time
+from datetime import date
+
+import pandas as pd
+
+from app.models import CashFlowType
+from app.report_data import ReportDataset
+from app.report_jobs import ReportCache, ReportJobManager, ReportSpec, report_cache_key
+
+AS_OF = date(2025, 3, 31)
+VERSION = ((3, '2025-03-01T00:00:00'),)
+
+
+def _dataset(data_version=VERSION):
+    flows = pd.DataFrame(columns=['investment_id', 'date', 'type', 'amount', 'notes'])
+    return ReportDataset(tenant_id=1, as_of_date=AS_OF, data_version=data_version,
+                         positions={}, entities={7: ('Smith Trust', 'Trust')}, flows=flows)
+
+
+def test_spec_defaults_and_cache_keys():
+    holdings = ReportSpec.create('holdings', AS_OF)
+    assert dict(holdings.options) == {'grouped_by': 'entity', 'status_filter': 'ACTIVE'}
+    assert holdings.filename() == 'holdings_report_20250331.pdf'
+    assert ReportSpec.create('holdings', AS_OF, 7).filename() == 'holdings_report_entity7_20250331.pdf'
+
+    key = report_cache_key(1, holdings, VERSION)
+    assert key == report_cache_key(1, ReportSpec.create('holdings', AS_OF, grouped_by='entity'), VERSION)
+    assert key != report_cache_key(2, holdings, VERSION)
+    assert key != report_cache_key(1, holdings, ((4, '2025-03-02T00:00:00'),))
+    assert key != report_cache_key(1, ReportSpec.create('holdings', AS_OF, grouped_by='vintage'), VERSION)
+
+    cash_flows = ReportSpec.create('cash-flow-activity', AS_OF, cash_flow_types=[CashFlowType.CAPITAL_CALL])
+    assert len(report_cache_key(1, cash_flows, VERSION)) == 64
+
+    for bad in (lambda: ReportSpec.create('nav-chart', AS_OF),
+                lambda: ReportSpec.create('portfolio-summary', AS_OF, grouped_by='entity')):
+        try:
+            bad()
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+def test_cache_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = ReportCache(directory, max_bytes=250)
+        keys = [f"{i}" * 64 for i in range(3)]
+        for age, key in enumerate(keys[:2]):
+            path = cache.put(1, key, b'x' * 100)
+            os.utime(path, (time.time() - 100 + age, time.time() - 100 + age))
+
+        assert cache.get(1, keys[0]) is not None  # touching makes keys[1] the oldest
+        cache.put(1, keys[2], b'x' * 100)
+        assert cache.get(1, keys[1]) is None
+        assert cache.get(1, keys[0]) is not None and cache.get(1, keys[2]) is not None
+        assert cache.get(2, keys[0]) is None  # other tenants cannot see the file
+
+        try:
+            cache.path(1, '../../etc/passwd')
+            assert False, "expected ValueError"
+        except ValueError:
+            pass
+
+
+def test_jobs_deduplicate_and_reuse_rendered_pdfs():
+    renders = []
+
+    def load(tenant_id, spec):
+        return "Tenant", _dataset()
+
+    def render(report_class, title, dataset, **options):
+        renders.append((report_class.__name__, title, options))
+        time.sleep(0.05)
+        return b'%PDF-1.4 stub'
+
+    async def run(manager):
+        spec = ReportSpec.create('holdings', AS_OF)
+        first = manager.enqueue(1, spec, VERSION)
+        second = manager.enqueue(1, spec, VERSION)
+        assert second is first and first.status in ('queued', 'running')
+        await manager.wait(first)
+        assert first.status == 'complete' and not first.cached
+        assert first.download_url.endswith(f"{first.cache_key}/holdings_report_20250331.pdf")
+
+        again = manager.enqueue(1, spec, VERSION)
+        assert again is not first and again.cached and again.status == 'complete'
+
+        # Entity-level reports are separate jobs from the portfolio-wide one
+        jobs = [manager.enqueue(1, ReportSpec.create(report_type, AS_OF, 7), VERSION, 'batch-1')
+                for report_type in ('holdings', 'portfolio-summary')]
+        for job in jobs:
+            await manager.wait(job)
+        return jobs
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = ReportJobManager(cache=ReportCache(directory), load_inputs=load, render=render)
+        jobs = asyncio.run(run(manager))
+
+    assert [job.status for job in jobs] == ['complete', 'complete']
+    assert [name for name, _, _ in renders] == ['HoldingsReport', 'HoldingsReport', 'PortfolioSummaryReport']
+    assert manager.get(1, jobs[0].job_id) is jobs[0] and manager.get(2, jobs[0].job_id) is None
+
+
+def test_failed_job_reports_error_and_can_be_retried():
+    attempts = []
+
+    def load(tenant_id, spec):
+        attempts.append(spec)
+        raise ValueError(f"Entity {spec.entity_id} not found")
+
+    async def run(manager):
+        job = manager.enqueue(1, ReportSpec.create('holdings', AS_OF, 99), VERSION)
+        await manager.wait(job)
+        retry = manager.enqueue(1, ReportSpec.create('holdings', AS_OF, 99), VERSION)
+        await manager.wait(retry)
+        return job, retry
+
+    with tempfile.TemporaryDirectory() as directory:
+        manager = ReportJobManager(cache=ReportCache(directory), load_inputs=load, render=lambda *a, **k: b'')
+        job, retry = asyncio.run(run(manager))
+
+    assert job.status == 'failed' and 'not found' in job.error and job.download_url is None
+    assert retry is not job and len(attempts) == 2
+
+
+if __name__ == "__main__":
+    test_spec_defaults_and_cache_keys()
+    test_cache_evicts_least_recently_used()
+    test_jobs_deduplicate_and_reuse_rendered_pdfs()
+    test_failed_job_reports_error_and_can_be_retried()
+    print("✅ All report job tests passed")
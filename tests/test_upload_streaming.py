@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Tests for chunked spreadsheet ingestion
+Builds small workbooks in memory - no database required
+"""
+
+import sys
+sys.path.append('.')
+
+from io import BytesIO
+from openpyxl import Workbook
+
+from app.upload_streaming import iter_excel_chunks, iter_csv_chunks
+
+
+def _workbook(sheet_name, rows):
+    workbook = Workbook()
+    sheet = workbook.active
+    sheet.title = sheet_name
+    for row in rows:
+        sheet.append(row)
+    buffer = BytesIO()
+    workbook.save(buffer)
+    return buffer.getvalue()
+
+
+def test_excel_chunks_carry_sheet_row_numbers():
+    rows = [["Investment Name", "NAV Value"]] + [[f"Fund {i}", i] for i in range(12)]
+    rows.insert(5, [None, None])  # blank row is skipped but keeps numbering
+    content = _workbook("NAV Data", rows)
+
+    chunks = list(iter_excel_chunks(content, "NAV Data", chunk_size=5))
+
+    assert [len(chunk) for chunk in chunks] == [5, 5, 2]
+    assert list(chunks[0].columns) == ["Investment Name", "NAV Value", "_row_num"]
+    assert chunks[0]['_row_num'].tolist() == [2, 3, 4, 5, 7]
+    assert chunks[-1]['Investment Name'].tolist() == ["Fund 10", "Fund 11"]
+    assert chunks[-1]['_row_num'].tolist() == [13, 14]
+
+
+def test_excel_header_row_and_skipped_rows():
+    content = _workbook("Entity Data", [
+        ["Entity Name", "Entity Type"],
+        ["[name]", "[entity_type]"],
+        ["Example Trust", "TRUST"],
+        ["Smith Family Trust", "TRUST"],
+    ])
+
+    chunks = list(iter_excel_chunks(content, "Entity Data", header_row=2, skip_rows=[3]))
+
+    assert len(chunks) == 1
+    assert chunks[0]['[name]'].tolist() == ["Smith Family Trust"]
+    assert chunks[0]['_row_num'].tolist() == [4]
+
+
+def test_missing_sheet_raises():
+    content = _workbook("Other", [["a"], [1]])
+    try:
+        list(iter_excel_chunks(content, "NAV Data"))
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "NAV Data" in str(e)
+
+
+def test_csv_chunks_number_rows_from_header():
+    content = b"name,amount\nA,1\nB,2\nC,3\n"
+    chunks = list(iter_csv_chunks(content, chunk_size=2))
+
+    assert [chunk['_row_num'].tolist() for chunk in chunks] == [[2, 3], [4]]
+
+
+if __name__ == "__main__":
+    test_excel_chunks_carry_sheet_row_numbers()
+    test_excel_header_row_and_skipped_rows()
+    test_missing_sheet_raises()
+    test_csv_chunks_number_rows_from_header()
+    print("✅ All upload streaming tests passed")